@@ -28,6 +28,8 @@
         'data/project_next_action_rules.xml',
         'data/project_stage_requirement_items.xml',
         'data/cron_signup_throttle_gc.xml',
+        'data/projection_refresh_cron.xml',
+        'data/my_work_index_cron.xml',
         'data/sc_extension_params.xml',
         'data/menu_config_runtime_params.xml',
         'data/supplier_type_data.xml',
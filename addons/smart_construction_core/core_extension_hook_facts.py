@@ -279,6 +279,7 @@ def scene_entry_orchestrator_specs():
             "suggested_action_key": "load_dashboard_progress",
             "suggested_action_reason_code": "PROJECT_DASHBOARD_READY",
             "block_fetch_intent": "project.dashboard.block.fetch",
+            "blocks_fetch_intent": "project.dashboard.blocks.fetch",
             "block_alias_map": {"risk": "risks"},
             "first_action_block_keys": ["progress"],
             "entry_summary_keys": (
@@ -310,6 +311,7 @@ def scene_entry_orchestrator_specs():
             "suggested_action_key": "load_execution_next_actions",
             "suggested_action_reason_code": "PROJECT_EXECUTION_READY",
             "block_fetch_intent": "project.execution.block.fetch",
+            "blocks_fetch_intent": "project.execution.blocks.fetch",
             "first_action_block_keys": ["next_actions", "execution_tasks"],
             "entry_summary_keys": common_project_summary + ("date_start", "date_end"),
             "entry_blocks": (
@@ -328,6 +330,7 @@ def scene_entry_orchestrator_specs():
             "suggested_action_key": "load_plan_next_actions",
             "suggested_action_reason_code": "PROJECT_PLAN_BOOTSTRAP_READY",
             "block_fetch_intent": "project.plan_bootstrap.block.fetch",
+            "blocks_fetch_intent": "project.plan_bootstrap.blocks.fetch",
             "first_action_block_keys": ["next_actions", "plan_summary_detail"],
             "entry_summary_keys": common_project_summary + ("date_start", "date_end"),
             "entry_blocks": (
@@ -346,6 +349,7 @@ def scene_entry_orchestrator_specs():
             "suggested_action_key": "load_payment_entry",
             "suggested_action_reason_code": "PAYMENT_SLICE_PREPARED_READY",
             "block_fetch_intent": "payment.block.fetch",
+            "blocks_fetch_intent": "payment.blocks.fetch",
             "first_action_block_keys": ["payment_entry", "payment_list"],
             "entry_summary_keys": common_project_summary + ("payment_record_count", "payment_total_amount"),
             "entry_blocks": (
@@ -365,6 +369,7 @@ def scene_entry_orchestrator_specs():
             "suggested_action_key": "load_settlement_summary",
             "suggested_action_reason_code": "SETTLEMENT_SLICE_PREPARED_READY",
             "block_fetch_intent": "settlement.block.fetch",
+            "blocks_fetch_intent": "settlement.blocks.fetch",
             "entry_summary_keys": common_project_summary + ("total_cost", "total_payment", "delta"),
             "entry_blocks": (
                 ("settlement_summary", "结算结果", "deferred"),
@@ -381,6 +386,7 @@ def scene_entry_orchestrator_specs():
             "suggested_action_key": "load_cost_entry",
             "suggested_action_reason_code": "COST_SLICE_PREPARED_READY",
             "block_fetch_intent": "cost.tracking.block.fetch",
+            "blocks_fetch_intent": "cost.tracking.blocks.fetch",
             "first_action_block_keys": ["cost_entry", "cost_list"],
             "entry_summary_keys": common_project_summary + ("cost_record_count", "cost_total_amount"),
             "entry_blocks": (
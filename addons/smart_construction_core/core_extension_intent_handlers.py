@@ -73,18 +73,21 @@ def get_intent_handler_contributions():
         )
         from odoo.addons.smart_construction_core.handlers.project_dashboard_block_fetch import (
             ProjectDashboardBlockFetchHandler,
+            ProjectDashboardBlocksFetchHandler,
         )
         from odoo.addons.smart_construction_core.handlers.project_plan_bootstrap_enter import (
             ProjectPlanBootstrapEnterHandler,
         )
         from odoo.addons.smart_construction_core.handlers.project_plan_bootstrap_block_fetch import (
             ProjectPlanBootstrapBlockFetchHandler,
+            ProjectPlanBootstrapBlocksFetchHandler,
         )
         from odoo.addons.smart_construction_core.handlers.project_execution_enter import (
             ProjectExecutionEnterHandler,
         )
         from odoo.addons.smart_construction_core.handlers.project_execution_block_fetch import (
             ProjectExecutionBlockFetchHandler,
+            ProjectExecutionBlocksFetchHandler,
         )
         try:
             from odoo.addons.smart_construction_core.handlers.project_execution_advance import (
@@ -101,6 +104,7 @@ def get_intent_handler_contributions():
         )
         from odoo.addons.smart_construction_core.handlers.cost_tracking_block_fetch import (
             CostTrackingBlockFetchHandler,
+            CostTrackingBlocksFetchHandler,
         )
         try:
             from odoo.addons.smart_construction_core.handlers.cost_tracking_record_create import (
@@ -119,9 +123,10 @@ def get_intent_handler_contributions():
         try:
             from odoo.addons.smart_construction_core.handlers.payment_slice_block_fetch import (
                 PaymentSliceBlockFetchHandler,
+                PaymentSliceBlocksFetchHandler,
             )
         except Exception as exc:
-            PaymentSliceBlockFetchHandler = None
+            PaymentSliceBlockFetchHandler = PaymentSliceBlocksFetchHandler = None
             _logger.warning("[get_intent_handler_contributions] skip payment_slice_block_fetch: %s", exc)
         try:
             from odoo.addons.smart_construction_core.handlers.payment_slice_record_create import (
@@ -140,10 +145,14 @@ def get_intent_handler_contributions():
         try:
             from odoo.addons.smart_construction_core.handlers.settlement_slice_block_fetch import (
                 SettlementSliceBlockFetchHandler,
+                SettlementSliceBlocksFetchHandler,
             )
         except Exception as exc:
-            SettlementSliceBlockFetchHandler = None
+            SettlementSliceBlockFetchHandler = SettlementSliceBlocksFetchHandler = None
             _logger.warning("[get_intent_handler_contributions] skip settlement_slice_block_fetch: %s", exc)
+        from odoo.addons.smart_construction_core.handlers.projection_refresh import (
+            ProjectionRefreshHandler,
+        )
         from odoo.addons.smart_construction_core.handlers.workspace_home_enter import (
             WorkspaceHomeEnterHandler,
         )
@@ -178,24 +187,31 @@ def get_intent_handler_contributions():
         ("project.entry.context.options", ProjectEntryContextOptionsHandler),
         ("business.evidence.trace", BusinessEvidenceTraceHandler),
         ("project.dashboard.block.fetch", ProjectDashboardBlockFetchHandler),
+        ("project.dashboard.blocks.fetch", ProjectDashboardBlocksFetchHandler),
         ("project.plan_bootstrap.enter", ProjectPlanBootstrapEnterHandler),
         ("project.plan_bootstrap.block.fetch", ProjectPlanBootstrapBlockFetchHandler),
+        ("project.plan_bootstrap.blocks.fetch", ProjectPlanBootstrapBlocksFetchHandler),
         ("project.execution.enter", ProjectExecutionEnterHandler),
         ("project.execution.block.fetch", ProjectExecutionBlockFetchHandler),
+        ("project.execution.blocks.fetch", ProjectExecutionBlocksFetchHandler),
         ("project.execution.advance", ProjectExecutionAdvanceHandler),
         ("project.connection.transition", ProjectConnectionTransitionHandler),
         ("cost.tracking.enter", CostTrackingEnterHandler),
         ("cost.tracking.block.fetch", CostTrackingBlockFetchHandler),
+        ("cost.tracking.blocks.fetch", CostTrackingBlocksFetchHandler),
         ("cost.tracking.record.create", CostTrackingRecordCreateHandler),
         ("payment.enter", PaymentSliceEnterHandler),
         ("payment.block.fetch", PaymentSliceBlockFetchHandler),
+        ("payment.blocks.fetch", PaymentSliceBlocksFetchHandler),
         ("payment.record.create", PaymentSliceRecordCreateHandler),
         ("settlement.enter", SettlementSliceEnterHandler),
         ("settlement.block.fetch", SettlementSliceBlockFetchHandler),
+        ("settlement.blocks.fetch", SettlementSliceBlocksFetchHandler),
         ("project.initiation.enter", ProjectInitiationEnterHandler),
         ("risk.action.execute", RiskActionExecuteHandler),
         ("workspace.home.enter", WorkspaceHomeEnterHandler),
         ("dashboard.company.enter", DashboardCompanyEnterHandler),
+        ("projection.refresh", ProjectionRefreshHandler),
     ]
     return [
         {
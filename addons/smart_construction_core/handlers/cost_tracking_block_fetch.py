@@ -17,6 +17,7 @@ from odoo.addons.smart_core.orchestration.cost_tracking_contract_orchestrator im
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
 )
+from odoo.addons.smart_construction_core.handlers.scene_blocks_fetch import SceneBlocksFetchMixin
 
 
 class CostTrackingBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandler):
@@ -78,3 +79,9 @@ class CostTrackingBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandl
                 "source_authority": source_authority,
             },
         }
+
+
+class CostTrackingBlocksFetchHandler(SceneBlocksFetchMixin, CostTrackingBlockFetchHandler):
+    INTENT_TYPE = "cost.tracking.blocks.fetch"
+    DESCRIPTION = "批量返回 cost.tracking runtime blocks（可 NDJSON 流式）"
+    ORCHESTRATOR = CostTrackingContractOrchestrator
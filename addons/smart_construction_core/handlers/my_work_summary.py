@@ -1,8 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import re
-
 from odoo import fields
 from odoo.addons.smart_core.core.base_handler import BaseIntentHandler
 from odoo.addons.smart_core.core.project_context import (
@@ -24,6 +22,7 @@ from odoo.addons.smart_core.utils.reason_codes import (
     REASON_WORKFLOW_PENDING,
 )
 from odoo.addons.smart_construction_core.services.my_work_aggregate_service import WorkItemAggregateService
+from odoo.addons.smart_construction_core.services.my_work_index_service import parse_followup_note
 from odoo.exceptions import AccessError
 from odoo.addons.smart_construction_core.services.project_execution_item_projection_service import (
     ProjectExecutionItemProjectionService,
@@ -68,6 +67,12 @@ class MyWorkSummaryHandler(BaseIntentHandler):
     STATUS_EMPTY = "EMPTY"
     STATUS_FILTER_EMPTY = "FILTER_EMPTY"
     SORT_FIELDS = WorkItemAggregateService.SORT_FIELDS
+    # 排序键 -> sc.my.work.item 列；未列出的同名。
+    INDEX_SORT_COLUMNS = {
+        "id": "source_res_id",
+        "model": "model_name",
+        "priority": "priority_rank",
+    }
     SOURCE_LABELS = {
         "mail.activity": "待办提醒",
         "tier.review": "审批复核",
@@ -177,30 +182,35 @@ class MyWorkSummaryHandler(BaseIntentHandler):
             record_id = self._coerce_record_id(row.get("record_id"))
             if not self._row_in_current_project_scope(model, record_id):
                 continue
-            action_ctx = self._resolve_action_context_for_model(model)
-            action_id = int(action_ctx.get("action_id") or 0)
-            menu_id = int(action_ctx.get("menu_id") or 0)
-            target = build_my_work_target(
-                model_name=model,
-                record_id=record_id,
-                action_id=action_id,
-                menu_id=menu_id,
-                explicit_scene_key=str(row.get("scene_key") or ""),
-                source_key=str(row.get("source") or ""),
-                section_key=str(row.get("section") or ""),
-            )
-            row["scene_key"] = str(target.get("scene_key") or "")
-            row["target"] = target
-            row.setdefault("source_label", self._source_label(row))
-            row.setdefault("project_name", self._row_project_name(model, record_id, row))
-            row.setdefault("action_summary", self._action_summary(row))
-            row["can_complete"] = self._can_complete(row)
-            complete_action = self._complete_action(row)
-            if complete_action:
-                row["complete_action"] = complete_action
-            attached.append(row)
+            attached.append(self._decorate_row(row))
         return attached
 
+    def _decorate_row(self, row):
+        model = str(row.get("model") or "").strip()
+        record_id = self._coerce_record_id(row.get("record_id"))
+        action_ctx = self._resolve_action_context_for_model(model)
+        action_id = int(action_ctx.get("action_id") or 0)
+        menu_id = int(action_ctx.get("menu_id") or 0)
+        target = build_my_work_target(
+            model_name=model,
+            record_id=record_id,
+            action_id=action_id,
+            menu_id=menu_id,
+            explicit_scene_key=str(row.get("scene_key") or ""),
+            source_key=str(row.get("source") or ""),
+            section_key=str(row.get("section") or ""),
+        )
+        row["scene_key"] = str(target.get("scene_key") or "")
+        row["target"] = target
+        row.setdefault("source_label", self._source_label(row))
+        row.setdefault("project_name", self._row_project_name(model, record_id, row))
+        row.setdefault("action_summary", self._action_summary(row))
+        row["can_complete"] = self._can_complete(row)
+        complete_action = self._complete_action(row)
+        if complete_action:
+            row["complete_action"] = complete_action
+        return row
+
     def _can_complete(self, row):
         return str(row.get("source") or "").strip() == "mail.activity"
 
@@ -607,17 +617,7 @@ class MyWorkSummaryHandler(BaseIntentHandler):
         return self._attach_targets(rows)
 
     def _parse_followup_note(self, note_text):
-        first_line = str(note_text or "").splitlines()[0] if note_text else ""
-        if not first_line.startswith("SC_FOLLOWUP"):
-            # Historical note format: "...reason=OK"
-            reason_match = re.search(r"reason=([A-Z0-9_]+)", str(note_text or ""))
-            return {"reason_code": reason_match.group(1) if reason_match else ""}
-        result = {}
-        for key in ("action_key", "action_label", "reason_code"):
-            match = re.search(rf"{key}=([^ ]+)", first_line)
-            if match:
-                result[key] = match.group(1)
-        return result
+        return parse_followup_note(note_text)
 
     def _load_owned_items(self, user, limit):
         Project = self._get_model("project.project", sudo=True)
@@ -699,69 +699,126 @@ class MyWorkSummaryHandler(BaseIntentHandler):
             return []
         return self._attach_targets(rows)
 
-    def handle(self, payload=None, ctx=None):
-        raw_payload = payload or self.params or {}
-        params = raw_payload.get("params") if isinstance(raw_payload, dict) and isinstance(raw_payload.get("params"), dict) else raw_payload
-        context = {}
-        if isinstance(self.context, dict):
-            context.update(self.context)
-        if isinstance(raw_payload, dict) and isinstance(raw_payload.get("context"), dict):
-            context.update(raw_payload.get("context") or {})
-        if isinstance(params, dict) and isinstance(params.get("context"), dict):
-            context.update(params.get("context") or {})
-        params = params if isinstance(params, dict) else {}
-        self._current_project_scope_id = selected_project_id_from_context(params, context)
-        if bool(params.get("product_workspace")):
-            product_workspace = PaymentRequestWorkItemService(
-                self.env,
-                params=params,
-                context=context,
-            ).build()
-            data = {
-                "generated_at": fields.Datetime.now(),
-                "sections": [],
-                "summary": [],
-                "items": [],
-                "facets": {},
-                "filters": {
-                    "section": "all",
-                    "source": "all",
-                    "reason_code": "all",
-                    "search": "",
-                    "filtered_count": 0,
-                    "total_before_filter": 0,
-                    "page": 1,
-                    "page_size": 0,
-                    "total_pages": 1,
-                },
-                "status": {"state": "READY", "reason_code": REASON_OK, "message": "", "hint": ""},
-                "visibility": {"partial_data_hidden": False, "restricted_sources": [], "message": ""},
-                "product_workspace": product_workspace,
-                "source_authority": product_workspace.get("source_authority"),
-            }
-            return {
-                "ok": True,
-                "data": data,
-                "meta": {
-                    "intent": self.INTENT_TYPE,
-                    "source_authority": product_workspace.get("source_authority"),
-                    "product_workspace": True,
-                },
-            }
-        user = self.env.user
-        partner = user.partner_id
-        limit = self._normalize_limit(params.get("limit"), default=20, max_value=100)
-        limit_each = self._normalize_limit(params.get("limit_each"), default=8, max_value=40)
-        page = self._normalize_page(params.get("page"), default=1)
-        page_size = self._normalize_limit(params.get("page_size"), default=limit, max_value=100)
-        sort_by = self._normalize_sort_by(params.get("sort_by"))
-        sort_dir = self._normalize_sort_dir(params.get("sort_dir"))
-        filter_section = self._normalize_section(params.get("section"))
-        filter_source = self._normalize_text(params.get("source")) or "all"
-        filter_reason_code = str(params.get("reason_code") or "").strip()
-        filter_reason_code = filter_reason_code if filter_reason_code else "all"
-        filter_search = self._normalize_text(params.get("search"))
+    def _work_index(self):
+        Index = self._get_model("sc.my.work.item", sudo=True)
+        if Index is None:
+            return None
+        try:
+            return Index if Index.index_ready() else None
+        except Exception:
+            return None
+
+    def _index_filter_domain(self, *, section, source, reason_code, search):
+        domain = []
+        if section and section != "all":
+            domain.append(("section", "=", section))
+        if source and source != "all":
+            domain.append(("source", "=", source))
+        if reason_code and reason_code != "all":
+            domain.append(("reason_code", "=", reason_code))
+        if search:
+            # search_text 已按小写拼接，=like 避免 ilike 的大小写折叠与通配符转义问题。
+            escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            domain.append(("search_text", "=like", "%%%s%%" % escaped))
+        return domain
+
+    def _index_order(self, sort_by, sort_dir):
+        direction = "asc" if sort_dir == "asc" else "desc"
+        if sort_by == "deadline":
+            # 与实时排序一致：升序时无截止日期排最后，降序时排最前。
+            nulls = "nulls last" if direction == "asc" else "nulls first"
+            return "deadline %s %s, source_res_id desc, id desc" % (direction, nulls)
+        column = self.INDEX_SORT_COLUMNS.get(sort_by, sort_by)
+        return "%s %s, source_res_id desc, id desc" % (column, direction)
+
+    def _index_facets(self, Index, domain):
+        counters = {"source": {}, "reason_code": {}, "section": {}, "priority": {}}
+        groups = Index.read_group(domain, list(counters), list(counters), lazy=False)
+        for group in groups:
+            count = int(group.get("__count") or 0)
+            for key, counter in counters.items():
+                value = str(group.get(key) or "").strip()
+                if value:
+                    counter[value] = int(counter.get(value, 0)) + count
+        ranked = WorkItemAggregateService.ranked_counts
+        return {
+            "source_counts": ranked(counters["source"]),
+            "reason_code_counts": ranked(counters["reason_code"]),
+            "section_counts": ranked(counters["section"]),
+            "priority_counts": ranked(counters["priority"]),
+        }
+
+    def _index_row(self, record):
+        row = {
+            "id": int(record.source_res_id or 0),
+            "title": record.title or "",
+            "model": record.model_name or "",
+            "record_id": int(record.record_id or 0),
+            "deadline": fields.Date.to_string(record.deadline) if record.deadline else "",
+            "source": record.source or "",
+            "scene_key": record.scene_key or "",
+            "action_label": record.action_label or "",
+            "action_key": record.action_key or "",
+            "reason_code": record.reason_code or "",
+            "priority": record.priority or "medium",
+        }
+        if record.project_name:
+            row["project_name"] = record.project_name
+        return row
+
+    def _collect_indexed_items(self, user, *, filters, page, page_size, sort_by, sort_dir):
+        """索引路径：计数、分面、筛选、排序、分页都在 sc.my.work.item 上完成；索引未就绪时返回 None。"""
+        Index = self._work_index()
+        if Index is None:
+            return None
+        Index.flush_pending()
+        domain = [("user_id", "=", user.id)]
+        project_id = self._current_project_id()
+        if project_id:
+            domain += ["|", ("project_scoped", "=", False), ("project_id", "=", project_id)]
+        facets = self._index_facets(Index, domain)
+        section_totals = {row["key"]: row["count"] for row in facets["section_counts"]}
+        total_before_filter = sum(section_totals.values())
+        section_scope_domain = domain + self._index_filter_domain(
+            section="all",
+            source=filters["source"],
+            reason_code=filters["reason_code"],
+            search=filters["search"],
+        )
+        filtered_section_counts = self._index_facets(Index, section_scope_domain)["section_counts"]
+        facets["section_counts_filtered"] = filtered_section_counts
+        filtered_domain = domain + self._index_filter_domain(**filters)
+        filtered_count = int(Index.search_count(filtered_domain))
+        total_pages = max(1, (filtered_count + page_size - 1) // page_size)
+        page = min(page, total_pages)
+        records = Index.search(
+            filtered_domain,
+            order=self._index_order(sort_by, sort_dir),
+            limit=page_size,
+            offset=(page - 1) * page_size,
+        )
+        items = []
+        for record in records:
+            section_key = record.section
+            items.append(
+                WorkItemAggregateService.normalize_item(
+                    self._decorate_row(self._index_row(record)),
+                    section_key=section_key,
+                    section_label=self.SECTION_LABELS.get(section_key, section_key),
+                )
+            )
+        return {
+            "counts": {key: int(section_totals.get(key, 0)) for key in self.SECTION_KEYS},
+            "items": items,
+            "facets": facets,
+            "filtered_count": filtered_count,
+            "total_before_filter": total_before_filter,
+            "total_pages": total_pages,
+            "page": page,
+        }
 
+    def _collect_live_items(self, user, partner, *, limit_each, filters, page, page_size, sort_by, sort_dir):
+        """实时聚合：索引未就绪时逐来源查询，每个来源最多 limit_each 条。"""
         mail_todo_count = self._safe_count("mail.activity", [("user_id", "=", user.id)], ["user_id"])
         tier_review_count = self._safe_count("tier.review", self._tier_review_domain(user) or [("id", "=", -1)], ["status"])
         workflow_todo_count = self._safe_count(
@@ -822,23 +879,133 @@ class MyWorkSummaryHandler(BaseIntentHandler):
         section_scope_items = self._apply_filters(
             items,
             section="all",
-            source=filter_source,
-            reason_code=filter_reason_code,
-            search=filter_search,
+            source=filters["source"],
+            reason_code=filters["reason_code"],
+            search=filters["search"],
         )
         filtered_section_counts = self._build_facets(section_scope_items).get("section_counts", [])
         facets["section_counts_filtered"] = filtered_section_counts
         items = self._apply_filters(
             items,
-            section=filter_section,
-            source=filter_source,
-            reason_code=filter_reason_code,
-            search=filter_search,
+            section=filters["section"],
+            source=filters["source"],
+            reason_code=filters["reason_code"],
+            search=filters["search"],
         )
         filtered_count = len(items)
         items = self._apply_sort(items, sort_by=sort_by, sort_dir=sort_dir)
         items, total_pages, page = self._paginate_items(items, page=page, page_size=page_size)
 
+        return {
+            "counts": {
+                "todo": todo_count,
+                "owned": responsible_count,
+                "mentions": mentioned_count,
+                "following": following_count,
+            },
+            "items": items,
+            "facets": facets,
+            "filtered_count": filtered_count,
+            "total_before_filter": total_before_filter,
+            "total_pages": total_pages,
+            "page": page,
+        }
+
+    def handle(self, payload=None, ctx=None):
+        raw_payload = payload or self.params or {}
+        params = raw_payload.get("params") if isinstance(raw_payload, dict) and isinstance(raw_payload.get("params"), dict) else raw_payload
+        context = {}
+        if isinstance(self.context, dict):
+            context.update(self.context)
+        if isinstance(raw_payload, dict) and isinstance(raw_payload.get("context"), dict):
+            context.update(raw_payload.get("context") or {})
+        if isinstance(params, dict) and isinstance(params.get("context"), dict):
+            context.update(params.get("context") or {})
+        params = params if isinstance(params, dict) else {}
+        self._current_project_scope_id = selected_project_id_from_context(params, context)
+        if bool(params.get("product_workspace")):
+            product_workspace = PaymentRequestWorkItemService(
+                self.env,
+                params=params,
+                context=context,
+            ).build()
+            data = {
+                "generated_at": fields.Datetime.now(),
+                "sections": [],
+                "summary": [],
+                "items": [],
+                "facets": {},
+                "filters": {
+                    "section": "all",
+                    "source": "all",
+                    "reason_code": "all",
+                    "search": "",
+                    "filtered_count": 0,
+                    "total_before_filter": 0,
+                    "page": 1,
+                    "page_size": 0,
+                    "total_pages": 1,
+                },
+                "status": {"state": "READY", "reason_code": REASON_OK, "message": "", "hint": ""},
+                "visibility": {"partial_data_hidden": False, "restricted_sources": [], "message": ""},
+                "product_workspace": product_workspace,
+                "source_authority": product_workspace.get("source_authority"),
+            }
+            return {
+                "ok": True,
+                "data": data,
+                "meta": {
+                    "intent": self.INTENT_TYPE,
+                    "source_authority": product_workspace.get("source_authority"),
+                    "product_workspace": True,
+                },
+            }
+        user = self.env.user
+        partner = user.partner_id
+        limit = self._normalize_limit(params.get("limit"), default=20, max_value=100)
+        limit_each = self._normalize_limit(params.get("limit_each"), default=8, max_value=40)
+        page = self._normalize_page(params.get("page"), default=1)
+        page_size = self._normalize_limit(params.get("page_size"), default=limit, max_value=100)
+        sort_by = self._normalize_sort_by(params.get("sort_by"))
+        sort_dir = self._normalize_sort_dir(params.get("sort_dir"))
+        filter_section = self._normalize_section(params.get("section"))
+        filter_source = self._normalize_text(params.get("source")) or "all"
+        filter_reason_code = str(params.get("reason_code") or "").strip()
+        filter_reason_code = filter_reason_code if filter_reason_code else "all"
+        filter_search = self._normalize_text(params.get("search"))
+
+        filters = {
+            "section": filter_section,
+            "source": filter_source,
+            "reason_code": filter_reason_code,
+            "search": filter_search,
+        }
+        collected = self._collect_indexed_items(
+            user, filters=filters, page=page, page_size=page_size, sort_by=sort_by, sort_dir=sort_dir
+        )
+        if collected is None:
+            collected = self._collect_live_items(
+                user,
+                partner,
+                limit_each=limit_each,
+                filters=filters,
+                page=page,
+                page_size=page_size,
+                sort_by=sort_by,
+                sort_dir=sort_dir,
+            )
+        counts = collected["counts"]
+        todo_count = counts["todo"]
+        responsible_count = counts["owned"]
+        mentioned_count = counts["mentions"]
+        following_count = counts["following"]
+        items = collected["items"]
+        facets = collected["facets"]
+        filtered_count = collected["filtered_count"]
+        total_before_filter = collected["total_before_filter"]
+        total_pages = collected["total_pages"]
+        page = collected["page"]
+
         access_models = (
             "mail.activity",
             "tier.review",
@@ -17,6 +17,7 @@ from odoo.addons.smart_core.orchestration.payment_slice_contract_orchestrator im
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
 )
+from odoo.addons.smart_construction_core.handlers.scene_blocks_fetch import SceneBlocksFetchMixin
 
 
 class PaymentSliceBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandler):
@@ -78,3 +79,9 @@ class PaymentSliceBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandl
                 "source_authority": source_authority,
             },
         }
+
+
+class PaymentSliceBlocksFetchHandler(SceneBlocksFetchMixin, PaymentSliceBlockFetchHandler):
+    INTENT_TYPE = "payment.blocks.fetch"
+    DESCRIPTION = "批量返回 payment runtime blocks（可 NDJSON 流式）"
+    ORCHESTRATOR = PaymentSliceContractOrchestrator
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from odoo.addons.smart_core.core.aggregate_cache import aggregate_cache_scope
 from odoo.addons.smart_core.core.base_handler import BaseIntentHandler
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
@@ -42,7 +43,8 @@ class ProjectDashboardHandler(ProjectContextResolverMixin, BaseIntentHandler):
         ctx = ctx or {}
         project_id = self._resolve_project_id(params, ctx)
         service = ProjectDashboardService(self.env)
-        data = service.build(project_id=project_id, context=ctx)
+        with aggregate_cache_scope(self.env):
+            data = service.build(project_id=project_id, context=ctx)
         trace_id = str((ctx or {}).get("trace_id") or (params or {}).get("trace_id") or "")
         return {
             "ok": True,
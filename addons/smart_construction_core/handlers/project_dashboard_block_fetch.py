@@ -14,6 +14,7 @@ from odoo.addons.smart_core.orchestration.project_dashboard_scene_orchestrator i
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
 )
+from odoo.addons.smart_construction_core.handlers.scene_blocks_fetch import SceneBlocksFetchMixin
 
 
 class ProjectDashboardBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandler):
@@ -83,3 +84,10 @@ class ProjectDashboardBlockFetchHandler(ProjectContextResolverMixin, BaseIntentH
                 "source_authority": orchestrator._service.source_authority_contract(),
             },
         }
+
+
+class ProjectDashboardBlocksFetchHandler(SceneBlocksFetchMixin, ProjectDashboardBlockFetchHandler):
+    INTENT_TYPE = "project.dashboard.blocks.fetch"
+    DESCRIPTION = "批量返回项目驾驶舱 runtime blocks（可 NDJSON 流式）"
+    ORCHESTRATOR = ProjectDashboardSceneOrchestrator
+    ENFORCE_PROJECT_SCOPE = False
@@ -17,6 +17,7 @@ from odoo.addons.smart_core.orchestration.project_execution_scene_orchestrator i
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
 )
+from odoo.addons.smart_construction_core.handlers.scene_blocks_fetch import SceneBlocksFetchMixin
 
 
 class ProjectExecutionBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandler):
@@ -99,3 +100,9 @@ class ProjectExecutionBlockFetchHandler(ProjectContextResolverMixin, BaseIntentH
                 "source_authority": source_authority,
             },
         }
+
+
+class ProjectExecutionBlocksFetchHandler(SceneBlocksFetchMixin, ProjectExecutionBlockFetchHandler):
+    INTENT_TYPE = "project.execution.blocks.fetch"
+    DESCRIPTION = "批量返回 project.execution runtime blocks（可 NDJSON 流式）"
+    ORCHESTRATOR = ProjectExecutionSceneOrchestrator
@@ -11,6 +11,7 @@ from odoo.addons.smart_core.orchestration.project_plan_bootstrap_scene_orchestra
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
 )
+from odoo.addons.smart_construction_core.handlers.scene_blocks_fetch import SceneBlocksFetchMixin
 
 
 class ProjectPlanBootstrapBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandler):
@@ -80,3 +81,10 @@ class ProjectPlanBootstrapBlockFetchHandler(ProjectContextResolverMixin, BaseInt
                 "source_authority": source_authority,
             },
         }
+
+
+class ProjectPlanBootstrapBlocksFetchHandler(SceneBlocksFetchMixin, ProjectPlanBootstrapBlockFetchHandler):
+    INTENT_TYPE = "project.plan_bootstrap.blocks.fetch"
+    DESCRIPTION = "批量返回 project.plan_bootstrap runtime blocks（可 NDJSON 流式）"
+    ORCHESTRATOR = ProjectPlanBootstrapSceneOrchestrator
+    ENFORCE_PROJECT_SCOPE = False
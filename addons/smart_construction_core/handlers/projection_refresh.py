@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import time
+
+from odoo.addons.smart_core.core.base_handler import BaseIntentHandler
+from odoo.addons.smart_construction_core.services.projection_refresh_registry import (
+    REFRESHABLE_PROJECTIONS,
+    source_authority_contract,
+)
+
+FULL_REFRESH_GROUP = "smart_construction_core.group_sc_cap_config_admin"
+
+
+class ProjectionRefreshHandler(BaseIntentHandler):
+    INTENT_TYPE = "projection.refresh"
+    DESCRIPTION = "Refresh snapshot projection partitions and materialized views, and report refresh lag"
+    VERSION = "1.0.0"
+    ETAG_ENABLED = False
+    REQUIRED_GROUPS = [
+        "smart_construction_core.group_sc_cap_finance_manager",
+        "smart_construction_core.group_sc_cap_config_admin",
+    ]
+    NON_IDEMPOTENT_ALLOWED = "projection refresh recomputes derived rows from source facts; repeating it is harmless"
+    SOURCE_AUTHORITY = source_authority_contract()
+
+    def handle(self, payload=None, ctx=None):
+        ts0 = time.time()
+        params = payload or self.params or {}
+        if isinstance(params, dict) and isinstance(params.get("params"), dict):
+            params = params.get("params") or {}
+        State = self.env["sc.projection.refresh.state"].sudo()
+        projection = str(params.get("projection") or "").strip()
+        materialized = projection in State._materialized_models()
+        if projection and projection not in REFRESHABLE_PROJECTIONS and not materialized:
+            return self._error("PROJECTION_NOT_REFRESHABLE", "投影不支持刷新：%s" % projection, ts0)
+        try:
+            project_id = int(params.get("project_id") or 0)
+        except (TypeError, ValueError):
+            return self._error("INVALID_ID", "project_id 无效", ts0)
+        full = bool(params.get("full"))
+        projections = [projection] if projection else None
+
+        if params.get("metrics_only"):
+            mode, refreshed = "metrics", []
+        elif materialized or params.get("materialized"):
+            # 物化视图整体刷新（CONCURRENTLY），指定投影时忽略新鲜度上限。
+            result = State.cron_refresh_materialized(force=bool(projection), projections=projections)
+            mode, refreshed = ("busy" if result.get("status") == "busy" else "materialized"), result.get("refreshed") or []
+        elif full:
+            if not self.env.user.has_group(FULL_REFRESH_GROUP):
+                return self._error("PERMISSION_DENIED", "全量重建仅限配置管理员", ts0)
+            mode, refreshed = "full", State.refresh_full(projections)
+        elif project_id > 0:
+            if not self.env["project.project"].search_count([("id", "=", project_id)], limit=1):
+                return self._error("PROJECT_NOT_FOUND", "项目不存在或当前账号不可访问", ts0)
+            mode, refreshed = "project", State.refresh_projects([project_id], projections)
+        else:
+            result = State.cron_refresh_dirty()
+            mode, refreshed = ("busy" if result.get("status") == "busy" else "dirty"), result.get("refreshed") or []
+
+        return {
+            "ok": True,
+            "data": {
+                "mode": mode,
+                "project_id": project_id or None,
+                "refreshed": refreshed,
+                "metrics": State.refresh_metrics(),
+                "materialized_metrics": State.materialized_metrics(),
+            },
+            "meta": self._meta(ts0),
+        }
+
+    def _meta(self, ts0):
+        return {
+            "intent": self.INTENT_TYPE,
+            "elapsed_ms": int((time.time() - ts0) * 1000),
+            "trace_id": str((self.context or {}).get("trace_id") or ""),
+            "source_authority": self.SOURCE_AUTHORITY,
+        }
+
+    def _error(self, code, message, ts0):
+        return {
+            "ok": False,
+            "error": {"code": code, "message": message, "suggested_action": "fix_input"},
+            "meta": self._meta(ts0),
+        }
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+import time
+
+from odoo import api
+from odoo.http import Response
+
+from odoo.addons.smart_core.core.project_context import (
+    project_scope_denied_response,
+    selected_project_id_from_context,
+)
+from odoo.addons.smart_core.core.scene_block_batch import (
+    NDJSON_MIMETYPE,
+    STREAM_MODE_NDJSON,
+    ndjson_line,
+    normalize_block_keys,
+)
+from odoo.addons.smart_construction_core.services.project_context_contract import (
+    attach_project_context_to_runtime_payload,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class SceneBlocksFetchMixin:
+    """
+    *.blocks.fetch：一次请求返回场景的多个 runtime block。
+    - 项目与上下文只解析一次，block 在同一批次作用域内构建，重复的 read_group/search_count 只查一次；
+    - 未传 block_keys 时返回场景入口声明的全部 block；
+    - params.stream == "ndjson" 时逐个 block 流式输出（project -> block* -> done），先构建完的先到达。
+    需与对应的 *.block.fetch handler 组合使用，沿用其权限组、project_id 解析与 lifecycle hints。
+    """
+
+    ORCHESTRATOR = None
+    ENFORCE_PROJECT_SCOPE = True
+
+    def _meta(self, ts0, source_authority):
+        return {
+            "intent": self.INTENT_TYPE,
+            "elapsed_ms": int((time.time() - ts0) * 1000),
+            "trace_id": str((self.context or {}).get("trace_id") or ""),
+            "source_authority": source_authority,
+        }
+
+    def handle(self, payload=None, ctx=None):
+        ts0 = time.time()
+        params = payload or self.params or {}
+        if isinstance(params, dict) and isinstance(params.get("params"), dict):
+            params = params.get("params") or {}
+        ctx = ctx or {}
+
+        project_id = self._resolve_project_id(params, ctx)
+        current_project_id = selected_project_id_from_context(params, ctx or self.context or {})
+        if self.ENFORCE_PROJECT_SCOPE and current_project_id and project_id > 0 and int(project_id) != int(current_project_id):
+            return project_scope_denied_response(
+                {
+                    "enabled": True,
+                    "project_id": int(current_project_id),
+                    "applied": True,
+                    "domain": [("id", "=", int(current_project_id))],
+                    "model": "project.project",
+                }
+            )
+        orchestrator = self.ORCHESTRATOR(self.env)
+        source_authority = orchestrator.source_authority_contract()
+        block_keys = normalize_block_keys(params.get("block_keys"))
+        if not block_keys and "block_keys" not in params:
+            block_keys = normalize_block_keys([key for key, _title, _state in orchestrator.entry_blocks])
+        if project_id <= 0 or not block_keys:
+            response = {
+                "ok": False,
+                "error": {
+                    "code": "MISSING_PARAMS",
+                    "message": "缺少参数：project_id 或 block_keys",
+                    "suggested_action": "fix_input",
+                },
+                "meta": self._meta(ts0, source_authority),
+            }
+            lifecycle_hints = getattr(self, "_build_lifecycle_hints", None)
+            if callable(lifecycle_hints):
+                response["data"] = {"lifecycle_hints": lifecycle_hints(project_id)}
+            return response
+
+        if str(params.get("stream") or "").strip().lower() == STREAM_MODE_NDJSON:
+            return self._ndjson_response(block_keys, project_id, ctx, ts0, source_authority)
+
+        project, _diag = orchestrator._service.resolve_project_with_diagnostics(project_id)
+        data = orchestrator.build_runtime_blocks(block_keys, context=ctx, project=project)
+        data = attach_project_context_to_runtime_payload(data, project)
+        return {"ok": True, "data": data, "meta": self._meta(ts0, source_authority)}
+
+    def _ndjson_response(self, block_keys, project_id, ctx, ts0, source_authority):
+        # 请求游标在 handler 返回后即被关闭，响应体迭代阶段必须使用独立游标重建 env。
+        registry = self.env.registry
+        uid, su = self.env.uid, self.env.su
+        env_context = dict(self.env.context)
+        orchestrator_cls = self.ORCHESTRATOR
+        block_ctx = dict(ctx or {})
+
+        def _generate():
+            degraded = False
+            try:
+                with registry.cursor() as cr:
+                    orchestrator = orchestrator_cls(api.Environment(cr, uid, env_context, su=su))
+                    project, _diag = orchestrator._service.resolve_project_with_diagnostics(project_id)
+                    head = {"type": "project", "project_id": int(getattr(project, "id", 0) or 0)}
+                    yield ndjson_line(attach_project_context_to_runtime_payload(head, project))
+                    for item in orchestrator.iter_runtime_blocks(block_keys, project, block_ctx):
+                        degraded = degraded or item["degraded"]
+                        yield ndjson_line(dict(item, type="block"))
+                    cr.rollback()
+            except Exception:
+                _logger.exception("[%s] block stream failed: project=%s", self.INTENT_TYPE, project_id)
+                yield ndjson_line({"type": "error", "error": {"code": "BLOCK_STREAM_FAILED", "message": "block 流式输出失败"}})
+                return
+            yield ndjson_line({"type": "done", "degraded": degraded, "meta": self._meta(ts0, source_authority)})
+
+        return Response(
+            _generate(),
+            status=200,
+            mimetype=NDJSON_MIMETYPE,
+            headers=[("Cache-Control", "no-store"), ("X-Accel-Buffering", "no")],
+        )
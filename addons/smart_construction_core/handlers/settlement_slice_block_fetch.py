@@ -17,6 +17,7 @@ from odoo.addons.smart_core.orchestration.settlement_slice_contract_orchestrator
 from odoo.addons.smart_construction_core.handlers.project_context_resolver import (
     ProjectContextResolverMixin,
 )
+from odoo.addons.smart_construction_core.handlers.scene_blocks_fetch import SceneBlocksFetchMixin
 
 
 class SettlementSliceBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHandler):
@@ -78,3 +79,9 @@ class SettlementSliceBlockFetchHandler(ProjectContextResolverMixin, BaseIntentHa
                 "source_authority": source_authority,
             },
         }
+
+
+class SettlementSliceBlocksFetchHandler(SceneBlocksFetchMixin, SettlementSliceBlockFetchHandler):
+    INTENT_TYPE = "settlement.blocks.fetch"
+    DESCRIPTION = "批量返回 settlement runtime blocks（可 NDJSON 流式）"
+    ORCHESTRATOR = SettlementSliceContractOrchestrator
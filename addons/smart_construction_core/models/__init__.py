@@ -5,3 +5,5 @@ from . import projection
 from . import support
 from .core import formal_config_contract_fields
 from .support import formal_entry_metadata_extensions
+from .support import projection_refresh_sources
+from .support import my_work_index_sources
@@ -9,6 +9,12 @@ from odoo import models, fields, api
 from ..support.state_guard import raise_guard
 from ..support.state_machine import ScStateMachine
 from odoo.exceptions import UserError, ValidationError
+from odoo.addons.smart_core.core.aggregate_cache import cached_read_group, group_value, read_group_by_project
+from odoo.addons.smart_construction_core.services.project_structure_rollup_service import (
+    ROLLUP_ROWS_SQL,
+    SUBTREE_LINES_SQL,
+    rollup_totals,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -142,25 +148,58 @@ class ScProjectStructure(models.Model):
             rec.level = (rec.parent_id.level or 0) + 1 if rec.parent_id else 1
 
     @api.depends(
+        'structure_type',
         'boq_line_ids.quantity',
         'boq_line_ids.amount',
+        'boq_line_ids.active',
         'child_ids.qty_total',
         'child_ids.amount_total',
+        'child_ids.active',
     )
     def _compute_totals(self):
-        """自下而上汇总工程量与合价。"""
+        """自下而上汇总工程量与合价：只取待重算节点及其直接下级，在内存中汇总。
+
+        child_ids 的递归依赖把变更沿上级链标记为待重算；未标记下级的存储值仍有效，直接参与汇总，
+        既不按整个项目聚合，也不逐节点读取下级。
+        """
+        # 同批之外仍待重算的节点一并现算（不赋值），避免把其过期的存储值当作已知值。
+        pending = self.env.records_to_compute(self._fields['qty_total'])
+        marked = self.filtered('id') | pending.filtered('id')
+        totals = {}
+        if marked:
+            self.env['project.boq.line'].flush_model(['quantity', 'amount', 'active', 'structure_id'])
+            self.flush_model(['parent_id', 'parent_path', 'structure_type', 'active'])
+            self.env.cr.execute(ROLLUP_ROWS_SQL, {'node_ids': marked.ids})
+            rows = self.env.cr.fetchall()
+            marked_ids = set(marked.ids)
+            settled = self.browse([row[0] for row in rows if row[0] not in marked_ids])
+            known = {child.id: (child.qty_total, child.amount_total) for child in settled}
+            totals = rollup_totals(rows, known)
         for node in self:
-            if node.structure_type == 'item':
-                qty = sum(node.boq_line_ids.mapped('quantity'))
-                amt = sum(node.boq_line_ids.mapped('amount'))
-            else:
-                qty = sum(node.child_ids.mapped('qty_total'))
-                amt = sum(node.child_ids.mapped('amount_total'))
+            # 尚未落库的新节点不在查询结果中，按原口径现算。
+            qty, amt = totals[node.id] if node.id in totals else node._totals_from_cache()
             node.qty_total = qty
             node.amount_total = amt
 
+    def _totals_from_cache(self):
+        self.ensure_one()
+        if self.structure_type == 'item':
+            return sum(self.boq_line_ids.mapped('quantity')), sum(self.boq_line_ids.mapped('amount'))
+        return sum(self.child_ids.mapped('qty_total')), sum(self.child_ids.mapped('amount_total'))
+
     def _compute_boq_line_all_ids(self):
         BoqLine = self.env['project.boq.line']
+        # 非叶子节点按 parent_path 前缀一次取出全部子树清单行，再经 search 过滤访问规则并保持默认排序。
+        subtree_nodes = self.filtered(lambda node: node.project_id and node.structure_type != 'item' and node.id)
+        line_ids_by_node = defaultdict(list)
+        if subtree_nodes:
+            BoqLine.flush_model(['structure_id', 'project_id', 'active'])
+            self.flush_model(['parent_path', 'project_id', 'active'])
+            self.env.cr.execute(SUBTREE_LINES_SQL, {'node_ids': subtree_nodes.ids})
+            for node_id, line_id in self.env.cr.fetchall():
+                line_ids_by_node[node_id].append(line_id)
+        all_line_ids = {line_id for line_ids in line_ids_by_node.values() for line_id in line_ids}
+        lines = BoqLine.search([('id', 'in', list(all_line_ids))]) if all_line_ids else BoqLine
         for node in self:
             if not node.project_id:
                 node.boq_line_all_ids = False
@@ -169,12 +208,8 @@ class ScProjectStructure(models.Model):
             if node.structure_type == 'item':
                 node.boq_line_all_ids = node.boq_line_ids
                 continue
-            # 其余节点：检索同项目下 structure_id child_of 当前节点 的清单行
-            lines = BoqLine.search([
-                ('project_id', '=', node.project_id.id),
-                ('structure_id', 'child_of', node.id),
-            ])
-            node.boq_line_all_ids = lines
+            node_line_ids = set(line_ids_by_node.get(node.id, ()))
+            node.boq_line_all_ids = lines.filtered(lambda line: line.id in node_line_ids)
 
     def _exec_structure_action(self, view_key):
         ctx = dict(self.env.context or {})
@@ -1053,47 +1088,39 @@ class ProjectProject(models.Model):
         can_settlement = self._can_read_model('project.settlement')
         can_payment = ('payment.request' in self.env) and self._can_read_model('payment.request')
 
+        # 存储型计算在数据变更后触发：只合并查询，不读请求级缓存。
         if self.ids and can_contract:
-            contract_read = self.env['construction.contract'].read_group(
-                [
-                    ('project_id', 'in', self.ids),
-                    ('type', '=', 'in'),
-                    ('state', '=', 'confirmed'),
-                ],
+            contract_read = read_group_by_project(
+                self.env['construction.contract'],
+                self.ids,
+                [('type', '=', 'in'), ('state', '=', 'confirmed')],
                 ['amount_final:sum'],
-                ['project_id'],
+                cache=False,
             )
-            for rec in contract_read:
-                project_id = rec['project_id'][0]
-                contract_map[project_id] += rec.get('amount_final_sum', rec.get('amount_final', 0.0)) or 0.0
+            for project_id, rows in contract_read.items():
+                contract_map[project_id] += group_value(rows[0], 'amount_final:sum')
 
         if self.ids and can_settlement:
-            settlement_read = self.env['project.settlement'].read_group(
-                [
-                    ('project_id', 'in', self.ids),
-                    ('type', '=', 'pay'),
-                    ('state', 'in', ['confirmed', 'done']),
-                ],
+            settlement_read = read_group_by_project(
+                self.env['project.settlement'],
+                self.ids,
+                [('type', '=', 'pay'), ('state', 'in', ['confirmed', 'done'])],
                 ['amount:sum'],
-                ['project_id'],
+                cache=False,
             )
-            for rec in settlement_read:
-                project_id = rec['project_id'][0]
-                settlement_map[project_id] += rec.get('amount_sum', rec.get('amount', 0.0)) or 0.0
+            for project_id, rows in settlement_read.items():
+                settlement_map[project_id] += group_value(rows[0], 'amount:sum')
 
         if self.ids and can_payment:
-            payment_read = self.env['payment.request'].read_group(
-                [
-                    ('project_id', 'in', self.ids),
-                    ('type', '=', 'pay'),
-                    ('state', 'in', ['approved', 'approve', 'done']),
-                ],
+            payment_read = read_group_by_project(
+                self.env['payment.request'],
+                self.ids,
+                [('type', '=', 'pay'), ('state', 'in', ['approved', 'approve', 'done'])],
                 ['amount:sum'],
-                ['project_id'],
+                cache=False,
             )
-            for rec in payment_read:
-                project_id = rec['project_id'][0]
-                payment_map[project_id] += rec.get('amount_sum', rec.get('amount', 0.0)) or 0.0
+            for project_id, rows in payment_read.items():
+                payment_map[project_id] += group_value(rows[0], 'amount:sum')
 
         for project in self:
             contract_total = contract_map.get(project.id, 0.0) if can_contract else 0.0
@@ -1131,18 +1158,14 @@ class ProjectProject(models.Model):
     def _compute_funding_remaining_amount(self):
         reserved_map = {}
         if self.ids:
-            data = self.env['payment.request'].read_group(
-                [
-                    ('project_id', 'in', self.ids),
-                    ('type', '=', 'pay'),
-                    ('state', 'in', ['submit', 'approve', 'approved']),
-                ],
+            data = read_group_by_project(
+                self.env['payment.request'],
+                self.ids,
+                [('type', '=', 'pay'), ('state', 'in', ['submit', 'approve', 'approved'])],
                 ['amount:sum'],
-                ['project_id'],
             )
-            for rec in data:
-                project_id = rec['project_id'][0]
-                reserved_map[project_id] = rec.get('amount_sum', rec.get('amount', 0.0)) or 0.0
+            for project_id, rows in data.items():
+                reserved_map[project_id] = group_value(rows[0], 'amount:sum')
         for project in self:
             reserved = reserved_map.get(project.id, 0.0)
             cap = project.funding_cap_amount or 0.0
@@ -1404,7 +1427,8 @@ class ProjectProject(models.Model):
                 ('account_id.internal_group', '=', 'income'),
                 ('account_id.account_type', '=', 'income'),
             ]
-            invoice_read = invoice_model.read_group(
+            invoice_read = cached_read_group(
+                invoice_model,
                 invoice_domain,
                 ['balance:sum'],
                 ['project_id']
@@ -1420,7 +1444,8 @@ class ProjectProject(models.Model):
                 revenue_line_map[project_id] = revenue_line_map.get(project_id, 0.0) - balance_val
 
             # --- 发票级兜底（避免行级未带 project 或科目未归类收入） ---
-            move_read = move_model.read_group(
+            move_read = cached_read_group(
+                move_model,
                 [
                     ('project_id', 'in', self.ids),
                     ('state', '=', 'posted'),
@@ -1447,7 +1472,8 @@ class ProjectProject(models.Model):
         payment_in_map = defaultdict(float)
         payment_out_map = defaultdict(float)
         if self.ids and can_payment:
-            payment_read = self.env['payment.request'].read_group(
+            payment_read = cached_read_group(
+                self.env['payment.request'],
                 [
                     ('project_id', 'in', self.ids),
                     ('state', '=', 'done'),
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from . import projection_refresh
+from . import projection_materialize
 from . import profit_report
 from . import cost_report
 from . import treasury_ledger
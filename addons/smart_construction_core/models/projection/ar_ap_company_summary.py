@@ -7,10 +7,12 @@ from odoo.exceptions import UserError
 
 class ScArApCompanySummary(models.Model):
     _name = "sc.ar.ap.company.summary"
+    _inherit = "sc.projection.refresh.mixin"
     _description = "应收应付报表"
     _auto = False
     _rec_name = "display_name"
     _order = "project_id"
+    _sc_projection_required_tables = ("sc_ar_ap_project_summary",)
     _sc_readonly_navigation_button_methods = {
         "action_open_project_partner_rows",
         "action_open_income_contracts",
@@ -190,35 +192,8 @@ class ScArApCompanySummary(models.Model):
             "target": "current",
         }
 
-    def init(self):
-        self._cr.execute("SELECT to_regclass('sc_ar_ap_project_summary')")
-        if not self._cr.fetchone()[0]:
-            return
-        self._cr.execute(
-            f"""
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1 FROM pg_class
-                    WHERE oid = to_regclass('{self._table}')
-                      AND relkind = 'v'
-                ) THEN
-                    EXECUTE 'DROP VIEW IF EXISTS {self._table} CASCADE';
-                ELSIF EXISTS (
-                    SELECT 1 FROM pg_class
-                    WHERE oid = to_regclass('{self._table}')
-                      AND relkind = 'm'
-                ) THEN
-                    EXECUTE 'DROP MATERIALIZED VIEW IF EXISTS {self._table} CASCADE';
-                ELSE
-                    EXECUTE 'DROP TABLE IF EXISTS {self._table} CASCADE';
-                END IF;
-            END $$;
-            """
-        )
-        self._cr.execute(
-            f"""
-            CREATE TABLE {self._table} AS (
+    def _sc_projection_select_sql(self, scope):
+        return f"""
                 WITH pricing AS (
                     SELECT
                         project_id,
@@ -234,11 +209,12 @@ class ScArApCompanySummary(models.Model):
                             ','
                         ) AS split_value(value)
                         WHERE NULLIF(trim(split_value.value), '') IS NOT NULL
+                          AND {scope('summary.project_id')}
                     ) split_pricing
                     GROUP BY project_id
                 )
                 SELECT
-                    row_number() OVER (ORDER BY s.project_id) AS id,
+                    row_number() OVER (ORDER BY s.project_id) + %(id_offset)s AS id,
                     COALESCE(MAX(s.project_name), '未匹配项目') AS display_name,
                     s.project_id,
                     COALESCE(MAX(s.project_name), '未匹配项目') AS project_name,
@@ -268,10 +244,6 @@ class ScArApCompanySummary(models.Model):
                     MAX(COALESCE(s.actual_available_balance, 0.0)) AS actual_available_balance
                 FROM sc_ar_ap_project_summary s
                 LEFT JOIN pricing p ON p.project_id IS NOT DISTINCT FROM s.project_id
+                WHERE {scope('s.project_id')}
                 GROUP BY s.project_id
-            )
             """
-        )
-        self._cr.execute(f"ALTER TABLE {self._table} ADD PRIMARY KEY (id)")
-        self._cr.execute(f"CREATE INDEX {self._table}_project_id_idx ON {self._table} (project_id)")
-        self._cr.execute(f"CREATE INDEX {self._table}_project_name_idx ON {self._table} (project_name)")
@@ -8,10 +8,23 @@ from odoo.osv import expression
 
 class ScArApProjectSummary(models.Model):
     _name = "sc.ar.ap.project.summary"
+    _inherit = "sc.projection.refresh.mixin"
     _description = "应收应付报表（项目）"
     _auto = False
     _rec_name = "display_name"
     _order = "project_id, partner_name"
+    _sc_projection_required_tables = (
+        "construction_contract",
+        "sc_receipt_income",
+        "sc_invoice_registration",
+        "sc_treasury_ledger",
+        "sc_legacy_invoice_surcharge_fact",
+        "sc_legacy_tax_deduction_fact",
+        "sc_legacy_self_funding_fact",
+        "sc_legacy_supplier_contract_pricing_fact",
+        "sc_legacy_project_fund_balance_fact",
+    )
+    _sc_projection_index_columns = ("project_id", "project_name", "partner_key", "partner_name")
     _sc_readonly_navigation_button_methods = {
         "action_open_income_contracts",
         "action_open_expense_contracts",
@@ -213,48 +226,8 @@ class ScArApProjectSummary(models.Model):
             "target": "current",
         }
 
-    def init(self):
-        self._cr.execute(
-            """
-            SELECT
-                to_regclass('construction_contract'),
-                to_regclass('sc_receipt_income'),
-                to_regclass('sc_invoice_registration'),
-                to_regclass('sc_treasury_ledger'),
-                to_regclass('sc_legacy_invoice_surcharge_fact'),
-                to_regclass('sc_legacy_tax_deduction_fact'),
-                to_regclass('sc_legacy_self_funding_fact'),
-                to_regclass('sc_legacy_supplier_contract_pricing_fact'),
-                to_regclass('sc_legacy_project_fund_balance_fact')
-            """
-        )
-        if not all(self._cr.fetchone()):
-            return
-        self._cr.execute(
-            f"""
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1 FROM pg_class
-                    WHERE oid = to_regclass('{self._table}')
-                      AND relkind = 'v'
-                ) THEN
-                    EXECUTE 'DROP VIEW IF EXISTS {self._table} CASCADE';
-                ELSIF EXISTS (
-                    SELECT 1 FROM pg_class
-                    WHERE oid = to_regclass('{self._table}')
-                      AND relkind = 'm'
-                ) THEN
-                    EXECUTE 'DROP MATERIALIZED VIEW IF EXISTS {self._table} CASCADE';
-                ELSE
-                    EXECUTE 'DROP TABLE IF EXISTS {self._table} CASCADE';
-                END IF;
-            END $$;
-            """
-        )
-        self._cr.execute(
-            f"""
-            CREATE TABLE {self._table} AS (
+    def _sc_projection_select_sql(self, scope):
+        return f"""
                 WITH income_contract AS (
                     SELECT
                         c.project_id,
@@ -265,6 +238,7 @@ class ScArApProjectSummary(models.Model):
                     FROM construction_contract c
                     JOIN res_partner rp ON rp.id = c.partner_id
                     WHERE c.type = 'out'
+                      AND {scope('c.project_id')}
                     GROUP BY c.project_id, c.partner_id, rp.name
                 ),
                 payable_contract AS (
@@ -277,6 +251,7 @@ class ScArApProjectSummary(models.Model):
                     FROM construction_contract c
                     JOIN res_partner rp ON rp.id = c.partner_id
                     WHERE c.type = 'in'
+                      AND {scope('c.project_id')}
                     GROUP BY c.project_id, c.partner_id, rp.name
                 ),
                 receipt AS (
@@ -290,6 +265,7 @@ class ScArApProjectSummary(models.Model):
                     JOIN res_partner rp ON rp.id = r.partner_id
                     WHERE r.active IS TRUE
                       AND r.partner_id IS NOT NULL
+                      AND {scope('r.project_id')}
                     GROUP BY r.project_id, r.partner_id, rp.name
                 ),
                 paid_out AS (
@@ -303,6 +279,7 @@ class ScArApProjectSummary(models.Model):
                     JOIN res_partner rp ON rp.id = l.partner_id
                     WHERE l.direction = 'out'
                       AND l.state = 'posted'
+                      AND {scope('l.project_id')}
                     GROUP BY l.project_id, l.partner_id, rp.name
                 ),
                 partner_name_map AS (
@@ -335,6 +312,7 @@ class ScArApProjectSummary(models.Model):
                         ON pnm.partner_name_key = lower(trim(i.legacy_partner_name))
                     WHERE i.active IS TRUE
                       AND i.direction IN ('input', 'output')
+                      AND {scope('i.project_id')}
                 ),
                 output_invoice AS (
                     SELECT
@@ -380,6 +358,7 @@ class ScArApProjectSummary(models.Model):
                     WHERE d.active IS TRUE
                       AND COALESCE(d.deleted_flag, '0') IN ('0', '')
                       AND COALESCE(d.document_state, '0') = '2'
+                      AND {scope('d.project_id')}
                 ),
                 tax_deduction AS (
                     SELECT
@@ -412,6 +391,7 @@ class ScArApProjectSummary(models.Model):
                     WHERE s.active IS TRUE
                       AND COALESCE(s.deleted_flag, '0') IN ('0', '')
                       AND COALESCE(s.document_state, '0') = '2'
+                      AND {scope('s.project_id')}
                 ),
                 invoice_surcharge AS (
                     SELECT
@@ -446,6 +426,7 @@ class ScArApProjectSummary(models.Model):
                       AND COALESCE(f.deleted_flag, '0') IN ('0', '')
                       AND COALESCE(f.document_state, '0') = '2'
                       AND NULLIF(trim(f.pricing_method_text), '') IS NOT NULL
+                      AND {scope('f.project_id')}
                 ),
                 supplier_contract_pricing AS (
                     SELECT
@@ -477,6 +458,7 @@ class ScArApProjectSummary(models.Model):
                         ON pnm.partner_name_key = lower(trim(s.partner_name))
                     WHERE s.active IS TRUE
                       AND COALESCE(s.deleted_flag, '0') IN ('0', '')
+                      AND {scope('s.project_id')}
                 ),
                 self_funding AS (
                     SELECT
@@ -496,6 +478,7 @@ class ScArApProjectSummary(models.Model):
                     FROM sc_legacy_project_fund_balance_fact
                     WHERE active IS TRUE
                       AND project_id IS NOT NULL
+                      AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 project_tax_rate AS (
@@ -558,7 +541,7 @@ class ScArApProjectSummary(models.Model):
                     )
                 )
                 SELECT
-                    row_number() OVER (ORDER BY k.project_id, k.partner_name, k.partner_key) AS id,
+                    row_number() OVER (ORDER BY k.project_id, k.partner_name, k.partner_key) + %(id_offset)s AS id,
                     CASE
                         WHEN COALESCE(p.name->>'zh_CN', p.name->>'en_US', '') ~ '^[0-9a-fA-F]{{32}}$'
                         THEN CONCAT('历史未归档项目 ', COALESCE(p.name->>'zh_CN', p.name->>'en_US'))
@@ -629,11 +612,4 @@ class ScArApProjectSummary(models.Model):
                     ON pfb.project_id = k.project_id
                 LEFT JOIN project_tax_rate ptr
                     ON ptr.project_id = k.project_id
-            )
             """
-        )
-        self._cr.execute(f"ALTER TABLE {self._table} ADD PRIMARY KEY (id)")
-        self._cr.execute(f"CREATE INDEX {self._table}_project_id_idx ON {self._table} (project_id)")
-        self._cr.execute(f"CREATE INDEX {self._table}_project_name_idx ON {self._table} (project_name)")
-        self._cr.execute(f"CREATE INDEX {self._table}_partner_key_idx ON {self._table} (partner_key)")
-        self._cr.execute(f"CREATE INDEX {self._table}_partner_name_idx ON {self._table} (partner_name)")
@@ -2,6 +2,8 @@
 from odoo import api, fields, models, tools
 from odoo.exceptions import UserError
 
+from .projection_materialize import live_relation
+
 
 class ScCompanyContractorResponsibilityFact(models.Model):
     _name = "sc.company.contractor.responsibility.fact"
@@ -113,6 +115,8 @@ class ScCompanyContractorResponsibilityFact(models.Model):
             return
 
         tools.drop_view_if_exists(self._cr, self._table)
+        # 不随上游物化而滞后：始终读取来源明细的实时视图。
+        business_fact = live_relation(self._cr, "sc_finance_business_fact")
         self._cr.execute(
             f"""
             CREATE OR REPLACE VIEW {self._table} AS (
@@ -160,7 +164,7 @@ class ScCompanyContractorResponsibilityFact(models.Model):
                         WHEN f.fact_type = 'self_funding_income' THEN '自筹垫付反映承包人与公司的资金占用关系，项目用于归属和办理约束'
                         WHEN f.fact_type = 'self_funding_refund' THEN '自筹退回冲减承包人与公司的自筹占用关系'
                     END AS coverage_note
-                FROM sc_finance_business_fact f
+                FROM {business_fact} f
                 WHERE f.business_domain IN ('arrival_settlement', 'self_funding')
                   AND f.fact_type IN ('arrival_gross', 'self_funding_income', 'self_funding_refund')
                   AND f.balance_policy = 'canonical'
@@ -5,10 +5,25 @@ from odoo.exceptions import UserError
 
 class ScComprehensiveCostSummary(models.Model):
     _name = "sc.comprehensive.cost.summary"
+    _inherit = "sc.projection.refresh.mixin"
     _description = "成本统计表（综合）"
     _auto = False
     _rec_name = "display_name"
     _order = "project_id"
+    _sc_projection_required_tables = (
+        "project_project",
+        "res_company",
+        "construction_contract",
+        "sc_receipt_income",
+        "sc_invoice_registration",
+        "sc_payment_execution",
+        "sc_expense_claim",
+        "sc_hr_payroll_document",
+        "sc_legacy_material_stock_fact",
+        "sc_legacy_labor_subcontract_fact",
+        "sc_legacy_equipment_lease_fact",
+        "sc_legacy_supplier_contract_pricing_fact",
+    )
     _sc_readonly_navigation_button_methods = {
         "action_open_income_contracts",
         "action_open_receipts",
@@ -200,61 +215,18 @@ class ScComprehensiveCostSummary(models.Model):
             self._project_domain() + [("active", "=", True), ("state", "!=", "cancel")],
         )
 
-    def init(self):
-        self._cr.execute(
-            """
-            SELECT
-                to_regclass('project_project'),
-                to_regclass('res_company'),
-                to_regclass('construction_contract'),
-                to_regclass('sc_receipt_income'),
-                to_regclass('sc_invoice_registration'),
-                to_regclass('sc_payment_execution'),
-                to_regclass('sc_expense_claim'),
-                to_regclass('sc_hr_payroll_document'),
-                to_regclass('sc_legacy_material_stock_fact'),
-                to_regclass('sc_legacy_labor_subcontract_fact'),
-                to_regclass('sc_legacy_equipment_lease_fact'),
-                to_regclass('sc_legacy_supplier_contract_pricing_fact')
-            """
-        )
-        if not all(self._cr.fetchone()):
-            return
-        self._cr.execute(
-            f"""
-            DO $$
-            BEGIN
-                IF EXISTS (
-                    SELECT 1 FROM pg_class
-                    WHERE oid = to_regclass('{self._table}')
-                      AND relkind = 'v'
-                ) THEN
-                    EXECUTE 'DROP VIEW IF EXISTS {self._table} CASCADE';
-                ELSIF EXISTS (
-                    SELECT 1 FROM pg_class
-                    WHERE oid = to_regclass('{self._table}')
-                      AND relkind = 'm'
-                ) THEN
-                    EXECUTE 'DROP MATERIALIZED VIEW IF EXISTS {self._table} CASCADE';
-                ELSE
-                    EXECUTE 'DROP TABLE IF EXISTS {self._table} CASCADE';
-                END IF;
-            END $$;
-            """
-        )
-        self._cr.execute(
-            f"""
-            CREATE TABLE {self._table} AS (
+    def _sc_projection_select_sql(self, scope):
+        return f"""
                 WITH income_contract AS (
                     SELECT project_id, SUM(COALESCE(amount_total, 0.0)) AS income_contract_amount, COUNT(*)::integer AS cnt
                     FROM construction_contract
-                    WHERE type = 'out' AND COALESCE(archived, FALSE) IS FALSE AND state <> 'cancel'
+                    WHERE type = 'out' AND COALESCE(archived, FALSE) IS FALSE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 payable_contract AS (
                     SELECT project_id, SUM(COALESCE(amount_total, 0.0)) AS payable_contract_amount, COUNT(*)::integer AS cnt
                     FROM construction_contract
-                    WHERE type = 'in' AND COALESCE(archived, FALSE) IS FALSE AND state <> 'cancel'
+                    WHERE type = 'in' AND COALESCE(archived, FALSE) IS FALSE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 supplier_contract AS (
@@ -265,12 +237,13 @@ class ScComprehensiveCostSummary(models.Model):
                     FROM sc_legacy_supplier_contract_pricing_fact
                     WHERE active IS TRUE
                       AND COALESCE(deleted_flag, '0') IN ('0', '')
+                      AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 receipt AS (
                     SELECT project_id, SUM(COALESCE(amount, 0.0)) AS receipt_amount, COUNT(*)::integer AS cnt
                     FROM sc_receipt_income
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 invoice AS (
@@ -282,7 +255,7 @@ class ScComprehensiveCostSummary(models.Model):
                             AS input_invoice_amount,
                         COUNT(*)::integer AS cnt
                     FROM sc_invoice_registration
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 payment AS (
@@ -291,7 +264,7 @@ class ScComprehensiveCostSummary(models.Model):
                         SUM(COALESCE(paid_amount, 0.0)) AS paid_amount,
                         COUNT(*)::integer AS cnt
                     FROM sc_payment_execution
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 material_cost AS (
@@ -306,7 +279,7 @@ class ScComprehensiveCostSummary(models.Model):
                             WHERE fact_type IN ('stock_in', 'stock_in_line', 'scbs_stock_in', 'material_lease_settlement')
                         )::integer AS cnt
                     FROM sc_legacy_material_stock_fact
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 labor_cost AS (
@@ -321,7 +294,7 @@ class ScComprehensiveCostSummary(models.Model):
                         END) AS labor_cost_amount,
                         COUNT(*)::integer AS cnt
                     FROM sc_legacy_labor_subcontract_fact
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 lease_cost AS (
@@ -336,7 +309,7 @@ class ScComprehensiveCostSummary(models.Model):
                         END) AS lease_cost_amount,
                         COUNT(*)::integer AS cnt
                     FROM sc_legacy_equipment_lease_fact
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 expense_cost AS (
@@ -348,7 +321,7 @@ class ScComprehensiveCostSummary(models.Model):
                         END) AS expense_cost_amount,
                         COUNT(*) FILTER (WHERE claim_type = 'expense')::integer AS cnt
                     FROM sc_expense_claim
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 salary_cost AS (
@@ -360,7 +333,7 @@ class ScComprehensiveCostSummary(models.Model):
                         END) AS salary_cost_amount,
                         COUNT(*) FILTER (WHERE fact_type = 'salary_registration')::integer AS cnt
                     FROM sc_hr_payroll_document
-                    WHERE active IS TRUE AND state <> 'cancel'
+                    WHERE active IS TRUE AND state <> 'cancel' AND {scope('project_id')}
                     GROUP BY project_id
                 ),
                 project_keys AS (
@@ -377,7 +350,7 @@ class ScComprehensiveCostSummary(models.Model):
                     UNION SELECT project_id FROM salary_cost
                 )
                 SELECT
-                    row_number() OVER (ORDER BY k.project_id NULLS LAST)::integer AS id,
+                    (row_number() OVER (ORDER BY k.project_id NULLS LAST) + %(id_offset)s)::integer AS id,
                     CASE
                         WHEN COALESCE(p.name->>'zh_CN', p.name->>'en_US', '') ~ '^[0-9a-fA-F]{{32}}$'
                         THEN CONCAT('历史未归档项目 ', COALESCE(p.name->>'zh_CN', p.name->>'en_US'))
@@ -464,9 +437,4 @@ class ScComprehensiveCostSummary(models.Model):
                 LEFT JOIN lease_cost ec ON ec.project_id IS NOT DISTINCT FROM k.project_id
                 LEFT JOIN expense_cost ex ON ex.project_id IS NOT DISTINCT FROM k.project_id
                 LEFT JOIN salary_cost sa ON sa.project_id IS NOT DISTINCT FROM k.project_id
-            )
             """
-        )
-        self._cr.execute(f"ALTER TABLE {self._table} ADD PRIMARY KEY (id)")
-        self._cr.execute(f"CREATE INDEX {self._table}_project_id_idx ON {self._table} (project_id)")
-        self._cr.execute(f"CREATE INDEX {self._table}_project_name_idx ON {self._table} (project_name)")
@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.exceptions import UserError
 
 
 class ScFinanceBusinessFact(models.Model):
     _name = "sc.finance.business.fact"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "项目收付款来源明细"
     _auto = False
     _rec_name = "display_name"
@@ -291,10 +292,10 @@ class ScFinanceBusinessFact(models.Model):
         if not all(self._cr.fetchone()):
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH default_company AS (
                     SELECT id AS company_id, currency_id
                       FROM res_company
@@ -600,3 +601,4 @@ class ScFinanceBusinessFact(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
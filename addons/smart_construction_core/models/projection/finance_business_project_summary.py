@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.exceptions import UserError
 
 
 class ScFinanceBusinessProjectSummary(models.Model):
     _name = "sc.finance.business.project.summary"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "项目收付款汇总"
     _auto = False
     _rec_name = "display_name"
@@ -172,10 +173,11 @@ class ScFinanceBusinessProjectSummary(models.Model):
         if not all(self._cr.fetchone()):
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
+        business_fact = self._sc_live_source("sc_finance_business_fact")
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH grouped AS (
                     SELECT
                         COALESCE(f.project_id, 0) AS project_key,
@@ -208,7 +210,7 @@ class ScFinanceBusinessProjectSummary(models.Model):
                         COALESCE(SUM(CASE WHEN f.fact_type = 'guarantee_out' THEN f.amount ELSE 0 END), 0.0) AS guarantee_out_amount,
                         COALESCE(SUM(CASE WHEN f.fact_type = 'guarantee_return' THEN f.amount ELSE 0 END), 0.0) AS guarantee_return_amount,
                         COALESCE(SUM(CASE WHEN f.business_domain = 'guarantee_deposit' THEN f.balance_effect ELSE 0 END), 0.0) AS guarantee_outstanding_amount
-                    FROM sc_finance_business_fact f
+                    FROM {business_fact} f
                     GROUP BY COALESCE(f.project_id, 0), f.project_id, f.business_domain
                 )
                 SELECT
@@ -256,3 +258,4 @@ class ScFinanceBusinessProjectSummary(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.osv import expression
 from odoo.exceptions import UserError
 
 
 class ScFinanceCounterpartyPositionSummary(models.Model):
     _name = "sc.finance.counterparty.position.summary"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "往来对象资金总览"
     _auto = False
     _rec_name = "display_name"
@@ -175,10 +176,11 @@ class ScFinanceCounterpartyPositionSummary(models.Model):
         if not self._cr.fetchone()[0]:
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
+        counterparty_position = self._sc_live_source("sc_finance_project_counterparty_position")
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH grouped AS (
                     SELECT
                         counterparty_type,
@@ -201,7 +203,7 @@ class ScFinanceCounterpartyPositionSummary(models.Model):
                         COALESCE(SUM(internal_transfer_amount), 0.0) AS internal_transfer_amount,
                         COALESCE(SUM(combined_balance_effect), 0.0) AS combined_balance_effect,
                         COALESCE(SUM(combined_cash_net_amount), 0.0) AS combined_cash_net_amount
-                    FROM sc_finance_project_counterparty_position
+                    FROM {counterparty_position}
                     GROUP BY counterparty_type, counterparty_project_id, partner_id, counterparty_name
                 )
                 SELECT
@@ -239,3 +241,4 @@ class ScFinanceCounterpartyPositionSummary(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
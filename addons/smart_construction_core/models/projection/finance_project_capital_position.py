@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.osv import expression
 from odoo.exceptions import UserError
 
 
 class ScFinanceProjectCapitalPosition(models.Model):
     _name = "sc.finance.project.capital.position"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "项目资金总览"
     _auto = False
     _rec_name = "display_name"
@@ -232,10 +233,12 @@ class ScFinanceProjectCapitalPosition(models.Model):
         if not all(self._cr.fetchone()):
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
+        business_summary = self._sc_live_source("sc_finance_business_project_summary")
+        interfund_summary = self._sc_live_source("sc_interfund_movement_project_summary")
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH finance AS (
                     SELECT
                         COALESCE(project_id, 0) AS project_key,
@@ -254,7 +257,7 @@ class ScFinanceProjectCapitalPosition(models.Model):
                         COALESCE(SUM(balance_effect), 0.0) AS finance_balance_effect,
                         COALESCE(SUM(cash_in_amount), 0.0) AS finance_cash_in_amount,
                         COALESCE(SUM(cash_out_amount), 0.0) AS finance_cash_out_amount
-                    FROM sc_finance_business_project_summary
+                    FROM {business_summary}
                     GROUP BY COALESCE(project_id, 0), project_id
                 ),
                 interfund AS (
@@ -275,7 +278,7 @@ class ScFinanceProjectCapitalPosition(models.Model):
                         COALESCE(SUM(project_transfer_out_amount), 0.0) AS project_transfer_out_amount,
                         COALESCE(SUM(contractor_borrow_out_amount), 0.0) AS contractor_borrow_out_amount,
                         COALESCE(SUM(contractor_repay_in_amount), 0.0) AS contractor_repay_in_amount
-                    FROM sc_interfund_movement_project_summary
+                    FROM {interfund_summary}
                     GROUP BY COALESCE(project_id, 0), project_id
                 ),
                 combined AS (
@@ -354,3 +357,4 @@ class ScFinanceProjectCapitalPosition(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.osv import expression
 from odoo.exceptions import UserError
 
 
 class ScFinanceProjectCounterpartyPosition(models.Model):
     _name = "sc.finance.project.counterparty.position"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "项目与对象资金往来"
     _auto = False
     _rec_name = "display_name"
@@ -367,10 +368,12 @@ class ScFinanceProjectCounterpartyPosition(models.Model):
         if not all(self._cr.fetchone()):
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
+        business_fact = self._sc_live_source("sc_finance_business_fact")
+        interfund_fact = self._sc_live_source("sc_interfund_movement_fact")
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH project_names AS (
                     SELECT id, COALESCE(name->>'zh_CN', name->>'en_US') AS project_name
                     FROM project_project
@@ -396,7 +399,7 @@ class ScFinanceProjectCounterpartyPosition(models.Model):
                         0.0 AS interfund_outflow_amount,
                         0.0 AS interfund_net_amount,
                         0.0 AS internal_transfer_amount
-                    FROM sc_finance_business_fact f
+                    FROM {business_fact} f
                     UNION ALL
                     SELECT
                         f.target_project_id AS project_id,
@@ -428,7 +431,7 @@ class ScFinanceProjectCounterpartyPosition(models.Model):
                         0.0 AS interfund_outflow_amount,
                         f.amount AS interfund_net_amount,
                         0.0 AS internal_transfer_amount
-                    FROM sc_interfund_movement_fact f
+                    FROM {interfund_fact} f
                     LEFT JOIN project_names sp ON sp.id = f.source_project_id
                     WHERE f.target_project_id IS NOT NULL
                       AND f.movement_type IN (
@@ -468,7 +471,7 @@ class ScFinanceProjectCounterpartyPosition(models.Model):
                         f.amount AS interfund_outflow_amount,
                         -f.amount AS interfund_net_amount,
                         0.0 AS internal_transfer_amount
-                    FROM sc_interfund_movement_fact f
+                    FROM {interfund_fact} f
                     LEFT JOIN project_names tp ON tp.id = f.target_project_id
                     WHERE f.source_project_id IS NOT NULL
                       AND f.movement_type IN (
@@ -495,7 +498,7 @@ class ScFinanceProjectCounterpartyPosition(models.Model):
                         0.0 AS interfund_outflow_amount,
                         0.0 AS interfund_net_amount,
                         f.amount AS internal_transfer_amount
-                    FROM sc_interfund_movement_fact f
+                    FROM {interfund_fact} f
                     WHERE COALESCE(f.source_project_id, f.target_project_id, f.project_id) IS NOT NULL
                       AND f.movement_type IN ('same_project_account_transfer', 'unclassified_account_transfer')
                 ),
@@ -551,3 +554,4 @@ class ScFinanceProjectCounterpartyPosition(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.exceptions import UserError
 
 
 class ScFundDailySummary(models.Model):
     _name = "sc.fund.daily.summary"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "企业资金日报汇总"
     _auto = False
     _rec_name = "display_name"
@@ -70,10 +71,10 @@ class ScFundDailySummary(models.Model):
         self._cr.execute("SELECT to_regclass('sc_legacy_fund_daily_snapshot_fact')")
         if not self._cr.fetchone()[0]:
             return
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH normalized_snapshot AS (
                     SELECT
                         s.id,
@@ -126,3 +127,4 @@ class ScFundDailySummary(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
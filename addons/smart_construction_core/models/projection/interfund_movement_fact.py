@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.exceptions import UserError
 
 
 class ScInterfundMovementFact(models.Model):
     _name = "sc.interfund.movement.fact"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "借款还款与调拨明细"
     _auto = False
     _rec_name = "display_name"
@@ -283,10 +284,10 @@ class ScInterfundMovementFact(models.Model):
         if not all(self._cr.fetchone()):
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH project_names AS (
                     SELECT
                         id,
@@ -567,3 +568,4 @@ class ScInterfundMovementFact(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 import ast
 
-from odoo import api, fields, models, tools
+from odoo import api, fields, models
 from odoo.osv import expression
 from odoo.exceptions import UserError
 
 
 class ScInterfundMovementProjectSummary(models.Model):
     _name = "sc.interfund.movement.project.summary"
+    _inherit = "sc.projection.materialize.mixin"
     _description = "项目借还调拨汇总"
     _auto = False
     _rec_name = "display_name"
@@ -199,10 +200,11 @@ class ScInterfundMovementProjectSummary(models.Model):
         if not all(self._cr.fetchone()):
             return
 
-        tools.drop_view_if_exists(self._cr, self._table)
+        self._sc_materialize_prepare()
+        interfund_fact = self._sc_live_source("sc_interfund_movement_fact")
         self._cr.execute(
             f"""
-            CREATE OR REPLACE VIEW {self._table} AS (
+            CREATE OR REPLACE VIEW {self._sc_live_table} AS (
                 WITH project_perspective AS (
                     SELECT
                         f.target_project_id AS project_id,
@@ -215,7 +217,7 @@ class ScInterfundMovementProjectSummary(models.Model):
                         0.0 AS outflow_amount,
                         f.amount AS net_amount,
                         0.0 AS internal_transfer_amount
-                    FROM sc_interfund_movement_fact f
+                    FROM {interfund_fact} f
                     WHERE f.target_project_id IS NOT NULL
                       AND f.movement_type IN (
                             'company_to_project_borrow',
@@ -235,7 +237,7 @@ class ScInterfundMovementProjectSummary(models.Model):
                         f.amount AS outflow_amount,
                         -f.amount AS net_amount,
                         0.0 AS internal_transfer_amount
-                    FROM sc_interfund_movement_fact f
+                    FROM {interfund_fact} f
                     WHERE f.source_project_id IS NOT NULL
                       AND f.movement_type IN (
                             'project_to_company_repay',
@@ -255,7 +257,7 @@ class ScInterfundMovementProjectSummary(models.Model):
                         0.0 AS outflow_amount,
                         0.0 AS net_amount,
                         f.amount AS internal_transfer_amount
-                    FROM sc_interfund_movement_fact f
+                    FROM {interfund_fact} f
                     WHERE COALESCE(f.source_project_id, f.target_project_id, f.project_id) IS NOT NULL
                       AND f.movement_type IN ('same_project_account_transfer', 'unclassified_account_transfer')
                 ),
@@ -309,3 +311,4 @@ class ScInterfundMovementProjectSummary(models.Model):
             )
             """
         )
+        self._sc_materialize_publish()
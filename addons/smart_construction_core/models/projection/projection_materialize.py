@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, models, tools
+
+_logger = logging.getLogger(__name__)
+
+MATERIALIZE_MODE_PARAM = "sc.projection.materialize.mode.%s"
+MATERIALIZE_STALENESS_PARAM = "sc.projection.materialize.staleness_minutes.%s"
+MODE_LIVE = "live"
+MODE_MATERIALIZED = "materialized"
+LIVE_CONTEXT_KEY = "sc_projection_live"
+
+
+def live_relation(cr, table):
+    """上游视图型投影的实时关系：存在 `{table}_live` 时读取它，避免经由上游的物化结果读到旧数据。"""
+    live = f"{table}_live"
+    cr.execute("SELECT to_regclass(%s)", (live,))
+    return live if cr.fetchone()[0] else table
+
+
+class ScProjectionMaterializeMixin(models.AbstractModel):
+    """
+    视图型投影的物化模式：
+    - `{table}_live` 始终是原始查询视图；
+    - live 模式：`{table}` 为 `SELECT * FROM {table}_live` 的视图，与改造前等价；
+    - materialized 模式：`{table}` 为物化视图，带 id 唯一索引（支持 REFRESH CONCURRENTLY）
+      及 project/partner/company/date 索引，按新鲜度上限由定时任务刷新。
+    模式在 init（模块升级）时按 ir.config_parameter 生效，默认 live，由部署方按模型选择物化；
+    上下文 sc_projection_live=True 的调用方（对新鲜度敏感）直接读取 `{table}_live`。
+    `{table}_live` 引用上游投影时须经 `_sc_live_source` 读取上游的 `_live`，保证 live 读取逐层实时。
+    """
+
+    _name = "sc.projection.materialize.mixin"
+    _description = "View Projection Materialize Mixin"
+
+    _sc_materialize = True
+    _sc_materialize_default_mode = MODE_LIVE
+    _sc_materialize_default_staleness_minutes = 15
+    _sc_materialize_index_columns = ("project_id", "partner_id", "company_id", "document_date")
+
+    @property
+    def _table_query(self):
+        if self.env.context.get(LIVE_CONTEXT_KEY):
+            return f"SELECT * FROM {self._sc_live_table}"
+        return None
+
+    @property
+    def _sc_live_table(self):
+        return f"{self._table}_live"
+
+    def _sc_live_source(self, table):
+        return live_relation(self._cr, table)
+
+    def _sc_materialize_mode(self):
+        mode = self.env["ir.config_parameter"].sudo().get_param(MATERIALIZE_MODE_PARAM % self._name)
+        mode = str(mode or self._sc_materialize_default_mode).strip().lower()
+        return mode if mode in (MODE_LIVE, MODE_MATERIALIZED) else MODE_LIVE
+
+    def _sc_materialize_staleness_minutes(self):
+        value = self.env["ir.config_parameter"].sudo().get_param(MATERIALIZE_STALENESS_PARAM % self._name)
+        try:
+            return max(int(value), 1)
+        except (TypeError, ValueError):
+            return self._sc_materialize_default_staleness_minutes
+
+    def _sc_materialized_relkind(self):
+        self._cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (self._table,))
+        row = self._cr.fetchone()
+        return row[0] if row else None
+
+    def _sc_materialize_prepare(self):
+        """删除对外关系（视图或物化视图，级联下游视图）与 live 视图，随后由投影创建 `{table}_live`。"""
+        if self._sc_materialized_relkind() == "m":
+            self._cr.execute(f"DROP MATERIALIZED VIEW IF EXISTS {self._table} CASCADE")
+        tools.drop_view_if_exists(self._cr, self._table)
+        tools.drop_view_if_exists(self._cr, self._sc_live_table)
+
+    def _sc_materialize_publish(self):
+        if self._sc_materialize_mode() == MODE_MATERIALIZED:
+            try:
+                with self._cr.savepoint():
+                    self._sc_materialize_create()
+                return MODE_MATERIALIZED
+            except Exception as exc:
+                _logger.warning("[projection.materialize] %s falls back to live view: %s", self._name, exc)
+        self._cr.execute(f"CREATE VIEW {self._table} AS SELECT * FROM {self._sc_live_table}")
+        return MODE_LIVE
+
+    def _sc_materialize_create(self):
+        self._cr.execute(f"CREATE MATERIALIZED VIEW {self._table} AS SELECT * FROM {self._sc_live_table}")
+        self._cr.execute(f"CREATE UNIQUE INDEX {self._table}_id_uniq ON {self._table} (id)")
+        for column in self._sc_materialize_index_columns:
+            if column in self._fields:
+                self._cr.execute(f"CREATE INDEX {self._table}_{column}_idx ON {self._table} ({column})")
+
+    @api.model
+    def _sc_materialize_refresh(self):
+        """CONCURRENTLY：刷新期间读取不阻塞；仅在当前为物化视图时执行。"""
+        if self._sc_materialized_relkind() != "m":
+            return False
+        self._cr.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self._table}")
+        self.invalidate_model()
+        return True
@@ -0,0 +1,426 @@
+# -*- coding: utf-8 -*-
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from odoo.addons.smart_construction_core.services.projection_refresh_registry import (
+    REFRESHABLE_PROJECTIONS,
+    derived_projections,
+    normalize_project_keys,
+    ordered_projections,
+    project_scope_sql,
+    projections_for_source,
+    source_authority_contract,
+)
+
+
+class ScProjectionRefreshMixin(models.AbstractModel):
+    """
+    快照投影刷新：投影只需提供 `_sc_projection_select_sql(scope)`。
+    - 全量：在 `{table}__shadow` 构建完整结果与索引，同一事务内 DROP 旧表并 RENAME 影子表；
+    - 分区：同一事务内 LOCK（EXCLUSIVE，读不受阻）、DELETE 脏分区、INSERT 影子结果，提交即原子可见。
+    scope(column) 返回来源过滤条件；分区刷新时参数为 %(project_keys)s，id 以 %(id_offset)s 续接。
+    """
+
+    _name = "sc.projection.refresh.mixin"
+    _description = "Snapshot Projection Refresh Mixin"
+
+    _sc_projection_required_tables = ()
+    _sc_projection_index_columns = ("project_id", "project_name")
+
+    def _sc_projection_select_sql(self, scope):
+        raise TypeError(f"{self._name} must override _sc_projection_select_sql(scope)")
+
+    def _sc_projection_ready(self):
+        tables = tuple(self._sc_projection_required_tables)
+        if not tables:
+            return True
+        self._cr.execute(
+            "SELECT %s" % ", ".join("to_regclass(%s)" for _table in tables),
+            tables,
+        )
+        return all(self._cr.fetchone())
+
+    def _sc_projection_drop_relation(self, relation):
+        self._cr.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM pg_class
+                    WHERE oid = to_regclass('{relation}')
+                      AND relkind = 'v'
+                ) THEN
+                    EXECUTE 'DROP VIEW IF EXISTS {relation} CASCADE';
+                ELSIF EXISTS (
+                    SELECT 1 FROM pg_class
+                    WHERE oid = to_regclass('{relation}')
+                      AND relkind = 'm'
+                ) THEN
+                    EXECUTE 'DROP MATERIALIZED VIEW IF EXISTS {relation} CASCADE';
+                ELSE
+                    EXECUTE 'DROP TABLE IF EXISTS {relation} CASCADE';
+                END IF;
+            END $$;
+            """
+        )
+
+    def _sc_projection_build_table(self, relation):
+        self._cr.execute(
+            f"CREATE TABLE {relation} AS ({self._sc_projection_select_sql(lambda column: project_scope_sql(column, False))})",
+            {"project_keys": [], "id_offset": 0},
+        )
+        self._cr.execute(f"ALTER TABLE {relation} ADD PRIMARY KEY (id)")
+        for column in self._sc_projection_index_columns:
+            self._cr.execute(f"CREATE INDEX {relation}_{column}_idx ON {relation} ({column})")
+
+    def init(self):
+        if self._abstract or not self._sc_projection_ready():
+            return
+        self._sc_projection_drop_relation(self._table)
+        self._sc_projection_build_table(self._table)
+
+    def _sc_projection_refresh_full(self):
+        if not self._sc_projection_ready():
+            return 0
+        shadow = f"{self._table}__shadow"
+        self._sc_projection_drop_relation(shadow)
+        self._sc_projection_build_table(shadow)
+        self._sc_projection_drop_relation(self._table)
+        self._cr.execute(f"ALTER TABLE {shadow} RENAME TO {self._table}")
+        self._cr.execute(f"ALTER TABLE {self._table} RENAME CONSTRAINT {shadow}_pkey TO {self._table}_pkey")
+        for column in self._sc_projection_index_columns:
+            self._cr.execute(f"ALTER INDEX {shadow}_{column}_idx RENAME TO {self._table}_{column}_idx")
+        self._cr.execute(f"SELECT COUNT(*) FROM {self._table}")
+        row_count = self._cr.fetchone()[0]
+        self.invalidate_model()
+        return row_count
+
+    def _sc_projection_refresh_partitions(self, project_keys):
+        keys = normalize_project_keys(project_keys)
+        if not keys or not self._sc_projection_ready():
+            return 0
+        shadow = f"{self._table}__partition"
+        select_sql = self._sc_projection_select_sql(lambda column: project_scope_sql(column, True))
+        # EXCLUSIVE 只阻塞并发刷新与写入，列表读取不受影响；事务提交前读者看到旧分区。
+        self._cr.execute(f"LOCK TABLE {self._table} IN EXCLUSIVE MODE")
+        self._cr.execute(f"SELECT COALESCE(MAX(id), 0) FROM {self._table}")
+        id_offset = self._cr.fetchone()[0]
+        self._cr.execute(f"DROP TABLE IF EXISTS pg_temp.{shadow}")
+        self._cr.execute(
+            f"""
+            CREATE TEMP TABLE {shadow} ON COMMIT DROP AS
+            SELECT refreshed.* FROM ({select_sql}) refreshed
+             WHERE {project_scope_sql("refreshed.project_id", True)}
+            """,
+            {"project_keys": keys, "id_offset": id_offset},
+        )
+        self._cr.execute(
+            f"DELETE FROM {self._table} WHERE {project_scope_sql('project_id', True)}",
+            {"project_keys": keys},
+        )
+        self._cr.execute(f"INSERT INTO {self._table} SELECT * FROM {shadow}")
+        inserted = self._cr.rowcount
+        self._cr.execute(f"DROP TABLE pg_temp.{shadow}")
+        self.invalidate_model()
+        return inserted
+
+
+class ScProjectionDirty(models.Model):
+    _name = "sc.projection.dirty"
+    _description = "Snapshot Projection Dirty Partition"
+    _log_access = False
+    _order = "id"
+
+    projection = fields.Char(string="Projection", required=True, readonly=True, index=True)
+    project_key = fields.Integer(string="Project Key", required=True, readonly=True)
+    source_model = fields.Char(string="Source Model", readonly=True)
+    marked_at = fields.Datetime(string="Marked At", required=True, readonly=True)
+
+    @api.model
+    def source_authority_contract(self):
+        return source_authority_contract()
+
+    @api.model
+    def mark(self, projections, project_keys, source_model=""):
+        """
+        只追加、无唯一约束：并发写入同一项目不会在标记行上互相等待。
+        刷新时按分区聚合，只删除本次读到的行，刷新期间新增的标记留待下一轮。
+        """
+        keys = normalize_project_keys(project_keys)
+        names = [name for name in projections or [] if name in REFRESHABLE_PROJECTIONS]
+        if not keys or not names:
+            return 0
+        rows = [(name, key, source_model or "") for name in names for key in keys]
+        self._cr.execute(
+            "INSERT INTO sc_projection_dirty (projection, project_key, source_model, marked_at) "
+            "SELECT projection, project_key, source_model, now() AT TIME ZONE 'UTC' "
+            "FROM unnest(%s::varchar[], %s::integer[], %s::varchar[]) AS t(projection, project_key, source_model)",
+            ([row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]),
+        )
+        return len(rows)
+
+    @api.model
+    def _pending_partitions(self, limit):
+        self._cr.execute(
+            """
+            SELECT projection, project_key, array_agg(id)
+              FROM sc_projection_dirty
+             GROUP BY projection, project_key
+             ORDER BY MIN(id)
+             LIMIT %s
+            """,
+            (max(int(limit or 0), 1),),
+        )
+        return self._cr.fetchall()
+
+
+class ScProjectionRefreshState(models.Model):
+    _name = "sc.projection.refresh.state"
+    _description = "Snapshot Projection Refresh State"
+    _log_access = False
+    _order = "projection"
+
+    projection = fields.Char(string="Projection", required=True, readonly=True)
+    last_refresh_at = fields.Datetime(string="Last Refresh At", readonly=True)
+    last_full_refresh_at = fields.Datetime(string="Last Full Refresh At", readonly=True)
+    last_duration_ms = fields.Integer(string="Last Duration (ms)", readonly=True)
+    last_partition_count = fields.Integer(string="Last Partition Count", readonly=True)
+    last_row_count = fields.Integer(string="Last Row Count", readonly=True)
+
+    _sql_constraints = [
+        ("projection_uniq", "unique(projection)", "Projection refresh state must be unique."),
+    ]
+
+    @api.model
+    def source_authority_contract(self):
+        return source_authority_contract()
+
+    @api.model
+    def _record(self, projection, *, full, partition_count, row_count, duration_ms):
+        now = fields.Datetime.now()
+        self._cr.execute(
+            """
+            INSERT INTO sc_projection_refresh_state
+                (projection, last_refresh_at, last_full_refresh_at, last_duration_ms, last_partition_count, last_row_count)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (projection) DO UPDATE
+               SET last_refresh_at = EXCLUDED.last_refresh_at,
+                   last_full_refresh_at = COALESCE(EXCLUDED.last_full_refresh_at, sc_projection_refresh_state.last_full_refresh_at),
+                   last_duration_ms = EXCLUDED.last_duration_ms,
+                   last_partition_count = EXCLUDED.last_partition_count,
+                   last_row_count = EXCLUDED.last_row_count
+            """,
+            (projection, now, now if full else None, int(duration_ms), int(partition_count), int(row_count)),
+        )
+
+    def _refresh_one(self, projection, project_keys=None):
+        model = self.env[projection].sudo()
+        started = time.monotonic()
+        if project_keys is None:
+            rows = model._sc_projection_refresh_full()
+            partition_count = 0
+        else:
+            rows = model._sc_projection_refresh_partitions(project_keys)
+            partition_count = len(project_keys)
+        duration_ms = int((time.monotonic() - started) * 1000)
+        self._record(
+            projection,
+            full=project_keys is None,
+            partition_count=partition_count,
+            row_count=rows,
+            duration_ms=duration_ms,
+        )
+        return {
+            "projection": projection,
+            "full": project_keys is None,
+            "partition_count": partition_count,
+            "row_count": rows,
+            "duration_ms": duration_ms,
+        }
+
+    @api.model
+    def refresh_projects(self, project_keys, projections=None):
+        """刷新指定项目分区；派生投影同步刷新相同分区。"""
+        keys = normalize_project_keys(project_keys)
+        if not keys:
+            return []
+        return [self._refresh_one(name, keys) for name in ordered_projections(projections)]
+
+    @api.model
+    def refresh_full(self, projections=None):
+        names = ordered_projections(projections)
+        # 先取出已有标记再重建：重建期间新增的标记不在本次删除范围内。
+        self._cr.execute("SELECT id FROM sc_projection_dirty WHERE projection = ANY(%s)", (names,))
+        consumed_ids = [row[0] for row in self._cr.fetchall()]
+        results = [self._refresh_one(name) for name in names]
+        if consumed_ids:
+            self._cr.execute("DELETE FROM sc_projection_dirty WHERE id = ANY(%s)", (consumed_ids,))
+        return results
+
+    @api.model
+    def cron_refresh_dirty(self, limit=500):
+        """
+        按依赖顺序刷新脏分区：来源投影刷新的分区并入其派生投影。
+        advisory lock 保证同一时刻只有一个刷新批次；拿不到锁直接返回。
+        """
+        self._cr.execute("SELECT pg_try_advisory_xact_lock(hashtext('sc.projection.refresh'))")
+        if not self._cr.fetchone()[0]:
+            return {"status": "busy", "refreshed": []}
+        dirty = self.env["sc.projection.dirty"].sudo()
+        keys_by_projection = {}
+        consumed_ids = []
+        for projection, project_key, row_ids in dirty._pending_partitions(limit):
+            keys_by_projection.setdefault(projection, set()).add(project_key)
+            consumed_ids.extend(row_ids)
+        results = []
+        for projection in ordered_projections(keys_by_projection):
+            keys = sorted(keys_by_projection.get(projection) or ())
+            if not keys:
+                continue
+            results.append(self._refresh_one(projection, keys))
+            for derived in derived_projections(projection):
+                keys_by_projection.setdefault(derived, set()).update(keys)
+        if consumed_ids:
+            self._cr.execute("DELETE FROM sc_projection_dirty WHERE id = ANY(%s)", (consumed_ids,))
+        return {"status": "ok", "refreshed": results}
+
+    @api.model
+    def _materialized_models(self):
+        """注册顺序即加载顺序：上游事实视图先于依赖它的汇总视图刷新。"""
+        return [
+            name
+            for name, model in self.env.registry.items()
+            if getattr(model, "_sc_materialize", False) and not model._abstract
+        ]
+
+    @api.model
+    def cron_refresh_materialized(self, force=False, projections=None):
+        """刷新超过新鲜度上限（staleness_minutes）的物化投影；force=True 忽略上限。"""
+        self._cr.execute("SELECT pg_try_advisory_xact_lock(hashtext('sc.projection.materialize'))")
+        if not self._cr.fetchone()[0]:
+            return {"status": "busy", "refreshed": []}
+        states = {state.projection: state for state in self.sudo().search([])}
+        now = fields.Datetime.now()
+        results = []
+        for name in self._materialized_models():
+            if projections and name not in projections:
+                continue
+            model = self.env[name].sudo()
+            state = states.get(name)
+            bound = timedelta(minutes=model._sc_materialize_staleness_minutes())
+            if not force and state and state.last_refresh_at and state.last_refresh_at + bound > now:
+                continue
+            started = time.monotonic()
+            if not model._sc_materialize_refresh():
+                continue
+            duration_ms = int((time.monotonic() - started) * 1000)
+            self._record(name, full=True, partition_count=0, row_count=0, duration_ms=duration_ms)
+            results.append({"projection": name, "full": True, "materialized": True, "duration_ms": duration_ms})
+        return {"status": "ok", "refreshed": results}
+
+    @api.model
+    def materialized_metrics(self):
+        states = {state.projection: state for state in self.sudo().search([])}
+        now = fields.Datetime.now()
+        metrics = []
+        for name in self._materialized_models():
+            model = self.env[name].sudo()
+            state = states.get(name)
+            materialized = model._sc_materialized_relkind() == "m"
+            last_refresh_at = state.last_refresh_at if state else None
+            metrics.append(
+                {
+                    "projection": name,
+                    "mode": "materialized" if materialized else "live",
+                    "max_staleness_minutes": model._sc_materialize_staleness_minutes(),
+                    "last_refresh_at": fields.Datetime.to_string(last_refresh_at) if last_refresh_at else "",
+                    "staleness_seconds": (
+                        max(int((now - last_refresh_at).total_seconds()), 0) if materialized and last_refresh_at else 0
+                    ),
+                    "last_duration_ms": int(state.last_duration_ms or 0) if state else 0,
+                }
+            )
+        return metrics
+
+    @api.model
+    def refresh_metrics(self):
+        """刷新滞后：lag_seconds = 当前时间 - 最早未处理标记时间；无脏分区时为 0。"""
+        self._cr.execute(
+            """
+            SELECT projection,
+                   COUNT(DISTINCT project_key),
+                   MIN(marked_at),
+                   EXTRACT(EPOCH FROM ((now() AT TIME ZONE 'UTC') - MIN(marked_at)))
+              FROM sc_projection_dirty
+             GROUP BY projection
+            """
+        )
+        pending = {row[0]: row[1:] for row in self._cr.fetchall()}
+        states = {state.projection: state for state in self.sudo().search([])}
+        metrics = []
+        for projection in REFRESHABLE_PROJECTIONS:
+            pending_count, oldest, lag = pending.get(projection) or (0, None, 0)
+            state = states.get(projection)
+            metrics.append(
+                {
+                    "projection": projection,
+                    "pending_partitions": int(pending_count or 0),
+                    "oldest_dirty_at": fields.Datetime.to_string(oldest) if oldest else "",
+                    "lag_seconds": max(int(lag or 0), 0),
+                    "last_refresh_at": fields.Datetime.to_string(state.last_refresh_at) if state and state.last_refresh_at else "",
+                    "last_full_refresh_at": (
+                        fields.Datetime.to_string(state.last_full_refresh_at)
+                        if state and state.last_full_refresh_at
+                        else ""
+                    ),
+                    "last_duration_ms": int(state.last_duration_ms or 0) if state else 0,
+                    "last_row_count": int(state.last_row_count or 0) if state else 0,
+                }
+            )
+        return metrics
+
+
+class ScProjectionDirtySource(models.AbstractModel):
+    """来源模型写入时标记受影响投影分区；写入前后的项目都会标记（项目变更时旧分区也需重算）。"""
+
+    _name = "sc.projection.dirty.source"
+    _description = "Snapshot Projection Dirty Source"
+
+    _sc_projection_key_field = "project_id"
+    _sc_projection_trigger_fields = None
+
+    def _sc_projection_keys(self):
+        field_name = self._sc_projection_key_field
+        if field_name == "id":
+            return normalize_project_keys(self.ids)
+        return normalize_project_keys(record[field_name].id for record in self.sudo())
+
+    def _sc_projection_mark(self, project_keys):
+        projections = projections_for_source(self._name)
+        if projections and project_keys:
+            self.env["sc.projection.dirty"].sudo().mark(projections, project_keys, source_model=self._name)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._sc_projection_mark(records._sc_projection_keys())
+        return records
+
+    def write(self, vals):
+        trigger_fields = self._sc_projection_trigger_fields
+        if not self or (trigger_fields is not None and not set(vals) & set(trigger_fields)):
+            return super().write(vals)
+        keys = set(self._sc_projection_keys())
+        result = super().write(vals)
+        if self._sc_projection_key_field in vals:
+            keys.update(self._sc_projection_keys())
+        self._sc_projection_mark(sorted(keys))
+        return result
+
+    def unlink(self):
+        keys = self._sc_projection_keys()
+        result = super().unlink()
+        self._sc_projection_mark(keys)
+        return result
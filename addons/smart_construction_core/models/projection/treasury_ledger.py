@@ -2,6 +2,8 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 
+from .projection_materialize import live_relation
+
 
 class TreasuryLedger(models.Model):
     _name = "sc.treasury.ledger"
@@ -147,15 +149,17 @@ class TreasuryLedger(models.Model):
     @api.model
     def _void_stale_interfund_ledgers(self):
         """Void interfund ledger rows that no longer match current interfund facts."""
+        # 物化的借还调拨明细可能滞后，按旧结果作废会误伤刚生成的台账行。
+        interfund_fact = live_relation(self.env.cr, "sc_interfund_movement_fact")
         self.env.cr.execute(
-            """
+            f"""
             WITH expected AS (
                 SELECT
                     f.source_model,
                     f.source_res_id,
                     f.source_project_id AS project_id,
                     'out'::varchar AS direction
-                FROM sc_interfund_movement_fact f
+                FROM {interfund_fact} f
                 WHERE f.amount > 0
                   AND f.source_project_id IS NOT NULL
                   AND f.movement_type IN (
@@ -170,7 +174,7 @@ class TreasuryLedger(models.Model):
                     f.source_res_id,
                     f.target_project_id AS project_id,
                     'in'::varchar AS direction
-                FROM sc_interfund_movement_fact f
+                FROM {interfund_fact} f
                 WHERE f.amount > 0
                   AND f.target_project_id IS NOT NULL
                   AND f.movement_type IN (
@@ -101,3 +101,4 @@ from . import partner_business_fact_line
 from . import runtime_user_management
 from . import product_policy_sync
 from . import formal_list_contract_sync
+from . import my_work_index
@@ -25,6 +25,15 @@ class ScAuditLog(models.Model):
     company_id = fields.Many2one("res.company", string="Company", index=True)
     project_id = fields.Many2one("project.project", string="Project", index=True)
 
+    def init(self):
+        # 记录时间线按 (model, res_id) 取 ts/id 倒序键集分页，复合索引可直接范围扫描。
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS sc_audit_log_model_res_ts_idx
+                ON sc_audit_log (model, res_id, ts DESC, id DESC)
+            """
+        )
+
     @api.model
     def write_event(
         self,
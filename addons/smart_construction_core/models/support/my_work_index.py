@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+“我的工作”物化索引：每个用户每条工作事项一行，my.work.summary 的计数、筛选、排序、分页直接走索引。
+- 增量：来源模型 create/write/unlink 只在事务内登记 (来源模型, id)，提交前（precommit）
+  按来源批量重算这些记录的索引行（按唯一键 upsert 变化行、删除多余行），同一事务内的多次写入只重算一次；
+  读取前 flush_pending() 先处理本事务内尚未落库的登记。
+- 全量：cron_reconcile 按来源分批对账（同样只写差异），批间提交，不清空整表、不长时间持锁，
+  修正目标记录改名、组成员变化等增量钩子覆盖不到的漂移；
+  首次全量完成前（sc.my_work.index.ready 未设置）my.work.summary 继续走实时聚合。
+"""
+import logging
+import threading
+import time
+
+from odoo import api, fields, models
+
+from odoo.addons.smart_construction_core.services.my_work_index_service import (
+    MyWorkIndexService,
+    source_authority_contract,
+)
+
+_logger = logging.getLogger(__name__)
+
+READY_PARAM = "sc.my_work.index.ready"
+ENABLED_PARAM = "sc.my_work.index.enabled"
+_PENDING_KEY = "sc.my.work.index.pending"
+_RECONCILE_LOCK = "sc.my.work.index.reconcile"
+
+INDEX_COLUMNS = (
+    ("user_id", "integer"),
+    ("section", "varchar"),
+    ("source", "varchar"),
+    ("source_model", "varchar"),
+    ("source_res_id", "integer"),
+    ("model_name", "varchar"),
+    ("record_id", "integer"),
+    ("title", "varchar"),
+    ("search_text", "varchar"),
+    ("project_id", "integer"),
+    ("project_scoped", "boolean"),
+    ("project_name", "varchar"),
+    ("deadline", "date"),
+    ("action_label", "varchar"),
+    ("action_key", "varchar"),
+    ("reason_code", "varchar"),
+    ("priority", "varchar"),
+    ("priority_rank", "integer"),
+    ("scene_key", "varchar"),
+)
+INDEX_KEY_COLUMNS = ("user_id", "section", "source", "source_res_id")
+
+
+class ScMyWorkItem(models.Model):
+    _name = "sc.my.work.item"
+    _description = "My Work Item Index"
+    _log_access = False
+    _order = "id desc"
+
+    user_id = fields.Many2one("res.users", string="用户", required=True, readonly=True, index=True, ondelete="cascade")
+    section = fields.Selection(
+        [("todo", "待我处理"), ("owned", "我负责"), ("mentions", "@我的"), ("following", "我关注的")],
+        string="分区",
+        required=True,
+        readonly=True,
+    )
+    source = fields.Char(string="来源", required=True, readonly=True)
+    source_model = fields.Char(string="来源模型", required=True, readonly=True)
+    source_res_id = fields.Integer(string="来源记录", required=True, readonly=True)
+    model_name = fields.Char(string="目标模型", readonly=True)
+    record_id = fields.Integer(string="目标记录", readonly=True)
+    title = fields.Char(string="标题", readonly=True)
+    search_text = fields.Char(string="检索文本", readonly=True)
+    project_id = fields.Many2one("project.project", string="项目", readonly=True, index=True, ondelete="set null")
+    project_scoped = fields.Boolean(string="受项目范围约束", readonly=True)
+    project_name = fields.Char(string="项目名称", readonly=True)
+    deadline = fields.Date(string="截止日期", readonly=True)
+    action_label = fields.Char(string="操作", readonly=True)
+    action_key = fields.Char(string="操作键", readonly=True)
+    reason_code = fields.Char(string="原因码", readonly=True)
+    priority = fields.Char(string="优先级", readonly=True)
+    priority_rank = fields.Integer(string="优先级排序", readonly=True)
+    scene_key = fields.Char(string="场景", readonly=True)
+
+    _sql_constraints = [
+        (
+            "user_item_uniq",
+            "unique(user_id, section, source, source_res_id)",
+            "My work item must be unique per user and source record.",
+        ),
+    ]
+
+    def init(self):
+        # 列表查询总是带 user_id，过滤/排序列跟在其后；增量重算按 (来源模型, 来源记录) 删除。
+        self._cr.execute(
+            "CREATE INDEX IF NOT EXISTS sc_my_work_item_user_section_idx "
+            "ON sc_my_work_item (user_id, section, source, reason_code)"
+        )
+        self._cr.execute(
+            "CREATE INDEX IF NOT EXISTS sc_my_work_item_user_deadline_idx "
+            "ON sc_my_work_item (user_id, deadline, source_res_id)"
+        )
+        self._cr.execute(
+            "CREATE INDEX IF NOT EXISTS sc_my_work_item_source_idx "
+            "ON sc_my_work_item (source_model, source_res_id)"
+        )
+
+    @api.model
+    def source_authority_contract(self):
+        return source_authority_contract()
+
+    @api.model
+    def index_ready(self):
+        params = self.env["ir.config_parameter"].sudo()
+        enabled = str(params.get_param(ENABLED_PARAM, "1") or "").strip().lower() in {"1", "true", "yes", "on"}
+        return enabled and bool(params.get_param(READY_PARAM))
+
+    # ---- 写入 ---------------------------------------------------------------------
+
+    @api.model
+    def _sync_rows(self, source_model, ids, rows):
+        """
+        把指定来源记录的索引行对齐到 rows：按唯一键 upsert（值未变的行不改写），
+        再删除这些来源记录下不在 rows 中的行。返回写入（新增或变化）的行数。
+        """
+        names = [name for name, _type in INDEX_COLUMNS]
+        # 同一唯一键只保留首行（与原 ON CONFLICT DO NOTHING 一致）；DO UPDATE 不允许同一命令重复命中一行。
+        rows = list({tuple(row.get(name) for name in INDEX_KEY_COLUMNS): row for row in reversed(rows or [])}.values())
+        written = 0
+        if rows:
+            value_names = [name for name in names if name not in INDEX_KEY_COLUMNS]
+            self._cr.execute(
+                "INSERT INTO sc_my_work_item AS item (%s) SELECT * FROM unnest(%s) "
+                "ON CONFLICT (%s) DO UPDATE SET %s WHERE (%s) IS DISTINCT FROM (%s)"
+                % (
+                    ", ".join(names),
+                    ", ".join("%%s::%s[]" % sql_type for _name, sql_type in INDEX_COLUMNS),
+                    ", ".join(INDEX_KEY_COLUMNS),
+                    ", ".join("%s = EXCLUDED.%s" % (name, name) for name in value_names),
+                    ", ".join("item.%s" % name for name in value_names),
+                    ", ".join("EXCLUDED.%s" % name for name in value_names),
+                ),
+                [[row.get(name) for row in rows] for name in names],
+            )
+            written = self._cr.rowcount
+        self._cr.execute(
+            """
+            DELETE FROM sc_my_work_item AS item
+             WHERE item.source_model = %s
+               AND item.source_res_id = ANY(%s)
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM unnest(%s::integer[], %s::varchar[], %s::varchar[], %s::integer[])
+                           AS keep(user_id, section, source, source_res_id)
+                     WHERE keep.user_id = item.user_id
+                       AND keep.section = item.section
+                       AND keep.source = item.source
+                       AND keep.source_res_id = item.source_res_id
+               )
+            """,
+            [source_model, list(ids)] + [[row.get(name) for row in rows] for name in INDEX_KEY_COLUMNS],
+        )
+        return written
+
+    @api.model
+    def refresh_sources(self, source_model, ids):
+        """按当前来源数据重算指定来源记录的索引行（记录已删除或不再适用时只删除）。"""
+        ids = sorted({int(rid) for rid in ids or [] if rid})
+        if not ids:
+            return 0
+        rows = MyWorkIndexService(self.env).rows_for(source_model, ids)
+        written = self._sync_rows(source_model, ids, rows)
+        self.invalidate_model()
+        return written
+
+    @api.model
+    def refresh_project_names(self, projects):
+        """项目改名只更新反规范化的项目名称列，不重算来源行。"""
+        for project in projects:
+            self._cr.execute(
+                "UPDATE sc_my_work_item SET project_name = %s WHERE project_id = %s AND project_name IS DISTINCT FROM %s",
+                (str(project.display_name or ""), project.id, str(project.display_name or "")),
+            )
+        self.invalidate_model(["project_name"])
+
+    # ---- 事务内登记 -----------------------------------------------------------------
+
+    @api.model
+    def mark(self, source_model, ids):
+        ids = {int(rid) for rid in ids or [] if rid}
+        if not ids:
+            return
+        data = self.env.cr.precommit.data
+        pending = data.get(_PENDING_KEY)
+        if pending is None:
+            pending = data[_PENDING_KEY] = {}
+            self.env.cr.precommit.add(self.sudo().flush_pending)
+        pending.setdefault(source_model, set()).update(ids)
+
+    @api.model
+    def flush_pending(self):
+        pending = self.env.cr.precommit.data.get(_PENDING_KEY) or {}
+        while pending:
+            source_model, ids = pending.popitem()
+            try:
+                # 重算失败只影响索引，保留给全量对账修正，不阻断业务写入。
+                with self.env.cr.savepoint():
+                    self.sudo().refresh_sources(source_model, ids)
+            except Exception:
+                _logger.exception("my work index refresh failed: source=%s ids=%s", source_model, sorted(ids)[:20])
+
+    # ---- 全量对账 -------------------------------------------------------------------
+
+    @api.model
+    def reconcile(self, batch_size=1000):
+        """
+        全量对账：逐来源、按 batch_size 分批重算“候选记录 ∪ 已索引记录”的索引行，只写差异，批间提交。
+        增量刷新在批间照常提交，不会被整表删除阻塞，也不会与长事务产生序列化冲突。
+        """
+        started = time.monotonic()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        service = MyWorkIndexService(self.env)
+        size = max(int(batch_size or 0), 1)
+        self.flush_pending()
+        counts = {}
+        for source_model in service.source_models():
+            Model = service._model(source_model)
+            ids = set(Model.search(service.reconcile_domain(source_model), order="id").ids)
+            # 已索引但不再是候选（已删除、已办结）的记录也要过一遍，由 rows_for 判定是否清除。
+            self._cr.execute(
+                "SELECT DISTINCT source_res_id FROM sc_my_work_item WHERE source_model = %s",
+                (source_model,),
+            )
+            ids.update(row[0] for row in self._cr.fetchall())
+            ids = sorted(ids)
+            written = 0
+            for offset in range(0, len(ids), size):
+                batch = ids[offset : offset + size]
+                written += self._sync_rows(source_model, batch, service.rows_for(source_model, batch))
+                Model.invalidate_model()
+                if auto_commit:
+                    self._cr.commit()
+            counts[source_model] = written
+        self.invalidate_model()
+        self.env["ir.config_parameter"].sudo().set_param(READY_PARAM, fields.Datetime.to_string(fields.Datetime.now()))
+        self._cr.execute("SELECT COUNT(*) FROM sc_my_work_item")
+        return {
+            "row_count": int(self._cr.fetchone()[0] or 0),
+            "sources": counts,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+        }
+
+    @api.model
+    def cron_reconcile(self):
+        # 对账跨多个事务：用会话级咨询锁防止并发对账，结束（含异常）时显式释放。
+        cr = self._cr
+        cr.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (_RECONCILE_LOCK,))
+        if not cr.fetchone()[0]:
+            return {"status": "busy"}
+        try:
+            return dict(self.sudo().reconcile(), status="ok")
+        except Exception:
+            cr.rollback()
+            raise
+        finally:
+            cr.execute("SELECT pg_advisory_unlock(hashtext(%s))", (_RECONCILE_LOCK,))
+
+
+class ScMyWorkIndexSource(models.AbstractModel):
+    """来源模型写入钩子：登记受影响的来源记录，提交前重算其索引行。"""
+
+    _name = "sc.my.work.index.source"
+    _description = "My Work Index Source"
+
+    # None 表示任意字段变更都重算。
+    _sc_my_work_trigger_fields = None
+
+    def _sc_my_work_mark(self, ids=None):
+        self.env["sc.my.work.item"].sudo().mark(self._name, self.ids if ids is None else ids)
+
+    def _sc_my_work_mark_created(self):
+        self._sc_my_work_mark()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._sc_my_work_mark_created()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        trigger_fields = self._sc_my_work_trigger_fields
+        if self and (trigger_fields is None or set(vals) & set(trigger_fields)):
+            self._sc_my_work_mark()
+        return result
+
+    def unlink(self):
+        ids = list(self.ids)
+        result = super().unlink()
+        if ids:
+            self._sc_my_work_mark(ids)
+        return result
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+“我的工作”索引来源模型：写入即登记来源记录，提交前由 sc.my.work.item 批量重算索引行。
+行构建见 services/my_work_index_service.MyWorkIndexService；目标记录改名、组成员变化由全量对账修正。
+"""
+from odoo import models
+
+from odoo.addons.smart_construction_core.services.my_work_index_service import (
+    EXECUTION_SOURCE_MODELS,
+    PROJECT_RESPONSIBLE_FIELDS,
+)
+
+
+class MailActivityMyWorkSource(models.Model):
+    _name = "mail.activity"
+    _inherit = ["mail.activity", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = (
+        "user_id",
+        "summary",
+        "note",
+        "date_deadline",
+        "res_model",
+        "res_id",
+        "activity_type_id",
+        "active",
+    )
+
+
+class TierReviewMyWorkSource(models.Model):
+    _name = "tier.review"
+    _inherit = ["tier.review", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("status", "reviewer_ids", "reviewer_id", "model", "res_id")
+
+    def _compute_reviewer_ids(self):
+        # reviewer_ids 为存储计算字段，重算不经过 write()。
+        parent = getattr(super(), "_compute_reviewer_ids", None)
+        if parent is not None:
+            parent()
+        self._sc_my_work_mark()
+
+
+class ScWorkflowWorkitemMyWorkSource(models.Model):
+    _name = "sc.workflow.workitem"
+    _inherit = ["sc.workflow.workitem", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("status", "assignee_id", "assignee_group_id", "instance_id", "node_id")
+
+
+class ProjectTaskMyWorkSource(models.Model):
+    _name = "project.task"
+    _inherit = ["project.task", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("name", "user_ids", "date_deadline", "active", "project_id")
+
+
+class ProjectProjectMyWorkSource(models.Model):
+    _name = "project.project"
+    _inherit = ["project.project", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("name", "active", "user_ids", "health_state") + PROJECT_RESPONSIBLE_FIELDS
+
+    def write(self, vals):
+        result = super().write(vals)
+        if not self:
+            return result
+        if "name" in vals:
+            self.env["sc.my.work.item"].sudo().refresh_project_names(self)
+        if {"active", "user_ids", *PROJECT_RESPONSIBLE_FIELDS} & set(vals):
+            # 执行事项按项目负责人/成员展开，项目侧变化需要重算其下的待处理执行事项。
+            self._sc_my_work_mark_execution_items()
+        return result
+
+    def _sc_my_work_mark_execution_items(self):
+        Item = self.env["sc.my.work.item"].sudo()
+        for model_name in EXECUTION_SOURCE_MODELS:
+            if model_name not in self.env:
+                continue
+            records = self.env[model_name].sudo().with_context(active_test=False).search([("project_id", "in", self.ids)])
+            Item.mark(model_name, records.ids)
+
+    def _compute_dashboard_metrics(self):
+        # health_state 为存储计算字段，风险待办随重算刷新。
+        super()._compute_dashboard_metrics()
+        self._sc_my_work_mark([rid for rid in self.ids if rid])
+
+
+class ConstructionContractMyWorkSource(models.Model):
+    _name = "construction.contract"
+    _inherit = ["construction.contract", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("state", "project_id", "subject", "date_end", "date_contract")
+
+
+class PaymentRequestMyWorkSource(models.Model):
+    _name = "payment.request"
+    _inherit = ["payment.request", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("state", "project_id", "name", "date_request")
+
+
+class ScSettlementOrderMyWorkSource(models.Model):
+    _name = "sc.settlement.order"
+    _inherit = ["sc.settlement.order", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("state", "project_id", "name", "date_settlement")
+
+
+class MailMessageMyWorkSource(models.Model):
+    _name = "mail.message"
+    _inherit = ["mail.message", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("partner_ids", "model", "res_id", "subject")
+
+    def _sc_my_work_mark_created(self):
+        # 只有带收件人的消息进入 @我的，避免每条跟踪/日志消息都登记重算。
+        self.filtered("partner_ids")._sc_my_work_mark()
+
+
+class MailFollowersMyWorkSource(models.Model):
+    _name = "mail.followers"
+    _inherit = ["mail.followers", "sc.my.work.index.source"]
+
+    _sc_my_work_trigger_fields = ("partner_id", "res_model", "res_id")
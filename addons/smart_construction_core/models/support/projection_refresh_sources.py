@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+快照投影来源模型：写入即标记 (投影, 项目) 脏分区，由 sc.projection.refresh.state 的定时任务增量刷新。
+受影响投影见 services/projection_refresh_registry.SOURCE_MODEL_PROJECTIONS。
+"""
+from odoo import models
+
+
+class ConstructionContractProjectionSource(models.Model):
+    _name = "construction.contract"
+    _inherit = ["construction.contract", "sc.projection.dirty.source"]
+
+
+class ScReceiptIncomeProjectionSource(models.Model):
+    _name = "sc.receipt.income"
+    _inherit = ["sc.receipt.income", "sc.projection.dirty.source"]
+
+
+class ScInvoiceRegistrationProjectionSource(models.Model):
+    _name = "sc.invoice.registration"
+    _inherit = ["sc.invoice.registration", "sc.projection.dirty.source"]
+
+
+class ScTreasuryLedgerProjectionSource(models.Model):
+    _name = "sc.treasury.ledger"
+    _inherit = ["sc.treasury.ledger", "sc.projection.dirty.source"]
+
+
+class ScPaymentExecutionProjectionSource(models.Model):
+    _name = "sc.payment.execution"
+    _inherit = ["sc.payment.execution", "sc.projection.dirty.source"]
+
+
+class ScExpenseClaimProjectionSource(models.Model):
+    _name = "sc.expense.claim"
+    _inherit = ["sc.expense.claim", "sc.projection.dirty.source"]
+
+
+class ScHrPayrollDocumentProjectionSource(models.Model):
+    _name = "sc.hr.payroll.document"
+    _inherit = ["sc.hr.payroll.document", "sc.projection.dirty.source"]
+
+
+class ScLegacyInvoiceSurchargeFactProjectionSource(models.Model):
+    _name = "sc.legacy.invoice.surcharge.fact"
+    _inherit = ["sc.legacy.invoice.surcharge.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacyTaxDeductionFactProjectionSource(models.Model):
+    _name = "sc.legacy.tax.deduction.fact"
+    _inherit = ["sc.legacy.tax.deduction.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacySelfFundingFactProjectionSource(models.Model):
+    _name = "sc.legacy.self.funding.fact"
+    _inherit = ["sc.legacy.self.funding.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacySupplierContractPricingFactProjectionSource(models.Model):
+    _name = "sc.legacy.supplier.contract.pricing.fact"
+    _inherit = ["sc.legacy.supplier.contract.pricing.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacyProjectFundBalanceFactProjectionSource(models.Model):
+    _name = "sc.legacy.project.fund.balance.fact"
+    _inherit = ["sc.legacy.project.fund.balance.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacyMaterialStockFactProjectionSource(models.Model):
+    _name = "sc.legacy.material.stock.fact"
+    _inherit = ["sc.legacy.material.stock.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacyLaborSubcontractFactProjectionSource(models.Model):
+    _name = "sc.legacy.labor.subcontract.fact"
+    _inherit = ["sc.legacy.labor.subcontract.fact", "sc.projection.dirty.source"]
+
+
+class ScLegacyEquipmentLeaseFactProjectionSource(models.Model):
+    _name = "sc.legacy.equipment.lease.fact"
+    _inherit = ["sc.legacy.equipment.lease.fact", "sc.projection.dirty.source"]
+
+
+class ProjectProjectProjectionSource(models.Model):
+    _name = "project.project"
+    _inherit = ["project.project", "sc.projection.dirty.source"]
+
+    # 项目自身以 id 为分区键，仅名称/公司变更影响投影展示列。
+    _sc_projection_key_field = "id"
+    _sc_projection_trigger_fields = ("name", "company_id")
@@ -37,6 +37,7 @@ class ScCapabilityGroup(models.Model):
 
 class ScCapability(models.Model):
     _name = "sc.capability"
+    _inherit = ["sc.contract.cache.invalidation.mixin"]
     _description = "SC Capability Catalog"
     _order = "sequence, id"
     SOURCE_KIND = "scene_delivery_capability_catalog"
@@ -146,11 +147,32 @@ class ScCapability(models.Model):
         data["reason"] = reason
         return data
 
-    def _access_context(self, user):
-        return self._normalize_access_result(self._access_context_inner(user, seen=set()))
+    def _access_facts(self, user):
+        """用户侧判定因子（组、角色码、权益开关）只解析一次，供整批能力复用。"""
+        if not user:
+            return {"group_ids": set(), "role_codes": set(), "flags": {}}
+        return {
+            "group_ids": set(user.groups_id.ids),
+            "role_codes": self._role_codes_for_user(user),
+            "flags": platform_feature_flags_for_user(self.env, user),
+        }
+
+    def _compile_access_table(self, user):
+        """一次遍历计算当前记录集的访问结果，返回 {capability_id: access}。"""
+        facts = self._access_facts(user)
+        index = {cap.key: cap for cap in self.sudo().search([("active", "=", True)])}
+        return {
+            rec.id: self._normalize_access_result(rec._access_context_inner(user, seen=set(), facts=facts, index=index))
+            for rec in self
+        }
 
-    def _access_context_inner(self, user, seen):
+    def _access_context(self, user, facts=None, index=None):
+        return self._normalize_access_result(self._access_context_inner(user, seen=set(), facts=facts, index=index))
+
+    def _access_context_inner(self, user, seen, facts=None, index=None):
         self.ensure_one()
+        if facts is None:
+            facts = self._access_facts(user)
         seen = set(seen or set())
         cap_key = str(self.key or f"id:{self.id}")
         if cap_key in seen:
@@ -166,8 +188,7 @@ class ScCapability(models.Model):
         # Role/group mismatch: hide from directory.
         role_scope_items = self._csv_items(self.role_scope)
         if role_scope_items:
-            role_codes = self._role_codes_for_user(user)
-            if not (set(role_scope_items) & role_codes):
+            if not (set(role_scope_items) & facts["role_codes"]):
                 return self._normalize_access_result({
                     "visible": False,
                     "allowed": False,
@@ -175,7 +196,7 @@ class ScCapability(models.Model):
                     "reason_code": "ROLE_SCOPE_MISMATCH",
                     "reason": self._reason_message("ROLE_SCOPE_MISMATCH"),
                 })
-        if self.required_group_ids and not bool(self.required_group_ids & user.groups_id):
+        if self.required_group_ids and not (set(self.required_group_ids.ids) & facts["group_ids"]):
             return self._normalize_access_result({
                 "visible": False,
                 "allowed": False,
@@ -190,8 +211,7 @@ class ScCapability(models.Model):
 
         # Entitlement mismatch: visible but locked.
         if self.required_flag:
-            flags = platform_feature_flags_for_user(self.env, user) if user else {}
-            if not self._flag_enabled(flags, self.required_flag):
+            if not self._flag_enabled(facts["flags"], self.required_flag):
                 allowed = False
                 reason_code = "FEATURE_DISABLED"
                 reason = self._reason_message("FEATURE_DISABLED")
@@ -199,15 +219,18 @@ class ScCapability(models.Model):
         # Capability dependency mismatch: visible but locked.
         dep_keys = self._csv_items(self.capability_scope)
         if dep_keys:
-            deps = self.sudo().search([("key", "in", dep_keys), ("active", "=", True)])
-            dep_map = {cap.key: cap for cap in deps}
+            if index is not None:
+                dep_map = {key: index[key] for key in dep_keys if key in index}
+            else:
+                deps = self.sudo().search([("key", "in", dep_keys), ("active", "=", True)])
+                dep_map = {cap.key: cap for cap in deps}
             missing = []
             for key in dep_keys:
                 dep = dep_map.get(key)
                 if not dep:
                     missing.append(key)
                     continue
-                dep_access = dep._access_context_inner(user, seen=seen)
+                dep_access = dep._access_context_inner(user, seen=seen, facts=facts, index=index)
                 if not dep_access.get("allowed"):
                     missing.append(key)
             if missing:
@@ -262,11 +285,12 @@ class ScCapability(models.Model):
             return "pending", _("能力处于试运行阶段")
         return "allow", ""
 
-    def to_public_dict(self, user):
+    def to_public_dict(self, user, access=None):
         self.ensure_one()
         group_xmlids = self.required_group_ids.get_external_id()
         payload = self._resolve_payload(self.default_payload or {})
-        access = self._access_context(user)
+        if access is None:
+            access = self._access_context(user)
         capability_state, capability_state_reason = self._semantic_capability_state(access)
         return {
             "key": self.key,
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+“我的工作”索引行构建：按来源记录计算 sc.my.work.item 行（每个相关用户一行）。
+
+行语义与 MyWorkSummaryHandler 的实时加载一致：
+- todo：mail.activity / tier.review / sc.workflow.workitem / project.task / 风险项目 / 合同·付款·结算执行事项；
+- owned：我负责的项目；mentions：mail.message.partner_ids；following：mail.followers。
+标题、项目、截止日期在此反规范化；目标记录改名等漂移由全量对账 cron 修正。
+"""
+from __future__ import annotations
+
+import re
+
+from odoo import fields
+from odoo.addons.smart_core.core.project_context import project_scope_domain
+from odoo.addons.smart_core.utils.reason_codes import (
+    REASON_ACTIVITY_PENDING,
+    REASON_FOLLOWING,
+    REASON_MENTIONED,
+    REASON_PROJECT_HEALTH_RISK,
+    REASON_PROJECT_HEALTH_WARN,
+    REASON_RESPONSIBLE_OWNER,
+    REASON_TASK_ASSIGNED,
+    REASON_TIER_REVIEW_PENDING,
+    REASON_WORKFLOW_PENDING,
+)
+from odoo.addons.smart_construction_core.services.project_execution_item_projection_service import (
+    ProjectExecutionItemProjectionService,
+)
+from odoo.addons.smart_construction_scene.services.capability_scene_targets import (
+    resolve_execution_projection_scene_key,
+)
+
+SOURCE_KIND = "my_work_item_index"
+SOURCE_AUTHORITIES = (
+    "mail.activity",
+    "tier.review",
+    "sc.workflow.workitem",
+    "project.task",
+    "project.project",
+    "construction.contract",
+    "payment.request",
+    "sc.settlement.order",
+    "mail.message",
+    "mail.followers",
+)
+NO_BUSINESS_FACT_AUTHORITY = True
+
+PRIORITY_RANKS = {"high": 3, "medium": 2, "low": 1}
+PROJECT_RESPONSIBLE_FIELDS = ("user_id", "manager_id", "cost_manager_id", "doc_manager_id")
+EXECUTION_SOURCE_MODELS = tuple(ProjectExecutionItemProjectionService.SOURCE_CONFIG)
+
+
+def source_authority_contract() -> dict:
+    return {
+        "kind": SOURCE_KIND,
+        "authorities": list(SOURCE_AUTHORITIES),
+        "projection_only": True,
+        "rebuildable": True,
+        "no_business_fact_authority": NO_BUSINESS_FACT_AUTHORITY,
+        "runtime_carrier": "sc.my.work.item",
+    }
+
+
+def parse_followup_note(note_text):
+    first_line = str(note_text or "").splitlines()[0] if note_text else ""
+    if not first_line.startswith("SC_FOLLOWUP"):
+        # Historical note format: "...reason=OK"
+        reason_match = re.search(r"reason=([A-Z0-9_]+)", str(note_text or ""))
+        return {"reason_code": reason_match.group(1) if reason_match else ""}
+    result = {}
+    for key in ("action_key", "action_label", "reason_code"):
+        match = re.search(rf"{key}=([^ ]+)", first_line)
+        if match:
+            result[key] = match.group(1)
+    return result
+
+
+def search_text(row):
+    """与 WorkItemAggregateService.apply_filters 的搜索范围一致。"""
+    return " ".join(
+        [
+            str(row.get("title") or ""),
+            str(row.get("model_name") or ""),
+            str(row.get("action_label") or ""),
+            str(row.get("reason_code") or ""),
+            str(row.get("priority") or ""),
+        ]
+    ).lower()
+
+
+class MyWorkIndexService:
+    """来源模型 -> 索引行；所有读取走 sudo，归属由行上的 user_id 表达。"""
+
+    # 来源模型 -> (构建方法, 全量对账时的候选 domain)
+    SOURCES = {
+        "mail.activity": ("_activity_rows", []),
+        "tier.review": ("_tier_review_rows", [("status", "in", ("waiting", "pending"))]),
+        "sc.workflow.workitem": ("_workflow_rows", [("status", "=", "todo")]),
+        "project.task": ("_task_rows", []),
+        "project.project": ("_project_rows", []),
+        "mail.message": ("_mention_rows", [("partner_ids", "!=", False)]),
+        "mail.followers": ("_following_rows", []),
+    }
+    SOURCES.update(
+        {
+            model_name: ("_execution_rows", [("state", "in", list(config.get("pending_states") or ()))])
+            for model_name, config in ProjectExecutionItemProjectionService.SOURCE_CONFIG.items()
+        }
+    )
+
+    def __init__(self, env):
+        self.env = env
+        self._scope_kinds = {}
+
+    def _model(self, model_name):
+        try:
+            return self.env[model_name].sudo().with_context(active_test=False)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _date(value):
+        return fields.Date.to_date(value) if value else None
+
+    @staticmethod
+    def _active(record):
+        return bool(getattr(record, "active", True)) if "active" in record._fields else True
+
+    def source_models(self):
+        return [model_name for model_name in self.SOURCES if self._model(model_name) is not None]
+
+    def reconcile_domain(self, model_name):
+        return list(self.SOURCES.get(model_name, (None, []))[1])
+
+    def rows_for(self, model_name, ids):
+        """返回来源记录当前应有的全部索引行；已删除/不再适用的记录不产生行。"""
+        spec = self.SOURCES.get(model_name)
+        Model = self._model(model_name)
+        if not spec or Model is None or not ids:
+            return []
+        records = Model.browse(sorted({int(rid) for rid in ids if rid})).exists()
+        if not records:
+            return []
+        return getattr(self, spec[0])(model_name, records)
+
+    # ---- 目标记录：标题与项目范围 ---------------------------------------------
+
+    def _scope_kind(self, model_name):
+        if model_name not in self._scope_kinds:
+            Model = self._model(model_name)
+            domain = project_scope_domain(Model, 1) if Model is not None else []
+            self._scope_kinds[model_name] = domain[0][0] if domain else ""
+        return self._scope_kinds[model_name]
+
+    def _targets(self, pairs):
+        """批量解析 (model, id) -> {title, project_id, project_scoped, project_name}。"""
+        ids_by_model = {}
+        for model_name, record_id in pairs:
+            if model_name and record_id:
+                ids_by_model.setdefault(model_name, set()).add(int(record_id))
+        result = {}
+        for model_name, ids in ids_by_model.items():
+            Model = self._model(model_name)
+            if Model is None:
+                continue
+            scope_field = self._scope_kind(model_name)
+            try:
+                records = Model.browse(sorted(ids)).exists()
+                for record in records:
+                    project = False
+                    if scope_field == "id":
+                        project = record
+                    elif scope_field in ("project_id", "project_ids"):
+                        project = record[scope_field][:1]
+                    result[(model_name, record.id)] = {
+                        "title": record.display_name or "",
+                        "project_id": project.id if project else None,
+                        "project_scoped": bool(scope_field),
+                        "project_name": str(project.display_name or "") if project else "",
+                    }
+            except Exception:
+                continue
+        return result
+
+    def _row(self, record, *, user_id, section, source, target, **values):
+        row = {
+            "user_id": int(user_id),
+            "section": section,
+            "source": source,
+            "source_model": record._name,
+            "source_res_id": int(record.id),
+            "model_name": values.pop("model_name"),
+            "record_id": int(values.pop("record_id") or 0),
+            "title": str(values.pop("title") or "").strip(),
+            "project_id": (target or {}).get("project_id"),
+            "project_scoped": bool((target or {}).get("project_scoped")),
+            "project_name": (target or {}).get("project_name") or "",
+            "deadline": values.pop("deadline", None),
+            "action_label": values.pop("action_label", "") or "",
+            "action_key": values.pop("action_key", "") or "",
+            "reason_code": values.pop("reason_code", "") or "",
+            "priority": values.pop("priority", "medium") or "medium",
+            "scene_key": values.pop("scene_key", "") or "",
+        }
+        row["priority_rank"] = PRIORITY_RANKS.get(row["priority"], 0)
+        row["search_text"] = search_text(row)
+        return row
+
+    def _partner_users(self, partner_ids):
+        Users = self._model("res.users")
+        if Users is None or not partner_ids:
+            return {}
+        users = Users.with_context(active_test=True).search([("partner_id", "in", list(partner_ids))])
+        result = {}
+        for user in users:
+            result.setdefault(user.partner_id.id, []).append(user.id)
+        return result
+
+    # ---- 各来源 -----------------------------------------------------------------
+
+    def _activity_rows(self, model_name, records):
+        targets = self._targets((rec.res_model, rec.res_id) for rec in records)
+        rows = []
+        for rec in records:
+            if not rec.user_id or not self._active(rec):
+                continue
+            followup = parse_followup_note(rec.note or "")
+            rows.append(
+                self._row(
+                    rec,
+                    user_id=rec.user_id.id,
+                    section="todo",
+                    source="mail.activity",
+                    target=targets.get((rec.res_model, rec.res_id)),
+                    model_name=rec.res_model,
+                    record_id=rec.res_id,
+                    title=rec.summary or rec.activity_type_id.name or rec.res_model,
+                    deadline=self._date(rec.date_deadline),
+                    action_label=followup.get("action_label") or "",
+                    action_key=followup.get("action_key") or "",
+                    reason_code=followup.get("reason_code") or REASON_ACTIVITY_PENDING,
+                    priority="medium",
+                )
+            )
+        return rows
+
+    def _tier_review_rows(self, model_name, records):
+        fields_map = records._fields
+        if "status" not in fields_map or not {"model", "res_id"} <= set(fields_map):
+            return []
+        targets = self._targets((str(rec.model or ""), int(rec.res_id or 0)) for rec in records)
+        rows = []
+        for rec in records:
+            if rec.status not in ("waiting", "pending"):
+                continue
+            if "reviewer_ids" in fields_map:
+                user_ids = rec.reviewer_ids.ids
+            elif "reviewer_id" in fields_map:
+                user_ids = rec.reviewer_id.ids
+            else:
+                continue
+            model = str(rec.model or "").strip()
+            record_id = int(rec.res_id or 0)
+            target = targets.get((model, record_id))
+            fallback = f"{model}#{record_id}" if model and record_id else (rec.name or f"tier.review#{rec.id}")
+            for user_id in user_ids:
+                rows.append(
+                    self._row(
+                        rec,
+                        user_id=user_id,
+                        section="todo",
+                        source="tier.review",
+                        target=target,
+                        model_name=model,
+                        record_id=record_id,
+                        title=(target or {}).get("title") or fallback,
+                        action_label="审批处理",
+                        action_key="tier.review.approve",
+                        reason_code=REASON_TIER_REVIEW_PENDING,
+                        priority="high",
+                    )
+                )
+        return rows
+
+    def _workflow_rows(self, model_name, records):
+        pairs = [(str(rec.instance_id.model_name or ""), int(rec.instance_id.res_id or 0)) for rec in records]
+        targets = self._targets(pairs)
+        rows = []
+        for rec in records:
+            if rec.status != "todo":
+                continue
+            instance = rec.instance_id
+            model = str(getattr(instance, "model_name", "") or "").strip()
+            record_id = int(getattr(instance, "res_id", 0) or 0)
+            node_name = str(getattr(rec.node_id, "name", "") or "").strip()
+            target = targets.get((model, record_id))
+            fallback = f"{instance.name or model} · {node_name or '待审批'}"
+            user_ids = set(rec.assignee_id.ids) | set(rec.assignee_group_id.users.ids)
+            for user_id in sorted(user_ids):
+                rows.append(
+                    self._row(
+                        rec,
+                        user_id=user_id,
+                        section="todo",
+                        source="sc.workflow.workitem",
+                        target=target,
+                        model_name=model,
+                        record_id=record_id,
+                        title=(target or {}).get("title") or fallback,
+                        action_label=node_name or "流程处理",
+                        action_key="sc.workflow.approve",
+                        reason_code=REASON_WORKFLOW_PENDING,
+                        priority="high",
+                    )
+                )
+        return rows
+
+    def _task_rows(self, model_name, records):
+        fields_map = records._fields
+        targets = self._targets(("project.task", rec.id) for rec in records)
+        rows = []
+        for rec in records:
+            if not self._active(rec):
+                continue
+            if "user_ids" in fields_map:
+                user_ids = rec.user_ids.ids
+            elif "user_id" in fields_map:
+                user_ids = rec.user_id.ids
+            else:
+                continue
+            for user_id in user_ids:
+                rows.append(
+                    self._row(
+                        rec,
+                        user_id=user_id,
+                        section="todo",
+                        source="project.task",
+                        target=targets.get(("project.task", rec.id)),
+                        model_name="project.task",
+                        record_id=rec.id,
+                        title=rec.name or f"project.task#{rec.id}",
+                        deadline=self._date(getattr(rec, "date_deadline", False)),
+                        action_label="任务处理",
+                        action_key="project.task.open",
+                        reason_code=REASON_TASK_ASSIGNED,
+                        priority="medium",
+                    )
+                )
+        return rows
+
+    @staticmethod
+    def _responsible_user_ids(project, *, include_members=False):
+        user_ids = set()
+        for field_name in PROJECT_RESPONSIBLE_FIELDS:
+            if field_name in project._fields:
+                user_ids.update(project[field_name].ids)
+        if include_members and "user_ids" in project._fields:
+            user_ids.update(project.user_ids.ids)
+        return sorted(user_ids)
+
+    def _project_rows(self, model_name, records):
+        has_health = "health_state" in records._fields
+        rows = []
+        for rec in records:
+            if not self._active(rec):
+                continue
+            target = {"project_id": rec.id, "project_scoped": True, "project_name": str(rec.display_name or "")}
+            health_state = str(getattr(rec, "health_state", "") or "").strip().lower() if has_health else ""
+            for user_id in self._responsible_user_ids(rec):
+                rows.append(
+                    self._row(
+                        rec,
+                        user_id=user_id,
+                        section="owned",
+                        source="project.project",
+                        target=target,
+                        model_name="project.project",
+                        record_id=rec.id,
+                        title=rec.name or f"project.project#{rec.id}",
+                        reason_code=REASON_RESPONSIBLE_OWNER,
+                        priority="medium",
+                    )
+                )
+                if health_state in ("risk", "warn"):
+                    rows.append(
+                        self._row(
+                            rec,
+                            user_id=user_id,
+                            section="todo",
+                            source="project.risk",
+                            target=target,
+                            model_name="project.project",
+                            record_id=rec.id,
+                            title=rec.name or f"project.project#{rec.id}",
+                            action_label="风险处理",
+                            action_key="project.risk.resolve",
+                            reason_code=REASON_PROJECT_HEALTH_RISK if health_state == "risk" else REASON_PROJECT_HEALTH_WARN,
+                            priority="high" if health_state == "risk" else "medium",
+                        )
+                    )
+        return rows
+
+    def _execution_rows(self, model_name, records):
+        config = ProjectExecutionItemProjectionService.SOURCE_CONFIG.get(model_name) or {}
+        projection = ProjectExecutionItemProjectionService(self.env)
+        pending_states = set(config.get("pending_states") or ())
+        rows = []
+        for rec in records:
+            project = rec.project_id
+            if str(rec.state or "") not in pending_states or not project or not self._active(project):
+                continue
+            deadline_text = projection._deadline_text(
+                rec,
+                str(config.get("deadline_field") or ""),
+                str(config.get("fallback_deadline_field") or ""),
+            )
+            target = {"project_id": project.id, "project_scoped": True, "project_name": str(project.display_name or "")}
+            for user_id in self._responsible_user_ids(project, include_members=True):
+                rows.append(
+                    self._row(
+                        rec,
+                        user_id=user_id,
+                        section="todo",
+                        source=model_name,
+                        target=target,
+                        model_name=model_name,
+                        record_id=rec.id,
+                        title=projection._item_title(rec, config),
+                        deadline=self._date(deadline_text),
+                        scene_key=resolve_execution_projection_scene_key(model_name),
+                        action_label=str(config.get("action_label") or ""),
+                        action_key="%s.open" % model_name,
+                        reason_code=str(config.get("reason_code") or ""),
+                        priority=str(config.get("priority") or "medium"),
+                    )
+                )
+        return rows
+
+    def _mention_rows(self, model_name, records):
+        users_by_partner = self._partner_users({pid for rec in records for pid in rec.partner_ids.ids})
+        targets = self._targets((rec.model or "", int(rec.res_id or 0)) for rec in records)
+        rows = []
+        for rec in records:
+            model = rec.model or ""
+            record_id = int(rec.res_id or 0)
+            target = targets.get((model, record_id))
+            fallback_title = rec.subject or (rec.record_name or model or ("mail.message#%s" % rec.id))
+            for partner_id in rec.partner_ids.ids:
+                for user_id in users_by_partner.get(partner_id, []):
+                    rows.append(
+                        self._row(
+                            rec,
+                            user_id=user_id,
+                            section="mentions",
+                            source="mail.message",
+                            target=target,
+                            model_name=model,
+                            record_id=record_id,
+                            title=(target or {}).get("title") or fallback_title,
+                            reason_code=REASON_MENTIONED,
+                            priority="low",
+                        )
+                    )
+        return rows
+
+    def _following_rows(self, model_name, records):
+        users_by_partner = self._partner_users(set(records.mapped("partner_id").ids))
+        targets = self._targets((rec.res_model or "", int(rec.res_id or 0)) for rec in records)
+        rows = []
+        for rec in records:
+            model = rec.res_model or ""
+            record_id = int(rec.res_id or 0)
+            target = targets.get((model, record_id))
+            for user_id in users_by_partner.get(rec.partner_id.id, []):
+                rows.append(
+                    self._row(
+                        rec,
+                        user_id=user_id,
+                        section="following",
+                        source="mail.followers",
+                        target=target,
+                        model_name=model,
+                        record_id=record_id,
+                        title=(target or {}).get("title") or model or ("mail.followers#%s" % rec.id),
+                        reason_code=REASON_FOLLOWING,
+                        priority="low",
+                    )
+                )
+        return rows
@@ -69,6 +69,12 @@ def attach_project_context_to_scene_payload(data, project):
             params.setdefault("project_id", project_context.get("project_id") or 0)
             params["project_context"] = project_context
             row["params"] = params
+    batch = runtime_fetch_hints.get("batch") if isinstance(runtime_fetch_hints, dict) else None
+    if isinstance(batch, dict):
+        params = dict(batch.get("params") or {})
+        params.setdefault("project_id", project_context.get("project_id") or 0)
+        params["project_context"] = project_context
+        batch["params"] = params
     return payload
 
 
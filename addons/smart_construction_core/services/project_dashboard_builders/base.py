@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 
+from odoo.addons.smart_core.core.aggregate_cache import cached_read_group, cached_search_count
+
 
 class BaseProjectBlockBuilder(ABC):
     block_key = ""
@@ -33,7 +35,7 @@ class BaseProjectBlockBuilder(ABC):
         if model is None:
             return 0
         try:
-            return int(model.search_count(domain or []))
+            return cached_search_count(model, domain or [])
         except Exception:
             return 0
 
@@ -44,7 +46,7 @@ class BaseProjectBlockBuilder(ABC):
         if model is None:
             return 0.0
         try:
-            rows = model.read_group(domain or [], [sum_field], [])
+            rows = cached_read_group(model, domain or [], [sum_field], [])
         except Exception:
             return 0.0
         if not rows:
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from odoo import fields
 
+from odoo.addons.smart_core.core.aggregate_cache import cached_search_count
 from odoo.addons.smart_construction_core.services.evidence_chain_service import EvidenceChainService
 from odoo.addons.smart_construction_core.services.project_decision_engine_service import ProjectDecisionEngineService
 from odoo.addons.smart_construction_core.services.project_metrics_explain_service import ProjectMetricsExplainService
@@ -402,11 +403,9 @@ class ProjectDashboardService:
         try:
             task_model = self._model("project.task")
             if task_model is not None:
-                total = int(task_model.search_count([("project_id", "=", int(project.id))]))
-                done = int(
-                    task_model.search_count(
-                        [("project_id", "=", int(project.id))] + ProjectTaskStateSupport.done_domain()
-                    )
+                total = cached_search_count(task_model, [("project_id", "=", int(project.id))])
+                done = cached_search_count(
+                    task_model, [("project_id", "=", int(project.id))] + ProjectTaskStateSupport.done_domain()
                 )
                 if total > 0:
                     progress_percent = round((done / float(total)) * 100.0, 2)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from odoo.addons.smart_core.core.aggregate_cache import cached_read_group, cached_search_count
+
 
 class ProjectDecisionEngineService:
     DECISION_SOURCE = "rule_engine_v1"
@@ -39,7 +41,7 @@ class ProjectDecisionEngineService:
             return 0
         try:
             domain = self._payment_request_domain(project) if model_name == "payment.request" else self._project_domain(model_name, project)
-            return int(model.search_count(domain))
+            return cached_search_count(model, domain)
         except Exception:
             return 0
 
@@ -52,7 +54,7 @@ class ProjectDecisionEngineService:
             if field_name not in getattr(model, "_fields", {}):
                 continue
             try:
-                rows = model.read_group(domain, [field_name], [])
+                rows = cached_read_group(model, domain, [field_name], [])
             except Exception:
                 continue
             if not rows:
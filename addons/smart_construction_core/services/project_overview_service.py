@@ -5,6 +5,8 @@ import time
 
 from odoo import api, models
 
+from odoo.addons.smart_core.core.aggregate_cache import read_group_by_project
+
 _logger = logging.getLogger(__name__)
 
 
@@ -12,10 +14,10 @@ class ProjectOverviewService(models.AbstractModel):
     _name = "sc.project.overview.service"
     _description = "Project Overview Aggregation Service"
 
-    def _group_count(self, row, groupby):
-        if "__count" in row:
-            return row.get("__count", 0)
-        return row.get(f"{groupby}_count", 0)
+    def _project_counts(self, model_name, project_ids, domain=None):
+        """按项目计数：一次 project_id IN 查询，命中请求级聚合缓存的项目不再重复查询。"""
+        rows_by_project = read_group_by_project(self.env[model_name], project_ids, domain or [], [])
+        return {project_id: int(rows[0].get("__count", 0)) if rows else 0 for project_id, rows in rows_by_project.items()}
 
     @api.model
     def get_overview(self, project_ids):
@@ -40,71 +42,31 @@ class ProjectOverviewService(models.AbstractModel):
 
         if can_contract:
             calls += 1
-            rows = env["construction.contract"].read_group(
-                [("project_id", "in", ids)],
-                ["project_id"],
-                ["project_id"],
-            )
-            for rec in rows:
-                project_id = rec["project_id"][0]
-                data[project_id]["contract"]["count"] = self._group_count(rec, "project_id")
+            for project_id, count in self._project_counts("construction.contract", ids).items():
+                data[project_id]["contract"]["count"] = count
 
         if can_cost:
             calls += 1
-            rows = env["project.cost.ledger"].read_group(
-                [("project_id", "in", ids)],
-                ["project_id"],
-                ["project_id"],
-            )
-            for rec in rows:
-                project_id = rec["project_id"][0]
-                data[project_id]["cost"]["count"] = self._group_count(rec, "project_id")
+            for project_id, count in self._project_counts("project.cost.ledger", ids).items():
+                data[project_id]["cost"]["count"] = count
 
         if can_payment:
             calls += 1
-            rows = env["payment.request"].read_group(
-                [("project_id", "in", ids)],
-                ["project_id"],
-                ["project_id"],
-            )
-            for rec in rows:
-                project_id = rec["project_id"][0]
-                data[project_id]["payment"]["count"] = self._group_count(rec, "project_id")
+            for project_id, count in self._project_counts("payment.request", ids).items():
+                data[project_id]["payment"]["count"] = count
             calls += 1
-            pending_rows = env["payment.request"].read_group(
-                [
-                    ("project_id", "in", ids),
-                    ("state", "in", ["submit", "approve", "approved"]),
-                ],
-                ["project_id"],
-                ["project_id"],
-            )
-            for rec in pending_rows:
-                project_id = rec["project_id"][0]
-                data[project_id]["payment"]["pending"] = self._group_count(rec, "project_id")
+            pending = self._project_counts("payment.request", ids, [("state", "in", ["submit", "approve", "approved"])])
+            for project_id, count in pending.items():
+                data[project_id]["payment"]["pending"] = count
 
         if can_task:
             calls += 1
-            rows = env["project.task"].read_group(
-                [("project_id", "in", ids)],
-                ["project_id"],
-                ["project_id"],
-            )
-            for rec in rows:
-                project_id = rec["project_id"][0]
-                data[project_id]["task"]["count"] = self._group_count(rec, "project_id")
+            for project_id, count in self._project_counts("project.task", ids).items():
+                data[project_id]["task"]["count"] = count
             calls += 1
-            progress_rows = env["project.task"].read_group(
-                [
-                    ("project_id", "in", ids),
-                    ("sc_state", "=", "in_progress"),
-                ],
-                ["project_id"],
-                ["project_id"],
-            )
-            for rec in progress_rows:
-                project_id = rec["project_id"][0]
-                data[project_id]["task"]["in_progress"] = self._group_count(rec, "project_id")
+            in_progress = self._project_counts("project.task", ids, [("sc_state", "=", "in_progress")])
+            for project_id, count in in_progress.items():
+                data[project_id]["task"]["in_progress"] = count
 
         if env.context.get("sc_overview_debug"):
             elapsed = time.time() - start_ts
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+工程结构汇总：只取待重算节点及其直接下级，在内存中自下而上汇总。
+
+口径与原递归计算字段一致：
+- 清单项目（item）节点 = 自身挂接的有效清单行合计，不再叠加下级节点；
+- 其它节点 = 有效下级节点汇总之和，自身直挂的清单行不计入。
+待重算节点沿上级链标记，未标记的下级其存储的汇总值仍然有效，直接作为已知值参与汇总，
+无需展开整棵子树或整个项目。节点按 parent_path 深度倒序处理，保证下级先于上级完成。
+"""
+from __future__ import annotations
+
+SOURCE_KIND = "project_structure_rollup"
+SOURCE_AUTHORITIES = ("project.boq.line", "sc.project.structure")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+ITEM_STRUCTURE_TYPE = "item"
+
+# 待重算节点 + 直接下级，以及待重算节点直挂的清单行合计；未标记下级的汇总值由调用方从存储值补齐。
+ROLLUP_ROWS_SQL = """
+    SELECT s.id, s.parent_id, s.structure_type, s.parent_path, s.active IS NOT FALSE,
+           COALESCE(l.qty, 0), COALESCE(l.amount, 0)
+      FROM sc_project_structure s
+      LEFT JOIN (
+            SELECT line.structure_id, SUM(line.quantity) AS qty, SUM(line.amount) AS amount
+              FROM project_boq_line line
+             WHERE line.structure_id = ANY(%(node_ids)s)
+               AND line.active IS NOT FALSE
+             GROUP BY line.structure_id
+      ) l ON l.structure_id = s.id
+     WHERE s.id = ANY(%(node_ids)s) OR s.parent_id = ANY(%(node_ids)s)
+"""
+
+# 节点子树（含自身）内的有效清单行，按 parent_path 前缀匹配，替代逐节点 child_of 检索。
+SUBTREE_LINES_SQL = """
+    SELECT node.id, line.id
+      FROM sc_project_structure node
+      JOIN sc_project_structure sub
+        ON sub.project_id = node.project_id
+       AND sub.parent_path LIKE node.parent_path || '%%'
+       AND sub.active IS NOT FALSE
+      JOIN project_boq_line line
+        ON line.structure_id = sub.id
+       AND line.project_id = node.project_id
+     WHERE node.id = ANY(%(node_ids)s)
+"""
+
+
+def source_authority_contract() -> dict:
+    return {
+        "kind": SOURCE_KIND,
+        "authorities": list(SOURCE_AUTHORITIES),
+        "projection_only": True,
+        "rebuildable": True,
+        "no_business_fact_authority": NO_BUSINESS_FACT_AUTHORITY,
+    }
+
+
+def path_depth(parent_path) -> int:
+    return len([part for part in str(parent_path or "").split("/") if part])
+
+
+def rollup_totals(rows, known=None) -> dict:
+    """
+    rows: (id, parent_id, structure_type, parent_path, active, 直挂工程量, 直挂合价)，返回 {id: (工程量, 合价)}。
+    known: {id: (工程量, 合价)}，无需重算的节点（未标记的下级）直接取该值，不再看其下级与清单行。
+    """
+    known = known or {}
+    nodes = {int(row[0]): row for row in rows or []}
+    child_sums = {node_id: [0.0, 0.0] for node_id in nodes}
+    totals = {}
+    for node_id in sorted(nodes, key=lambda rid: path_depth(nodes[rid][3]), reverse=True):
+        _rid, parent_id, structure_type, _path, active, own_qty, own_amount = nodes[node_id]
+        if node_id in known:
+            qty, amount = (float(value or 0.0) for value in known[node_id])
+        elif structure_type == ITEM_STRUCTURE_TYPE:
+            qty, amount = float(own_qty or 0.0), float(own_amount or 0.0)
+        else:
+            qty, amount = child_sums[node_id]
+        totals[node_id] = (qty, amount)
+        parent_id = int(parent_id or 0)
+        if active and parent_id in child_sums:
+            child_sums[parent_id][0] += qty
+            child_sums[parent_id][1] += amount
+    return totals
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Refreshable snapshot projection registry.
+
+快照投影（`_auto = False` + CREATE TABLE AS）按 project_id 分区增量刷新：
+- 来源模型写入时标记 (projection, project_key) 为脏；
+- 刷新按注册顺序执行，派生投影（如公司汇总依赖项目汇总）排在来源投影之后，
+  且来源投影刷新的分区会同步标记到派生投影；
+- project_key 为 0 表示 project_id 为空的分区。
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+SOURCE_KIND = "projection_refresh_registry"
+SOURCE_AUTHORITIES = ("sc.projection.dirty", "sc.projection.refresh.state")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+NULL_PROJECT_KEY = 0
+
+# 刷新顺序即依赖顺序。
+REFRESHABLE_PROJECTIONS: tuple[str, ...] = (
+    "sc.ar.ap.project.summary",
+    "sc.ar.ap.company.summary",
+    "sc.comprehensive.cost.summary",
+)
+
+# 派生投影 -> 其来源投影。
+DERIVED_PROJECTIONS: dict[str, tuple[str, ...]] = {
+    "sc.ar.ap.company.summary": ("sc.ar.ap.project.summary",),
+}
+
+# 来源业务模型 -> 受影响投影。project.project 以自身 id 为分区键（项目名称/公司变更）。
+SOURCE_MODEL_PROJECTIONS: dict[str, tuple[str, ...]] = {
+    "construction.contract": ("sc.ar.ap.project.summary", "sc.comprehensive.cost.summary"),
+    "sc.receipt.income": ("sc.ar.ap.project.summary", "sc.comprehensive.cost.summary"),
+    "sc.invoice.registration": ("sc.ar.ap.project.summary", "sc.comprehensive.cost.summary"),
+    "sc.treasury.ledger": ("sc.ar.ap.project.summary",),
+    "sc.payment.execution": ("sc.comprehensive.cost.summary",),
+    "sc.expense.claim": ("sc.comprehensive.cost.summary",),
+    "sc.hr.payroll.document": ("sc.comprehensive.cost.summary",),
+    "sc.legacy.invoice.surcharge.fact": ("sc.ar.ap.project.summary",),
+    "sc.legacy.tax.deduction.fact": ("sc.ar.ap.project.summary",),
+    "sc.legacy.self.funding.fact": ("sc.ar.ap.project.summary",),
+    "sc.legacy.supplier.contract.pricing.fact": ("sc.ar.ap.project.summary", "sc.comprehensive.cost.summary"),
+    "sc.legacy.project.fund.balance.fact": ("sc.ar.ap.project.summary",),
+    "sc.legacy.material.stock.fact": ("sc.comprehensive.cost.summary",),
+    "sc.legacy.labor.subcontract.fact": ("sc.comprehensive.cost.summary",),
+    "sc.legacy.equipment.lease.fact": ("sc.comprehensive.cost.summary",),
+    "project.project": REFRESHABLE_PROJECTIONS,
+}
+
+
+def source_authority_contract() -> dict:
+    return {
+        "kind": SOURCE_KIND,
+        "authorities": list(SOURCE_AUTHORITIES),
+        "projection_only": True,
+        "rebuildable": True,
+        "no_business_fact_authority": NO_BUSINESS_FACT_AUTHORITY,
+        "runtime_carrier": "projection.refresh",
+    }
+
+
+def projections_for_source(model_name: str) -> tuple[str, ...]:
+    return SOURCE_MODEL_PROJECTIONS.get(str(model_name or ""), ())
+
+
+def normalize_project_keys(values: Iterable) -> list[int]:
+    """project_id 值（记录 / int / False）-> 去重排序的分区键；空项目归为 0。"""
+    keys = set()
+    for value in values or []:
+        if hasattr(value, "id"):
+            value = value.id
+        try:
+            key = int(value or 0)
+        except (TypeError, ValueError):
+            continue
+        keys.add(max(key, NULL_PROJECT_KEY))
+    return sorted(keys)
+
+
+def ordered_projections(names: Iterable[str] | None = None) -> list[str]:
+    """按注册（依赖）顺序返回投影；未注册的名称忽略。None 表示全部。"""
+    if names is None:
+        return list(REFRESHABLE_PROJECTIONS)
+    wanted = set(names)
+    for name in list(wanted):
+        wanted.update(derived for derived, sources in DERIVED_PROJECTIONS.items() if name in sources)
+    return [name for name in REFRESHABLE_PROJECTIONS if name in wanted]
+
+
+def derived_projections(name: str) -> list[str]:
+    return [derived for derived in REFRESHABLE_PROJECTIONS if name in DERIVED_PROJECTIONS.get(derived, ())]
+
+
+def project_scope_sql(column: str, partitioned: bool) -> str:
+    """
+    分区刷新时的来源过滤；全量刷新返回 TRUE。参数名固定为 %(project_keys)s，0 代表无项目分区。
+    不用 COALESCE(column, 0) 包裹列，保证 project_id 索引可用。
+    """
+    if not partitioned:
+        return "TRUE"
+    return "(%s = ANY(%%(project_keys)s) OR (%s IS NULL AND 0 = ANY(%%(project_keys)s)))" % (column, column)
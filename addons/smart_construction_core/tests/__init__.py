@@ -33,6 +33,7 @@ from . import test_core_extension_v2_finalize
 from . import test_api_data_write_unlink_idempotency_backend
 from . import test_project_context_resolver
 from . import test_my_work_backend
+from . import test_projection_materialize_backend
 from . import test_reason_codes_backend
 from . import test_payment_request_permission
 from . import test_payment_request_available_actions_backend
@@ -48,3 +49,4 @@ from . import test_user_feedback_business_views
 from . import test_workflow_contract_backend
 from . import test_runtime_user_management
 from . import test_role_surface_project_member
+from . import test_projection_refresh_registry
@@ -240,6 +240,29 @@ class TestApiDataBatchContractBackend(TransactionCase):
         self.assertEqual(row.get("error_category"), "conflict")
         self.assertEqual(row.get("suggested_action"), "reload_then_retry")
 
+    def test_bulk_write_chunks_valid_rows_and_keeps_row_contract(self):
+        partners = self.env["res.partner"].create([{"name": "Batch Bulk %s" % idx} for idx in range(3)])
+        handler = ApiDataBatchHandler(self.env, payload={})
+        handler.BULK_WRITE_CHUNK_SIZE = 2
+        ids = [partners[0].id, 999999993, partners[1].id, partners[2].id]
+        result = handler.handle(
+            {
+                "params": {
+                    "model": "res.partner",
+                    "ids": ids,
+                    "action": "archive",
+                    "request_id": "req-batch-bulk-chunks-1",
+                }
+            }
+        )
+        self.assertTrue(result.get("ok"))
+        data = result.get("data") or {}
+        self.assertEqual(data.get("succeeded"), 3)
+        self.assertEqual(data.get("failed"), 1)
+        self.assertEqual([row.get("id") for row in data.get("results") or []], ids)
+        self.assertEqual((data.get("results") or [])[1].get("reason_code"), "NOT_FOUND")
+        self.assertFalse(any(partners.mapped("active")))
+
     def test_replay_window_expired_is_exposed_in_contract(self):
         if not self.env.get("sc.audit.log"):
             self.skipTest("sc.audit.log not available")
@@ -6,7 +6,7 @@ from odoo.tests.common import TransactionCase, tagged
 
 from odoo.addons.smart_core.handlers.api_data_unlink import ApiDataUnlinkHandler
 from odoo.addons.smart_core.handlers.api_data_write import ApiDataWriteHandler
-from odoo.addons.smart_core.handlers.reason_codes import REASON_IDEMPOTENCY_CONFLICT
+from odoo.addons.smart_core.handlers.reason_codes import REASON_IDEMPOTENCY_CONFLICT, REASON_IDEMPOTENCY_IN_FLIGHT
 
 
 @tagged("sc_smoke", "api_data_batch_backend")
@@ -217,8 +217,8 @@ class TestApiDataWriteUnlinkIdempotencyBackend(TransactionCase):
         project = self.env["project.project"].create({"name": "Write Mock Conflict"})
         handler = ApiDataWriteHandler(self.env, payload={})
         with patch(
-            "odoo.addons.smart_core.handlers.api_data_write.find_recent_audit_entry",
-            return_value={"payload": {"idempotency_fingerprint": "mismatch-fingerprint"}},
+            "odoo.addons.smart_core.handlers.api_data_write.claim_idempotency_key",
+            return_value={"conflict": True, "in_flight": False, "replay_payload": None, "claim_id": 0},
         ):
             conflict = handler.handle(
                 {
@@ -252,21 +252,16 @@ class TestApiDataWriteUnlinkIdempotencyBackend(TransactionCase):
             }
         }
         with patch(
-            "odoo.addons.smart_core.handlers.api_data_unlink.find_recent_audit_entry",
+            "odoo.addons.smart_core.handlers.api_data_unlink.claim_idempotency_key",
             return_value={
-                "payload": {
-                    "idempotency_fingerprint": handler._idempotency_fingerprint(
-                        model="project.task",
-                        ids=[task.id],
-                        dry_run=False,
-                        idem_key="req-unlink-mock-dedupe-1",
-                    ),
-                    "result": {
-                        "ids": [task.id],
-                        "model": "project.task",
-                        "dry_run": False,
-                    },
-                }
+                "conflict": False,
+                "in_flight": False,
+                "replay_payload": {
+                    "ids": [task.id],
+                    "model": "project.task",
+                    "dry_run": False,
+                },
+                "claim_id": 0,
             },
         ):
             result = handler.handle(payload)
@@ -276,3 +271,25 @@ class TestApiDataWriteUnlinkIdempotencyBackend(TransactionCase):
         self.assertEqual(data.get("request_id"), "req-unlink-mock-dedupe-1")
         self.assertEqual(data.get("idempotency_key"), "req-unlink-mock-dedupe-1")
         self.assertFalse(bool(data.get("idempotent_replay")))
+
+    def test_api_data_write_in_flight_key_returns_retryable_409(self):
+        project = self.env["project.project"].create({"name": "Write In Flight"})
+        handler = ApiDataWriteHandler(self.env, payload={})
+        with patch.object(type(self.env["sc.idempotency.key"]), "claim", return_value={"status": "in_flight"}):
+            result = handler.handle(
+                {
+                    "intent": "api.data.write",
+                    "params": {
+                        "model": "project.project",
+                        "id": project.id,
+                        "values": {"name": "Write In Flight Changed"},
+                        "request_id": "req-write-in-flight-1",
+                    },
+                }
+            )
+        self.assertFalse(result.get("ok"))
+        self.assertEqual(int(result.get("code") or 0), 409)
+        err = result.get("error") or {}
+        self.assertEqual(err.get("reason_code"), REASON_IDEMPOTENCY_IN_FLIGHT)
+        self.assertTrue(bool(err.get("retryable")))
+        self.assertEqual(project.name, "Write In Flight")
@@ -16,6 +16,7 @@ from odoo.addons.smart_construction_core.handlers.reason_codes import (
     REASON_REPLAY_WINDOW_EXPIRED,
 )
 from odoo.addons.smart_construction_core.handlers.my_work_summary import MyWorkSummaryHandler
+from odoo.addons.smart_construction_core.models.support.my_work_index import READY_PARAM
 
 
 @tagged("sc_smoke", "my_work_backend")
@@ -333,6 +334,79 @@ class TestMyWorkBackend(TransactionCase):
         self.assertIn("sc.settlement.order", sources)
         self.assertIn("construction.contract", sources)
 
+    def _indexed_task_rows(self, task):
+        return self.env["sc.my.work.item"].sudo().search(
+            [("source_model", "=", "project.task"), ("source_res_id", "=", task.id)]
+        )
+
+    def test_work_index_marks_writes_and_refreshes_on_flush_pending(self):
+        Index = self.env["sc.my.work.item"].sudo()
+        project, _partner = self._create_project_with_partner("My Work Index Mark")
+        task = self.env["project.task"].create(
+            {"name": "MW index mark task", "project_id": project.id, "user_ids": [(6, 0, [self.env.user.id])]}
+        )
+
+        pending = self.env.cr.precommit.data.get("sc.my.work.index.pending") or {}
+        self.assertIn(task.id, pending.get("project.task", set()))
+        self.assertFalse(self._indexed_task_rows(task))
+
+        Index.flush_pending()
+        rows = self._indexed_task_rows(task)
+        self.assertEqual(rows.user_id, self.env.user)
+        self.assertEqual(rows.section, "todo")
+        self.assertEqual(rows.title, "MW index mark task")
+        self.assertFalse(self.env.cr.precommit.data.get("sc.my.work.index.pending"))
+
+        # 多次写入只登记一次；改名就地更新同一行，取消指派后删除。
+        task.write({"name": "MW index renamed"})
+        task.write({"date_deadline": "2026-03-01"})
+        Index.flush_pending()
+        renamed = self._indexed_task_rows(task)
+        self.assertEqual(renamed.id, rows.id)
+        self.assertEqual(renamed.title, "MW index renamed")
+
+        task.write({"user_ids": [(5, 0, 0)]})
+        Index.flush_pending()
+        self.assertFalse(self._indexed_task_rows(task))
+
+    def test_work_index_reconcile_removes_stale_rows_without_truncating(self):
+        Index = self.env["sc.my.work.item"].sudo()
+        project, _partner = self._create_project_with_partner("My Work Index Reconcile")
+        task = self.env["project.task"].create(
+            {"name": "MW reconcile task", "project_id": project.id, "user_ids": [(6, 0, [self.env.user.id])]}
+        )
+        Index.flush_pending()
+        kept = self._indexed_task_rows(task)
+        # 直接改库制造漂移：钩子看不到，由对账按差异修正。
+        self.env.cr.execute("UPDATE project_task SET name = 'MW reconcile drift' WHERE id = %s", (task.id,))
+        self.env.cr.execute("DELETE FROM project_task_user_rel WHERE task_id = %s", (task.id,))
+        task.invalidate_recordset()
+
+        result = Index.reconcile(batch_size=2)
+
+        self.assertIn("project.task", result["sources"])
+        self.assertFalse(self._indexed_task_rows(task))
+        self.assertFalse(Index.browse(kept.id).exists())
+        self.assertTrue(self.env["ir.config_parameter"].sudo().get_param(READY_PARAM))
+
+    def test_summary_reads_work_index_once_ready(self):
+        project, _partner = self._create_project_with_partner("My Work Index Summary")
+        self.env["project.task"].create(
+            {"name": "MW indexed summary task", "project_id": project.id, "user_ids": [(6, 0, [self.env.user.id])]}
+        )
+        self.env["ir.config_parameter"].sudo().set_param(READY_PARAM, "2026-01-01 00:00:00")
+
+        handler = MyWorkSummaryHandler(self.env, payload={})
+        with patch.object(type(handler), "_collect_live_items", side_effect=AssertionError("live path used")):
+            result = handler.handle({"section": "todo", "search": "mw indexed summary"})
+
+        data = result.get("data") or {}
+        # 读取前先处理本事务内尚未提交的登记，刚创建的任务立即可见。
+        self.assertEqual([item.get("title") for item in data.get("items") or []], ["MW indexed summary task"])
+        self.assertEqual((data.get("filters") or {}).get("filtered_count"), 1)
+        todo = next(row for row in data.get("summary") or [] if row.get("key") == "todo")
+        self.assertGreaterEqual(int(todo.get("count") or 0), 1)
+
     def test_contract_target_keeps_action_without_hidden_mixed_menu(self):
         handler = MyWorkSummaryHandler(self.env, payload={})
         action_ctx = handler._resolve_action_context_for_model("construction.contract")
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+def _install_module(name, **attrs):
+    module = types.ModuleType(name)
+    for key, value in attrs.items():
+        setattr(module, key, value)
+    sys.modules[name] = module
+    return module
+
+
+class _ProjectionService:
+    SOURCE_CONFIG = {
+        "payment.request": {"pending_states": ("draft", "submit"), "priority": "high"},
+    }
+
+
+def _load_service_module():
+    root = Path(__file__).resolve().parents[1]
+    fields_mod = types.SimpleNamespace(Date=types.SimpleNamespace(to_date=lambda value: value))
+    _install_module("odoo", fields=fields_mod)
+    _install_module("odoo.addons")
+    _install_module("odoo.addons.smart_core.core.project_context", project_scope_domain=lambda model, project_id: [])
+    reason_codes = {
+        name: name
+        for name in (
+            "REASON_ACTIVITY_PENDING",
+            "REASON_FOLLOWING",
+            "REASON_MENTIONED",
+            "REASON_PROJECT_HEALTH_RISK",
+            "REASON_PROJECT_HEALTH_WARN",
+            "REASON_RESPONSIBLE_OWNER",
+            "REASON_TASK_ASSIGNED",
+            "REASON_TIER_REVIEW_PENDING",
+            "REASON_WORKFLOW_PENDING",
+        )
+    }
+    _install_module("odoo.addons.smart_core.utils.reason_codes", **reason_codes)
+    _install_module(
+        "odoo.addons.smart_construction_core.services.project_execution_item_projection_service",
+        ProjectExecutionItemProjectionService=_ProjectionService,
+    )
+    _install_module(
+        "odoo.addons.smart_construction_scene.services.capability_scene_targets",
+        resolve_execution_projection_scene_key=lambda model_name: "scene.%s" % model_name,
+    )
+
+    module_name = "odoo.addons.smart_construction_core.services.my_work_index_service"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, root / "services" / "my_work_index_service.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Users:
+    def __init__(self, ids):
+        self.ids = list(ids)
+
+
+class _Review:
+    _name = "tier.review"
+
+    def __init__(self, rid, status, reviewer_ids, model="payment.request", res_id=5):
+        self.id = rid
+        self.status = status
+        self.reviewer_ids = _Users(reviewer_ids)
+        self.model = model
+        self.res_id = res_id
+        self.name = "Review %s" % rid
+
+
+class _Reviews(list):
+    _fields = {"status": None, "model": None, "res_id": None, "reviewer_ids": None}
+
+
+class TestMyWorkIndexService(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_service_module()
+
+    def test_parse_followup_note_reads_structured_and_historical_formats(self):
+        parse = self.module.parse_followup_note
+        self.assertEqual(
+            parse("SC_FOLLOWUP action_key=pay.open action_label=付款 reason_code=PAY_DUE\n正文"),
+            {"action_key": "pay.open", "action_label": "付款", "reason_code": "PAY_DUE"},
+        )
+        self.assertEqual(parse("done reason=OK"), {"reason_code": "OK"})
+        self.assertEqual(parse(""), {"reason_code": ""})
+
+    def test_tier_review_rows_fan_out_per_reviewer_with_denormalized_columns(self):
+        service = self.module.MyWorkIndexService({})
+        rows = service._tier_review_rows(
+            "tier.review",
+            _Reviews([_Review(1, "pending", [7, 8]), _Review(2, "approved", [7])]),
+        )
+
+        self.assertEqual([(row["user_id"], row["source_res_id"]) for row in rows], [(7, 1), (8, 1)])
+        row = rows[0]
+        self.assertEqual(row["section"], "todo")
+        self.assertEqual(row["source_model"], "tier.review")
+        self.assertEqual(row["title"], "payment.request#5")
+        self.assertEqual(row["priority_rank"], 3)
+        self.assertFalse(row["project_scoped"])
+        self.assertIsNone(row["project_id"])
+        self.assertEqual(row["search_text"], "payment.request#5 payment.request 审批处理 reason_tier_review_pending high")
+
+    def test_execution_sources_reconcile_only_pending_states(self):
+        service = self.module.MyWorkIndexService({})
+        self.assertEqual(service.reconcile_domain("payment.request"), [("state", "in", ["draft", "submit"])])
+        self.assertEqual(service.reconcile_domain("unknown.model"), [])
+        self.assertEqual(service.source_models(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
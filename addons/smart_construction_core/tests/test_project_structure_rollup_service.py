@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+
+def _load_service_module():
+    root = Path(__file__).resolve().parents[1]
+    module_name = "odoo.addons.smart_construction_core.services.project_structure_rollup_service"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, root / "services" / "project_structure_rollup_service.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestProjectStructureRollupService(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_service_module()
+
+    def test_rollup_sums_item_lines_up_through_non_item_ancestors(self):
+        rows = [
+            # id, parent_id, structure_type, parent_path, active, 直挂工程量, 直挂合价
+            (1, None, "unit", "1/", True, 99.0, 990.0),
+            (2, 1, "division", "1/2/", True, 0.0, 0.0),
+            (3, 2, "item", "1/2/3/", True, 4.0, 40.0),
+            (4, 2, "item", "1/2/4/", True, 6.0, 60.0),
+            (5, 1, "item", "1/5/", True, 1.5, 15.0),
+        ]
+        totals = self.module.rollup_totals(rows)
+
+        self.assertEqual(totals[3], (4.0, 40.0))
+        self.assertEqual(totals[2], (10.0, 100.0))
+        # 非清单项目节点自身直挂的清单行不计入，只汇总下级。
+        self.assertEqual(totals[1], (11.5, 115.0))
+
+    def test_item_nodes_ignore_children_and_archived_children_do_not_roll_up(self):
+        rows = [
+            (1, None, "division", "1/", True, 0.0, 0.0),
+            (2, 1, "item", "1/2/", True, 2.0, 20.0),
+            (3, 2, "item", "1/2/3/", True, 7.0, 70.0),
+            (4, 1, "item", "1/4/", False, 5.0, 50.0),
+        ]
+        totals = self.module.rollup_totals(rows)
+
+        self.assertEqual(totals[2], (2.0, 20.0))
+        self.assertEqual(totals[4], (5.0, 50.0))
+        self.assertEqual(totals[1], (2.0, 20.0))
+
+    def test_rollup_order_follows_parent_path_depth_not_row_order(self):
+        rows = [
+            (10, None, "single", "10/", True, 0.0, 0.0),
+            (11, 10, "unit", "10/11/", True, 0.0, 0.0),
+            (12, 11, "item", "10/11/12/", True, 3.0, 30.0),
+        ]
+        totals = self.module.rollup_totals(rows)
+
+        self.assertEqual(totals[10], (3.0, 30.0))
+        self.assertEqual(self.module.path_depth("10/11/12/"), 3)
+        self.assertEqual(self.module.path_depth(None), 0)
+
+    def test_settled_children_use_known_totals_without_their_subtree(self):
+        rows = [
+            # 待重算链 1 -> 2，以及 1、2 的直接下级；下级 4、5 未标记，其子树不在查询结果中。
+            (1, None, "unit", "1/", True, 0.0, 0.0),
+            (2, 1, "division", "1/2/", True, 0.0, 0.0),
+            (3, 2, "item", "1/2/3/", True, 4.0, 40.0),
+            (4, 2, "division", "1/2/4/", True, 0.0, 0.0),
+            (5, 1, "division", "1/5/", True, 0.0, 0.0),
+            (6, 1, "division", "1/6/", False, 0.0, 0.0),
+        ]
+        known = {4: (6.0, 60.0), 5: (1.5, 15.0), 6: (100.0, 1000.0)}
+        totals = self.module.rollup_totals(rows, known)
+
+        self.assertEqual(totals[4], (6.0, 60.0))
+        self.assertEqual(totals[2], (10.0, 100.0))
+        self.assertEqual(totals[1], (11.5, 115.0))
+
+    def test_rollup_sql_is_scoped_to_marked_nodes_and_their_children(self):
+        sql = " ".join(self.module.ROLLUP_ROWS_SQL.split())
+        self.assertIn("WHERE s.id = ANY(%(node_ids)s) OR s.parent_id = ANY(%(node_ids)s)", sql)
+        self.assertIn("line.structure_id = ANY(%(node_ids)s)", sql)
+        self.assertNotIn("project_ids", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
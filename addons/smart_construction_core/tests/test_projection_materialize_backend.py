@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase, tagged
+
+from odoo.addons.smart_construction_core.models.projection.projection_materialize import (
+    LIVE_CONTEXT_KEY,
+    MATERIALIZE_MODE_PARAM,
+    MODE_LIVE,
+    MODE_MATERIALIZED,
+)
+
+
+@tagged("sc_smoke", "projection_materialize")
+class TestProjectionMaterializeBackend(TransactionCase):
+    FACT = "sc.interfund.movement.fact"
+    SUMMARY = "sc.interfund.movement.project.summary"
+
+    def setUp(self):
+        super().setUp()
+        self.project = self.env["project.project"].create({"name": "Materialize Project"})
+
+    def _switch(self, model_name, mode):
+        self.env["ir.config_parameter"].sudo().set_param(MATERIALIZE_MODE_PARAM % model_name, mode)
+        model = self.env[model_name]
+        model.init()
+        # 上游重建会级联删除下游视图，按加载顺序补建。
+        if model_name == self.FACT:
+            self.env[self.SUMMARY].init()
+        return model._sc_materialized_relkind()
+
+    def _repay_claim(self):
+        claim = self.env["sc.expense.claim"].create(
+            {
+                "claim_type": "project_company_repay",
+                "summary": "项目还公司款",
+                "project_id": self.project.id,
+                "amount": 320,
+            }
+        )
+        self.env.flush_all()
+        return 30000000 + claim.id
+
+    def test_projections_default_to_live_and_switch_modes_on_init(self):
+        self.assertEqual(self.env[self.FACT]._sc_materialize_mode(), MODE_LIVE)
+
+        self.assertEqual(self._switch(self.FACT, MODE_MATERIALIZED), "m")
+        self.env.cr.execute("SELECT to_regclass('sc_interfund_movement_fact_id_uniq')")
+        self.assertTrue(self.env.cr.fetchone()[0])
+
+        self.assertEqual(self._switch(self.FACT, MODE_LIVE), "v")
+
+    def test_materialized_reads_lag_until_refresh_while_live_context_is_fresh(self):
+        self._switch(self.FACT, MODE_MATERIALIZED)
+        fact_id = self._repay_claim()
+        Fact = self.env[self.FACT]
+
+        self.assertFalse(Fact.search([("id", "=", fact_id)]))
+        live = Fact.with_context(**{LIVE_CONTEXT_KEY: True}).search([("id", "=", fact_id)])
+        self.assertEqual(live.amount, 320)
+
+        self.assertTrue(Fact._sc_materialize_refresh())
+        self.assertEqual(Fact.search([("id", "=", fact_id)]).amount, 320)
+
+    def test_downstream_live_view_reads_upstream_live_relation(self):
+        self._switch(self.FACT, MODE_MATERIALIZED)
+        self.env.cr.execute("SELECT pg_get_viewdef('sc_interfund_movement_project_summary_live'::regclass)")
+        self.assertIn("sc_interfund_movement_fact_live", self.env.cr.fetchone()[0])
+
+        self._repay_claim()
+        summary = self.env[self.SUMMARY].with_context(**{LIVE_CONTEXT_KEY: True}).search(
+            [("project_id", "=", self.project.id)]
+        )
+        self.assertTrue(summary)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import pathlib
+import unittest
+
+try:
+    from odoo.tests.common import TransactionCase, tagged
+    from odoo.addons.smart_construction_core.services import projection_refresh_registry as registry
+    BaseCase = TransactionCase
+except ModuleNotFoundError:
+    module_path = pathlib.Path(__file__).resolve().parents[1] / "services" / "projection_refresh_registry.py"
+    spec = importlib.util.spec_from_file_location("projection_refresh_registry", module_path)
+    registry = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(registry)
+    BaseCase = unittest.TestCase
+
+    def tagged(*_args, **_kwargs):
+        def decorator(cls):
+            return cls
+
+        return decorator
+
+
+@tagged("sc_gate", "projection_refresh")
+class TestProjectionRefreshRegistry(BaseCase):
+    def test_project_keys_fold_empty_project_into_null_partition(self):
+        self.assertEqual(registry.normalize_project_keys([7, "3", False, None, 7, "bad"]), [0, 3, 7])
+
+    def test_ordered_projections_pull_in_derived_summaries(self):
+        self.assertEqual(
+            registry.ordered_projections(["sc.comprehensive.cost.summary", "sc.ar.ap.project.summary"]),
+            ["sc.ar.ap.project.summary", "sc.ar.ap.company.summary", "sc.comprehensive.cost.summary"],
+        )
+        self.assertEqual(registry.ordered_projections(["sc.unknown.summary"]), [])
+        self.assertEqual(registry.derived_projections("sc.ar.ap.project.summary"), ["sc.ar.ap.company.summary"])
+
+    def test_source_models_map_to_refreshable_projections(self):
+        for model_name, projections in registry.SOURCE_MODEL_PROJECTIONS.items():
+            self.assertTrue(projections, model_name)
+            self.assertTrue(set(projections) <= set(registry.REFRESHABLE_PROJECTIONS), model_name)
+        self.assertEqual(registry.projections_for_source("res.partner"), ())
+
+    def test_scope_sql_is_open_for_full_build(self):
+        self.assertEqual(registry.project_scope_sql("c.project_id", False), "TRUE")
+        self.assertEqual(
+            registry.project_scope_sql("c.project_id", True) % {"project_keys": "ARRAY[1]"},
+            "(c.project_id = ANY(ARRAY[1]) OR (c.project_id IS NULL AND 0 = ANY(ARRAY[1])))",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
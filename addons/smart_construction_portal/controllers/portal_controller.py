@@ -11,7 +11,7 @@ from odoo.addons.smart_construction_core.controllers.api_base import ok, fail
 from odoo.addons.smart_construction_portal.services.portal_contract_service import (
     PortalContractService,
 )
-from odoo.addons.smart_core.security.auth import decode_token
+from odoo.addons.smart_core.security.auth import decode_token, resolve_token_user
 
 
 _logger = logging.getLogger(__name__)
@@ -117,16 +117,7 @@ def _sanitize_portal_next(next_url):
 
 def _resolve_user_from_token(token):
     try:
-        payload = decode_token(token)
-        user_id = payload.get("user_id")
-        user = request.env["res.users"].sudo().browse(int(user_id))
-        if not user.exists():
-            return None
-        current_version = int(getattr(user, "token_version", 0) or 0)
-        token_version = int(payload.get("token_version") or 0)
-        if token_version != current_version:
-            return None
-        return user
+        return resolve_token_user(request.env, decode_token(token))
     except Exception:
         return None
 
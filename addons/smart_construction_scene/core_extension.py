@@ -369,15 +369,8 @@ CRITICAL_SCENE_TARGET_ROUTE_OVERRIDES = {
     "my_work.workspace": "/my-work",
 }
 
-_DERIVED_NAV_SCENE_MAP_CACHE: dict[str, dict[str, dict[Any, str]]] = {}
-
-
-def _scene_cache_key(env) -> str:
-    try:
-        dbname = str(getattr(getattr(env, "cr", None), "dbname", "") or "").strip()
-    except Exception:
-        dbname = ""
-    return dbname or "__default__"
+# 每个 db 一条 (代次, 值)，代次变化时整体替换。
+_DERIVED_NAV_SCENE_MAP_CACHE: dict[str, tuple[str, dict[str, dict[Any, str]]]] = {}
 
 
 def _normalize_view_mode(raw: Any) -> str:
@@ -390,8 +383,8 @@ def _normalize_view_mode(raw: Any) -> str:
 
 
 def _derive_nav_scene_maps_from_registry(env) -> dict[str, dict[Any, str]]:
-    cache_key = _scene_cache_key(env)
-    cached = _DERIVED_NAV_SCENE_MAP_CACHE.get(cache_key)
+    slot = scene_registry.scene_cache_slot(env)
+    cached = scene_registry.generation_cache_get(_DERIVED_NAV_SCENE_MAP_CACHE, slot)
     if isinstance(cached, dict):
         return cached
 
@@ -428,7 +421,7 @@ def _derive_nav_scene_maps_from_registry(env) -> dict[str, dict[Any, str]]:
         "action_xmlid_scene_map": action_xmlid_scene_map,
         "model_view_scene_map": model_view_scene_map,
     }
-    _DERIVED_NAV_SCENE_MAP_CACHE[cache_key] = derived
+    scene_registry.generation_cache_put(_DERIVED_NAV_SCENE_MAP_CACHE, slot, derived)
     return derived
 
 
@@ -3,3 +3,4 @@ from . import scene_governance_log
 from . import scene_company_channel
 from . import scene_governance_wizard
 from . import scene_package_installation
+from . import scene_registry_generation
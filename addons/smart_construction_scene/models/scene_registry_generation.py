@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+场景注册表代次：场景/版本/磁贴/能力/发布快照写入后递增 sc.scene.registry.generation，
+使 scene_registry 的进程内合并缓存（按代次分键）在所有 worker 失效。
+同一事务只递增一次，且在提交前（precommit）递增，事务内后续写入不会落在已递增的代次下；
+ir.config_parameter 变更经注册表缓存信号同步到其他 worker。
+"""
+from odoo import api, models
+
+from odoo.addons.smart_construction_scene.scene_registry import mark_scene_registry_dirty
+
+
+class ScSceneRegistryGenerationSource(models.AbstractModel):
+    _name = "sc.scene.registry.generation.source"
+    _description = "Scene Registry Generation Source"
+
+    def _sc_scene_registry_touch(self):
+        mark_scene_registry_dirty(self.env)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._sc_scene_registry_touch()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if self:
+            self._sc_scene_registry_touch()
+        return result
+
+    def unlink(self):
+        touched = bool(self)
+        result = super().unlink()
+        if touched:
+            self._sc_scene_registry_touch()
+        return result
+
+
+class ScSceneGenerationSource(models.Model):
+    _name = "sc.scene"
+    _inherit = ["sc.scene", "sc.scene.registry.generation.source"]
+
+
+class ScSceneVersionGenerationSource(models.Model):
+    _name = "sc.scene.version"
+    _inherit = ["sc.scene.version", "sc.scene.registry.generation.source"]
+
+
+class ScSceneTileGenerationSource(models.Model):
+    _name = "sc.scene.tile"
+    _inherit = ["sc.scene.tile", "sc.scene.registry.generation.source"]
+
+
+class ScCapabilityGenerationSource(models.Model):
+    _name = "sc.capability"
+    _inherit = ["sc.capability", "sc.scene.registry.generation.source"]
+
+
+class ScSceneSnapshotGenerationSource(models.Model):
+    _name = "sc.scene.snapshot"
+    _inherit = ["sc.scene.snapshot", "sc.scene.registry.generation.source"]
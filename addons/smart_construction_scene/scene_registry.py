@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import copy
+import hashlib
 import json
 import logging
 import os
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from importlib.util import module_from_spec, spec_from_file_location
 from pathlib import Path
 
@@ -12,8 +17,24 @@ SCENE_VERSION = "v2"
 SCHEMA_VERSION = "v2"
 IMPORTED_SCENES_PARAM = "sc.scene.package.imported_scenes"
 
+# 编译缓存：来源层（内容 profile + YAML 资产）按文件 mtime/size 指纹缓存，
+# 合并层（DB 场景 + 导入场景 + 来源层）按 DB 代次 + 用户权限键缓存。
+REGISTRY_GENERATION_PARAM = "sc.scene.registry.generation"
+GENERATION_PENDING_KEY = "sc.scene.registry.generation.pending"
+REGISTRY_CACHE_PARAM = "sc.scene.registry.cache"
+REGISTRY_CACHE_TTL_PARAM = "sc.scene.registry.cache_ttl_seconds"
+REGISTRY_CACHE_DIR_PARAM = "sc.scene.registry.cache_dir"
+REGISTRY_CACHE_DIR_ENV = "SC_SCENE_REGISTRY_CACHE_DIR"
+REGISTRY_CACHE_FORMAT = 1
+REGISTRY_CACHE_DEFAULT_TTL_SECONDS = 300
+REGISTRY_CACHE_MAX_ENTRIES = 64
+
 _logger = logging.getLogger(__name__)
 
+_COMPILED_CACHE_LOCK = threading.Lock()
+_COMPILED_SOURCE_CACHE = {}
+_COMPILED_SCENE_CACHE = OrderedDict()
+
 
 _SCENE_REGISTRY_CONTENT_MODULE = None
 _SCENE_REGISTRY_ENGINE_MODULE = None
@@ -276,6 +297,323 @@ def _load_scene_asset_entries_with_timings():
     return rows, timings_ms
 
 
+def _merge_missing(scene, defaults):
+    for key, value in defaults.items():
+        current = scene.get(key)
+        if key not in scene or current in (None, "", [], {}):
+            scene[key] = value
+            continue
+        if isinstance(value, dict):
+            if not isinstance(current, dict):
+                scene[key] = value
+                continue
+            for d_key, d_val in value.items():
+                if d_key not in current or current.get(d_key) in (None, "", [], {}):
+                    current[d_key] = d_val
+            continue
+        if isinstance(value, list) and not isinstance(current, list):
+            scene[key] = value
+
+
+def _compile_scene_sources_with_timings():
+    """内置兜底 + 内容 profile + YAML 资产 -> 未按 is_test 过滤的来源场景列表。"""
+    timings_ms = {}
+
+    def _mark(stage, started_at):
+        timings_ms[stage] = int((time.perf_counter() - started_at) * 1000)
+        return time.perf_counter()
+
+    # Note: keep configs data-only; target IDs are resolved by system_init.
+    # Complete migration: platform fallback keeps only minimal internal defaults.
+    fallback = [
+        {
+            "code": "default",
+            "name": "默认场景",
+            "is_test": True,
+            "tags": ["internal"],
+            "target": {"route": "/workbench?scene=default"},
+        },
+        {
+            "code": "scene_smoke_default",
+            "name": "Scene Smoke Default",
+            "is_test": True,
+            "tags": ["internal", "smoke"],
+            "target": {"route": "/workbench?scene=scene_smoke_default"},
+        },
+    ]
+
+    stage_ts = time.perf_counter()
+    content_entries, content_timings_ms = _load_scene_registry_content_entries_with_timings()
+    if isinstance(content_timings_ms, dict):
+        for key, value in content_timings_ms.items():
+            timings_ms[f"content_entries.{key}"] = int(value)
+    for scene in content_entries:
+        code = str(scene.get("code") or "").strip()
+        if not code:
+            continue
+        fallback = [item for item in fallback if str(item.get("code") or "").strip() != code]
+        fallback.append(scene)
+    stage_ts = _mark("load_scene_registry_content_entries", stage_ts)
+    stage_ts = time.perf_counter()
+    asset_entries, asset_timings_ms = _load_scene_asset_entries_with_timings()
+    if isinstance(asset_timings_ms, dict):
+        for key, value in asset_timings_ms.items():
+            timings_ms[f"scene_asset_entries.{key}"] = int(value)
+    fallback_map_for_assets = {
+        str(scene.get("code") or "").strip(): scene
+        for scene in fallback
+        if str(scene.get("code") or "").strip()
+    }
+    for asset in asset_entries:
+        code = str(asset.get("code") or "").strip()
+        if not code:
+            continue
+        existing = fallback_map_for_assets.get(code)
+        if existing:
+            _merge_missing(existing, asset)
+        else:
+            fallback.append(asset)
+            fallback_map_for_assets[code] = asset
+    _mark("load_scene_asset_entries", stage_ts)
+    return fallback, timings_ms
+
+
+def _scene_source_paths():
+    base = Path(__file__).resolve().parent
+    paths = [
+        base / "scene_registry.py",
+        base.parent / "smart_scene" / "core" / "scene_registry_engine.py",
+        base.parent / "smart_scene" / "core" / "scene_provider_registry.py",
+    ]
+    profiles = base / "profiles"
+    if profiles.exists():
+        paths.extend(sorted(profiles.glob("*.py")))
+    root = _scene_asset_root()
+    if root.exists():
+        paths.extend(sorted(root.rglob("*.scene.yaml")))
+    return paths
+
+
+def scene_source_fingerprint():
+    """来源文件（路径 + mtime_ns + size）指纹；任何 profile / YAML 资产变更都会改变它。"""
+    digest = hashlib.sha1(f"format:{REGISTRY_CACHE_FORMAT}:{SCENE_VERSION}".encode("utf-8"))
+    for path in _scene_source_paths():
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _get_param(env, key):
+    if env is None:
+        return None
+    try:
+        return env["ir.config_parameter"].sudo().get_param(key)
+    except Exception:
+        return None
+
+
+def _registry_cache_enabled(env) -> bool:
+    return _to_bool(_get_param(env, REGISTRY_CACHE_PARAM) or "", True)
+
+
+def _registry_cache_ttl_seconds(env) -> int:
+    try:
+        return max(int(_get_param(env, REGISTRY_CACHE_TTL_PARAM)), 0)
+    except (TypeError, ValueError):
+        return REGISTRY_CACHE_DEFAULT_TTL_SECONDS
+
+
+def _registry_cache_dir(env):
+    raw = str(_get_param(env, REGISTRY_CACHE_DIR_PARAM) or os.environ.get(REGISTRY_CACHE_DIR_ENV) or "").strip()
+    if not raw:
+        return None
+    if raw.lower() in {"1", "true", "tmp"}:
+        return Path(tempfile.gettempdir()) / "sc_scene_registry"
+    return Path(raw)
+
+
+def _artifact_path(env, fingerprint):
+    cache_dir = _registry_cache_dir(env)
+    if cache_dir is None:
+        return None
+    return cache_dir / f"scene_sources.{fingerprint}.json"
+
+
+def _read_compiled_artifact(env, fingerprint):
+    path = _artifact_path(env, fingerprint)
+    if path is None or not path.exists():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or payload.get("fingerprint") != fingerprint:
+        return None
+    rows = payload.get("scenes")
+    return rows if isinstance(rows, list) else None
+
+
+def _write_compiled_artifact(env, fingerprint, rows):
+    path = _artifact_path(env, fingerprint)
+    if path is None:
+        return False
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = json.dumps({"fingerprint": fingerprint, "scenes": rows}, ensure_ascii=False)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        _logger.debug("Unable to persist compiled scene registry artifact %s", path, exc_info=True)
+        return False
+
+
+def _load_compiled_scene_sources_with_timings(env, fingerprint):
+    """来源层：进程内缓存 -> 可选 JSON 产物（冷启动预热）-> 重新编译。返回可修改的副本。"""
+    timings_ms = {}
+    started = time.perf_counter()
+    enabled = _registry_cache_enabled(env)
+    with _COMPILED_CACHE_LOCK:
+        rows = _COMPILED_SOURCE_CACHE.get(fingerprint) if enabled else None
+    if rows is None and enabled:
+        rows = _read_compiled_artifact(env, fingerprint)
+        if rows is not None:
+            timings_ms["compiled_sources_artifact_hit"] = int((time.perf_counter() - started) * 1000)
+            with _COMPILED_CACHE_LOCK:
+                _COMPILED_SOURCE_CACHE.clear()
+                _COMPILED_SOURCE_CACHE[fingerprint] = rows
+    if rows is not None:
+        timings_ms["compiled_sources_cache_hit"] = int((time.perf_counter() - started) * 1000)
+        return copy.deepcopy(rows), timings_ms
+
+    rows, build_timings_ms = _compile_scene_sources_with_timings()
+    timings_ms.update(build_timings_ms)
+    if enabled:
+        with _COMPILED_CACHE_LOCK:
+            _COMPILED_SOURCE_CACHE.clear()
+            _COMPILED_SOURCE_CACHE[fingerprint] = copy.deepcopy(rows)
+        _write_compiled_artifact(env, fingerprint, rows)
+    timings_ms["compiled_sources_cache_miss"] = int((time.perf_counter() - started) * 1000)
+    return rows, timings_ms
+
+
+def scene_registry_generation(env):
+    return str(_get_param(env, REGISTRY_GENERATION_PARAM) or "0")
+
+
+def bump_scene_registry_generation(env):
+    """sc.scene / sc.scene.snapshot 等写入后调用；代次变化使所有进程的合并层缓存失效。"""
+    generation = f"{time.time_ns():x}"
+    env["ir.config_parameter"].sudo().set_param(REGISTRY_GENERATION_PARAM, generation)
+    return generation
+
+
+def scene_registry_write_pending(env):
+    """本事务已写入场景来源、代次将在提交前递增；期间读到的是未提交数据，不写入也不读取进程缓存。"""
+    try:
+        return bool(env.cr.precommit.data.get(GENERATION_PENDING_KEY))
+    except Exception:
+        return False
+
+
+def mark_scene_registry_dirty(env):
+    """登记代次递增：同一事务只登记一次，在 precommit 中（全部写入之后）递增，避免后续写入沿用已递增的代次。"""
+    data = env.cr.precommit.data
+    if data.get(GENERATION_PENDING_KEY):
+        return
+    data[GENERATION_PENDING_KEY] = True
+
+    def _bump():
+        bump_scene_registry_generation(env)
+        env["ir.config_parameter"].flush_model()
+
+    env.cr.precommit.add(_bump)
+
+
+def scene_cache_slot(env):
+    """进程内派生缓存的槽位 (db, 代次)；本事务有未提交的场景写入时返回 None（不走缓存）。"""
+    if scene_registry_write_pending(env):
+        return None
+    try:
+        dbname = str(getattr(getattr(env, "cr", None), "dbname", "") or "").strip()
+    except Exception:
+        dbname = ""
+    return dbname or "__default__", scene_registry_generation(env)
+
+
+def generation_cache_get(cache, slot):
+    """cache 按 db 只保留一条 (代次, 值)；代次不一致视为未命中。"""
+    if slot is None:
+        return None
+    dbname, generation = slot
+    entry = cache.get(dbname)
+    if entry is None or entry[0] != generation:
+        return None
+    return entry[1]
+
+
+def generation_cache_put(cache, slot, value):
+    """写入时直接替换该 db 的旧代次条目，旧代次不会累积。"""
+    if slot is not None:
+        dbname, generation = slot
+        cache[dbname] = (generation, value)
+    return value
+
+
+def _compiled_scene_cache_key(env, fingerprint, include_tests):
+    if env is None or not _registry_cache_enabled(env) or scene_registry_write_pending(env):
+        return None
+    try:
+        user = env.user
+        imported = str(_get_param(env, IMPORTED_SCENES_PARAM) or "")
+        return (
+            str(env.cr.dbname or ""),
+            scene_registry_generation(env),
+            hashlib.sha1(imported.encode("utf-8")).hexdigest(),
+            int(user.id or 0),
+            tuple(sorted(user.groups_id.ids)),
+            bool(include_tests),
+            fingerprint,
+        )
+    except Exception:
+        return None
+
+
+def _compiled_scene_cache_get(env, cache_key):
+    if cache_key is None:
+        return None
+    ttl = _registry_cache_ttl_seconds(env)
+    with _COMPILED_CACHE_LOCK:
+        entry = _COMPILED_SCENE_CACHE.get(cache_key)
+        if entry is None:
+            return None
+        compiled_at, scenes, drift = entry
+        if ttl and time.monotonic() - compiled_at > ttl:
+            _COMPILED_SCENE_CACHE.pop(cache_key, None)
+            return None
+        _COMPILED_SCENE_CACHE.move_to_end(cache_key)
+    return copy.deepcopy(scenes), copy.deepcopy(drift)
+
+
+def _compiled_scene_cache_put(cache_key, scenes, drift):
+    entry = (time.monotonic(), copy.deepcopy(scenes), copy.deepcopy(drift))
+    with _COMPILED_CACHE_LOCK:
+        _COMPILED_SCENE_CACHE[cache_key] = entry
+        _COMPILED_SCENE_CACHE.move_to_end(cache_key)
+        while len(_COMPILED_SCENE_CACHE) > REGISTRY_CACHE_MAX_ENTRIES:
+            _COMPILED_SCENE_CACHE.popitem(last=False)
+
+
+def clear_compiled_scene_cache():
+    with _COMPILED_CACHE_LOCK:
+        _COMPILED_SOURCE_CACHE.clear()
+        _COMPILED_SCENE_CACHE.clear()
+
+
 def _apply_scene_defaults(scene, drift=None, source="registry"):
     code = scene.get("code") or scene.get("key") or ""
     if code == "projects.intake":
@@ -398,6 +736,36 @@ def load_scene_configs(env, drift=None):
 
 
 def load_scene_configs_with_timings(env, drift=None):
+    """
+    合并后的场景配置按 (DB 代次, 导入场景, 用户权限, 来源指纹) 在进程内缓存；
+    命中时回放编译时产生的 drift，timings_ms 以 compiled_registry_cache_hit/miss 标示。
+    """
+    timings_ms = {}
+    started = time.perf_counter()
+    include_tests = _include_test_scenes(env)
+    timings_ms["include_test_scenes"] = int((time.perf_counter() - started) * 1000)
+    fingerprint = scene_source_fingerprint()
+    cache_key = _compiled_scene_cache_key(env, fingerprint, include_tests)
+    cached = _compiled_scene_cache_get(env, cache_key)
+    if cached is not None:
+        scenes, cached_drift = cached
+        if drift is not None:
+            drift.extend(cached_drift)
+        timings_ms["compiled_registry_cache_hit"] = int((time.perf_counter() - started) * 1000)
+        return scenes, timings_ms
+
+    build_drift = []
+    scenes, build_timings_ms = _build_scene_configs_with_timings(env, fingerprint, include_tests, drift=build_drift)
+    timings_ms.update(build_timings_ms)
+    if drift is not None:
+        drift.extend(copy.deepcopy(build_drift))
+    if cache_key is not None:
+        _compiled_scene_cache_put(cache_key, scenes, build_drift)
+    timings_ms["compiled_registry_cache_miss"] = int((time.perf_counter() - started) * 1000)
+    return scenes, timings_ms
+
+
+def _build_scene_configs_with_timings(env, fingerprint, include_tests, drift=None):
     timings_ms = {}
 
     def _mark(stage, started_at):
@@ -410,43 +778,6 @@ def load_scene_configs_with_timings(env, drift=None):
     stage_ts = _mark("load_from_db", stage_ts)
     imported_scenes = _load_imported_scenes(env, drift=drift)
     stage_ts = _mark("load_imported_scenes", stage_ts)
-    include_tests = _include_test_scenes(env)
-    stage_ts = _mark("include_test_scenes", stage_ts)
-    # Note: keep configs data-only; target IDs are resolved by system_init.
-    # Complete migration: platform fallback keeps only minimal internal defaults.
-    fallback = [
-        {
-            "code": "default",
-            "name": "默认场景",
-            "is_test": True,
-            "tags": ["internal"],
-            "target": {"route": "/workbench?scene=default"},
-        },
-        {
-            "code": "scene_smoke_default",
-            "name": "Scene Smoke Default",
-            "is_test": True,
-            "tags": ["internal", "smoke"],
-            "target": {"route": "/workbench?scene=scene_smoke_default"},
-        },
-    ]
-
-    def _merge_missing(scene, defaults):
-        for key, value in defaults.items():
-            current = scene.get(key)
-            if key not in scene or current in (None, "", [], {}):
-                scene[key] = value
-                continue
-            if isinstance(value, dict):
-                if not isinstance(current, dict):
-                    scene[key] = value
-                    continue
-                for d_key, d_val in value.items():
-                    if d_key not in current or current.get(d_key) in (None, "", [], {}):
-                        current[d_key] = d_val
-                continue
-            if isinstance(value, list) and not isinstance(current, list):
-                scene[key] = value
 
     def _upgrade_registry_target_identity(scene, defaults):
         current = scene.get("target")
@@ -469,39 +800,8 @@ def load_scene_configs_with_timings(env, drift=None):
                 if value not in (None, "", [], {}):
                     current[key] = value
 
-    stage_ts = time.perf_counter()
-    content_entries, content_timings_ms = _load_scene_registry_content_entries_with_timings()
-    if isinstance(content_timings_ms, dict):
-        for key, value in content_timings_ms.items():
-            timings_ms[f"content_entries.{key}"] = int(value)
-    for scene in content_entries:
-        code = str(scene.get("code") or "").strip()
-        if not code:
-            continue
-        fallback = [item for item in fallback if str(item.get("code") or "").strip() != code]
-        fallback.append(scene)
-    stage_ts = _mark("load_scene_registry_content_entries", stage_ts)
-    stage_ts = time.perf_counter()
-    asset_entries, asset_timings_ms = _load_scene_asset_entries_with_timings()
-    if isinstance(asset_timings_ms, dict):
-        for key, value in asset_timings_ms.items():
-            timings_ms[f"scene_asset_entries.{key}"] = int(value)
-    fallback_map_for_assets = {
-        str(scene.get("code") or "").strip(): scene
-        for scene in fallback
-        if str(scene.get("code") or "").strip()
-    }
-    for asset in asset_entries:
-        code = str(asset.get("code") or "").strip()
-        if not code:
-            continue
-        existing = fallback_map_for_assets.get(code)
-        if existing:
-            _merge_missing(existing, asset)
-        else:
-            fallback.append(asset)
-            fallback_map_for_assets[code] = asset
-    stage_ts = _mark("load_scene_asset_entries", stage_ts)
+    fallback, source_timings_ms = _load_compiled_scene_sources_with_timings(env, fingerprint)
+    timings_ms.update(source_timings_ms)
     if not db_scenes:
         if not imported_scenes:
             stage_ts = time.perf_counter()
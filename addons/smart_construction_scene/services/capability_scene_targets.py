@@ -7,9 +7,10 @@ from typing import Any, Dict, Tuple
 from odoo.addons.smart_construction_scene import scene_registry
 
 
-_SCENE_CONFIGS_CACHE: dict[str, list[dict[str, Any]]] = {}
-_SCENE_MAP_CACHE: dict[str, dict[str, dict[str, Any]]] = {}
-_TARGET_SCENE_LOOKUP_CACHE: dict[str, dict[tuple[str, str], str]] = {}
+# 每个 db 一条 (代次, 值)，代次变化时整体替换。
+_SCENE_CONFIGS_CACHE: dict[str, tuple[str, list[dict[str, Any]]]] = {}
+_SCENE_MAP_CACHE: dict[str, tuple[str, dict[str, dict[str, Any]]]] = {}
+_TARGET_SCENE_LOOKUP_CACHE: dict[str, tuple[str, dict[tuple[str, str], str]]] = {}
 
 
 CAPABILITY_ENTRY_SCENE_MAP: dict[str, str] = {
@@ -108,17 +109,10 @@ def _resolve_scene_map(env) -> dict[str, dict[str, Any]]:
     return out
 
 
-def _scene_cache_key(env) -> str:
-    try:
-        dbname = str(getattr(getattr(env, "cr", None), "dbname", "") or "").strip()
-    except Exception:
-        dbname = ""
-    return dbname or "__default__"
-
-
 def _load_scene_map_with_timings(env) -> Tuple[dict[str, dict[str, Any]], dict[str, int]]:
-    cache_key = _scene_cache_key(env)
-    cached_map = _SCENE_MAP_CACHE.get(cache_key)
+    # 代次变化（场景/能力写入）后自动换槽，避免进程内映射长期陈旧。
+    slot = scene_registry.scene_cache_slot(env)
+    cached_map = scene_registry.generation_cache_get(_SCENE_MAP_CACHE, slot)
     if isinstance(cached_map, dict):
         return cached_map, {
             "load_scene_configs_cache_hit": 0,
@@ -131,7 +125,7 @@ def _load_scene_map_with_timings(env) -> Tuple[dict[str, dict[str, Any]], dict[s
         for key, value in scene_config_timings_ms.items():
             timings_ms[key] = int(value)
     if isinstance(scenes, list):
-        _SCENE_CONFIGS_CACHE[cache_key] = list(scenes)
+        scene_registry.generation_cache_put(_SCENE_CONFIGS_CACHE, slot, list(scenes))
     map_ts = time.perf_counter()
     scene_map = {
         str(scene.get("code") or scene.get("key") or "").strip(): dict(scene)
@@ -139,13 +133,13 @@ def _load_scene_map_with_timings(env) -> Tuple[dict[str, dict[str, Any]], dict[s
         if isinstance(scene, dict) and str(scene.get("code") or scene.get("key") or "").strip()
     }
     timings_ms["build_scene_map"] = int((time.perf_counter() - map_ts) * 1000)
-    _SCENE_MAP_CACHE[cache_key] = scene_map
+    scene_registry.generation_cache_put(_SCENE_MAP_CACHE, slot, scene_map)
     return scene_map, timings_ms
 
 
 def _build_target_scene_lookup(env) -> dict[tuple[str, str], str]:
-    cache_key = _scene_cache_key(env)
-    cached = _TARGET_SCENE_LOOKUP_CACHE.get(cache_key)
+    slot = scene_registry.scene_cache_slot(env)
+    cached = scene_registry.generation_cache_get(_TARGET_SCENE_LOOKUP_CACHE, slot)
     if isinstance(cached, dict):
         return cached
 
@@ -165,7 +159,7 @@ def _build_target_scene_lookup(env) -> dict[tuple[str, str], str]:
             lookup.setdefault(("menu_xmlid", menu_xmlid), scene_key)
         if model and view_mode:
             lookup.setdefault(("model_view", f"{model}:{view_mode}"), scene_key)
-    _TARGET_SCENE_LOOKUP_CACHE[cache_key] = lookup
+    scene_registry.generation_cache_put(_TARGET_SCENE_LOOKUP_CACHE, slot, lookup)
     return lookup
 
 
@@ -35,6 +35,22 @@ scene_pkg.__path__ = [str(SCENE_DIR)]
 scene_registry_mod = types.ModuleType("odoo.addons.smart_construction_scene.scene_registry")
 scene_registry_mod.load_scene_configs = lambda env: []
 scene_registry_mod.load_scene_configs_with_timings = lambda env: ([], {})
+scene_registry_mod.scene_registry_generation = lambda env: "0"
+scene_registry_mod.scene_cache_slot = lambda env: ("__default__", "0")
+
+
+def _generation_cache_get(cache, slot):
+    entry = cache.get(slot[0])
+    return entry[1] if entry and entry[0] == slot[1] else None
+
+
+def _generation_cache_put(cache, slot, value):
+    cache[slot[0]] = (slot[1], value)
+    return value
+
+
+scene_registry_mod.generation_cache_get = _generation_cache_get
+scene_registry_mod.generation_cache_put = _generation_cache_put
 sys.modules["odoo.addons.smart_construction_scene.scene_registry"] = scene_registry_mod
 scene_pkg.scene_registry = scene_registry_mod
 
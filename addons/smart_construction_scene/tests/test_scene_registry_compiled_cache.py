@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "scene_registry.py"
+
+
+def _load_module():
+    spec = importlib.util.spec_from_file_location("scene_registry_compiled_cache_under_test", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+class _FakeParams:
+    def __init__(self, values):
+        self.values = values
+
+    def sudo(self):
+        return self
+
+    def get_param(self, key, default=False):
+        return self.values.get(key, default)
+
+    def set_param(self, key, value):
+        self.values[key] = value
+
+    def flush_model(self, fnames=None):
+        return None
+
+
+class _FakeGroups:
+    ids = [3, 1]
+
+
+class _FakeUser:
+    id = 7
+    groups_id = _FakeGroups()
+
+
+class _FakePrecommit:
+    def __init__(self):
+        self.data = {}
+        self.funcs = []
+
+    def add(self, func):
+        self.funcs.append(func)
+
+    def run(self):
+        while self.funcs:
+            self.funcs.pop(0)()
+        self.data.clear()
+
+
+class _FakeCursor:
+    dbname = "sc_test"
+
+    def __init__(self):
+        self.precommit = _FakePrecommit()
+
+
+class _FakeEnv:
+    def __init__(self, params):
+        self.params = _FakeParams(params)
+        self.user = _FakeUser()
+        self.cr = _FakeCursor()
+
+    def __getitem__(self, model_name):
+        if model_name == "ir.config_parameter":
+            return self.params
+        raise KeyError(model_name)
+
+
+class TestSceneRegistryCompiledCache(unittest.TestCase):
+    def setUp(self):
+        self.target = _load_module()
+        self.content_calls = []
+        self.db_calls = []
+
+        def _content():
+            self.content_calls.append(1)
+            return [{"code": "projects.list", "name": "项目列表", "target": {"route": "/s/projects.list"}}], {}
+
+        def _db(env, drift=None):
+            self.db_calls.append(1)
+            self.target._append_drift(drift, scene_key="projects.list", kind="fallback_override", fields=["target"])
+            return [{"code": "projects.list", "name": "项目台账", "target": {"route": "/s/projects.list"}}]
+
+        self.target._load_scene_registry_content_entries_with_timings = _content
+        self.target._load_from_db = _db
+        self.target._load_imported_scenes = lambda env, drift=None: []
+
+    def test_source_layer_compiles_once_per_fingerprint(self):
+        self.target._load_from_db = lambda env, drift=None: []
+        _rows, first_timings = self.target.load_scene_configs_with_timings(None)
+        rows, second_timings = self.target.load_scene_configs_with_timings(None)
+
+        self.assertIn("compiled_sources_cache_miss", first_timings)
+        self.assertIn("compiled_sources_cache_hit", second_timings)
+        self.assertEqual(len(self.content_calls), 1)
+        self.assertTrue(any(row.get("code") == "projects.list" for row in rows))
+
+        rows[0]["name"] = "mutated"
+        rows_again, _timings = self.target.load_scene_configs_with_timings(None)
+        self.assertNotEqual(rows_again[0].get("name"), "mutated")
+
+    def test_source_fingerprint_follows_file_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            asset = Path(tmp) / "demo.scene.yaml"
+            asset.write_text("scene_key: demo\n", encoding="utf-8")
+            self.target._scene_source_paths = lambda: [asset]
+            before = self.target.scene_source_fingerprint()
+            stat = asset.stat()
+            os.utime(asset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            self.assertNotEqual(before, self.target.scene_source_fingerprint())
+
+    def test_merged_layer_replays_drift_and_invalidates_on_generation_bump(self):
+        env = _FakeEnv({self.target.REGISTRY_GENERATION_PARAM: "1"})
+
+        first_drift = []
+        _rows, first_timings = self.target.load_scene_configs_with_timings(env, drift=first_drift)
+        second_drift = []
+        rows, second_timings = self.target.load_scene_configs_with_timings(env, drift=second_drift)
+
+        self.assertIn("compiled_registry_cache_miss", first_timings)
+        self.assertIn("compiled_registry_cache_hit", second_timings)
+        self.assertEqual(len(self.db_calls), 1)
+        self.assertEqual(first_drift, second_drift)
+        self.assertEqual(next(row for row in rows if row.get("code") == "projects.list").get("name"), "项目台账")
+
+        self.target.bump_scene_registry_generation(env)
+        _rows, third_timings = self.target.load_scene_configs_with_timings(env)
+        self.assertIn("compiled_registry_cache_miss", third_timings)
+        self.assertEqual(len(self.db_calls), 2)
+
+    def test_generation_cache_keeps_one_slot_per_db(self):
+        env = _FakeEnv({self.target.REGISTRY_GENERATION_PARAM: "1"})
+        cache = {}
+
+        slot = self.target.scene_cache_slot(env)
+        self.target.generation_cache_put(cache, slot, {"v": 1})
+        self.assertEqual(self.target.generation_cache_get(cache, slot), {"v": 1})
+
+        self.target.bump_scene_registry_generation(env)
+        new_slot = self.target.scene_cache_slot(env)
+        self.assertIsNone(self.target.generation_cache_get(cache, new_slot))
+        self.target.generation_cache_put(cache, new_slot, {"v": 2})
+
+        self.assertEqual(list(cache), ["sc_test"])
+        self.assertEqual(self.target.generation_cache_get(cache, new_slot), {"v": 2})
+
+    def test_touch_bumps_generation_at_precommit_and_bypasses_cache_meanwhile(self):
+        env = _FakeEnv({self.target.REGISTRY_GENERATION_PARAM: "1"})
+        cache = {}
+        self.target.generation_cache_put(cache, self.target.scene_cache_slot(env), {"v": 1})
+
+        self.target.mark_scene_registry_dirty(env)
+        self.target.mark_scene_registry_dirty(env)
+
+        self.assertEqual(env.params.values[self.target.REGISTRY_GENERATION_PARAM], "1")
+        self.assertEqual(len(env.cr.precommit.funcs), 1)
+        self.assertIsNone(self.target.scene_cache_slot(env))
+        self.assertIsNone(self.target._compiled_scene_cache_key(env, "fp", False))
+
+        env.cr.precommit.run()
+
+        self.assertNotEqual(env.params.values[self.target.REGISTRY_GENERATION_PARAM], "1")
+        self.assertIsNone(self.target.generation_cache_get(cache, self.target.scene_cache_slot(env)))
+
+    def test_cold_worker_starts_from_persisted_artifact(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = _FakeEnv({self.target.REGISTRY_CACHE_DIR_PARAM: tmp})
+            self.target._load_from_db = lambda env, drift=None: []
+            self.target.load_scene_configs_with_timings(env)
+            self.target.clear_compiled_scene_cache()
+
+            def _fail():
+                raise AssertionError("sources should come from the artifact")
+
+            self.target._compile_scene_sources_with_timings = _fail
+            self.target._registry_cache_ttl_seconds = lambda env: 0
+            rows, timings = self.target.load_scene_configs_with_timings(env)
+
+        self.assertIn("compiled_sources_artifact_hit", timings)
+        self.assertTrue(any(row.get("code") == "projects.list" for row in rows))
+
+    def test_cache_can_be_disabled(self):
+        env = _FakeEnv({self.target.REGISTRY_CACHE_PARAM: "0"})
+        self.target.load_scene_configs_with_timings(env)
+        _rows, timings = self.target.load_scene_configs_with_timings(env)
+
+        self.assertIn("compiled_sources_cache_miss", timings)
+        self.assertIn("compiled_registry_cache_miss", timings)
+        self.assertEqual(len(self.db_calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
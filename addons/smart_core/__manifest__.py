@@ -8,7 +8,7 @@
 - 意图调度总线（/api/intent），用于场景化业务动作
 - 私有缓存与多公司/多语言上下文透传
 """,
-    "version": "17.0.1.0",
+    "version": "17.0.1.1",
     "author": "Leedefend",
     "website": "https://example.com",
     "category": "Technical/Framework",
@@ -25,6 +25,12 @@
         "security/ir.model.access.csv",
         "data/sc_subscription_default.xml",
         "data/ui_base_contract_asset_cron.xml",
+        "data/startup_snapshot_cron.xml",
+        "data/usage_telemetry_cron.xml",
+        "data/idempotency_key_cron.xml",
+        "data/file_upload_session_cron.xml",
+        "data/legacy_file_cache_cron.xml",
+        "data/global_message_unread_cron.xml",
         "views/platform_company_access_views.xml",
         "views/ui_menu_config_policy_views.xml",
         # 可选：默认参数/开关
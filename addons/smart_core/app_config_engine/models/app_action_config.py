@@ -8,8 +8,11 @@ _logger = logging.getLogger(__name__)
 try:
     # 解析视图按钮用（若环境缺 lxml，可按需降级）
     from lxml import etree
+    from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 except Exception:
     etree = None
+    arch_root = None
+    indexed_nodes = None
 
 
 class AppActionConfig(models.Model):
@@ -339,9 +342,9 @@ class AppActionConfig(models.Model):
                     continue
                 if etree is None:
                     continue  # 环境缺 lxml 时略过（可改为简单字符串查找）
-                root = etree.fromstring(arch.encode('utf-8'))
+                root = arch_root(arch)
                 # 找所有 button
-                for btn in root.xpath('.//button'):
+                for btn in indexed_nodes(root, "button"):
                     b_type = btn.get('type') or 'object'
                     name = btn.get('name') or ''
                     string = btn.get('string') or btn.get('title') or name
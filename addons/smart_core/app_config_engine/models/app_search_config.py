@@ -8,8 +8,11 @@ _logger = logging.getLogger(__name__)
 
 try:
     from lxml import etree
+    from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 except Exception:
     etree = None
+    arch_root = None
+    indexed_nodes = None
 
 
 class AppSearchConfig(models.Model):
@@ -298,10 +301,10 @@ class AppSearchConfig(models.Model):
             return filters, []
 
         try:
-            root = etree.fromstring(arch.encode('utf-8'))
-            nodes = [root] if root.tag == 'search' else root.xpath('.//search')
+            root = arch_root(arch)
+            nodes = [root] if root.tag == 'search' else indexed_nodes(root, "search")
             for s in nodes:
-                for f in s.xpath('.//filter'):
+                for f in indexed_nodes(s, "filter"):
                     name = f.get('name') or ''
                     label = f.get('string') or name
                     domain_raw = f.get('domain')
@@ -22,6 +22,8 @@ from odoo.addons.smart_core.app_config_engine.services.contract_governance_filte
     ContractGovernanceFilterService,
 )
 from odoo.addons.smart_core.core.view_orchestrator import ViewOrchestrator
+from odoo.addons.smart_core.core.contract_cache import contract_cache_key, get_or_build
+from odoo.addons.smart_core.core.view_arch_cache import arch_plain_root, indexed_nodes
 
 _logger = logging.getLogger(__name__)
 
@@ -359,9 +361,8 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
 
             # 3) 降级/合并默认排序（tree）
             if view_type == 'tree' and view_data and view_data.get('arch'):
-                import xml.etree.ElementTree as ET
                 try:
-                    root = ET.fromstring(view_data['arch'])
+                    root = arch_plain_root(view_data['arch'])
                     tag_ok = (root.tag in ('tree', 'list'))
                     if tag_ok and root.get('default_order'):
                         parsed_json['order'] = root.get('default_order')
@@ -371,11 +372,10 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
 
             # 3.2) 仅在解析器未给 columns 时，才用原始视图可见字段覆盖（保持保真）
             if view_type == 'tree' and view_data and view_data.get('arch') and not parsed_json.get('columns'):
-                import xml.etree.ElementTree as ET
                 try:
-                    root = ET.fromstring(view_data['arch'])
+                    root = arch_plain_root(view_data['arch'])
                     visible_fields = []
-                    for field in root.findall('.//field[@name]'):
+                    for field in indexed_nodes(root, "field", named=True):
                         fname = field.get('name')
                         is_invisible = field.get('column_invisible')
                         if fname and is_invisible not in ('True', '1'):
@@ -535,6 +535,46 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             block['dashboard'] = vp.get('dashboard', {'cards': []})
         return block
 
+    @api.model
+    def get_compiled_contract_api(self, model_name, view_type, runtime_user=None, filter_runtime=True, check_model_acl=True):
+        """
+        解析 + 最终契约的缓存入口（_generate_from_fields_view_get → get_contract_api）。
+        按 (模型, 视图类型, 动作/菜单/视图上下文, 用户组集合, lang, company) 跨用户共享，
+        来源变更由 contract_cache 代际计数统一失效。
+        """
+        ctx = dict(self.env.context or {})
+        user = runtime_user or self.env.user
+        scoped_keys = (
+            'contract_action_id',
+            'contract_menu_id',
+            'contract_subject',
+            'contract_view_id',
+            'contract_projection_readonly',
+            'contract_force_parser',
+            'contract_force_fallback',
+        )
+        runtime_env = self.with_user(user).env
+        key = contract_cache_key(
+            runtime_env,
+            kind='app.view.config',
+            model=model_name,
+            view_type=view_type,
+            action_id=ctx.get('contract_action_id'),
+            menu_id=ctx.get('contract_menu_id'),
+            extra={
+                'scope': {k: ctx.get(k) for k in scoped_keys if ctx.get(k) is not None},
+                'filter_runtime': bool(filter_runtime),
+                'check_model_acl': bool(check_model_acl),
+            },
+        )
+
+        def build():
+            cfg = self._generate_from_fields_view_get(model_name, view_type)
+            runtime_cfg = cfg.with_user(user).sudo().with_context(**ctx)
+            return runtime_cfg.get_contract_api(filter_runtime=filter_runtime, check_model_acl=check_model_acl)
+
+        return get_or_build(runtime_env, key, build)
+
     def _view_orchestration_version_token(self, contract):
         trace = {}
         if isinstance(contract, dict):
@@ -594,9 +634,8 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             if isinstance(data, dict) and data.get('arch'):
                 arch = data.get('arch', '')
                 if arch:
-                    import xml.etree.ElementTree as ET
                     try:
-                        root = ET.fromstring(arch)
+                        root = arch_plain_root(arch)
                         if root.tag != view_type and not (view_type == 'tree' and root.tag == 'list'):
                             _logger.warning("视图类型不匹配: 请求 %s 但获得 %s", view_type, root.tag)
                     except Exception as e:
@@ -632,8 +671,6 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
         - tree：保留你原有逻辑
         - kanban：提供最小可渲染块，避免误用 form 逻辑
         """
-        import xml.etree.ElementTree as ET
-
         fields_get = (view_data or {}).get('fields') or self.env[model_name].sudo().fields_get()
         arch = (view_data or {}).get('arch', '') or ''
         base = {
@@ -649,10 +686,10 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             order_default = getattr(self.env[model_name], '_order', 'id desc') or 'id desc'
             if arch:
                 try:
-                    root = ET.fromstring(arch)
+                    root = arch_plain_root(arch)
                     if root.get('default_order'):
                         order_default = root.get('default_order')
-                    for field in root.findall('.//field[@name]'):
+                    for field in indexed_nodes(root, "field", named=True):
                         fname = field.get('name')
                         is_invisible = field.get('column_invisible')
                         if fname and is_invisible not in ('True', '1'):
@@ -717,7 +754,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             kb = {'template_qweb': None, 'quick_create': True, 'stages_field': 'stage_id', 'fields': []}
             if arch:
                 try:
-                    root = ET.fromstring(arch)
+                    root = arch_plain_root(arch)
                     # 常见分组字段：不同版本/模块写法不一，这里尽量从属性里推断
                     for attr in ('default_group_by', 'group_by', 'stages_field'):
                         val = root.get(attr)
@@ -733,7 +770,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
                         kb['js_class'] = root.get('js_class')
                     known_fields = set((fields_get or {}).keys())
                     seen_fields = set()
-                    for field_node in root.findall('.//field[@name]'):
+                    for field_node in indexed_nodes(root, "field", named=True):
                         fname = (field_node.get('name') or '').strip()
                         if not fname or fname in seen_fields:
                             continue
@@ -750,11 +787,11 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             search = {'filters': [], 'group_by': [], 'group_by_fields': [], 'search_fields': [], 'facets': {'enabled': True}}
             if arch:
                 try:
-                    root = ET.fromstring(arch)
-                    search_nodes = [root] if root.tag == 'search' else list(root.findall('.//search'))
+                    root = arch_plain_root(arch)
+                    search_nodes = [root] if root.tag == 'search' else list(indexed_nodes(root, "search"))
                     seen_group_by = set()
                     for search_node in search_nodes:
-                        for field_node in search_node.findall('.//field'):
+                        for field_node in indexed_nodes(search_node, "field"):
                             fname = (field_node.get('name') or '').strip()
                             if not fname:
                                 continue
@@ -765,7 +802,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
                                 'filter_domain_raw': field_node.get('filter_domain') or '',
                                 'context_raw': field_node.get('context') or '',
                             })
-                        for filter_node in search_node.findall('.//filter'):
+                        for filter_node in indexed_nodes(search_node, "filter"):
                             name = filter_node.get('name') or filter_node.get('string') or ''
                             context_raw = filter_node.get('context') or ''
                             search['filters'].append({
@@ -802,7 +839,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             }
             if arch:
                 try:
-                    root = ET.fromstring(arch)
+                    root = arch_plain_root(arch)
                     if root.tag != 'calendar':
                         root = root.find('.//calendar') or root
                     cal['native_attrs'] = dict(root.attrib or {})
@@ -830,7 +867,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             }
             if arch:
                 try:
-                    root = ET.fromstring(arch)
+                    root = arch_plain_root(arch)
                     if root.tag != 'gantt':
                         root = root.find('.//gantt') or root
                     gantt['native_attrs'] = dict(root.attrib or {})
@@ -859,7 +896,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             }
             if arch:
                 try:
-                    root = ET.fromstring(arch)
+                    root = arch_plain_root(arch)
                     if root.tag != 'activity':
                         root = root.find('.//activity') or root
                     activity['native_attrs'] = dict(root.attrib or {})
@@ -884,7 +921,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
             header = root.find('.//header')
             if header is None:
                 return btns
-            for b in header.findall('.//button'):
+            for b in indexed_nodes(header, "button"):
                 item = {
                     'name': b.get('name'),
                     'string': b.get('string') or b.get('title') or '',
@@ -910,7 +947,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
                 klass = (div.get('class') or '')
                 if 'oe_button_box' not in klass:
                     continue
-                for b in div.findall('.//button'):
+                for b in indexed_nodes(div, "button"):
                     if 'oe_stat_button' not in (b.get('class') or ''):
                         continue
                     stats.append({
@@ -1087,7 +1124,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
         # 开始解析 FORM
         if arch:
             try:
-                root = ET.fromstring(arch)
+                root = arch_plain_root(arch)
             except Exception as e:
                 _logger.warning("FORM fallback: XML 解析失败，将使用极简布局: %s", e)
                 root = None
@@ -1120,7 +1157,7 @@ class AppViewConfig(models.Model, ContractSchemaMixin):
     def _fallback_view_field_nodes(self, root):
         rows = []
         seen = set()
-        for field_node in root.findall('.//field') if root is not None else []:
+        for field_node in indexed_nodes(root, "field") if root is not None else []:
             name = (field_node.get('name') or '').strip()
             if not name or name in seen:
                 continue
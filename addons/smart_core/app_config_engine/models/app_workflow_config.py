@@ -426,11 +426,12 @@ class AppWorkflowConfig(models.Model):
         """
         out = []
         try:
-            from lxml import etree
+            from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
+
             if not arch:
                 return out
-            root = etree.fromstring(arch.encode('utf-8'))
-            for btn in root.xpath('.//button'):
+            root = arch_root(arch)
+            for btn in indexed_nodes(root, "button"):
                 btype = btn.get('type') or 'object'
                 name = btn.get('name') or ''
                 label = btn.get('string') or btn.get('title') or name
@@ -326,14 +326,14 @@ class PageAssembler:
                 if requested_view_id and len(view_types) == 1:
                     scoped_view_context["contract_view_id"] = requested_view_id
                 view_config_model = env['app.view.config'].with_context(**scoped_view_context) if scoped_view_context else env['app.view.config']
-                vcfg = view_config_model._generate_from_fields_view_get(model, vt)
                 # app.view.config is platform metadata and ordinary business
                 # users do not read it directly. Keep metadata access elevated,
                 # but bind the environment user to the real requester so
                 # runtime group/ACL filtering still matches native Odoo.
-                vcfg_runtime = vcfg.with_user(env.user).sudo().with_context(**scoped_view_context)
-                v_contract = vcfg_runtime.get_contract_api(filter_runtime=True, check_model_acl=True)
-                v_versions.append(str(v_contract.get("effective_version") or vcfg.version))
+                v_contract = view_config_model.get_compiled_contract_api(
+                    model, vt, runtime_user=env.user, filter_runtime=True, check_model_acl=True
+                )
+                v_versions.append(str(v_contract.get("effective_version") or v_contract.get("version") or ""))
             except KeyError:
                 mark_missing("app.view.config")
                 _logger.warning("app.view.config missing; fallback view contract for model=%s vt=%s", model, vt)
@@ -2167,9 +2167,9 @@ class PageAssembler:
         context = dict(view_context or {})
         context["contract_projection_readonly"] = True
         try:
-            view_config = env["app.view.config"].with_context(**context)._generate_from_fields_view_get(model, "search")
-            runtime_view_config = view_config.with_user(env.user).sudo().with_context(**context)
-            search_contract = runtime_view_config.get_contract_api(filter_runtime=True, check_model_acl=True)
+            search_contract = env["app.view.config"].with_context(**context).get_compiled_contract_api(
+                model, "search", runtime_user=env.user, filter_runtime=True, check_model_acl=True
+            )
         except Exception:
             _logger.exception("Failed to apply search view orchestration for model=%s", model)
             return
@@ -5,7 +5,7 @@ smart_core/app_config_engine/services/contract_service.py
   1) 读取 JSON Body、If-None-Match（ETag）；
   2) 解析/规范化 payload；
   3) 根据 subject 分发到对应 Dispatcher；
-  4) 计算 ETag、命中 304、拼装 meta；
+  4) 先按版本向量预判 304（不组装契约），再计算 ETag、拼装 meta；
   5) 返回响应三件套：status/headers/body
 
 相对原版的关键改动：
@@ -29,6 +29,10 @@ from odoo.addons.smart_core.app_config_engine.services.dispatchers.nav_dispatche
 from odoo.addons.smart_core.app_config_engine.services.dispatchers.menu_dispatcher import MenuDispatcher
 from odoo.addons.smart_core.app_config_engine.services.dispatchers.action_dispatcher import ActionDispatcher
 from odoo.addons.smart_core.core.trace import get_trace_id
+from odoo.addons.smart_core.core.contract_version_vector import (
+    build_contract_version_vector,
+    contract_version_etag,
+)
 from odoo.addons.smart_core.core.exceptions import (
     BAD_REQUEST,
     VALIDATION_ERROR,
@@ -122,6 +126,13 @@ class ContractService:
         contract_mode = resolve_contract_mode(payload if isinstance(payload, dict) else p)
         _logger.debug("CONTRACT_PARSED_PAYLOAD %s", p)
 
+        # 2.x) 版本向量预判：客户端已持有同版本契约时，直接 304，不进入分发/统一化/治理
+        # 约定：with_data=True 时不缓存（避免列表数据频繁变化造成误判）
+        skip_cache = bool(p.get("with_data"))
+        version_etag = "" if skip_cache else self._version_etag(p, contract_mode)
+        if version_etag and client_etag and client_etag == version_etag:
+            return True, 304, [("ETag", version_etag), ("X-Trace-Id", trace_id)], b''
+
         # 3) 根据 subject 分发
         subject = p.get('subject')
         data, versions = {}, {}
@@ -153,10 +164,8 @@ class ContractService:
             return _err(422, VALIDATION_ERROR, "contract_self_check_failed", {"detail": str(ae)})
         # -----------------------------------------
 
-        # 4) 计算 ETag，支持 304
-        etag = stable_etag({"data": data, "contract_mode": contract_mode})
-        # 约定：with_data=True 时不缓存（避免列表数据频繁变化造成误判）
-        skip_cache = bool(p.get("with_data"))
+        # 4) 计算 ETag，支持 304（版本向量不可用时回退为内容哈希）
+        etag = version_etag or stable_etag({"data": data, "contract_mode": contract_mode})
         if not skip_cache and client_etag and client_etag == etag:
             # 命中 304：只回 ETag，body 为空
             return True, 304, [("ETag", etag), ("X-Trace-Id", trace_id)], b''
@@ -184,6 +193,20 @@ class ContractService:
             ("X-Trace-Id", trace_id),
         ], body
 
+    def _version_etag(self, p: dict, contract_mode: str) -> str:
+        """按契约版本向量计算 ETag；向量不可用时返回空串，由调用方回退到内容哈希。"""
+        ctx = p.get("context") if isinstance(p.get("context"), dict) else {}
+        vector = build_contract_version_vector(
+            self.env,
+            model=p.get("model"),
+            action_id=p.get("action_id"),
+            menu_id=p.get("menu_id"),
+            lang=ctx.get("lang") or self.env.context.get("lang"),
+            contract_mode=contract_mode,
+            request_key={"carrier": "contract_service", "payload": p},
+        )
+        return contract_version_etag(vector)
+
     # =========================
     # 对外唯一需要调用的入口
     # =========================
@@ -10,6 +10,7 @@ services/view_Parser/base.py
 from odoo import models, api, _
 from odoo.tools.safe_eval import safe_eval
 from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 import logging
 import json
 
@@ -78,7 +79,7 @@ class _BaseViewParserMixin:
         try:
             if not xml_content or (isinstance(xml_content, str) and not xml_content.strip()):
                 return {}
-            root = etree.fromstring(xml_content.encode('utf-8')) if isinstance(xml_content, str) else xml_content
+            root = arch_root(xml_content)
             return self._xml_to_dict(root, preserve_all=True)
         except Exception as e:
             _logger.error("XML parsing failed: %s", e)
@@ -146,8 +147,8 @@ class _BaseViewParserMixin:
         try:
             if not arch:
                 return {}
-            root = etree.fromstring(arch.encode('utf-8'))
-            for fld in root.xpath('.//field[@name]'):
+            root = arch_root(arch)
+            for fld in indexed_nodes(root, "field", named=True):
                 name = fld.get('name')
                 if not name:
                     continue
@@ -10,7 +10,7 @@ import logging
 
 from .base import _BaseViewParserMixin
 from importlib import import_module
-from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 
 _logger = logging.getLogger(__name__)
 
@@ -168,8 +168,8 @@ class OdooViewParser(_BaseViewParserMixin,
         missing = []
         if arch:
             try:
-                root = etree.fromstring(arch.encode('utf-8'))
-                for el in root.xpath(".//field[@name]"):
+                root = arch_root(arch)
+                for el in indexed_nodes(root, "field", named=True):
                     fname = (el.get("name") or "").strip()
                     field_string = (el.get("string") or "").strip()
                     if fname and field_string and isinstance(out.get(fname), dict):
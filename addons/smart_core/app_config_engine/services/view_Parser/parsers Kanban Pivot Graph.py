@@ -5,6 +5,7 @@ services/view_Parser/parsers Kanban Pivot Graph.py
 kanban / pivot / graph 解析
 """
 from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -40,7 +41,7 @@ class _KanbanPivotGraphParserMixin:
         try:
             if not arch:
                 return out
-            root = etree.fromstring(arch.encode('utf-8'))
+            root = arch_root(arch)
             if root.tag != 'kanban':
                 kn = root.xpath('.//kanban')
                 if kn:
@@ -68,7 +69,7 @@ class _KanbanPivotGraphParserMixin:
 
             seen_fields = set()
             known_fields = set((fields_info or {}).keys())
-            for field_node in root.xpath('.//field[@name]'):
+            for field_node in indexed_nodes(root, "field", named=True):
                 fname = (field_node.get('name') or '').strip()
                 if not fname or fname in seen_fields:
                     continue
@@ -81,7 +82,7 @@ class _KanbanPivotGraphParserMixin:
             out["template_qweb"] = tmpl and etree.tostring(tmpl[0], encoding='unicode') or None
 
             quick = []
-            for btn in root.xpath('.//button'):
+            for btn in indexed_nodes(root, "button"):
                 entry = self._button_to_action(btn, level='header')
                 if entry:
                     quick.append(entry)
@@ -97,8 +98,8 @@ class _KanbanPivotGraphParserMixin:
         measures, dimensions = [], []
         try:
             if arch:
-                root = etree.fromstring(arch.encode('utf-8'))
-                for fld in root.xpath('.//field[@name]'):
+                root = arch_root(arch)
+                for fld in indexed_nodes(root, "field", named=True):
                     name = fld.get('name')
                     ftype = fld.get('type')
                     label = fld.get('string') or name
@@ -116,7 +117,7 @@ class _KanbanPivotGraphParserMixin:
                             "axis": dim_type,
                             "interval": fld.get('interval') or None
                         })
-                for ms in root.xpath('.//measure[@name]'):
+                for ms in indexed_nodes(root, "measure", named=True):
                     measures.append({
                         "name": ms.get('name'),
                         "label": ms.get('string') or ms.get('name'),
@@ -132,9 +133,9 @@ class _KanbanPivotGraphParserMixin:
         type_default = "bar"
         try:
             if arch:
-                root = etree.fromstring(arch.encode('utf-8'))
+                root = arch_root(arch)
                 type_default = root.get('type') or type_default
-                for fld in root.xpath('.//field[@name]'):
+                for fld in indexed_nodes(root, "field", named=True):
                     name = fld.get('name')
                     ftype = fld.get('type')
                     label = fld.get('string') or name
@@ -151,7 +152,7 @@ class _KanbanPivotGraphParserMixin:
                             "label": label,
                             "interval": fld.get('interval') or None
                         })
-                for ms in root.xpath('.//measure[@name]'):
+                for ms in indexed_nodes(root, "measure", named=True):
                     name = ms.get('name')
                     label = ms.get('string') or name
                     measures.append({
@@ -13,6 +13,7 @@ Tree / Form 解析、表单布局转换、按钮归一化（增强版，直接
 """
 from odoo import _
 from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 import logging
 import ast
 import json
@@ -420,7 +421,7 @@ class _TreeFormParserMixin:
         default_order = None
 
         try:
-            root = etree.fromstring(arch.encode('utf-8')) if arch else None
+            root = arch_root(arch) if arch else None
             if root is not None and root.tag in ('tree', 'list'):
                 # default_order / editable / create / delete / limit
                 default_order = root.get('default_order')
@@ -466,7 +467,7 @@ class _TreeFormParserMixin:
                 _logger.debug("TREE_PARSER_DEBUG: parsed_columns=%s", columns)
 
                 # 2) 行级按钮（tree 内所有 <button>）
-                for btn in root.xpath('.//button'):
+                for btn in indexed_nodes(root, "button"):
                     entry = self._button_to_action(btn, level='row')
                     if entry:
                         row_actions.append(entry)
@@ -565,7 +566,7 @@ class _TreeFormParserMixin:
         root = None
         if arch:
             try:
-                root = etree.fromstring(arch.encode('utf-8'))
+                root = arch_root(arch)
             except Exception:
                 _logger.exception("FORM_PARSER_DEBUG: XML parse failed, fallback to minimal layout")
 
@@ -867,7 +868,7 @@ class _TreeFormParserMixin:
             return {k: (v if v is None or not v.strip() else v) for k, v in (e.attrib or {}).items()}
 
         if self._has_class(el, 'oe_chatter'):
-            chatter_fields = [f.get('name') for f in el.xpath(".//field[@name]") if f.get('name')]
+            chatter_fields = [f.get('name') for f in indexed_nodes(el, "field", named=True) if f.get('name')]
             return {
                 'type': 'chatter',
                 'name': 'chatter',
@@ -1202,7 +1203,7 @@ class _TreeFormParserMixin:
 
         # 再从 arch 覆盖/补充
         if root is not None:
-            for el in root.xpath(".//field[@name]"):
+            for el in indexed_nodes(root, "field", named=True):
                 fname = el.get('name')
                 if not fname:
                     continue
@@ -1226,7 +1227,7 @@ class _TreeFormParserMixin:
         sub = {}
         if root is None:
             return sub
-        for el in root.xpath(".//field[@name]"):
+        for el in indexed_nodes(root, "field", named=True):
             fname = el.get('name')
             finfo = (fields_info or {}).get(fname) or {}
             ftype = finfo.get('type')
@@ -1254,9 +1255,9 @@ class _TreeFormParserMixin:
                             if vt in ('tree', 'form'):
                                 blk = self._safe_get_view_data(self.env[relation], vt)
                                 if vt == 'tree':
-                                    entry['tree'] = self._parse_inline_tree_columns(etree.fromstring((blk or {}).get('arch', '').encode('utf-8'))) if (blk or {}).get('arch') else entry.get('tree')
+                                    entry['tree'] = self._parse_inline_tree_columns(arch_root((blk or {}).get('arch', ''))) if (blk or {}).get('arch') else entry.get('tree')
                                 else:
-                                    entry['form'] = {"layout": self._extract_form_layout_dom(etree.fromstring((blk or {}).get('arch','').encode('utf-8')), {})} if (blk or {}).get('arch') else entry.get('form')
+                                    entry['form'] = {"layout": self._extract_form_layout_dom(arch_root((blk or {}).get('arch','')), {})} if (blk or {}).get('arch') else entry.get('form')
                 # context="{'tree_view_ref': 'xmlid'}" 风格
                 ctx = self._safe_eval_expr(el.get('context')) if el.get('context') else None
                 xmlid = (isinstance(ctx, dict) and (ctx.get('tree_view_ref') or ctx.get('form_view_ref')))
@@ -1268,9 +1269,9 @@ class _TreeFormParserMixin:
                         if res and res[0] == 'ir.ui.view':
                             view_rec = self.env['ir.ui.view'].browse(res[1])
                             if view_rec.type == 'tree':
-                                entry['tree'] = self._parse_inline_tree_columns(etree.fromstring(view_rec.arch_db.encode('utf-8')))
+                                entry['tree'] = self._parse_inline_tree_columns(arch_root(view_rec.arch_db))
                             elif view_rec.type == 'form':
-                                entry['form'] = {"layout": self._extract_form_layout_dom(etree.fromstring(view_rec.arch_db.encode('utf-8')), {})}
+                                entry['form'] = {"layout": self._extract_form_layout_dom(arch_root(view_rec.arch_db), {})}
                     except Exception:
                         pass
             except Exception:
@@ -5,6 +5,7 @@ services/view_Parser/parsers_Calendar_Gantt Activity.py
 calendar / gantt / activity / search 解析与合并
 """
 from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ class _CalendarGanttActivitySearchParserMixin:
         }
         try:
             if arch:
-                root = etree.fromstring(arch.encode('utf-8'))
+                root = arch_root(arch)
                 if root.tag != 'calendar':
                     cals = root.xpath('.//calendar')
                     root = cals[0] if cals else root
@@ -91,7 +92,7 @@ class _CalendarGanttActivitySearchParserMixin:
         }
         try:
             if arch:
-                root = etree.fromstring(arch.encode('utf-8'))
+                root = arch_root(arch)
                 if root.tag != 'gantt':
                     g = root.xpath('.//gantt')
                     root = g[0] if g else root
@@ -140,7 +141,7 @@ class _CalendarGanttActivitySearchParserMixin:
         }
         try:
             if arch:
-                root = etree.fromstring(arch.encode('utf-8'))
+                root = arch_root(arch)
                 if root.tag != 'activity':
                     ac = root.xpath('.//activity')
                     root = ac[0] if ac else root
@@ -164,8 +165,8 @@ class _CalendarGanttActivitySearchParserMixin:
         try:
             if not arch:
                 return out
-            root = etree.fromstring(arch.encode('utf-8'))
-            search_nodes = root.xpath('.//search') if root.tag != 'search' else [root]
+            root = arch_root(arch)
+            search_nodes = indexed_nodes(root, "search") if root.tag != 'search' else [root]
             if not search_nodes:
                 return out
 
@@ -175,7 +176,7 @@ class _CalendarGanttActivitySearchParserMixin:
             group_by_fields = []
             search_fields = []
             for s in search_nodes:
-                for field in s.xpath('.//field[@name]'):
+                for field in indexed_nodes(s, "field", named=True):
                     fname = (field.get('name') or '').strip()
                     if not fname:
                         continue
@@ -186,7 +187,7 @@ class _CalendarGanttActivitySearchParserMixin:
                         "filter_domain_raw": field.get('filter_domain') or '',
                         "context_raw": field.get('context') or '',
                     })
-                for f in s.xpath('.//filter'):
+                for f in indexed_nodes(s, "filter"):
                     name = f.get('name') or ''
                     label = f.get('string') or name
                     domain_raw = f.get('domain')
@@ -296,7 +297,7 @@ class _CalendarGanttActivitySearchParserMixin:
     def _parse_view_field_nodes(self, root):
         rows = []
         seen = set()
-        for field in root.xpath('.//field[@name]') if root is not None else []:
+        for field in indexed_nodes(root, "field", named=True) if root is not None else []:
             name = (field.get('name') or '').strip()
             if not name or name in seen:
                 continue
@@ -4,7 +4,7 @@
 #   - extract_tree_columns_strict：从 <tree> 严格提取列（按 XML 顺序，仅可渲染）；
 #   - normalize_cols_safely：将 columns 正常化/回退，过滤隐字段/one2many。
 import logging
-from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 
 _logger = logging.getLogger(__name__)
 SOURCE_KIND = "odoo_tree_view_column_projection"
@@ -41,7 +41,7 @@ def extract_tree_columns_strict(arch_db: str, fields_map: dict):
     if not arch_db:
         return [], None
     try:
-        root = etree.fromstring(arch_db.encode('utf-8'))
+        root = arch_root(arch_db)
     except Exception as e:
         _logger.warning("extract_tree_columns_strict parse error: %s", e)
         return [], None
@@ -50,7 +50,7 @@ def extract_tree_columns_strict(arch_db: str, fields_map: dict):
 
     default_order = root.get('default_order') or None
     cols = []
-    for node in root.findall('.//field'):
+    for node in indexed_nodes(root, "field"):
         name = node.get('name')
         if not name or name in TREE_EXCLUDE_NAMES:
             continue
@@ -1,4 +1,6 @@
 from . import intent_dispatcher
 from . import platform_menu_api
 from . import platform_ops_controller
+from . import file_download_controller
+from . import file_upload_controller
 from ..app_config_engine.controllers import contract_api
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# 📄 smart_core/controllers/file_download_controller.py
+# 凭 file.download 签发的短期令牌流式下载附件（Range / ETag / Last-Modified / X-Accel-Redirect）
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from odoo import http
+from odoo.http import Response, Stream, request
+from odoo.tools import config
+
+from odoo.addons.smart_core.core.file_download_token import (
+    DOWNLOAD_ROUTE,
+    FileDownloadTokenError,
+    verify_download_token,
+)
+from odoo.addons.smart_core.core.legacy_file_cache import cache_root, cached_file
+from odoo.addons.smart_core.handlers.file_download import (
+    _remote_legacy_file_candidates,
+    _resolve_legacy_file_path,
+)
+
+_logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_BYTES = 256 * 1024
+REMOTE_TIMEOUT_SECONDS = 30
+# 旧系统镜像目录交给前置 nginx 输出："/mnt/legacy-files=/_legacy_files,/opt/x=/_legacy_x"
+LEGACY_FILE_ACCEL_MAP_ENV = "SC_LEGACY_FILE_ACCEL_MAP"
+RELAYED_REMOTE_HEADERS = ("Content-Length", "Content-Range", "Accept-Ranges", "ETag", "Last-Modified")
+
+
+def _error(status: int, message: str):
+    return request.make_json_response({"ok": False, "error": {"code": status, "message": message}}, status=status)
+
+
+def _content_disposition(name: str, as_attachment: bool) -> str:
+    disposition = "attachment" if as_attachment else "inline"
+    return f"{disposition}; filename*=UTF-8''{quote(name or 'download', safe='')}"
+
+
+def _legacy_accel_redirect(path: Path) -> str:
+    raw = str(os.environ.get(LEGACY_FILE_ACCEL_MAP_ENV) or "").strip()
+    if not raw:
+        return ""
+    for item in raw.replace("\n", ",").split(","):
+        root, _sep, prefix = item.strip().partition("=")
+        if not root or not prefix:
+            continue
+        try:
+            relative = path.relative_to(Path(root).resolve())
+        except ValueError:
+            continue
+        return prefix.rstrip("/") + "/" + "/".join(quote(part) for part in relative.parts)
+    return ""
+
+
+def _iter_remote(response):
+    try:
+        while True:
+            chunk = response.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        response.close()
+
+
+def _open_remote(url: str):
+    headers = {"User-Agent": "Mozilla/5.0"}
+    range_header = request.httprequest.headers.get("Range")
+    if range_header:
+        headers["Range"] = range_header
+    try:
+        return urlopen(Request(url, headers=headers), timeout=REMOTE_TIMEOUT_SECONDS)
+    except HTTPError as exc:
+        if exc.code == 416:
+            return exc
+        raise
+
+
+class FileDownloadController(http.Controller):
+    @http.route(f"{DOWNLOAD_ROUTE}/<string:token>", type="http", auth="public", methods=["GET", "HEAD"], csrf=False)
+    def download(self, token, download=None, **_kwargs):
+        try:
+            payload = verify_download_token(request.env, token)
+        except FileDownloadTokenError as exc:
+            return _error(403, str(exc))
+        user = request.env["res.users"].sudo().browse(int(payload.get("uid") or 0)).exists()
+        if not user or not user.active:
+            return _error(403, "下载令牌用户无效")
+        attachment = request.env["ir.attachment"].sudo().browse(int(payload.get("att") or 0)).exists()
+        if not attachment:
+            return _error(404, "附件不存在")
+
+        as_attachment = str(download or "").strip().lower() in ("1", "true", "yes")
+        name = payload.get("name") or attachment.name or "download"
+        mimetype = payload.get("mt") or attachment.mimetype or "application/octet-stream"
+        source = payload.get("src")
+        if source == "attachment":
+            stream = Stream.from_attachment(attachment)
+            stream.download_name = name
+            stream.mimetype = mimetype
+            return stream.get_response(as_attachment=as_attachment)
+        if source == "path":
+            return self._legacy_path_response(payload.get("ref") or "", name, mimetype, as_attachment)
+        if source == "cache":
+            return self._cache_response(payload.get("ref") or "", name, mimetype, as_attachment)
+        if source == "remote_url":
+            urls = [payload.get("ref") or ""]
+        else:
+            urls = [url for url, _candidate in _remote_legacy_file_candidates(payload.get("ref") or "", payload.get("base") or "")]
+        return self._remote_response([url for url in urls if url], name, mimetype, as_attachment)
+
+    def _legacy_path_response(self, relative_path, name, mimetype, as_attachment):
+        # 重新在旧系统根目录内解析，令牌中的路径不能越出配置的根目录。
+        path = _resolve_legacy_file_path(relative_path)
+        if not path:
+            return _error(404, "历史附件文件不存在")
+        try:
+            stat = path.stat()
+        except OSError:
+            _logger.exception("legacy attachment file unreadable: path=%s", path)
+            return _error(500, "历史附件读取失败")
+        accel_redirect = _legacy_accel_redirect(path)
+        if accel_redirect:
+            return Response(
+                status=200,
+                headers=[
+                    ("Content-Type", mimetype),
+                    ("Content-Disposition", _content_disposition(name, as_attachment)),
+                    ("X-Accel-Redirect", accel_redirect),
+                    ("X-Accel-Charset", "utf-8"),
+                    ("X-Content-Type-Options", "nosniff"),
+                ],
+            )
+        stream = Stream(
+            type="path",
+            path=str(path),
+            mimetype=mimetype,
+            download_name=name,
+            etag=f"{stat.st_size:x}-{stat.st_mtime_ns:x}",
+            last_modified=stat.st_mtime,
+            size=stat.st_size,
+        )
+        return stream.get_response(as_attachment=as_attachment)
+
+    def _cache_response(self, sha256, name, mimetype, as_attachment):
+        path = cached_file(cache_root(config["data_dir"], request.env.cr.dbname), sha256)
+        if not path:
+            return _error(404, "历史附件缓存不存在")
+        stat = path.stat()
+        # 内容寻址：sha256 即强校验值。
+        stream = Stream(
+            type="path",
+            path=str(path),
+            mimetype=mimetype,
+            download_name=name,
+            etag=sha256,
+            last_modified=stat.st_mtime,
+            size=stat.st_size,
+        )
+        return stream.get_response(as_attachment=as_attachment, immutable=True)
+
+    def _remote_response(self, urls, name, mimetype, as_attachment):
+        for url in urls:
+            try:
+                upstream = _open_remote(url)
+            except (OSError, URLError):
+                continue
+            headers = [
+                ("Content-Type", mimetype if mimetype != "application/octet-stream" else upstream.headers.get_content_type()),
+                ("Content-Disposition", _content_disposition(name, as_attachment)),
+                ("X-Content-Type-Options", "nosniff"),
+            ]
+            headers.extend((key, upstream.headers[key]) for key in RELAYED_REMOTE_HEADERS if upstream.headers.get(key))
+            status = getattr(upstream, "status", None) or upstream.getcode() or 200
+            return Response(_iter_remote(upstream), status=status, headers=headers, direct_passthrough=True)
+        _logger.warning("remote legacy file stream failed: urls=%s", len(urls))
+        return _error(404, "历史附件文件不存在")
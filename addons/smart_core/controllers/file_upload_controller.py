@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# 📄 smart_core/controllers/file_upload_controller.py
+# file.upload 分片续传：按 offset 以原始字节 PUT 分片，不走 JSON/base64 信封
+from __future__ import annotations
+
+import logging
+
+from odoo import http
+from odoo.exceptions import AccessDenied
+from odoo.http import request
+
+from odoo.addons.smart_core.core.file_upload_spool import UPLOAD_ROUTE, UploadChunkError
+from odoo.addons.smart_core.security.auth import get_user_from_token
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SHA256_HEADER = "X-Chunk-Sha256"
+
+
+def _json(payload: dict, status: int = 200):
+    return request.make_json_response(payload, status=status)
+
+
+def _error(status: int, message: str, offset: int | None = None):
+    error = {"code": status, "message": message}
+    if offset is not None:
+        error["offset"] = offset
+    return _json({"ok": False, "error": error, "code": status}, status=status)
+
+
+def _read_chunk(max_bytes: int) -> bytes:
+    """最多读取 max_bytes + 1 字节，超限部分由 append_chunk 判 413，不把超大请求体读入内存。"""
+    return request.httprequest.stream.read(max_bytes + 1)
+
+
+class FileUploadController(http.Controller):
+    @http.route(f"{UPLOAD_ROUTE}/<string:upload_id>", type="http", auth="public", methods=["PUT", "POST"], csrf=False)
+    def upload_chunk(self, upload_id, offset=None, **_kwargs):
+        try:
+            user = get_user_from_token()
+        except AccessDenied as exc:
+            return _error(401, str(exc) or "未登录")
+        Session = request.env(user=user)["sc.file.upload.session"]
+        session = Session.find_session(upload_id, user.id)
+        if not session:
+            return _error(404, "上传会话不存在")
+
+        max_chunk_bytes = session.max_chunk_bytes()
+        content_length = request.httprequest.content_length
+        if content_length is not None and content_length > max_chunk_bytes:
+            return _error(413, "分片过大", offset=session.received_size)
+        try:
+            offset_value = int(offset if offset is not None else request.httprequest.headers.get("X-Upload-Offset", ""))
+        except (TypeError, ValueError):
+            return _error(400, "offset 无效", offset=session.received_size)
+
+        try:
+            received = session.receive_chunk(
+                offset=offset_value,
+                data=_read_chunk(max_chunk_bytes),
+                sha256=request.httprequest.headers.get(CHUNK_SHA256_HEADER, ""),
+            )
+        except UploadChunkError as exc:
+            return _error(exc.code, exc.message, offset=exc.offset)
+        except Exception:
+            _logger.exception("file upload chunk failed: session=%s", session.id)
+            return _error(500, "分片写入失败", offset=session.received_size)
+        return _json(
+            {
+                "ok": True,
+                "data": {
+                    "upload_id": session.upload_token,
+                    "offset": received,
+                    "total_size": session.total_size,
+                    "complete": received >= session.total_size,
+                },
+            }
+        )
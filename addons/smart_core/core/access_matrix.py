@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled per-group-set access matrix.
+
+一次遍历解析用户组 xmlid、可用意图面与能力目录（角色码/权益开关/能力依赖判定），
+结果按 (组集合, 公司, 语言) 存入编译契约缓存，同组集合的用户共享同一份：
+- res.groups / sc.capability / sc.entitlement 写入会递增缓存代际，矩阵随之失效；
+- handler 注册表在进程内固定，不参与失效。
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from odoo.addons.smart_core.identity.identity_resolver import IdentityResolver
+
+from .contract_cache import contract_cache_key, get_or_build
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "compiled_access_matrix"
+SOURCE_AUTHORITIES = ("res.groups", "sc.capability", "sc.entitlement", "handler_registry")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+MATRIX_VERSION = "am1"
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="access_matrix",
+    )
+
+
+def access_matrix_key(env, user) -> str:
+    company = getattr(user, "company_id", None)
+    return contract_cache_key(
+        env,
+        kind="access_matrix",
+        extra={"v": MATRIX_VERSION, "user_company_id": getattr(company, "id", None)},
+        user=user,
+    )
+
+
+def compile_access_matrix(env, user) -> dict[str, Any]:
+    # 与 capability_provider / intent_surface_builder 互相引用，延迟导入。
+    from .capability_provider import load_capabilities_uncached
+    from .intent_surface_builder import IntentSurfaceBuilder
+
+    group_xmlids = IdentityResolver(env).user_group_xmlids(user)
+    intents, intents_meta = IntentSurfaceBuilder().collect_for_group_xmlids(env, group_xmlids)
+    return {
+        "version": MATRIX_VERSION,
+        "group_xmlids": sorted(group_xmlids),
+        "intents": intents,
+        "intents_meta": intents_meta,
+        "capabilities": load_capabilities_uncached(env, user),
+    }
+
+
+def access_matrix_for_user(env, user) -> dict[str, Any]:
+    """返回可自由修改的矩阵副本；缓存不可用时现算。"""
+    return get_or_build(env, access_matrix_key(env, user), lambda: compile_access_matrix(env, user))
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Shared read_group / search_count result cache.
+
+聚合结果共享缓存（项目概览、驾驶舱 block、决策引擎、非存储计算字段共用）：
+- 缓存键：(模型, 规范化 domain, 聚合字段, 分组, read_group 参数, 权限签名)；
+  权限签名取 ir.rule 计算后的读 domain + 用户组 + 当前公司，规则相同的用户才会命中同一条目，
+  命中前仍做 check_access_rights，缓存不会绕过 ACL；
+- aggregate_cache_scope：请求级作用域，作用域外所有调用直接查库，行为与未接入前一致；
+  可选按 sc.aggregate_cache.ttl_seconds 开启进程内短 TTL 共享（默认关闭）；
+- read_group_by_project：同一请求里针对不同项目的相同聚合合并为一次
+  read_group(domain + [("project_id", "in", ids)])，结果按项目拆分写回缓存，
+  后续按单个项目（project_id = x）查询直接命中。
+作用域只应包在只读路径上；存储型计算字段在数据变更后触发，应传 cache=False 只做合并不读缓存。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "aggregate_read_group_cache"
+SOURCE_AUTHORITIES = ("odoo.read_group", "odoo.search_count", "ir.rule")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+TTL_PARAM = "sc.aggregate_cache.ttl_seconds"
+MAX_TTL_SECONDS = 300
+SHARED_MAX_ENTRIES = 4096
+PROJECT_FIELD = "project_id"
+
+_GROUP_META_KEYS = ("__domain", "__context", "__fold", "__range")
+_MISS = object()
+_SCOPE: ContextVar[dict | None] = ContextVar("sc_aggregate_cache_scope", default=None)
+_SHARED: OrderedDict = OrderedDict()
+_SHARED_LOCK = threading.Lock()
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="aggregate_cache",
+    )
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(item) for item in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def normalize_domain(domain) -> tuple:
+    """纯 AND 的 domain 与叶子顺序无关，in/not in 的取值与顺序无关；含 | & ! 时保留原顺序。"""
+    items = []
+    for item in domain or []:
+        if isinstance(item, (list, tuple)) and len(item) == 3:
+            field, operator, value = item
+            if operator in ("in", "not in") and isinstance(value, (list, tuple, set, frozenset)):
+                value = tuple(sorted((_freeze(v) for v in value), key=repr))
+            items.append((field, operator, _freeze(value)))
+        else:
+            items.append(_freeze(item))
+    if all(isinstance(item, tuple) for item in items):
+        items.sort(key=repr)
+    return tuple(items)
+
+
+def _company_ids(env) -> tuple:
+    ids = getattr(getattr(env, "companies", None), "ids", None)
+    if ids is None:
+        ids = (getattr(env, "context", None) or {}).get("allowed_company_ids") or ()
+    return tuple(sorted(ids))
+
+
+def rule_signature(model) -> tuple:
+    """同一权限签名下 read_group 结果相同：记录规则读 domain + 用户组 + 当前公司。"""
+    env = model.env
+    companies = _company_ids(env)
+    if env.su:
+        return ("su", companies)
+    scope = _SCOPE.get()
+    memo_key = (model._name, env.uid, companies)
+    if scope is not None and memo_key in scope["signatures"]:
+        return scope["signatures"][memo_key]
+    try:
+        rule_domain = env["ir.rule"]._compute_domain(model._name, "read")
+        groups = tuple(sorted(env.user.groups_id.ids))
+        signature = ("rules", repr(list(rule_domain or [])), groups, companies)
+    except Exception:
+        signature = ("uid", env.uid, companies)
+    if scope is not None:
+        scope["signatures"][memo_key] = signature
+    return signature
+
+
+def _key(kind, model, domain, fields=(), groupby=(), kwargs=None) -> tuple:
+    return (
+        kind,
+        model.env.cr.dbname if getattr(model.env, "cr", None) is not None else "",
+        model._name,
+        normalize_domain(domain),
+        tuple(fields or ()),
+        tuple(groupby or ()),
+        _freeze(dict(kwargs or {})),
+        rule_signature(model),
+    )
+
+
+@contextmanager
+def aggregate_cache_scope(env=None, ttl_seconds=None):
+    """请求级缓存作用域；嵌套时复用最外层。env 给定且未指定 ttl 时读取系统参数。"""
+    current = _SCOPE.get()
+    if current is not None:
+        yield current
+        return
+    if ttl_seconds is None and env is not None:
+        try:
+            ttl_seconds = int(env["ir.config_parameter"].sudo().get_param(TTL_PARAM) or 0)
+        except (TypeError, ValueError):
+            ttl_seconds = 0
+    scope = {
+        "ttl": min(max(int(ttl_seconds or 0), 0), MAX_TTL_SECONDS),
+        "values": {},
+        "signatures": {},
+        "hits": 0,
+        "misses": 0,
+        "merged": 0,
+    }
+    token = _SCOPE.set(scope)
+    try:
+        yield scope
+    finally:
+        _SCOPE.reset(token)
+
+
+def cache_stats() -> dict:
+    scope = _SCOPE.get()
+    if scope is None:
+        return {}
+    return {"hits": scope["hits"], "misses": scope["misses"], "merged": scope["merged"]}
+
+
+def invalidate(model_name: str | None = None) -> None:
+    """当前作用域内的写入之后调用：丢弃该模型（或全部）的缓存条目，共享 TTL 条目同步丢弃。"""
+    scope = _SCOPE.get()
+    if scope is not None:
+        for key in [key for key in scope["values"] if model_name is None or key[2] == model_name]:
+            scope["values"].pop(key, None)
+    with _SHARED_LOCK:
+        for key in [key for key in _SHARED if model_name is None or key[2] == model_name]:
+            _SHARED.pop(key, None)
+
+
+def _lookup(scope, key):
+    value = scope["values"].get(key, _MISS)
+    if value is _MISS and scope["ttl"]:
+        with _SHARED_LOCK:
+            entry = _SHARED.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                value = entry[1]
+                scope["values"][key] = value
+    if value is _MISS:
+        scope["misses"] += 1
+    else:
+        scope["hits"] += 1
+    return value
+
+
+def _store(scope, key, value):
+    scope["values"][key] = value
+    if scope["ttl"]:
+        with _SHARED_LOCK:
+            _SHARED[key] = (time.monotonic() + scope["ttl"], value)
+            _SHARED.move_to_end(key)
+            while len(_SHARED) > SHARED_MAX_ENTRIES:
+                _SHARED.popitem(last=False)
+
+
+def _copy_rows(rows) -> list:
+    return [dict(row) for row in rows or []]
+
+
+def cached_search_count(model, domain) -> int:
+    domain = list(domain or [])
+    scope = _SCOPE.get()
+    if scope is None:
+        return int(model.search_count(domain))
+    model.check_access_rights("read")
+    key = _key("search_count", model, domain)
+    value = _lookup(scope, key)
+    if value is _MISS:
+        value = int(model.search_count(domain))
+        _store(scope, key, value)
+    return value
+
+
+def cached_read_group(model, domain, fields, groupby, **kwargs) -> list:
+    domain = list(domain or [])
+    fields = list(fields or [])
+    groupby = list(groupby or [])
+    scope = _SCOPE.get()
+    if scope is None:
+        return model.read_group(domain, fields, groupby, **kwargs)
+    model.check_access_rights("read")
+    key = _key("read_group", model, domain, fields, groupby, kwargs)
+    value = _lookup(scope, key)
+    if value is _MISS:
+        value = _copy_rows(model.read_group(domain, fields, groupby, **kwargs))
+        _store(scope, key, value)
+    return _copy_rows(value)
+
+
+def _project_key(model, domain, project_id, fields, groupby):
+    kwargs = {"lazy": False} if groupby else {}
+    return _key("read_group", model, list(domain) + [(PROJECT_FIELD, "=", project_id)], fields, groupby, kwargs)
+
+
+def read_group_by_project(model, project_ids, domain, fields, groupby=(), cache=True) -> dict:
+    """
+    按项目批量聚合：返回 {project_id: rows}，rows 与单项目 read_group 同形
+    （不分组时恰好一行，含 __count 与聚合字段；有分组时每组一行，按 lazy=False 语义）。
+    缓存未命中的项目合并为一次 project_id IN (...) 查询。
+    """
+    ids = sorted({int(pid) for pid in project_ids or [] if pid and int(pid) > 0})
+    domain = list(domain or [])
+    fields = list(fields or [])
+    groupby = list(groupby or [])
+    scope = _SCOPE.get() if cache else None
+    result = {}
+    missing = []
+    if scope is not None and ids:
+        model.check_access_rights("read")
+    for pid in ids:
+        value = _lookup(scope, _project_key(model, domain, pid, fields, groupby)) if scope is not None else _MISS
+        if value is _MISS:
+            missing.append(pid)
+        else:
+            result[pid] = _copy_rows(value)
+    if not missing:
+        return result
+
+    rows = model.read_group(domain + [(PROJECT_FIELD, "in", missing)], fields, [PROJECT_FIELD] + groupby, lazy=False)
+    per_project = {pid: [] for pid in missing}
+    for row in rows:
+        group = row.get(PROJECT_FIELD)
+        pid = group[0] if isinstance(group, (list, tuple)) and group else group
+        if pid not in per_project:
+            continue
+        per_project[pid].append(
+            {key: value for key, value in row.items() if key != PROJECT_FIELD and key not in _GROUP_META_KEYS}
+        )
+    for pid in missing:
+        project_rows = per_project[pid]
+        if not groupby and not project_rows:
+            project_rows = [{"__count": 0}]
+        if scope is not None:
+            _store(scope, _project_key(model, domain, pid, fields, groupby), project_rows)
+        result[pid] = _copy_rows(project_rows)
+    if scope is not None:
+        scope["merged"] += 1
+    return result
+
+
+def group_value(row, field_spec, default=0.0):
+    """读取聚合值，兼容 "amount:sum" 返回 amount / amount_sum 两种键名。"""
+    name = str(field_spec or "").split(":", 1)[0]
+    if not row:
+        return default
+    value = row.get(f"{name}_sum", row.get(name, default))
+    return value or default
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+api.data list aggregation planner.
+
+以 ORM 生成的作用域子查询（`_search(domain)`，已包含记录规则与业务范围 domain）为基础，
+把列表页的汇总需求合并为固定条数的 SQL：
+- summary_aggregates：总数、分组总数与全部数值字段 SUM 一条语句；
+- group_window_ids：各分组当前页样本行一条窗口语句（ROW_NUMBER() OVER (PARTITION BY ...)）。
+无法下推（非存储/继承/翻译字段、分组粒度、排序无法解析）时返回 None，由调用方走原 ORM 路径。
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Sequence
+
+from .api_data_sort_index import related_order_sql, scoped_ids_sql
+from .source_authority import build_source_authority_contract
+
+_logger = logging.getLogger(__name__)
+
+SOURCE_KIND = "api_data_aggregate_planner"
+SOURCE_AUTHORITIES = ("odoo.orm", "ir.rule", "postgresql.window_functions")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+SUM_FIELD_TYPES = frozenset({"integer", "float", "monetary"})
+# 分组值经 _normalize_group_item 归一化后 0/"" 与空值同为 None，仅保留取值不含假值的类型。
+GROUP_FIELD_TYPES = frozenset({"many2one", "selection", "boolean"})
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="api.data.list",
+    )
+
+
+def _quote(identifier: str) -> str:
+    return '"%s"' % str(identifier).replace('"', '""')
+
+
+def _own_column(env_model, field_name: str, allowed_types) -> Any:
+    field = env_model._fields.get(field_name)
+    if (
+        not field
+        or field.type not in allowed_types
+        or not getattr(field, "store", False)
+        or not getattr(field, "column_type", None)
+        or getattr(field, "inherited", False)
+        or getattr(field, "translate", False)
+    ):
+        return None
+    return field
+
+
+def _execute(env_model, sql: str, params: list, flush_fields: Sequence[str]):
+    cr = env_model.env.cr
+    env_model.flush_model([name for name in flush_fields if name in env_model._fields] or None)
+    with cr.savepoint(flush=False):
+        cr.execute(sql, params)
+        return cr.fetchall()
+
+
+def _group_expr(field) -> str:
+    column = "t.%s" % _quote(field.name)
+    if field.type == "boolean":
+        # read_group 把 NULL 与 False 归入同一组。
+        return "COALESCE(%s, false)" % column
+    return column
+
+
+def summary_aggregates(
+    env_model,
+    domain,
+    *,
+    sum_fields: Sequence[str] = (),
+    group_field: str = "",
+    need_count: bool = False,
+) -> dict[str, Any] | None:
+    """返回 {"count", "group_total", "sums"}；任一项无法下推时返回 None。"""
+    sum_columns = []
+    for field_name in sum_fields or []:
+        if not _own_column(env_model, field_name, SUM_FIELD_TYPES):
+            return None
+        sum_columns.append(field_name)
+    group = None
+    if group_field:
+        group = _own_column(env_model, group_field, GROUP_FIELD_TYPES)
+        if group is None:
+            return None
+    if not sum_columns and not group and not need_count:
+        return {"count": None, "group_total": None, "sums": {}}
+    select_parts = ["COUNT(*)"]
+    if group is not None:
+        expr = _group_expr(group)
+        select_parts.append(
+            "COUNT(DISTINCT %s) + MAX(CASE WHEN %s IS NULL THEN 1 ELSE 0 END)" % (expr, expr)
+        )
+    select_parts.extend("SUM(t.%s)" % _quote(name) for name in sum_columns)
+    try:
+        sub_sql, sub_params = scoped_ids_sql(env_model, domain)
+        rows = _execute(
+            env_model,
+            "SELECT " + ", ".join(select_parts)
+            + " FROM " + _quote(env_model._table) + " t WHERE t.id IN (" + sub_sql + ")",
+            sub_params,
+            list(sum_columns) + ([group_field] if group_field else []),
+        )
+    except Exception:
+        _logger.debug("summary aggregate plan failed model=%s", env_model._name, exc_info=True)
+        return None
+    row = rows[0] if rows else (0,)
+    count = int(row[0] or 0)
+    offset = 1
+    group_total = None
+    if group is not None:
+        group_total = int(row[1] or 0) if count else 0
+        offset = 2
+    sums: dict[str, Any] = {}
+    for index, name in enumerate(sum_columns):
+        value = row[offset + index] if len(row) > offset + index else None
+        if value is not None:
+            sums[name] = float(value) if not isinstance(value, (int, float)) else value
+    return {"count": count, "group_total": group_total, "sums": sums}
+
+
+def group_window_ids(
+    env_model,
+    domain,
+    *,
+    group_field: str,
+    order_clauses: Sequence[tuple[str, str]],
+    windows: Sequence[tuple[Any, int, int]],
+) -> list[list[int]] | None:
+    """
+    windows: [(分组值, 起始偏移, 页大小)]；返回与 windows 对齐的 id 列表。
+    同一条语句内按分组编号行号，再与窗口表连接取各组当前页。
+    """
+    if not windows:
+        return []
+    group = _own_column(env_model, group_field, GROUP_FIELD_TYPES)
+    if group is None:
+        return None
+    resolved = related_order_sql(env_model, order_clauses or [("id", "asc")], blanks_last=False)
+    if resolved is None:
+        return None
+    join_sql, order_sql = resolved
+    column_type = str((group.column_type or ("", ""))[1] or group.column_type[0])
+    if group.type == "boolean":
+        column_type = "boolean"
+    expr = _group_expr(group)
+    value_rows = []
+    value_params: list = []
+    for index, (value, offset, size) in enumerate(windows):
+        if group.type == "boolean" and value is None:
+            value = False
+        value_rows.append("(%%s, CAST(%%s AS %s), %%s, %%s)" % column_type)
+        value_params.extend([index, value, max(int(offset or 0), 0), max(int(offset or 0), 0) + max(int(size or 0), 1)])
+    try:
+        sub_sql, sub_params = scoped_ids_sql(env_model, domain)
+        sql = (
+            "SELECT w.idx, s.id FROM ("
+            "SELECT t.id AS id, " + expr + " AS gval, "
+            "ROW_NUMBER() OVER (PARTITION BY " + expr + " ORDER BY " + order_sql + ") AS rn "
+            "FROM " + _quote(env_model._table) + " t " + join_sql + " WHERE t.id IN (" + sub_sql + ")"
+            ") s JOIN (VALUES " + ", ".join(value_rows) + ") AS w(idx, gval, lo, hi) "
+            "ON s.gval IS NOT DISTINCT FROM w.gval "
+            "WHERE s.rn > w.lo AND s.rn <= w.hi ORDER BY w.idx, s.rn"
+        )
+        rows = _execute(
+            env_model,
+            sql,
+            sub_params + value_params,
+            [group_field] + [name for name, _direction in order_clauses or []],
+        )
+    except Exception:
+        _logger.debug("group window plan failed model=%s", env_model._name, exc_info=True)
+        return None
+    out: list[list[int]] = [[] for _window in windows]
+    for index, record_id in rows:
+        out[int(index)].append(int(record_id))
+    return out
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+api.data.batch set-based write planning.
+
+整批 id 先以集合方式完成校验，再对剩余有效子集分块写入：
+- 存在性：一次 exists()；
+- 记录规则：一次 _filter_access_rules("write")；
+- 乐观并发：对 if_match_map 覆盖的记录一次预取 write_date；
+- 写入：按块一次 write()，块失败时仅对该块回退为逐行 savepoint，定位失败行。
+本模块只做纯粹的分区与分块，ORM 调用留在 handler。
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "api_data_bulk_write_planner"
+SOURCE_AUTHORITIES = ("odoo.orm", "ir.rule")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+BULK_WRITE_CHUNK_SIZE = 1000
+
+OUTCOME_MISSING = "missing"
+OUTCOME_DENIED = "denied"
+OUTCOME_STALE = "stale"
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="api.data.batch",
+    )
+
+
+def write_date_token(value: Any) -> str:
+    """与 if_match_map 比较用的 write_date 文本（秒级）。"""
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    return list(dict.fromkeys(int(rec_id) for rec_id in ids or []))
+
+
+def partition_batch_ids(
+    ids: Iterable[int],
+    *,
+    found_ids: Iterable[int],
+    writable_ids: Iterable[int],
+    write_dates: Mapping[int, str] | None = None,
+    if_match_map: Mapping[int, str] | None = None,
+) -> Tuple[List[int], Dict[int, str]]:
+    """
+    按原逐行顺序（不存在 -> 无权限 -> 版本冲突）判定每个 id，返回 (可写 id, {id: outcome})。
+    可写 id 去重并保持请求顺序。
+    """
+    found = set(found_ids or [])
+    writable = set(writable_ids or [])
+    write_dates = write_dates or {}
+    if_match_map = if_match_map or {}
+    valid: List[int] = []
+    rejected: Dict[int, str] = {}
+    for rec_id in unique_ids(ids):
+        if rec_id not in found:
+            rejected[rec_id] = OUTCOME_MISSING
+        elif rec_id not in writable:
+            rejected[rec_id] = OUTCOME_DENIED
+        elif rec_id in if_match_map:
+            current = str(write_dates.get(rec_id) or "")
+            expected = str(if_match_map.get(rec_id) or "")
+            if current and expected and current != expected:
+                rejected[rec_id] = OUTCOME_STALE
+            else:
+                valid.append(rec_id)
+        else:
+            valid.append(rec_id)
+    return valid, rejected
+
+
+def chunked(ids: List[int], size: int = BULK_WRITE_CHUNK_SIZE) -> Iterator[List[int]]:
+    size = max(int(size or 0), 1)
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
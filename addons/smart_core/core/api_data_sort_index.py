@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+api.data list sort engine helpers.
+
+- 非存储关联字段（related 链全部为存储 many2one，末端为存储标量列）解析为 SQL join 排序表达式，
+  与 ORM 编译的作用域子查询拼成一条 SELECT，只取一页；after 游标记录上一页末行的排序值，按 keyset 续页；
+- 无法下推到 SQL 的计算字段只读取排序字段计算 key，在 Python 中排序一次，
+  有序 id 序列按查询指纹缓存（TTL + LRU），后续分页（offset 或 after 游标）直接切片；
+- 排序字段均为数值/日期类存储列时，after 游标走纯 domain keyset，不需要 id 序列；
+- 其余原生排序的 after 游标只记录位置，续页按 OFFSET 读取。
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Iterable, Sequence
+
+from .source_authority import build_source_authority_contract
+
+_logger = logging.getLogger(__name__)
+
+SOURCE_KIND = "api_data_sort_index"
+SOURCE_AUTHORITIES = ("odoo.orm", "postgresql.order_by")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+CURSOR_VERSION = 1
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_INDEXES = 32
+DEFAULT_MAX_IDS = 2_000_000
+MAX_RELATED_DEPTH = 4
+
+STRATEGY_NATIVE = "native"
+STRATEGY_SQL_INDEX = "sql_index"
+STRATEGY_PYTHON_INDEX = "python_index"
+
+# after 游标可直接转为 domain keyset 的字段类型：False 与 NULL 语义一致，顺序与 PG 一致。
+KEYSET_FIELD_TYPES = frozenset({"integer", "float", "monetary", "date", "datetime"})
+SQL_SCALAR_FIELD_TYPES = frozenset(
+    {"char", "text", "selection", "integer", "float", "monetary", "date", "datetime", "boolean"}
+)
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="api.data.list",
+    )
+
+
+class SortKeyIndex:
+    """按查询指纹缓存的有序 id 序列；条目过期或超出容量时淘汰。"""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_indexes: int = DEFAULT_MAX_INDEXES,
+        max_ids: int = DEFAULT_MAX_IDS,
+    ):
+        self.ttl_seconds = max(int(ttl_seconds or 0), 1)
+        self.max_indexes = max(int(max_indexes or 0), 1)
+        self.max_ids = max(int(max_ids or 0), 1)
+        self._entries: "OrderedDict[str, tuple[float, array]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "oversize_skips": 0}
+
+    def get(self, key: str, *, now: float | None = None) -> array | None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, ids = entry
+            if expires_at <= now:
+                self._entries.pop(key, None)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return ids
+
+    def put(self, key: str, ids: Iterable[int], *, now: float | None = None) -> array:
+        packed = ids if isinstance(ids, array) else array("q", ids)
+        if len(packed) > self.max_ids:
+            with self._lock:
+                self._stats["oversize_skips"] += 1
+            return packed
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl_seconds, packed)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_indexes:
+                self._entries.popitem(last=False)
+        return packed
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+
+_INDEX = SortKeyIndex()
+
+
+def sort_index() -> SortKeyIndex:
+    return _INDEX
+
+
+def query_fingerprint(*, model: str, domain: Any, order: str, uid: Any, context: dict | None) -> str:
+    context = context if isinstance(context, dict) else {}
+    raw = json.dumps(
+        {
+            "model": model,
+            "domain": domain or [],
+            "order": order or "",
+            "uid": uid,
+            "lang": context.get("lang") or "",
+            "allowed_company_ids": list(context.get("allowed_company_ids") or []),
+            "active_test": context.get("active_test", True),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def encode_after_token(payload: dict) -> str:
+    raw = json.dumps({"v": CURSOR_VERSION, **payload}, ensure_ascii=False, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_after_token(token: str) -> dict | None:
+    text = str(token or "").strip()
+    if not text:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        return None
+    if "id" in payload:
+        # offset 游标只记录位置，不带末行 id。
+        try:
+            payload["id"] = int(payload.get("id"))
+        except Exception:
+            return None
+    return payload
+
+
+def keyset_capable(env_model, clauses: Sequence[tuple[str, str]]) -> bool:
+    if not clauses:
+        return False
+    for field_name, _direction in clauses:
+        if field_name == "id":
+            continue
+        field = env_model._fields.get(field_name)
+        if not field or not getattr(field, "store", False) or not getattr(field, "column_type", None):
+            return False
+        if getattr(field, "type", None) not in KEYSET_FIELD_TYPES:
+            return False
+    return True
+
+
+def with_id_tiebreak(clauses: Sequence[tuple[str, str]]) -> list[tuple[str, str]]:
+    clauses = list(clauses or [])
+    if any(field_name == "id" for field_name, _direction in clauses):
+        return clauses
+    return clauses + [("id", "asc")]
+
+
+def order_string(clauses: Sequence[tuple[str, str]]) -> str:
+    return ", ".join("%s %s" % (field_name, direction) for field_name, direction in clauses)
+
+
+def _and(parts: list[list]) -> list:
+    parts = [part for part in parts if part]
+    if not parts:
+        return []
+    out: list = ["&"] * (len(parts) - 1)
+    for part in parts:
+        out.extend(part)
+    return out
+
+
+def _or(parts: list[list]) -> list:
+    parts = [part for part in parts if part]
+    if not parts:
+        return []
+    out: list = ["|"] * (len(parts) - 1)
+    for part in parts:
+        out.extend(part)
+    return out
+
+
+def _after_condition(field_name: str, direction: str, value: Any) -> list:
+    """严格位于 value 之后的条件；PG 默认 ASC NULLS LAST / DESC NULLS FIRST。"""
+    if field_name == "id":
+        return [("id", ">" if direction == "asc" else "<", value)]
+    if direction == "asc":
+        if value is None:
+            return []
+        return _or([[(field_name, ">", value)], [(field_name, "=", False)]])
+    if value is None:
+        return [(field_name, "!=", False)]
+    return [(field_name, "<", value)]
+
+
+def _equal_condition(field_name: str, value: Any) -> list:
+    return [(field_name, "=", value if value is not None else False)]
+
+
+def keyset_domain(clauses: Sequence[tuple[str, str]], values: Sequence[Any]) -> list:
+    """clauses 必须以唯一列（id）收尾；values 为上一页最后一行对应的排序值。"""
+    branches: list[list] = []
+    prefix: list[list] = []
+    for (field_name, direction), value in zip(clauses, values):
+        after = _after_condition(field_name, direction, value)
+        if after:
+            branches.append(_and(prefix + [after]))
+        if field_name == "id":
+            break
+        prefix.append(_equal_condition(field_name, value))
+    return _or(branches) or [("id", "=", 0)]
+
+
+def _token_value(value: Any) -> Any:
+    if value is None or value is False:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+def keyset_values(row: dict, clauses: Sequence[tuple[str, str]]) -> list:
+    return [_token_value(row.get(field_name)) for field_name, _direction in clauses]
+
+
+def page_from_index(
+    ids: Sequence[int],
+    *,
+    limit: int,
+    offset: int = 0,
+    after_id: int | None = None,
+    after_pos: int | None = None,
+) -> tuple[list[int], int]:
+    """返回 (本页 id, 起始位置)。游标行已被删除时退回到记录的位置继续。"""
+    start = max(int(offset or 0), 0)
+    if after_id is not None:
+        pos = after_pos if isinstance(after_pos, int) else -1
+        if not (0 <= pos < len(ids) and ids[pos] == after_id):
+            try:
+                pos = list(ids).index(after_id)
+            except ValueError:
+                pos = min(max(pos, -1), len(ids) - 1)
+        start = pos + 1
+    end = start + int(limit) if int(limit or 0) > 0 else None
+    return list(ids[start:end]), start
+
+
+def _quote(identifier: str) -> str:
+    return '"%s"' % str(identifier).replace('"', '""')
+
+
+def _resolve_column(env_model, field_name: str, alias: str, joins: "OrderedDict[str, tuple]", depth: int = 0):
+    """解析为 (SQL 表达式, 字段类型)；无法下推时返回 None。"""
+    if depth > MAX_RELATED_DEPTH:
+        return None
+    field = env_model._fields.get(field_name)
+    if not field or getattr(field, "inherited", False) or getattr(field, "translate", False):
+        return None
+    if field_name == "id":
+        return "%s.id" % alias, "integer"
+    if getattr(field, "store", False) and getattr(field, "column_type", None):
+        if field.type not in SQL_SCALAR_FIELD_TYPES:
+            return None
+        return "%s.%s" % (alias, _quote(field_name)), field.type
+    related = getattr(field, "related", None)
+    if isinstance(related, (list, tuple)):
+        related = ".".join(related)
+    if not related:
+        return None
+    path = str(related).split(".")
+    model = env_model
+    current_alias = alias
+    for hop in path[:-1]:
+        hop_field = model._fields.get(hop)
+        if (
+            not hop_field
+            or hop_field.type != "many2one"
+            or not getattr(hop_field, "store", False)
+            or getattr(hop_field, "inherited", False)
+        ):
+            return None
+        comodel = model.env[hop_field.comodel_name]
+        join_key = "%s.%s" % (current_alias, hop)
+        if join_key not in joins:
+            join_alias = "j%d" % (len(joins) + 1)
+            joins[join_key] = (
+                join_alias,
+                'LEFT JOIN %s %s ON %s.id = %s.%s'
+                % (_quote(comodel._table), join_alias, join_alias, current_alias, _quote(hop)),
+            )
+        current_alias = joins[join_key][0]
+        model = comodel
+    return _resolve_column(model, path[-1], current_alias, joins, depth + 1)
+
+
+def _order_terms(env_model, clauses: Sequence[tuple[str, str]], *, blanks_last: bool):
+    """
+    解析为 (join 片段, [(表达式, 方向, 空值是否在后)])，末项恒为 t.id；任一子句无法下推时返回 None。
+    主表 id 不会为空，空值位置记为 None。
+    """
+    joins: "OrderedDict[str, tuple]" = OrderedDict()
+    terms: list[tuple[str, str, bool | None]] = []
+    for field_name, direction in clauses:
+        resolved = _resolve_column(env_model, field_name, "t", joins)
+        if resolved is None:
+            return None
+        expr, field_type = resolved
+        if blanks_last and field_type in {"char", "text", "selection"}:
+            expr = "NULLIF(%s, '')" % expr
+        # PG 默认 ASC NULLS LAST / DESC NULLS FIRST。
+        nulls_last = None if field_name == "id" else (blanks_last or direction != "desc")
+        terms.append((expr, "desc" if direction == "desc" else "asc", nulls_last))
+    if not any(field_name == "id" for field_name, _direction in clauses):
+        terms.append(("t.id", "asc", None))
+    return " ".join(join for _alias, join in joins.values()), terms
+
+
+def related_order_sql(
+    env_model,
+    clauses: Sequence[tuple[str, str]],
+    *,
+    blanks_last: bool = True,
+) -> tuple[str, str] | None:
+    """
+    生成 (join 片段, ORDER BY 片段)；任一子句无法下推时返回 None。
+    blanks_last=True 时空值（含空字符串）统一排在最后，与 Python 兜底排序语义一致；
+    否则沿用 PG 默认空值位置，与 ORM search(order=...) 一致。
+    """
+    resolved = _order_terms(env_model, clauses, blanks_last=blanks_last)
+    if resolved is None:
+        return None
+    join_sql, terms = resolved
+    if not any(field_name == "id" for field_name, _direction in clauses):
+        terms, tiebreak = terms[:-1], ["t.id ASC"]
+    else:
+        tiebreak = []
+    suffix = " NULLS LAST" if blanks_last else ""
+    order_parts = ["%s %s%s" % (expr, direction.upper(), suffix) for expr, direction, _nulls_last in terms]
+    return join_sql, ", ".join(order_parts + tiebreak)
+
+
+def _sql_parts(value) -> tuple[str, list]:
+    # Odoo 16 返回 (sql, params)；Odoo 17 返回 SQL 对象（code / params）。
+    if isinstance(value, tuple) and len(value) == 2:
+        return str(value[0]), list(value[1] or [])
+    code = getattr(value, "code", None)
+    if isinstance(code, str):
+        return code, list(getattr(value, "params", None) or [])
+    raise TypeError("unsupported subquery type: %r" % type(value))
+
+
+def scoped_ids_sql(env_model, domain) -> tuple[str, list]:
+    """作用域 id 子查询：与 search(domain) 同一套访问检查、记录规则与 active_test。"""
+    return _sql_parts(env_model._search(domain or []).subselect())
+
+
+def sql_keyset_condition(terms: Sequence[tuple[str, str, bool | None]], values: Sequence[Any]) -> tuple[str, list]:
+    """严格位于上一页末行（values 与 terms 一一对应）之后的 SQL 条件，空值位置与 ORDER BY 一致。"""
+    branches: list[str] = []
+    params: list = []
+    prefix: list[str] = []
+    prefix_params: list = []
+    for (expr, direction, nulls_last), value in zip(terms, values):
+        op = "<" if direction == "desc" else ">"
+        if nulls_last is None:
+            after, after_params = "%s %s %%s" % (expr, op), [value]
+            equal, equal_params = "%s = %%s" % expr, [value]
+        elif value is None:
+            after, after_params = ("" if nulls_last else "%s IS NOT NULL" % expr), []
+            equal, equal_params = "%s IS NULL" % expr, []
+        else:
+            after = ("(%s %s %%s OR %s IS NULL)" % (expr, op, expr)) if nulls_last else "%s %s %%s" % (expr, op)
+            after_params = [value]
+            equal, equal_params = "%s = %%s" % expr, [value]
+        if after:
+            branches.append("(%s)" % " AND ".join(prefix + [after]))
+            params.extend(prefix_params + after_params)
+        prefix.append(equal)
+        prefix_params.extend(equal_params)
+    if not branches:
+        return "FALSE", []
+    return "(%s)" % " OR ".join(branches), params
+
+
+def sql_sorted_page(
+    env_model,
+    domain,
+    clauses: Sequence[tuple[str, str]],
+    *,
+    limit: int | None,
+    offset: int = 0,
+    after: Sequence[Any] | None = None,
+) -> tuple[list[int], list] | None:
+    """
+    作用域子查询、join 排序与 LIMIT 合为一条 SELECT，返回 (本页 id, 末行排序值)；
+    after 为上一页末行排序值时按 keyset 续页。无法下推或执行失败时返回 None。
+    """
+    resolved = _order_terms(env_model, clauses, blanks_last=True)
+    if resolved is None:
+        return None
+    join_sql, terms = resolved
+    order_sql = ", ".join(
+        "%s %s%s" % (expr, direction.upper(), "" if nulls_last is None else " NULLS LAST")
+        for expr, direction, nulls_last in terms
+    )
+    cr = env_model.env.cr
+    try:
+        sub_sql, params = scoped_ids_sql(env_model, domain)
+        where_sql = "t.id IN (%s)" % sub_sql
+        if after is not None:
+            if len(after) != len(terms):
+                return None
+            keyset_sql, keyset_params = sql_keyset_condition(terms, after)
+            where_sql += " AND " + keyset_sql
+            params = params + keyset_params
+        env_model.flush_model([name for name, _direction in clauses if name in env_model._fields] or None)
+        with cr.savepoint(flush=False):
+            cr.execute(
+                "SELECT %s FROM %s t %s WHERE %s ORDER BY %s LIMIT %%s OFFSET %%s"
+                % (
+                    ", ".join(expr for expr, _direction, _nulls in terms),
+                    _quote(env_model._table),
+                    join_sql,
+                    where_sql,
+                    order_sql,
+                ),
+                params + [int(limit) if limit else None, 0 if after is not None else max(int(offset or 0), 0)],
+            )
+            rows = cr.fetchall()
+    except Exception:
+        _logger.debug("sql sorted page failed model=%s", getattr(env_model, "_name", ""), exc_info=True)
+        return None
+    # 末项恒为 t.id；布尔 False 是有效排序值，不能像 ORM 读值那样折算为空。
+    ids = [int(row[-1]) for row in rows]
+    last_values = [
+        value if value is None or isinstance(value, (bool, int, float)) else str(value) for value in (rows[-1] if rows else ())
+    ]
+    return ids, last_values
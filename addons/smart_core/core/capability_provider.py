@@ -4,6 +4,7 @@ from __future__ import annotations
 import time
 from typing import List
 
+from odoo.addons.smart_core.core.access_matrix import access_matrix_for_user
 from odoo.addons.smart_core.utils.extension_hooks import call_extension_hook_first
 
 
@@ -109,6 +110,11 @@ def build_capability_groups(capabilities: List[dict]) -> List[dict]:
 
 
 def load_capabilities_for_user(env, user) -> List[dict]:
+    """按组集合共享的编译结果；见 core/access_matrix.py。"""
+    return list(access_matrix_for_user(env, user).get("capabilities") or [])
+
+
+def load_capabilities_uncached(env, user) -> List[dict]:
     extension_caps = call_extension_hook_first(env, "smart_core_list_capabilities_for_user", env, user)
     if isinstance(extension_caps, list) and extension_caps:
         source = source_authority_contract()
@@ -138,11 +144,18 @@ def load_capabilities_for_user(env, user) -> List[dict]:
         caps = cap_model.search([("active", "=", True)], order="sequence, id")
     except Exception:
         return []
+    try:
+        access_table = caps._compile_access_table(user) if hasattr(caps, "_compile_access_table") else {}
+    except Exception:
+        access_table = {}
     out: List[dict] = []
     for rec in caps:
         try:
-            if rec._user_visible(user):
-                payload = rec.to_public_dict(user)
+            access = access_table.get(rec.id)
+            if access is None:
+                access = rec._access_context(user)
+            if access.get("visible"):
+                payload = rec.to_public_dict(user, access=access)
                 if isinstance(payload, dict):
                     payload.setdefault("source_authority", source_authority_contract())
                     out.append(payload)
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled contract cache.
+
+进程内 LRU + Postgres 代际计数（sequence）的编译契约缓存：
+- 键：(kind, model, view_type, action/menu, 用户组集合哈希, lang, company, contract_mode, extra)；
+  同组集合的用户共享同一份编译结果，不含 uid。
+- 值：JSON 序列化后的字节串。命中时反序列化返回，调用方可随意修改，不会污染缓存；
+  单条超过 max_entry_bytes 的契约不入缓存。
+- 失效：契约来源写入时在提交后 nextval 代际序列，所有 prefork worker 在下一次
+  读取代际时整体失效；写入事务内本 worker 直接旁路缓存，避免读到自己写前的编译结果。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .source_authority import build_source_authority_contract
+
+_logger = logging.getLogger(__name__)
+
+SOURCE_KIND = "compiled_contract_cache"
+SOURCE_AUTHORITIES = ("contract_pipeline", "pg_sequence.sc_contract_cache_generation")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+GENERATION_SEQUENCE = "sc_contract_cache_generation"
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+_CR_GENERATION_KEY = "sc_contract_cache.generation"
+_CR_BYPASS_KEY = "sc_contract_cache.bypass"
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="contract_cache",
+    )
+
+
+class ContractCache:
+    """线程安全的 LRU；只保存 JSON 字节串，按 generation 整体失效。"""
+
+    def __init__(self, *, max_entries: int = DEFAULT_MAX_ENTRIES, max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES):
+        self.max_entries = max(int(max_entries or 0), 1)
+        self.max_entry_bytes = max(int(max_entry_bytes or 0), 1)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._generation: int | None = None
+        self._lock = threading.RLock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "oversize_skips": 0,
+            "invalidations": 0,
+            "bypasses": 0,
+        }
+
+    def sync_generation(self, generation: int) -> None:
+        with self._lock:
+            if self._generation == generation:
+                return
+            if self._generation is not None:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._generation = generation
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return json.loads(raw)
+
+    def put(self, key: str, value: Any) -> bool:
+        try:
+            raw = json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+        except Exception:
+            _logger.debug("contract cache value not serializable key=%s", key, exc_info=True)
+            return False
+        with self._lock:
+            if len(raw) > self.max_entry_bytes:
+                self._stats["oversize_skips"] += 1
+                return False
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = raw
+            self._bytes += len(raw)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+        return True
+
+    def note_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypasses"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_entry_bytes": self.max_entry_bytes,
+                "generation": self._generation,
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+_CACHE = ContractCache()
+
+
+def contract_cache() -> ContractCache:
+    return _CACHE
+
+
+def configure_contract_cache(*, max_entries: int | None = None, max_entry_bytes: int | None = None) -> dict:
+    """调整容量（如由部署参数驱动）；当前条目按新上限重新裁剪。"""
+    global _CACHE
+    with _CACHE._lock:
+        _CACHE = ContractCache(
+            max_entries=max_entries or _CACHE.max_entries,
+            max_entry_bytes=max_entry_bytes or _CACHE.max_entry_bytes,
+        )
+    return _CACHE.stats()
+
+
+def _cr_cache(env) -> dict | None:
+    cache = getattr(getattr(env, "cr", None), "cache", None)
+    return cache if isinstance(cache, dict) else None
+
+
+def ensure_generation_sequence(cr) -> None:
+    cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % GENERATION_SEQUENCE)
+
+
+def read_generation(env) -> int:
+    """读取全局代际；同一事务内只查询一次。序列不存在时按 0 处理。"""
+    cache = _cr_cache(env)
+    if cache is not None and _CR_GENERATION_KEY in cache:
+        return cache[_CR_GENERATION_KEY]
+    # pg_sequences 对不存在的序列返回空集，不会让请求事务进入 aborted 状态。
+    env.cr.execute(
+        "SELECT COALESCE(last_value, 0) FROM pg_sequences WHERE schemaname = current_schema() AND sequencename = %s",
+        (GENERATION_SEQUENCE,),
+    )
+    row = env.cr.fetchone()
+    generation = int(row[0]) if row and row[0] is not None else 0
+    if cache is not None:
+        cache[_CR_GENERATION_KEY] = generation
+    return generation
+
+
+def _bump_after_commit(registry) -> None:
+    try:
+        with registry.cursor() as cr:
+            ensure_generation_sequence(cr)
+            cr.execute("SELECT nextval(%s)", (GENERATION_SEQUENCE,))
+    except Exception:
+        _logger.exception("contract cache generation bump failed")
+
+
+def bump_contract_cache_generation(env, *, reason: str = "") -> None:
+    """
+    契约来源变更：本 worker 立即清空并在本事务内旁路缓存，
+    提交后递增全局代际，其它 worker 在下次读取代际时失效。
+    """
+    _CACHE.clear()
+    cache = _cr_cache(env)
+    if cache is not None:
+        if cache.get(_CR_BYPASS_KEY):
+            return
+        cache[_CR_BYPASS_KEY] = True
+    _logger.debug("contract cache invalidated reason=%s", reason)
+    postcommit = getattr(getattr(env, "cr", None), "postcommit", None)
+    registry = getattr(env, "registry", None)
+    if postcommit is None or registry is None:
+        return
+    postcommit.add(lambda: _bump_after_commit(registry))
+
+
+def group_set_hash(env, user=None) -> str:
+    user = user if user is not None else env.user
+    try:
+        group_ids = sorted(int(gid) for gid in user.groups_id.ids)
+    except Exception:
+        group_ids = []
+    return hashlib.md5(",".join(str(gid) for gid in group_ids).encode("utf-8")).hexdigest()
+
+
+def contract_cache_key(
+    env,
+    *,
+    kind: str,
+    model: str = "",
+    view_type: str = "",
+    action_id: Any = None,
+    menu_id: Any = None,
+    contract_mode: str = "",
+    extra: dict | None = None,
+    user=None,
+) -> str:
+    context = getattr(env, "context", None) or {}
+    company = getattr(env, "company", None)
+    payload = {
+        "kind": kind,
+        "model": model or "",
+        "view_type": view_type or "",
+        "action_id": action_id or None,
+        "menu_id": menu_id or None,
+        "groups": group_set_hash(env, user),
+        "lang": context.get("lang") or "",
+        "company": getattr(company, "id", None),
+        "allowed_company_ids": list(context.get("allowed_company_ids") or []),
+        "contract_mode": contract_mode or context.get("contract_mode") or "",
+        "extra": extra or {},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str, separators=(",", ":"))
+    return "%s:%s" % (kind, hashlib.sha1(raw.encode("utf-8")).hexdigest())
+
+
+def get_or_build(env, key: str, builder: Callable[[], Any]) -> Any:
+    """命中返回缓存副本；未命中调用 builder 并写入。代际读取失败时直接构建，不影响主链路。"""
+    cache = _cr_cache(env)
+    if cache is not None and cache.get(_CR_BYPASS_KEY):
+        _CACHE.note_bypass()
+        return builder()
+    try:
+        _CACHE.sync_generation(read_generation(env))
+    except Exception:
+        _logger.debug("contract cache generation unavailable; building without cache", exc_info=True)
+        _CACHE.note_bypass()
+        return builder()
+    cached = _CACHE.get(key)
+    if cached is not None:
+        return cached
+    value = builder()
+    if value is not None:
+        _CACHE.put(key, value)
+    return value
+
+
+def contract_cache_diagnostics(env) -> dict[str, Any]:
+    try:
+        generation = read_generation(env)
+    except Exception:
+        generation = None
+    return {
+        "source_authority": source_authority_contract(),
+        "generation": generation,
+        "stats": _CACHE.stats(),
+        "ts": int(time.time()),
+    }
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Contract version vector.
+
+契约构建前的廉价版本向量：只读取各来源的 write_date / 计数 / etag，
+不组装契约本身。向量相同即可认为契约未变化，调用方据此在分发前直接
+回 304，跳过 NavDispatcher/ActionDispatcher、finalize 与治理链路。
+
+向量组成：
+- 模型/视图/动作/菜单/权限的 write_date 与行数（行数用于识别删除）；
+- app.*.config 与字段/菜单策略表的 write_date，app.menu.config.etag 摘要；
+- 用户组集合、语言、公司、contract_mode；
+- 已安装模块的最近升级时间（模块升级即整体失效）。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Iterable
+
+from .source_authority import build_source_authority_contract
+
+_logger = logging.getLogger(__name__)
+
+SOURCE_KIND = "contract_version_vector"
+SOURCE_AUTHORITIES = (
+    "ir.model.fields",
+    "ir.ui.view",
+    "ir.ui.menu",
+    "ir.actions.act_window",
+    "ir.model.access",
+    "ir.rule",
+    "ir.module.module",
+    "res.groups",
+    "app.menu.config",
+)
+NO_BUSINESS_FACT_AUTHORITY = True
+
+# 向量格式版本：向量组成变化时递增，使旧 ETag 全部失效。
+VECTOR_VERSION = "cv1"
+
+# 按 model 列过滤的配置模型（model -> 列名）。扩展模块可追加自己的契约来源。
+_MODEL_SCOPED_SOURCES: dict[str, str] = {
+    "app.view.config": "model",
+    "app.model.config": "model",
+    "app.search.config": "model",
+    "app.action.config": "model",
+    "app.report.config": "model",
+    "app.validator.config": "model",
+    "app.workflow.config": "model",
+    "app.view.variant": "model",
+    "ui.form.field.policy": "model",
+}
+# 不按模型切分、整表参与版本的配置模型。
+_GLOBAL_SOURCES: set[str] = {
+    "ui.menu.config.policy",
+}
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="contract_version_vector",
+    )
+
+
+def register_contract_version_source(model_name: str, model_column: str | None = None) -> None:
+    """登记额外的契约来源模型；model_column 为空表示整表参与版本。"""
+    token = str(model_name or "").strip()
+    if not token:
+        return
+    column = str(model_column or "").strip()
+    if column:
+        _MODEL_SCOPED_SOURCES[token] = column
+    else:
+        _GLOBAL_SOURCES.add(token)
+
+
+def contract_version_sources() -> dict[str, Any]:
+    return {
+        "model_scoped": dict(sorted(_MODEL_SCOPED_SOURCES.items())),
+        "global": sorted(_GLOBAL_SOURCES),
+    }
+
+
+def _table_of(env, model_name: str) -> str | None:
+    try:
+        if model_name not in env:
+            return None
+        model = env[model_name]
+    except Exception:
+        return None
+    if getattr(model, "_abstract", False) or not getattr(model, "_auto", True):
+        return None
+    table = str(getattr(model, "_table", "") or "").strip()
+    return table or None
+
+
+def _model_names(model: Any) -> list[str]:
+    if isinstance(model, (list, tuple, set)):
+        values: Iterable[Any] = model
+    else:
+        values = [model]
+    out = []
+    for item in values:
+        token = str(item or "").strip()
+        if token and token not in out:
+            out.append(token)
+    return sorted(out)
+
+
+def _positive_int(value: Any) -> int | None:
+    try:
+        number = int(value)
+    except Exception:
+        return None
+    return number if number > 0 else None
+
+
+def _build_query(
+    env,
+    *,
+    models: list[str],
+    action_id: int | None,
+    extra_sources: Iterable[str] = (),
+) -> tuple[list[str], str, list[Any]]:
+    """拼接单条 SELECT：每个来源一列子查询，一次往返取回整个向量。"""
+    labels: list[str] = []
+    columns: list[str] = []
+    params: list[Any] = []
+
+    def add(label: str, sql: str, *args: Any):
+        labels.append(label)
+        columns.append("(%s)" % sql)
+        params.extend(args)
+
+    add("user_groups", "SELECT md5(COALESCE(string_agg(gid::text, ',' ORDER BY gid), '')) FROM res_groups_users_rel WHERE uid = %s", env.uid)
+    add("user", "SELECT write_date::text FROM res_users WHERE id = %s", env.uid)
+    add("groups", "SELECT max(write_date)::text || ':' || count(*) FROM res_groups")
+    add("modules", "SELECT max(write_date)::text || ':' || count(*) FROM ir_module_module WHERE state = 'installed'")
+    add("menus", "SELECT max(write_date)::text || ':' || count(*) FROM ir_ui_menu")
+    menu_config_table = _table_of(env, "app.menu.config")
+    if menu_config_table:
+        add(
+            "menu_config",
+            "SELECT md5(COALESCE(string_agg(id::text || '=' || COALESCE(etag, ''), ',' ORDER BY id), '')) FROM %s"
+            % menu_config_table,
+        )
+    if models:
+        add("model", "SELECT max(write_date)::text || ':' || count(*) FROM ir_model_fields WHERE model = ANY(%s)", models)
+        add("view", "SELECT max(write_date)::text || ':' || count(*) FROM ir_ui_view WHERE model = ANY(%s)", models)
+        add(
+            "perm",
+            "SELECT max(a.write_date)::text || ':' || count(*) FROM ("
+            " SELECT acl.write_date FROM ir_model_access acl JOIN ir_model m ON m.id = acl.model_id WHERE m.model = ANY(%s)"
+            " UNION ALL"
+            " SELECT r.write_date FROM ir_rule r JOIN ir_model m ON m.id = r.model_id WHERE m.model = ANY(%s)"
+            ") a",
+            models,
+            models,
+        )
+        add(
+            "actions",
+            "SELECT max(write_date)::text || ':' || count(*) FROM ir_act_window WHERE res_model = ANY(%s)",
+            models,
+        )
+        for source_model, column in sorted(_MODEL_SCOPED_SOURCES.items()):
+            table = _table_of(env, source_model)
+            if not table:
+                continue
+            add(
+                "cfg:%s" % source_model,
+                "SELECT max(write_date)::text || ':' || count(*) FROM %s WHERE %s = ANY(%%s)" % (table, column),
+                models,
+            )
+    else:
+        # 未指定模型（nav/menu/action_open）：契约可能引用任意模型的字段、视图、动作与权限，取全表版本，
+        # 否则 ACL/记录规则变更后菜单与导航仍回 304。
+        add("model", "SELECT max(write_date)::text || ':' || count(*) FROM ir_model_fields")
+        add("view", "SELECT max(write_date)::text || ':' || count(*) FROM ir_ui_view")
+        add(
+            "perm",
+            "SELECT max(a.write_date)::text || ':' || count(*) FROM ("
+            " SELECT write_date FROM ir_model_access"
+            " UNION ALL"
+            " SELECT write_date FROM ir_rule"
+            ") a",
+        )
+        add("actions", "SELECT max(write_date)::text || ':' || count(*) FROM ir_act_window")
+    if action_id:
+        add("action", "SELECT write_date::text FROM ir_act_window WHERE id = %s", action_id)
+    for source_model in sorted(_GLOBAL_SOURCES | {str(item or "").strip() for item in extra_sources if item}):
+        table = _table_of(env, source_model)
+        if not table:
+            continue
+        add("cfg:%s" % source_model, "SELECT max(write_date)::text || ':' || count(*) FROM %s" % table)
+    return labels, "SELECT " + ", ".join(columns), params
+
+
+def build_contract_version_vector(
+    env,
+    *,
+    model: Any = None,
+    action_id: Any = None,
+    menu_id: Any = None,
+    lang: str | None = None,
+    contract_mode: str = "user",
+    request_key: dict | None = None,
+    extra_sources: Iterable[str] = (),
+) -> dict[str, Any] | None:
+    """
+    读取契约版本向量；失败返回 None（调用方退回完整构建路径）。
+
+    request_key 放入请求维度（subject/op/view_type/surface 等），
+    保证不同请求形状不会共享同一 ETag；extra_sources 为本次调用额外
+    整表参与版本的模型（如 system.init 的场景/能力表）。
+    """
+    models = _model_names(model)
+    action = _positive_int(action_id)
+    try:
+        labels, query, params = _build_query(env, models=models, action_id=action, extra_sources=extra_sources)
+        # savepoint 隔离：向量读取失败不能把请求事务置为 aborted。
+        with env.cr.savepoint(flush=False):
+            env.cr.execute(query, params)
+            row = env.cr.fetchone() or ()
+    except Exception:
+        _logger.debug("contract version vector unavailable", exc_info=True)
+        return None
+    sources = {label: (row[idx] if idx < len(row) else None) for idx, label in enumerate(labels)}
+    company = getattr(env, "company", None)
+    context = getattr(env, "context", None) or {}
+    return {
+        "vector_version": VECTOR_VERSION,
+        "uid": env.uid,
+        "company_id": getattr(company, "id", None),
+        "allowed_company_ids": list(context.get("allowed_company_ids") or []),
+        "lang": lang or context.get("lang"),
+        "contract_mode": contract_mode,
+        "models": models,
+        "action_id": action,
+        "menu_id": _positive_int(menu_id),
+        "request": request_key or {},
+        "sources": sources,
+    }
+
+
+def contract_version_etag(vector: dict | None) -> str:
+    if not isinstance(vector, dict):
+        return ""
+    raw = json.dumps(vector, ensure_ascii=False, sort_keys=True, default=str, separators=(",", ":"))
+    return "%s-%s" % (VECTOR_VERSION, hashlib.sha1(raw.encode("utf-8")).hexdigest())
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Signed short-lived download tokens for file.download.
+
+file.download 完成附件白名单、ir.rule 与业务范围校验后签发令牌；
+/api/file/download/<token> 仅凭令牌流式输出文件，不再把文件 base64 塞进 JSON 信封。
+- 签名：HMAC-SHA256，密钥为本库 database.secret，令牌只在签发库内有效；
+- 载荷：库名、用户、附件、已解析的文件来源（filestore / 旧系统路径 / 远程地址）与过期时间；
+- 令牌只承载校验结论，不替代校验：过期、篡改、跨库一律拒绝。
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+from urllib.parse import quote
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "file_download_token"
+SOURCE_AUTHORITIES = ("ir.attachment", "sc.legacy.file.index", "ir.config_parameter")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+DOWNLOAD_ROUTE = "/api/file/download"
+TOKEN_TTL_PARAM = "sc.file.download.token_ttl"
+DEFAULT_TOKEN_TTL_SECONDS = 300
+MAX_TOKEN_TTL_SECONDS = 3600
+INLINE_MAX_BYTES_PARAM = "sc.file.download.inline_max_bytes"
+DEFAULT_INLINE_MAX_BYTES = 4 * 1024 * 1024
+TOKEN_VERSION = 1
+# attachment: ir.attachment 二进制（filestore / db_datas）
+# path: 旧系统镜像目录下的相对路径；remote_url: 已知远程地址；remote_path: 旧系统 HTTP 基址下的相对路径
+# cache: 远程旧附件已预取到本地内容寻址缓存，ref 为 sha256
+SOURCE_KINDS = ("attachment", "path", "cache", "remote_url", "remote_path")
+DELIVERY_MODES = ("auto", "inline", "stream")
+
+_SIGNING_SCOPE = b"sc.file.download:"
+
+
+class FileDownloadTokenError(ValueError):
+    pass
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="file_download_token",
+    )
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _get_param(env, key: str, default: Any = "") -> Any:
+    try:
+        return env["ir.config_parameter"].sudo().get_param(key, default)
+    except Exception:
+        return default
+
+
+def _int_param(env, key: str, default: int) -> int:
+    try:
+        value = int(_get_param(env, key, "") or default)
+    except (TypeError, ValueError):
+        return default
+    return value if value >= 0 else default
+
+
+def token_ttl_seconds(env) -> int:
+    return min(max(_int_param(env, TOKEN_TTL_PARAM, DEFAULT_TOKEN_TTL_SECONDS), 1), MAX_TOKEN_TTL_SECONDS)
+
+
+def inline_max_bytes(env) -> int:
+    """auto 模式下仍内联 base64 返回的文件大小上限；0 表示始终走流式下载。"""
+    return _int_param(env, INLINE_MAX_BYTES_PARAM, DEFAULT_INLINE_MAX_BYTES)
+
+
+def normalize_delivery(value: Any) -> str:
+    mode = str(value or "").strip().lower()
+    return mode if mode in DELIVERY_MODES else "auto"
+
+
+def _signing_key(env) -> bytes:
+    secret = str(_get_param(env, "database.secret", "") or "").strip()
+    if not secret:
+        raise FileDownloadTokenError("database.secret 未配置")
+    return secret.encode("utf-8")
+
+
+def _sign(env, body: str) -> str:
+    digest = hmac.new(_signing_key(env), _SIGNING_SCOPE + body.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def download_url(token: str, db: str = "") -> str:
+    url = f"{DOWNLOAD_ROUTE}/{token}"
+    if db:
+        url += "?db=" + quote(db, safe="")
+    return url
+
+
+def issue_download_token(
+    env,
+    *,
+    attachment_id: int,
+    source: str,
+    ref: str = "",
+    base_url: str = "",
+    name: str = "",
+    mimetype: str = "",
+    now: float | None = None,
+) -> dict:
+    if source not in SOURCE_KINDS:
+        raise FileDownloadTokenError(f"不支持的下载来源：{source}")
+    issued_at = int(now if now is not None else time.time())
+    ttl = token_ttl_seconds(env)
+    db = str(getattr(env.cr, "dbname", "") or "")
+    payload = {
+        "v": TOKEN_VERSION,
+        "db": db,
+        "uid": int(env.uid or 0),
+        "att": int(attachment_id or 0),
+        "src": source,
+        "ref": str(ref or ""),
+        "base": str(base_url or ""),
+        "name": str(name or ""),
+        "mt": str(mimetype or ""),
+        "exp": issued_at + ttl,
+    }
+    body = _b64encode(json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    token = f"{body}.{_sign(env, body)}"
+    return {
+        "token": token,
+        "url": download_url(token, db),
+        "expires_at": payload["exp"],
+        "ttl": ttl,
+    }
+
+
+def verify_download_token(env, token: str, *, now: float | None = None) -> dict:
+    """校验签名、库名与过期时间，返回载荷；任何不符抛出 FileDownloadTokenError。"""
+    body, _sep, signature = str(token or "").partition(".")
+    if not body or not signature:
+        raise FileDownloadTokenError("下载令牌格式无效")
+    if not hmac.compare_digest(signature, _sign(env, body)):
+        raise FileDownloadTokenError("下载令牌签名无效")
+    try:
+        payload = json.loads(_b64decode(body).decode("utf-8"))
+    except (TypeError, ValueError):
+        raise FileDownloadTokenError("下载令牌格式无效")
+    if not isinstance(payload, dict) or payload.get("v") != TOKEN_VERSION:
+        raise FileDownloadTokenError("下载令牌版本不受支持")
+    if str(payload.get("db") or "") != str(getattr(env.cr, "dbname", "") or ""):
+        raise FileDownloadTokenError("下载令牌数据库与当前请求不一致")
+    if int(payload.get("exp") or 0) < int(now if now is not None else time.time()):
+        raise FileDownloadTokenError("下载令牌已过期")
+    if payload.get("src") not in SOURCE_KINDS:
+        raise FileDownloadTokenError("下载令牌来源无效")
+    return payload
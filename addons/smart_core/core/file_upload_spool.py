@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Temp spool for chunked file.upload sessions.
+
+分片上传的落盘与入库辅助（无 ORM 依赖）：
+- 每个上传会话一个 spool 文件，分片按 offset 严格顺序追加，断线后按已接收字节数续传；
+- 每个分片单独限长并可携带 sha256 校验，整文件在 finalize 时流式计算 sha1（Odoo filestore 的内容寻址键）；
+- 入库时 filestore 已有同 sha1 文件则直接复用（去重），否则原子移动/分块复制进 filestore。
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "file_upload_spool"
+SOURCE_AUTHORITIES = ("sc.file.upload.session", "ir.attachment")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+UPLOAD_ROUTE = "/api/file/upload"
+SPOOL_DIR_ENV = "SC_FILE_UPLOAD_SPOOL_DIR"
+MAX_UPLOAD_BYTES_PARAM = "sc.file.upload.max_bytes"
+MAX_CHUNK_BYTES_PARAM = "sc.file.upload.max_chunk_bytes"
+SESSION_TTL_HOURS_PARAM = "sc.file.upload.session_ttl_hours"
+DEFAULT_MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_CHUNK_BYTES = 8 * 1024 * 1024
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+DEFAULT_SESSION_TTL_HOURS = 24
+COPY_BUFFER_BYTES = 1024 * 1024
+
+_UPLOAD_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadChunkError(ValueError):
+    def __init__(self, code: int, message: str, *, offset: int | None = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.offset = offset
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="file_upload_spool",
+        write_proxy=True,
+    )
+
+
+def spool_root(data_dir: str, dbname: str) -> Path:
+    configured = str(os.environ.get(SPOOL_DIR_ENV) or "").strip()
+    base = Path(configured) if configured else Path(data_dir) / "sc_upload_spool"
+    return base / re.sub(r"[^A-Za-z0-9_.-]", "_", dbname or "default")
+
+
+def spool_path(root: Path, upload_token: str) -> Path:
+    token = str(upload_token or "").strip()
+    if not _UPLOAD_TOKEN_RE.match(token):
+        raise UploadChunkError(400, "upload_id 无效")
+    return Path(root) / token[:2] / token
+
+
+def spooled_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def append_chunk(
+    path: Path,
+    *,
+    offset: int,
+    data: bytes,
+    total_size: int,
+    max_chunk_bytes: int,
+    sha256: str = "",
+) -> int:
+    """
+    校验并追加一个分片，返回追加后的已接收字节数。
+    offset 必须等于当前已接收字节数（否则 409 并回报服务端 offset，客户端据此续传）。
+    """
+    if len(data) > max_chunk_bytes:
+        raise UploadChunkError(413, "分片过大")
+    if not data:
+        raise UploadChunkError(400, "分片为空")
+    current = spooled_size(path)
+    if offset != current:
+        raise UploadChunkError(409, "分片偏移与已接收字节数不一致", offset=current)
+    if current + len(data) > total_size:
+        raise UploadChunkError(413, "分片超出声明的文件大小", offset=current)
+    expected = str(sha256 or "").strip().lower()
+    if expected and hashlib.sha256(data).hexdigest() != expected:
+        raise UploadChunkError(422, "分片校验和不一致", offset=current)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    return current + len(data)
+
+
+def file_digests(path: Path) -> tuple[str, str, int]:
+    """流式计算 (sha1, sha256, size)；sha1 与 ir.attachment.checksum 口径一致。"""
+    sha1 = hashlib.sha1()
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(COPY_BUFFER_BYTES), b""):
+            sha1.update(block)
+            sha256.update(block)
+            size += len(block)
+    return sha1.hexdigest(), sha256.hexdigest(), size
+
+
+def install_into_filestore(path: Path, full_path: Path) -> bool:
+    """把 spool 文件放到 filestore 目标位置；目标已存在（同内容）时返回 True 表示去重。"""
+    full_path = Path(full_path)
+    if full_path.is_file():
+        remove_spool(path)
+        return True
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+    staging = full_path.with_name(f".{full_path.name}.{os.getpid()}.upload")
+    try:
+        os.replace(path, staging)
+    except OSError:
+        # 跨设备：分块复制，不整体读入内存。
+        with open(path, "rb") as src, open(staging, "wb") as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+            dst.flush()
+            os.fsync(dst.fileno())
+        remove_spool(path)
+    os.replace(staging, full_path)
+    return False
+
+
+def remove_spool(path: Path) -> None:
+    try:
+        Path(path).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Global station message wake-ups over Postgres LISTEN/NOTIFY.
+
+全局站内信的推送唤醒：
+- 写入侧：notify_partners 在事务内累积受影响的 partner，提交后（postcommit）向 postgres 库的
+  sc_global_message 通道发一条 NOTIFY；同一事务内的多次写入合并为一次，回滚的事务不会唤醒任何人；
+- 监听侧：每个进程一个后台线程（首次等待时启动），收到通知后短暂合并同一波突发，
+  再按 (db, partner) 递增版本号，只唤醒这些 partner 的等待者；
+- 等待者先取版本号再查库，查库无变化才等版本号前进，查库与等待之间提交的消息不会漏掉；
+  监听连接断开重连后唤醒全部等待者重新查库；
+- 只有事件驱动的进程（gevent 长连接进程，odoo.evented）或经长连接路由转发的请求才真正挂起等待：
+  多线程/prefork 进程里每个等待都占着一个 HTTP 工作线程，一律按短轮询立即应答；
+  事件驱动进程里每进程同时等待的长轮询数仍有上限，超出时同样按短轮询应答；
+- 未读计数游标（revision cursor）= 快照 xmax + 取快照时仍在进行、可能以更小事务号提交的事务号，
+  不受全集群最老事务（快照 xmin）拖慢。
+"""
+from __future__ import annotations
+
+import json
+import logging
+import select
+import threading
+import time
+
+from .source_authority import build_source_authority_contract
+
+_logger = logging.getLogger(__name__)
+
+SOURCE_KIND = "global_message_notify_channel"
+SOURCE_AUTHORITIES = ("pg_notify.sc_global_message", "sc.global.message.unread")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+CHANNEL = "sc_global_message"
+MAX_PARTNERS_PER_NOTIFY = 500
+SELECT_TIMEOUT_SECONDS = 50
+COALESCE_SECONDS = 0.05
+RECONNECT_DELAY_SECONDS = 5
+MAX_WAITERS_PARAM = "sc.global_message.long_poll.max_waiters"
+DEFAULT_MAX_WAITERS = 256
+# 反向代理转发到 gevent 端口的路由前缀。
+LONG_POLL_ROUTE_PREFIXES = ("/longpolling/", "/websocket")
+# 游标中携带的进行中事务号上限；超出时退回到最小的进行中事务号（重复下发已见行，绝对计数幂等）。
+MAX_CURSOR_PENDING = 64
+
+_CR_PENDING_KEY = "sc_global_message.notify"
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="global.message.poll",
+    )
+
+
+def long_poll_supported(path: str = "") -> bool:
+    """当前进程能否挂起等待而不占用 HTTP 工作线程：gevent 进程或长连接路由。"""
+    import odoo
+
+    if getattr(odoo, "evented", False):
+        return True
+    return str(path or "").startswith(LONG_POLL_ROUTE_PREFIXES)
+
+
+def encode_revision_cursor(high: int, pending=()):
+    """无进行中事务时仍是整数（兼容旧客户端），否则为 "xmax:xid,xid"。"""
+    pending = sorted({int(xid) for xid in pending or () if int(xid) < int(high)})
+    if not pending:
+        return int(high)
+    if len(pending) > MAX_CURSOR_PENDING:
+        return pending[0]
+    return "%s:%s" % (int(high), ",".join(str(xid) for xid in pending))
+
+
+def decode_revision_cursor(value):
+    """返回 ((high, pending), error)；空值为 ((0, ()), None)。"""
+    if value is None or value is False or (isinstance(value, str) and not value.strip()):
+        return (0, ()), None
+    if isinstance(value, bool):
+        return None, "invalid"
+    high_text, _sep, pending_text = str(value).strip().partition(":")
+    try:
+        high = int(high_text)
+        pending = tuple(sorted({int(xid) for xid in pending_text.split(",") if xid.strip()}))
+    except Exception:
+        return None, "invalid"
+    if high < 0 or any(xid < 0 or xid >= high for xid in pending):
+        return None, "invalid"
+    return (high, pending), None
+
+
+def _partner_ids(values) -> set[int]:
+    out = set()
+    for value in values or []:
+        try:
+            parsed = int(value or 0)
+        except Exception:
+            continue
+        if parsed > 0:
+            out.add(parsed)
+    return out
+
+
+def encode_payloads(dbname: str, partner_ids) -> list[str]:
+    """NOTIFY 负载上限 8000 字节，partner 过多时分片。"""
+    ids = sorted(_partner_ids(partner_ids))
+    return [
+        json.dumps({"db": dbname, "partners": ids[offset : offset + MAX_PARTNERS_PER_NOTIFY]}, separators=(",", ":"))
+        for offset in range(0, len(ids), MAX_PARTNERS_PER_NOTIFY)
+    ]
+
+
+def decode_payload(payload: str):
+    try:
+        data = json.loads(payload or "")
+    except Exception:
+        return "", set()
+    if not isinstance(data, dict):
+        return "", set()
+    return str(data.get("db") or ""), _partner_ids(data.get("partners"))
+
+
+def _send(dbname: str, partner_ids) -> None:
+    from odoo import sql_db
+
+    try:
+        with sql_db.db_connect("postgres").cursor() as cr:
+            for payload in encode_payloads(dbname, partner_ids):
+                cr.execute("SELECT pg_notify(%s, %s)", (CHANNEL, payload))
+    except Exception:
+        # 唤醒失败只会让等待者按超时返回，客户端下一轮仍能拿到增量。
+        _logger.warning("global message notify failed: db=%s", dbname, exc_info=True)
+
+
+def notify_partners(env, partner_ids) -> None:
+    ids = _partner_ids(partner_ids)
+    if not ids:
+        return
+    cr = env.cr
+    data = cr.postcommit.data
+    pending = data.get(_CR_PENDING_KEY)
+    if pending is None:
+        pending = data[_CR_PENDING_KEY] = set()
+        dbname = cr.dbname
+        cr.postcommit.add(lambda: _send(dbname, pending))
+    pending.update(ids)
+
+
+class GlobalMessageDispatcher:
+    """进程内等待表：(db, partner) -> 版本号 + 等待事件。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: dict[tuple[str, int], int] = {}
+        self._waiters: dict[tuple[str, int], set[threading.Event]] = {}
+        self._thread = None
+        self._listening = False
+        self._active_polls = 0
+        self._stats = {"notifications": 0, "wakeups": 0, "timeouts": 0, "reconnects": 0, "rejected": 0}
+
+    def version(self, dbname: str, partner_id: int) -> int:
+        with self._lock:
+            return self._versions.get((dbname, int(partner_id)), 0)
+
+    def publish(self, dbname: str, partner_ids) -> int:
+        woken = 0
+        with self._lock:
+            for partner_id in _partner_ids(partner_ids):
+                key = (dbname, partner_id)
+                self._versions[key] = self._versions.get(key, 0) + 1
+                for event in self._waiters.get(key, ()):
+                    event.set()
+                    woken += 1
+            self._stats["wakeups"] += woken
+        return woken
+
+    def wake_all(self) -> None:
+        with self._lock:
+            for key, events in self._waiters.items():
+                self._versions[key] = self._versions.get(key, 0) + 1
+                for event in events:
+                    event.set()
+
+    def wait(self, dbname: str, partner_id: int, version: int, timeout: float) -> bool:
+        """版本号已前进或在 timeout 内前进返回 True，超时返回 False。"""
+        key = (dbname, int(partner_id))
+        event = threading.Event()
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return True
+            self._waiters.setdefault(key, set()).add(event)
+        try:
+            woken = event.wait(max(float(timeout or 0), 0.0))
+        finally:
+            with self._lock:
+                events = self._waiters.get(key)
+                if events is not None:
+                    events.discard(event)
+                    if not events:
+                        self._waiters.pop(key, None)
+                if not event.is_set():
+                    self._stats["timeouts"] += 1
+        return woken
+
+    def has_capacity(self, max_waiters: int) -> bool:
+        with self._lock:
+            return self._active_polls < max(int(max_waiters or 0), 0)
+
+    def acquire_poll(self, max_waiters: int) -> bool:
+        """占用一个长轮询名额；已达上限返回 False，调用方不再等待。"""
+        with self._lock:
+            if self._active_polls >= max(int(max_waiters or 0), 0):
+                self._stats["rejected"] += 1
+                return False
+            self._active_polls += 1
+            return True
+
+    def release_poll(self) -> None:
+        with self._lock:
+            self._active_polls = max(self._active_polls - 1, 0)
+
+    def available(self) -> bool:
+        """首次调用时启动监听线程；监听建立前返回 False，调用方按短轮询处理。"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sc.global_message.listener", daemon=True)
+                    self._thread.start()
+        return self._listening
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "listening": self._listening,
+                "waiters": sum(len(events) for events in self._waiters.values()),
+                "active_polls": self._active_polls,
+            }
+
+    def _drain(self, conn, batch: dict) -> None:
+        conn.poll()
+        while conn.notifies:
+            dbname, partner_ids = decode_payload(conn.notifies.pop().payload)
+            if dbname and partner_ids:
+                batch.setdefault(dbname, set()).update(partner_ids)
+                self._stats["notifications"] += 1
+
+    def _listen(self) -> None:
+        from odoo import sql_db
+
+        with sql_db.db_connect("postgres").cursor() as cr:
+            conn = cr._cnx
+            cr.execute("LISTEN %s" % CHANNEL)
+            cr.commit()
+            self._listening = True
+            # 断线期间的通知已丢失，让所有等待者重新查库。
+            self.wake_all()
+            while True:
+                if select.select([conn], [], [], SELECT_TIMEOUT_SECONDS) == ([], [], []):
+                    continue
+                batch: dict[str, set[int]] = {}
+                self._drain(conn, batch)
+                time.sleep(COALESCE_SECONDS)
+                self._drain(conn, batch)
+                for dbname, partner_ids in batch.items():
+                    self.publish(dbname, partner_ids)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                _logger.warning("global message listener disconnected; retrying", exc_info=True)
+            self._listening = False
+            self._stats["reconnects"] += 1
+            time.sleep(RECONNECT_DELAY_SECONDS)
+
+
+_DISPATCHER = GlobalMessageDispatcher()
+
+
+def global_message_dispatcher() -> GlobalMessageDispatcher:
+    return _DISPATCHER
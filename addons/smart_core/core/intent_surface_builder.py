@@ -3,13 +3,13 @@ from __future__ import annotations
 
 from typing import Dict, Iterable, List, Tuple
 
+from odoo.addons.smart_core.core.access_matrix import access_matrix_for_user
 from odoo.addons.smart_core.core.handler_registry import HANDLER_REGISTRY
-from odoo.addons.smart_core.identity.identity_resolver import IdentityResolver
 
 
 class IntentSurfaceBuilder:
     SOURCE_KIND = "intent_surface_projection"
-    SOURCE_AUTHORITIES = ("handler_registry", "ir.model.data", "res.groups", "identity_resolver")
+    SOURCE_AUTHORITIES = ("handler_registry", "ir.model.data", "res.groups", "identity_resolver", "access_matrix")
     NO_BUSINESS_FACT_AUTHORITY = True
 
     @classmethod
@@ -70,7 +70,11 @@ class IntentSurfaceBuilder:
         return (not req) or req.issubset(user_xmlids)
 
     def collect(self, env, user) -> Tuple[List[str], Dict[str, dict]]:
-        user_xmlids = IdentityResolver(env).user_group_xmlids(user)
+        matrix = access_matrix_for_user(env, user)
+        return list(matrix.get("intents") or []), dict(matrix.get("intents_meta") or {})
+
+    def collect_for_group_xmlids(self, env, user_xmlids: set) -> Tuple[List[str], Dict[str, dict]]:
+        user_xmlids = set(user_xmlids or set())
         canonical_rows: dict[str, dict] = {}
         alias_rows: dict[str, set[str]] = {}
 
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Local content-addressed cache for remote legacy attachments.
+
+旧系统远程附件的本地内容寻址缓存（无 ORM 依赖，可在线程池中运行）：
+- 后台按候选 URL 顺序抓取，流式写入临时文件并计算 sha256，落到 root/ab/<sha256>（同内容只存一份）；
+- 全部候选都返回 404/410 视为文件缺失（负缓存），其余失败视为临时错误，由调用方退避重试；
+- fetch_many 用有界线程池并发抓取，单个旧系统慢不会占满 Odoo worker。
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "legacy_file_cache"
+SOURCE_AUTHORITIES = ("sc.legacy.file.cache", "sc.legacy.file.index", "ir.attachment")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+CACHE_DIR_ENV = "SC_LEGACY_FILE_CACHE_DIR"
+CONCURRENCY_PARAM = "sc.legacy.file.prefetch.concurrency"
+MISSING_TTL_HOURS_PARAM = "sc.legacy.file.cache.missing_ttl_hours"
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+DEFAULT_MISSING_TTL_HOURS = 24
+DEFAULT_MAX_ATTEMPTS = 5
+# 认领租约：认领后即提交，抓取期间行不再被锁；租约到期仍为 running（cron 崩溃）的行可被重新认领。
+CLAIM_LEASE_SECONDS = 1800
+FETCH_TIMEOUT_SECONDS = 30
+MAX_FETCH_BYTES = 512 * 1024 * 1024
+COPY_BUFFER_BYTES = 256 * 1024
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 3600
+MISSING_HTTP_STATUSES = (404, 410)
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class LegacyFetchMissing(Exception):
+    """所有候选地址都明确返回文件不存在。"""
+
+
+class LegacyFetchError(Exception):
+    """网络/服务端错误，可重试。"""
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="legacy_file_cache",
+        write_proxy=True,
+    )
+
+
+def cache_root(data_dir: str, dbname: str) -> Path:
+    configured = str(os.environ.get(CACHE_DIR_ENV) or "").strip()
+    base = Path(configured) if configured else Path(data_dir) / "sc_legacy_file_cache"
+    return base / re.sub(r"[^A-Za-z0-9_.-]", "_", dbname or "default")
+
+
+def cas_path(root: Path, sha256: str) -> Path:
+    digest = str(sha256 or "").strip().lower()
+    if not _SHA256_RE.match(digest):
+        raise ValueError("invalid sha256")
+    return Path(root) / digest[:2] / digest
+
+
+def cached_file(root: Path, sha256: str) -> Path | None:
+    try:
+        path = cas_path(root, sha256)
+    except ValueError:
+        return None
+    return path if path.is_file() else None
+
+
+def retry_delay_seconds(attempts: int) -> int:
+    """指数退避：第 1 次失败 60s，逐次翻倍，上限 6 小时。"""
+    exponent = max(int(attempts or 0), 1) - 1
+    return min(RETRY_BASE_SECONDS * (2 ** min(exponent, 16)), RETRY_MAX_SECONDS)
+
+
+def _store_response(root: Path, response, max_bytes: int) -> dict:
+    root = Path(root)
+    tmp_dir = root / ".tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+    try:
+        with handle:
+            for block in iter(lambda: response.read(COPY_BUFFER_BYTES), b""):
+                size += len(block)
+                if size > max_bytes:
+                    raise LegacyFetchError(f"file exceeds {max_bytes} bytes")
+                digest.update(block)
+                handle.write(block)
+        sha256 = digest.hexdigest()
+        target = cas_path(root, sha256)
+        if target.is_file():
+            os.unlink(handle.name)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(handle.name, target)
+    except BaseException:
+        try:
+            os.unlink(handle.name)
+        except FileNotFoundError:
+            pass
+        raise
+    content_type = response.headers.get_content_type() if getattr(response, "headers", None) else ""
+    return {"sha256": sha256, "size": size, "mimetype": content_type or ""}
+
+
+def fetch_to_store(
+    root: Path,
+    urls: list[str],
+    *,
+    timeout: int = FETCH_TIMEOUT_SECONDS,
+    max_bytes: int = MAX_FETCH_BYTES,
+) -> dict:
+    """
+    按顺序尝试候选 URL，首个成功的写入缓存并返回 {sha256, size, mimetype, url}。
+    全部 404/410 -> LegacyFetchMissing；存在其他失败 -> LegacyFetchError。
+    """
+    urls = [url for url in dict.fromkeys(urls or []) if url]
+    if not urls:
+        raise LegacyFetchMissing("no candidate url")
+    last_error = ""
+    transient = False
+    for url in urls:
+        try:
+            with urlopen(Request(url, headers={"User-Agent": "Mozilla/5.0"}), timeout=timeout) as response:
+                result = _store_response(root, response, max_bytes)
+        except HTTPError as exc:
+            last_error = f"HTTP {exc.code}: {url}"
+            transient = transient or exc.code not in MISSING_HTTP_STATUSES
+            continue
+        except (OSError, LegacyFetchError) as exc:
+            last_error = f"{type(exc).__name__}: {exc}"
+            transient = True
+            continue
+        result["url"] = url
+        return result
+    if transient:
+        raise LegacyFetchError(last_error)
+    raise LegacyFetchMissing(last_error)
+
+
+def fetch_many(
+    root: Path,
+    jobs: list[dict],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: int = FETCH_TIMEOUT_SECONDS,
+    max_bytes: int = MAX_FETCH_BYTES,
+) -> list[dict]:
+    """
+    有界线程池并发抓取 jobs（每项 {"id", "urls"}），按输入顺序返回
+    {"id", "status": done|missing|error, "result"|"error"}。线程内不访问 ORM。
+    """
+
+    def _run(job):
+        try:
+            result = fetch_to_store(root, job.get("urls") or [], timeout=timeout, max_bytes=max_bytes)
+        except LegacyFetchMissing as exc:
+            return {"id": job.get("id"), "status": "missing", "error": str(exc)}
+        except Exception as exc:  # 单个任务失败不影响整批
+            return {"id": job.get("id"), "status": "error", "error": f"{type(exc).__name__}: {exc}"}
+        return {"id": job.get("id"), "status": "done", "result": result}
+
+    if not jobs:
+        return []
+    workers = min(max(int(concurrency or 0), 1), MAX_CONCURRENCY, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sc-legacy-prefetch") as pool:
+        return list(pool.map(_run, jobs))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Batched scene runtime block fetch helpers.
+
+场景 runtime block 批量获取（*.blocks.fetch）的平台侧辅助：
+- normalize_block_keys：规范化请求的 block 列表（去重、保序、限量）；
+- ndjson_line：流式输出时每个 block 一行 JSON，先完成的 block 先到达前端。
+"""
+from __future__ import annotations
+
+import json
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "scene_block_batch_runtime_carrier"
+SOURCE_AUTHORITIES = ("scene_runtime_service", "odoo.read_group", "odoo.orm")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+MAX_BATCH_BLOCKS = 16
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_MODE_NDJSON = "ndjson"
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="scene_entry_and_block_contract",
+    )
+
+
+def normalize_block_keys(value, limit: int = MAX_BATCH_BLOCKS) -> list[str]:
+    """接受列表或逗号分隔字符串，小写去重并保持请求顺序。"""
+    if isinstance(value, str):
+        items = value.split(",")
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = []
+    keys = []
+    for item in items:
+        key = str(item or "").strip().lower()
+        if key and key not in keys:
+            keys.append(key)
+    return keys[: max(int(limit or 0), 1)]
+
+
+def ndjson_line(payload: dict) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":")) + "\n").encode("utf-8")
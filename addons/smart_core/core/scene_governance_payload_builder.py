@@ -249,6 +249,10 @@ def build_scene_governance_payload_v1(
             "consumed_at": _as_text(queue_metrics.get("consumed_at")),
             "popped_count": int(queue_metrics.get("popped_count") or 0),
             "remaining_count": int(queue_metrics.get("remaining_count") or 0),
+            "running_count": int(queue_metrics.get("running_count") or 0),
+            "retry_count": int(queue_metrics.get("retry_count") or 0),
+            "failed_count": int(queue_metrics.get("failed_count") or 0),
+            "oldest_age_seconds": int(queue_metrics.get("oldest_age_seconds") or 0),
         },
         "scene_ready_consumption": consumption_summary,
         "diagnostics": {
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+system.init startup snapshot helpers.
+
+按 (用户, 角色面=组集合, 公司, 场景通道, contract_mode, build_mode, 请求参数) 持久化启动快照：
+- 有效性 = 版本向量（菜单/组/模块/场景/能力/权益等 write_date）+ 编译契约缓存代际 + TTL；
+- 快照按 data 顶层键切分为 part，各自带 etag；客户端回传 part_etags 时只下发变化的 part，
+  全部未变化时回 304。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from .contract_cache import read_generation
+from .contract_version_vector import build_contract_version_vector, contract_version_etag
+from .hash_utils import stable_fingerprint
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "system_init_startup_snapshot"
+SOURCE_AUTHORITIES = ("system.init", "contract_version_vector", "contract_cache_generation")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+SNAPSHOT_VERSION = "ss1"
+DEFAULT_TTL_SECONDS = 600
+TTL_PARAM_KEY = "sc.system_init.snapshot_ttl_seconds"
+
+# 启动面额外依赖的整表来源：场景、能力、权益与订阅；
+# 访问权限与记录规则按全表计入，ACL/规则变更即令快照失效（system.init 不按模型切分权限项）。
+STARTUP_SOURCE_MODELS = (
+    "ir.model.access",
+    "ir.rule",
+    "sc.scene",
+    "sc.scene.snapshot",
+    "sc.capability",
+    "sc.entitlement",
+    "sc.subscription",
+    "sc.ui.base.contract.asset",
+)
+
+# 协商参数，不参与快照键。
+NEGOTIATION_PARAM_KEYS = frozenset(
+    {
+        "part_etags",
+        "partEtags",
+        "if_none_match",
+        "ifNoneMatch",
+        "force_refresh",
+        "trace_id",
+    }
+)
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="system_init_startup_snapshot",
+    )
+
+
+def snapshot_request_params(params: dict | None) -> dict:
+    params = params if isinstance(params, dict) else {}
+    return {key: value for key, value in params.items() if key not in NEGOTIATION_PARAM_KEYS}
+
+
+def client_part_etags(params: dict | None) -> dict[str, str]:
+    params = params if isinstance(params, dict) else {}
+    raw = params.get("part_etags")
+    if raw is None:
+        raw = params.get("partEtags")
+    if isinstance(raw, str) and raw.strip():
+        try:
+            raw = json.loads(raw)
+        except Exception:
+            return {}
+    if not isinstance(raw, dict):
+        return {}
+    return {str(key): str(value or "").strip().strip('"') for key, value in raw.items() if str(value or "").strip()}
+
+
+def snapshot_key(
+    env,
+    *,
+    params: dict | None,
+    scene_channel: str,
+    contract_mode: str,
+    build_mode: str,
+) -> str:
+    context = getattr(env, "context", None) or {}
+    company = getattr(env, "company", None)
+    raw = json.dumps(
+        {
+            "v": SNAPSHOT_VERSION,
+            "uid": env.uid,
+            "company_id": getattr(company, "id", None),
+            "allowed_company_ids": list(context.get("allowed_company_ids") or []),
+            "lang": context.get("lang") or "",
+            "scene_channel": scene_channel or "",
+            "contract_mode": contract_mode or "",
+            "build_mode": build_mode or "",
+            "params": snapshot_request_params(params),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def snapshot_version(env, *, contract_mode: str) -> str:
+    """启动面版本：版本向量 + 契约缓存代际。任何一项不可读时返回空串（不走快照）。"""
+    vector = build_contract_version_vector(
+        env,
+        contract_mode=contract_mode,
+        request_key={"carrier": "system.init"},
+        extra_sources=STARTUP_SOURCE_MODELS,
+    )
+    version_etag = contract_version_etag(vector)
+    if not version_etag:
+        return ""
+    try:
+        generation = read_generation(env)
+    except Exception:
+        return ""
+    return "%s:%s:g%s" % (SNAPSHOT_VERSION, version_etag, generation)
+
+
+def build_part_etags(data: dict | None) -> dict[str, str]:
+    data = data if isinstance(data, dict) else {}
+    return {str(key): stable_fingerprint({"part": value}) for key, value in data.items()}
+
+
+def select_changed_parts(
+    data: dict | None,
+    part_etags: dict[str, str],
+    client_etags: dict[str, str] | None,
+) -> tuple[dict, list[str], list[str]]:
+    """返回 (变化的 part 数据, 未变化 part 键, 客户端持有但已不存在的 part 键)。"""
+    data = data if isinstance(data, dict) else {}
+    client_etags = client_etags if isinstance(client_etags, dict) else {}
+    changed: dict[str, Any] = {}
+    unchanged: list[str] = []
+    for key, value in data.items():
+        if client_etags.get(key) and client_etags.get(key) == part_etags.get(key):
+            unchanged.append(key)
+        else:
+            changed[key] = value
+    removed = sorted(key for key in client_etags if key not in data)
+    return changed, sorted(unchanged), removed
+
+
+def client_if_none_match(params: dict | None) -> str:
+    params = params if isinstance(params, dict) else {}
+    raw = params.get("if_none_match")
+    if raw is None:
+        raw = params.get("ifNoneMatch")
+    return str(raw or "").strip().strip('"')
+
+
+def negotiate_snapshot_response(
+    *,
+    data: dict,
+    meta: dict,
+    part_etags: dict[str, str],
+    client_etags: dict[str, str] | None,
+    if_none_match: str = "",
+    snapshot_meta: dict | None = None,
+) -> tuple[dict | None, dict, int | None]:
+    """
+    按客户端持有的 etag 协商下发内容，返回 (data, meta, code)：
+    - 顶层 etag 命中或全部 part 未变化 -> (None, meta, 304)；
+    - 客户端带 part_etags -> 只下发变化的 part（delivery=delta）；
+    - 否则整包下发（delivery=full），附带 part_etags 供下次协商。
+    """
+    out_meta = dict(meta or {})
+    out_meta["part_etags"] = dict(part_etags or {})
+    out_meta["startup_snapshot"] = dict(snapshot_meta or {})
+    top_etag = str(out_meta.get("etag") or "")
+    if if_none_match and top_etag and if_none_match == top_etag:
+        out_meta["delivery"] = "not_modified"
+        return None, out_meta, 304
+    if not client_etags:
+        out_meta["delivery"] = "full"
+        return data, out_meta, None
+    changed, unchanged, removed = select_changed_parts(data, part_etags, client_etags)
+    if not changed and not removed:
+        out_meta["delivery"] = "not_modified"
+        out_meta["parts_unchanged"] = unchanged
+        return None, out_meta, 304
+    out_meta["delivery"] = "delta"
+    out_meta["parts_unchanged"] = unchanged
+    out_meta["parts_removed"] = removed
+    return changed, out_meta, None
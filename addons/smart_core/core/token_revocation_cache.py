@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Bearer token revocation cache.
+
+进程内 (user_id -> token_version, active) 缓存 + Postgres 代际计数（单行计数表）：
+- 校验走请求游标：每个事务只读一次代际，命中时不再查询 res_users，也不再额外借出连接；
+- 失效：token_version / active 变更、用户删除时，在同一事务内递增代际，本 worker 立即清空
+  并在本事务内旁路缓存；其它 prefork worker 在下一次读取代际时整体失效；
+- 代际与 res_users 同事务提交、同快照读取：快照早于撤销提交的请求只会把旧值记在旧代际下，
+  不会出现“新代际 + 旧 token_version”的缓存条目（非事务的 sequence 做不到这一点）；
+- 分区代际只进不退，读写都带上调用方同步的代际：旧快照请求既不能把分区拉回旧代际，
+  也读不到、写不进新代际下的条目；
+- 不缓存“用户不存在”，新建用户无需失效；绕过 ORM 直接改库的场景需手工递增代际。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+
+from .source_authority import build_source_authority_contract
+
+_logger = logging.getLogger(__name__)
+
+SOURCE_KIND = "token_revocation_cache"
+SOURCE_AUTHORITIES = ("res.users", "pg_table.sc_token_revocation_generation")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+GENERATION_TABLE = "sc_token_revocation_generation"
+DEFAULT_MAX_USERS = 8192
+
+_CR_GENERATION_KEY = "sc_token_revocation.generation"
+_CR_BYPASS_KEY = "sc_token_revocation.bypass"
+_READY_DBS: set[str] = set()
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="token_revocation_cache",
+    )
+
+
+class TokenRevocationCache:
+    """按数据库分区的线程安全 LRU；每个分区记录其代际，代际变化时整体清空。"""
+
+    def __init__(self, *, max_users: int = DEFAULT_MAX_USERS):
+        self.max_users = max(int(max_users or 0), 1)
+        self._partitions: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "bypasses": 0}
+
+    def _partition(self, dbname: str) -> dict:
+        partition = self._partitions.get(dbname)
+        if partition is None:
+            partition = {"generation": None, "users": OrderedDict()}
+            self._partitions[dbname] = partition
+        return partition
+
+    def sync_generation(self, dbname: str, generation: int) -> None:
+        """只向前推进：快照较旧的请求带来的低代际不会回退分区，也不会清掉新代际下的条目。"""
+        with self._lock:
+            partition = self._partition(dbname)
+            current = partition["generation"]
+            if current is not None and generation <= current:
+                return
+            if current is not None:
+                self._stats["invalidations"] += 1
+            partition["users"].clear()
+            partition["generation"] = generation
+
+    def clear(self, dbname: str | None = None) -> None:
+        with self._lock:
+            for name, partition in self._partitions.items():
+                if dbname is None or name == dbname:
+                    partition["users"].clear()
+                    partition["generation"] = None
+
+    def get(self, dbname: str, user_id: int, generation: int):
+        """generation 为调用方同步的代际；分区处于其它代际时视为未命中，由调用方按自身快照查库。"""
+        with self._lock:
+            partition = self._partition(dbname)
+            users = partition["users"]
+            state = users.get(user_id) if partition["generation"] == generation else None
+            if state is None:
+                self._stats["misses"] += 1
+                return None
+            users.move_to_end(user_id)
+            self._stats["hits"] += 1
+            return state
+
+    def put(self, dbname: str, user_id: int, state: tuple, generation: int) -> bool:
+        """generation 为读取 state 时同步的代际；期间分区已切换到其它代际时丢弃写入。"""
+        with self._lock:
+            partition = self._partition(dbname)
+            if partition["generation"] is None or partition["generation"] != generation:
+                return False
+            users = partition["users"]
+            users[user_id] = state
+            users.move_to_end(user_id)
+            while len(users) > self.max_users:
+                users.popitem(last=False)
+            return True
+
+    def note_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypasses"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "users": sum(len(partition["users"]) for partition in self._partitions.values()),
+                "generations": {name: partition["generation"] for name, partition in self._partitions.items()},
+            }
+
+
+_CACHE = TokenRevocationCache()
+
+
+def token_revocation_cache() -> TokenRevocationCache:
+    return _CACHE
+
+
+def _cr_cache(env) -> dict | None:
+    cache = getattr(getattr(env, "cr", None), "cache", None)
+    return cache if isinstance(cache, dict) else None
+
+
+def _dbname(env) -> str:
+    return str(getattr(getattr(env, "cr", None), "dbname", "") or "")
+
+
+def ensure_generation_table(cr) -> None:
+    cr.execute(
+        "CREATE TABLE IF NOT EXISTS %s (id integer PRIMARY KEY, generation bigint NOT NULL DEFAULT 0)"
+        % GENERATION_TABLE
+    )
+
+
+def read_generation(env) -> int:
+    """读取全局代际；同一事务内只查询一次。计数表不存在时按 0 处理且不记忆，建表后即生效。"""
+    cache = _cr_cache(env)
+    if cache is not None and _CR_GENERATION_KEY in cache:
+        return cache[_CR_GENERATION_KEY]
+    dbname = _dbname(env)
+    if dbname not in _READY_DBS:
+        # to_regclass 对不存在的表返回 NULL，不会让请求事务进入 aborted 状态。
+        env.cr.execute("SELECT to_regclass(%s) IS NOT NULL", (GENERATION_TABLE,))
+        row = env.cr.fetchone()
+        if not (row and row[0]):
+            return 0
+        _READY_DBS.add(dbname)
+    env.cr.execute("SELECT generation FROM %s WHERE id = 1" % GENERATION_TABLE)
+    row = env.cr.fetchone()
+    generation = int(row[0]) if row and row[0] is not None else 0
+    if cache is not None:
+        cache[_CR_GENERATION_KEY] = generation
+    return generation
+
+
+def _read_user_state(env, user_id: int):
+    env.cr.execute("SELECT token_version, active FROM res_users WHERE id = %s", (int(user_id),))
+    row = env.cr.fetchone()
+    if not row:
+        return None
+    return int(row[0] or 0), bool(row[1])
+
+
+def user_token_state(env, user_id: int):
+    """
+    返回 (token_version, active)，用户不存在时返回 None。
+    代际读取失败或本事务内已有失效写入时直接查库，不影响主链路。
+    """
+    cache = _cr_cache(env)
+    if cache is not None and cache.get(_CR_BYPASS_KEY):
+        _CACHE.note_bypass()
+        return _read_user_state(env, user_id)
+    dbname = _dbname(env)
+    try:
+        generation = read_generation(env)
+        _CACHE.sync_generation(dbname, generation)
+    except Exception:
+        _logger.debug("token revocation generation unavailable; reading res_users directly", exc_info=True)
+        _CACHE.note_bypass()
+        return _read_user_state(env, user_id)
+    state = _CACHE.get(dbname, int(user_id), generation)
+    if state is not None:
+        return state
+    state = _read_user_state(env, user_id)
+    if state is not None:
+        # 并发请求可能已把分区推进到更新的代际（或被本 worker 的失效清空）：按读取时的代际写入，不一致即丢弃。
+        _CACHE.put(dbname, int(user_id), state, generation)
+    return state
+
+
+def bump_token_revocation_generation(env, *, reason: str = "") -> None:
+    """
+    token_version / active 变更或用户删除：在当前事务内递增全局代际（随事务提交/回滚），
+    本 worker 立即清空并在本事务内旁路缓存，其它 worker 在下次读取代际时失效。
+    """
+    _CACHE.clear(_dbname(env) or None)
+    cache = _cr_cache(env)
+    if cache is not None:
+        if cache.get(_CR_BYPASS_KEY):
+            return
+        cache[_CR_BYPASS_KEY] = True
+    _logger.debug("token revocation cache invalidated reason=%s", reason)
+    if _dbname(env) not in _READY_DBS:
+        ensure_generation_table(env.cr)
+    env.cr.execute(
+        "INSERT INTO {table} (id, generation) VALUES (1, 1) "
+        "ON CONFLICT (id) DO UPDATE SET generation = {table}.generation + 1".format(table=GENERATION_TABLE)
+    )
@@ -1,17 +1,21 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from .source_authority import build_source_authority_contract
 
-QUEUE_KEY = "sc.ui_base_contract.asset.refresh.queue"
-QUEUE_META_KEY = "sc.ui_base_contract.asset.refresh.queue.meta"
-DEFAULT_MAX_QUEUE_SIZE = 500
+QUEUE_TABLE = "sc_ui_base_contract_asset_job"
+# 旧版队列（ir.config_parameter JSON 列表），仅供升级迁移读取。
+LEGACY_QUEUE_KEY = "sc.ui_base_contract.asset.refresh.queue"
+LEGACY_QUEUE_META_KEY = "sc.ui_base_contract.asset.refresh.queue.meta"
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 3600
+CLAIM_LEASE_SECONDS = 900
 SOURCE_KIND = "ui_base_contract_asset_event_queue"
-SOURCE_AUTHORITIES = ("ir.config_parameter", "ui_base_contract_asset")
+SOURCE_AUTHORITIES = ("sc.ui.base.contract.asset.job", "ui_base_contract_asset")
 NO_BUSINESS_FACT_AUTHORITY = True
 
 
@@ -29,8 +33,17 @@ def _text(value: Any) -> str:
     return str(value or "").strip()
 
 
-def _utc_z() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+def _utc_now() -> datetime:
+    # 与 Odoo Datetime 字段一致：UTC naive。
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _utc_z(value: datetime | None = None) -> str:
+    if value is None:
+        value = _utc_now()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
 def _normalize_scene_key(value: Any) -> str:
@@ -44,146 +57,222 @@ def _normalize_scene_key(value: Any) -> str:
     return key
 
 
-def _normalize_queue_payload(payload: Any) -> list[str]:
-    if not isinstance(payload, list):
+def _normalize_scene_keys(values: Any) -> list[str]:
+    """去重排序：多个生产者按相同顺序写入唯一索引，避免互相死锁。"""
+    if not isinstance(values, (list, tuple, set)):
         return []
-    out: list[str] = []
-    seen = set()
-    for item in payload:
-        key = _normalize_scene_key(item)
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        out.append(key)
-    return out
-
-
-def _load_queue_with_changed(config) -> tuple[list[str], bool]:
-    raw = _text(config.get_param(QUEUE_KEY) or "")
-    if not raw:
-        return [], False
-    try:
-        payload = json.loads(raw)
-    except Exception:
-        return [], True
-    if not isinstance(payload, list):
-        return [], True
-    normalized = _normalize_queue_payload(payload)
-    changed = normalized != payload
-    return normalized, changed
-
-
-def _load_queue(config) -> list[str]:
-    queue, _ = _load_queue_with_changed(config)
-    return queue
-
+    return sorted({key for key in (_normalize_scene_key(item) for item in values) if key})
 
-def _save_queue(config, queue: list[str]) -> None:
-    config.set_param(QUEUE_KEY, json.dumps(queue, ensure_ascii=False, separators=(",", ":")))
 
+def retry_delay_seconds(attempts: int) -> int:
+    """指数退避：第 1 次失败 60s，逐次翻倍，上限 1 小时。"""
+    exponent = max(int(attempts or 0), 1) - 1
+    return min(RETRY_BASE_SECONDS * (2 ** min(exponent, 16)), RETRY_MAX_SECONDS)
 
-def _load_queue_meta(config) -> dict:
-    raw = _text(config.get_param(QUEUE_META_KEY) or "")
-    if not raw:
-        return {}
-    try:
-        payload = json.loads(raw)
-    except Exception:
-        return {}
-    return payload if isinstance(payload, dict) else {}
 
-
-def enqueue_scene_keys(
-    env,
-    *,
-    scene_keys: list[str] | None,
-    reason: str = "event",
-    max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
-) -> dict:
-    config = env["ir.config_parameter"].sudo()
-    current, changed = _load_queue_with_changed(config)
-    if changed:
-        _save_queue(config, current)
-    existing = set(current)
+def enqueue_scene_keys(env, *, scene_keys: list[str] | None, reason: str = "event") -> dict:
+    """
+    一条 upsert 入队：新键插入为 pending；已存在的键 revision+1，
+    done/failed 重新置为 pending，running 保持（完成时按 revision 判断是否需要再跑）。
+    """
+    keys = _normalize_scene_keys(scene_keys)
+    reason = _text(reason) or "event"
     added = 0
-    for item in scene_keys or []:
-        key = _normalize_scene_key(item)
-        if not key or key in existing:
-            continue
-        current.append(key)
-        existing.add(key)
-        added += 1
-    max_size = max(int(max_queue_size or 0), 1)
-    if len(current) > max_size:
-        current = current[-max_size:]
-    _save_queue(config, current)
-    meta = {
-        "reason": _text(reason) or "event",
-        "updated_at": _utc_z(),
-        "size": len(current),
-        "added": int(added),
-    }
-    config.set_param(QUEUE_META_KEY, json.dumps(meta, ensure_ascii=False, separators=(",", ":")))
+    if keys:
+        now = _utc_now()
+        env.cr.execute(
+            f"""
+            INSERT INTO {QUEUE_TABLE} AS job
+                (scene_key, reason, state, revision, attempts, enqueued_at, updated_at, available_at)
+            SELECT key, %(reason)s, 'pending', 1, 0, %(now)s, %(now)s, %(now)s
+              FROM unnest(%(keys)s::varchar[]) AS key
+             ORDER BY key
+            ON CONFLICT (scene_key) DO UPDATE SET
+                revision = job.revision + 1,
+                reason = EXCLUDED.reason,
+                updated_at = EXCLUDED.updated_at,
+                state = CASE WHEN job.state IN ('done', 'failed') THEN 'pending' ELSE job.state END,
+                attempts = CASE WHEN job.state IN ('done', 'failed') THEN 0 ELSE job.attempts END,
+                enqueued_at = CASE WHEN job.state IN ('done', 'failed') THEN EXCLUDED.enqueued_at ELSE job.enqueued_at END,
+                available_at = CASE WHEN job.state IN ('done', 'failed') THEN EXCLUDED.available_at ELSE job.available_at END
+            RETURNING job.enqueued_at = %(now)s
+            """,
+            {"reason": reason, "now": now, "keys": keys},
+        )
+        added = sum(1 for row in env.cr.fetchall() if row[0])
     return {
         "source_authority": source_authority_contract(),
-        "queue_size": len(current),
+        "queue_size": queue_depth(env),
         "added_count": int(added),
-        "reason": meta["reason"],
+        "reason": reason,
     }
 
 
-def pop_scene_keys(env, *, limit: int = 50) -> dict:
-    config = env["ir.config_parameter"].sudo()
-    current, changed = _load_queue_with_changed(config)
-    if changed:
-        _save_queue(config, current)
+def queue_depth(env) -> int:
+    env.cr.execute(f"SELECT COUNT(*) FROM {QUEUE_TABLE} WHERE state IN ('pending', 'running')")
+    return int((env.cr.fetchone() or (0,))[0] or 0)
+
+
+def pop_scene_keys(env, *, limit: int = 50, lease_seconds: int = CLAIM_LEASE_SECONDS) -> dict:
+    """
+    认领一批到期任务（FOR UPDATE SKIP LOCKED，多个消费者互不阻塞）并置为 running；
+    租约超时的 running（消费者崩溃且已提交认领）可被重新认领。
+    返回的 jobs 携带认领时的 revision，交给 complete_scene_keys 收尾。
+    """
+    now = _utc_now()
     batch_size = max(int(limit or 0), 1)
-    selected = current[:batch_size]
-    remain = current[batch_size:]
-    _save_queue(config, remain)
-    meta = _load_queue_meta(config)
-    meta.update(
-        {
-            "last_operation": "pop",
-            "consumed_at": _utc_z(),
-            "popped_count": len(selected),
-            "remaining_count": len(remain),
-            "size": len(remain),
-        }
+    env.cr.execute(
+        f"""
+        WITH picked AS (
+            SELECT id
+              FROM {QUEUE_TABLE}
+             WHERE (state = 'pending' AND available_at <= %(now)s)
+                OR (state = 'running' AND claimed_at <= %(lease_expired)s)
+             ORDER BY available_at, id
+             LIMIT %(limit)s
+             FOR UPDATE SKIP LOCKED
+        )
+        UPDATE {QUEUE_TABLE} AS job
+           SET state = 'running', claimed_at = %(now)s, attempts = job.attempts + 1
+          FROM picked
+         WHERE job.id = picked.id
+        RETURNING job.scene_key, job.revision, job.attempts
+        """,
+        {"now": now, "lease_expired": now - timedelta(seconds=max(int(lease_seconds or 0), 1)), "limit": batch_size},
     )
-    config.set_param(QUEUE_META_KEY, json.dumps(meta, ensure_ascii=False, separators=(",", ":")))
+    jobs = [
+        {"scene_key": scene_key, "revision": int(revision), "attempts": int(attempts)}
+        for scene_key, revision, attempts in sorted(env.cr.fetchall())
+    ]
+    remaining = queue_depth(env) - len(jobs)
     return {
         "source_authority": source_authority_contract(),
-        "scene_keys": list(selected),
-        "popped_count": len(selected),
-        "remaining_count": len(remain),
+        "scene_keys": [job["scene_key"] for job in jobs],
+        "jobs": jobs,
+        "popped_count": len(jobs),
+        "remaining_count": max(remaining, 0),
     }
 
 
-def get_queue_metrics(env) -> dict:
-    config = env["ir.config_parameter"].sudo()
-    queue, changed = _load_queue_with_changed(config)
-    if changed:
-        _save_queue(config, queue)
-    meta = _load_queue_meta(config)
-    if changed:
-        meta.update(
+def complete_scene_keys(
+    env,
+    *,
+    jobs: list[dict] | None,
+    failed_scene_keys: list[str] | None = None,
+    error: str = "",
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> dict:
+    """
+    收尾已认领任务：
+    - 成功且认领后无新事件 -> done；认领后又有入队（revision 变化）-> pending 立即重跑；
+    - 失败 -> pending 并按 attempts 退避；超过 max_attempts -> failed（新事件会重新激活）。
+    """
+    failed = {_normalize_scene_key(item) for item in (failed_scene_keys or [])}
+    now = _utc_now()
+    done_rows, retry_rows = [], []
+    for job in jobs or []:
+        scene_key = _normalize_scene_key(job.get("scene_key"))
+        if not scene_key:
+            continue
+        revision = int(job.get("revision") or 0)
+        if scene_key in failed:
+            attempts = int(job.get("attempts") or 0)
+            give_up = attempts >= max(int(max_attempts or 0), 1)
+            retry_at = now + timedelta(seconds=retry_delay_seconds(attempts))
+            retry_rows.append((scene_key, revision, "failed" if give_up else "pending", retry_at))
+        else:
+            done_rows.append((scene_key, revision))
+    if done_rows:
+        env.cr.execute(
+            f"""
+            UPDATE {QUEUE_TABLE} AS job
+               SET state = CASE WHEN job.revision = done.revision THEN 'done' ELSE 'pending' END,
+                   attempts = 0,
+                   available_at = %(now)s,
+                   finished_at = %(now)s,
+                   last_error = NULL
+              FROM unnest(%(keys)s::varchar[], %(revisions)s::integer[]) AS done(scene_key, revision)
+             WHERE job.scene_key = done.scene_key AND job.state = 'running'
+            """,
+            {"keys": [row[0] for row in done_rows], "revisions": [row[1] for row in done_rows], "now": now},
+        )
+    if retry_rows:
+        env.cr.execute(
+            f"""
+            UPDATE {QUEUE_TABLE} AS job
+               SET state = CASE WHEN job.revision <> retry.revision THEN 'pending' ELSE retry.state END,
+                   available_at = CASE WHEN job.revision <> retry.revision THEN %(now)s ELSE retry.retry_at END,
+                   finished_at = %(now)s,
+                   last_error = %(error)s
+              FROM unnest(%(keys)s::varchar[], %(revisions)s::integer[], %(states)s::varchar[], %(retry_at)s::timestamp[])
+                   AS retry(scene_key, revision, state, retry_at)
+             WHERE job.scene_key = retry.scene_key AND job.state = 'running'
+            """,
             {
-                "last_operation": "compact",
-                "updated_at": _utc_z(),
-                "remaining_count": len(queue),
-                "size": len(queue),
-            }
+                "keys": [row[0] for row in retry_rows],
+                "revisions": [row[1] for row in retry_rows],
+                "states": [row[2] for row in retry_rows],
+                "retry_at": [row[3] for row in retry_rows],
+                "now": now,
+                "error": (_text(error) or "asset production failed")[:256],
+            },
         )
-        config.set_param(QUEUE_META_KEY, json.dumps(meta, ensure_ascii=False, separators=(",", ":")))
+    return {
+        "done_count": len(done_rows),
+        "retry_count": sum(1 for row in retry_rows if row[2] == "pending"),
+        "failed_count": sum(1 for row in retry_rows if row[2] == "failed"),
+    }
+
+
+def get_queue_metrics(env) -> dict:
+    now = _utc_now()
+    env.cr.execute(
+        f"""
+        SELECT COUNT(*) FILTER (WHERE state IN ('pending', 'running')),
+               COUNT(*) FILTER (WHERE state = 'running'),
+               COUNT(*) FILTER (WHERE state = 'pending' AND attempts > 0),
+               COUNT(*) FILTER (WHERE state = 'failed'),
+               MIN(enqueued_at) FILTER (WHERE state IN ('pending', 'running')),
+               MAX(updated_at),
+               MAX(claimed_at),
+               MAX(finished_at)
+          FROM {QUEUE_TABLE}
+        """
+    )
+    depth, running, retrying, failed, oldest, updated_at, claimed_at, finished_at = env.cr.fetchone() or (
+        0, 0, 0, 0, None, None, None, None
+    )
+    reason = ""
+    added = popped = 0
+    if updated_at:
+        env.cr.execute(f"SELECT reason FROM {QUEUE_TABLE} ORDER BY updated_at DESC, id DESC LIMIT 1")
+        reason = _text((env.cr.fetchone() or ("",))[0])
+        if claimed_at:
+            env.cr.execute(
+                f"SELECT COUNT(*) FROM {QUEUE_TABLE} WHERE state = 'pending' AND enqueued_at > %s",
+                (claimed_at,),
+            )
+        else:
+            env.cr.execute(f"SELECT COUNT(*) FROM {QUEUE_TABLE} WHERE state = 'pending'")
+        added = int((env.cr.fetchone() or (0,))[0] or 0)
+    if claimed_at:
+        env.cr.execute(f"SELECT COUNT(*) FROM {QUEUE_TABLE} WHERE claimed_at = %s", (claimed_at,))
+        popped = int((env.cr.fetchone() or (0,))[0] or 0)
+    last_operation = ""
+    if updated_at or claimed_at:
+        last_operation = "pop" if claimed_at and (not updated_at or claimed_at >= updated_at) else "enqueue"
     return {
         "source_authority": source_authority_contract(),
-        "queue_size": len(queue),
-        "updated_at": _text(meta.get("updated_at")),
-        "reason": _text(meta.get("reason")),
-        "added_count": int(meta.get("added") or 0),
-        "last_operation": _text(meta.get("last_operation")),
-        "consumed_at": _text(meta.get("consumed_at")),
-        "popped_count": int(meta.get("popped_count") or 0),
-        "remaining_count": len(queue),
+        "queue_size": int(depth or 0),
+        "updated_at": _utc_z(updated_at) if updated_at else "",
+        "reason": reason,
+        "added_count": added,
+        "last_operation": last_operation,
+        "consumed_at": _utc_z(finished_at) if finished_at else "",
+        "popped_count": popped,
+        "remaining_count": int(depth or 0),
+        "running_count": int(running or 0),
+        "retry_count": int(retrying or 0),
+        "failed_count": int(failed or 0),
+        "oldest_age_seconds": max(int((now - oldest).total_seconds()), 0) if oldest else 0,
     }
@@ -141,6 +141,8 @@ def refresh_ui_base_contract_assets(
     produced = 0
     skipped = 0
     failed = 0
+    produced_keys: list[str] = []
+    failed_keys: list[str] = []
     for scene in rows:
         if produced >= max(int(limit or 0), 1):
             break
@@ -178,12 +180,16 @@ def refresh_ui_base_contract_assets(
                 status="active",
             )
             produced += 1
+            produced_keys.append(scene_key)
         except Exception:
             failed += 1
+            failed_keys.append(scene_key)
     return {
         "requested_scene_count": len(requested_keys),
         "produced_count": produced,
         "skipped_count": skipped,
         "failed_count": failed,
+        "produced_scene_keys": produced_keys,
+        "failed_scene_keys": failed_keys,
         "scene_source": _text(scene_source),
     }
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Usage daily rollup queries.
+
+sc_usage_rollup 以 (company_id, day, event_type, subject_key, role_code, user_id, legacy_slice) 为粒度，
+usage.report / usage.export.csv 在请求的日期窗口内做带索引的 GROUP BY，不再全量加载计数键做字符串解析。
+
+legacy_slice 标记从旧字符串键回填的日切片（旧键各维度独立累计，无法还原联合粒度）：
+- "daily" / "role_daily" / "user_daily" 只参与对应口径的日趋势；
+- 排行（对象/角色/用户）只统计结构化事件行（legacy_slice = ''）。
+"""
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import Any
+
+from .source_authority import build_source_authority_contract
+from .usage_telemetry import EVENT_PREFIXES, split_role_signature
+
+SOURCE_KIND = "usage_daily_rollup"
+SOURCE_AUTHORITIES = ("sc.usage.rollup",)
+NO_BUSINESS_FACT_AUTHORITY = True
+
+LEGACY_SLICE_DAILY = "daily"
+LEGACY_SLICE_ROLE_DAILY = "role_daily"
+LEGACY_SLICE_USER_DAILY = "user_daily"
+
+_LEGACY_DAILY_RE = re.compile(
+    r"^usage\.(scene_open|capability_open)\.(?:(role|user)\.([^.]+)\.)?daily\.(\d{4}-\d{2}-\d{2})$"
+)
+LEGACY_DAILY_KEY_SQL_PATTERN = r"^usage\.(scene_open|capability_open)\.((role|user)\.[^.]+\.)?daily\.[0-9]{4}-[0-9]{2}-[0-9]{2}$"
+
+_DAILY_SQL = """
+    SELECT event_type, day, SUM(event_count), MAX(updated_at)
+      FROM sc_usage_rollup
+     WHERE company_id = %s AND day BETWEEN %s AND %s AND {scope}
+     GROUP BY event_type, day
+"""
+
+_SUBJECT_TOP_SQL = """
+    SELECT event_type, subject_key, total
+      FROM (
+        SELECT event_type, subject_key, SUM(event_count) AS total,
+               ROW_NUMBER() OVER (PARTITION BY event_type ORDER BY SUM(event_count) DESC, subject_key) AS rn
+          FROM sc_usage_rollup
+         WHERE company_id = %s AND day BETWEEN %s AND %s AND {scope}
+           AND ((event_type = 'scene_open' AND lower(subject_key) LIKE %s)
+             OR (event_type = 'capability_open' AND lower(subject_key) LIKE %s))
+         GROUP BY event_type, subject_key
+      ) ranked
+     WHERE rn <= %s
+     ORDER BY event_type, rn
+"""
+
+_ROLE_SQL = """
+    SELECT role_code, event_type, SUM(event_count)
+      FROM sc_usage_rollup
+     WHERE company_id = %s AND day BETWEEN %s AND %s AND legacy_slice = '' AND role_code <> ''
+     GROUP BY role_code, event_type
+"""
+
+_USER_TOP_SQL = """
+    SELECT user_id,
+           SUM(CASE WHEN event_type = 'scene_open' THEN event_count ELSE 0 END),
+           SUM(CASE WHEN event_type = 'capability_open' THEN event_count ELSE 0 END)
+      FROM sc_usage_rollup
+     WHERE company_id = %s AND day BETWEEN %s AND %s AND legacy_slice = '' AND user_id > 0
+     GROUP BY user_id
+     ORDER BY SUM(event_count) DESC, user_id
+     LIMIT %s
+"""
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="usage.report",
+    )
+
+
+def parse_legacy_daily_key(key: str) -> dict[str, Any] | None:
+    """旧日切片键 -> 回填维度；非日切片键返回 None。"""
+    match = _LEGACY_DAILY_RE.match(str(key or ""))
+    if not match:
+        return None
+    event_type, scope, scope_value, day = match.groups()
+    row = {"event_type": event_type, "day": day, "role_code": "", "user_id": 0, "legacy_slice": LEGACY_SLICE_DAILY}
+    if scope == "role":
+        row.update(role_code=scope_value.strip().lower(), legacy_slice=LEGACY_SLICE_ROLE_DAILY)
+    elif scope == "user":
+        try:
+            user_id = int(scope_value)
+        except ValueError:
+            return None
+        if user_id <= 0:
+            return None
+        row.update(user_id=user_id, legacy_slice=LEGACY_SLICE_USER_DAILY)
+    return row
+
+
+def _like_prefix(prefix: str) -> str:
+    escaped = str(prefix or "").lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def native_scope(role_code: str = "", user_id: int = 0) -> tuple[str, list]:
+    """结构化事件行的角色/用户过滤；角色按签名成员匹配。"""
+    clauses = ["legacy_slice = ''"]
+    params: list = []
+    if role_code:
+        clauses.append("(',' || role_code || ',') LIKE %s")
+        params.append("%%,%s,%%" % str(role_code).strip().lower())
+    if user_id:
+        clauses.append("user_id = %s")
+        params.append(int(user_id))
+    return "(" + " AND ".join(clauses) + ")", params
+
+
+def daily_scope(role_code: str = "", user_id: int = 0) -> tuple[str, list]:
+    """日趋势口径：结构化事件行 + 同口径的回填日切片。"""
+    native_sql, native_params = native_scope(role_code, user_id)
+    if role_code and user_id:
+        return native_sql, native_params
+    if role_code:
+        legacy_sql = "(legacy_slice = %s AND role_code = %s)"
+        legacy_params = [LEGACY_SLICE_ROLE_DAILY, str(role_code).strip().lower()]
+    elif user_id:
+        legacy_sql = "(legacy_slice = %s AND user_id = %s)"
+        legacy_params = [LEGACY_SLICE_USER_DAILY, int(user_id)]
+    else:
+        legacy_sql = "(legacy_slice = %s)"
+        legacy_params = [LEGACY_SLICE_DAILY]
+    return "(%s OR %s)" % (native_sql, legacy_sql), native_params + legacy_params
+
+
+def query_rollup_report(
+    cr,
+    *,
+    company_id: int,
+    day_from: str,
+    day_to: str,
+    top_n: int,
+    scene_prefix: str = "",
+    capability_prefix: str = "",
+    role_code: str = "",
+    user_id: int = 0,
+) -> dict[str, Any]:
+    """日期窗口内四条 GROUP BY：日趋势、对象排行、角色合计、用户排行。"""
+    window = [int(company_id), day_from, day_to]
+    daily: dict[str, dict[str, int]] = {event_type: {} for event_type in EVENT_PREFIXES}
+    generated_at = None
+    scope_sql, scope_params = daily_scope(role_code, user_id)
+    cr.execute(_DAILY_SQL.format(scope=scope_sql), window + scope_params)
+    for event_type, day, total, updated_at in cr.fetchall():
+        if event_type in daily:
+            daily[event_type][str(day)] = int(total or 0)
+        if updated_at and (generated_at is None or updated_at > generated_at):
+            generated_at = updated_at
+
+    top: dict[str, list[dict[str, Any]]] = {event_type: [] for event_type in EVENT_PREFIXES}
+    scope_sql, scope_params = native_scope(role_code, user_id)
+    cr.execute(
+        _SUBJECT_TOP_SQL.format(scope=scope_sql),
+        window + scope_params + [_like_prefix(scene_prefix), _like_prefix(capability_prefix), int(top_n)],
+    )
+    for event_type, subject_key, total in cr.fetchall():
+        if event_type in top:
+            top[event_type].append({"key": subject_key, "count": int(total or 0)})
+
+    role_totals: dict[str, dict[str, int]] = {event_type: defaultdict(int) for event_type in EVENT_PREFIXES}
+    cr.execute(_ROLE_SQL, window)
+    for signature, event_type, total in cr.fetchall():
+        if event_type not in role_totals:
+            continue
+        for code in split_role_signature(signature):
+            role_totals[event_type][code] += int(total or 0)
+
+    user_totals: dict[str, dict[int, int]] = {event_type: {} for event_type in EVENT_PREFIXES}
+    cr.execute(_USER_TOP_SQL, window + [int(top_n)])
+    for uid, scene_total, capability_total in cr.fetchall():
+        user_totals["scene_open"][int(uid)] = int(scene_total or 0)
+        user_totals["capability_open"][int(uid)] = int(capability_total or 0)
+
+    return {
+        "generated_at": generated_at,
+        "daily": daily,
+        "top": top,
+        "role_totals": {event_type: dict(values) for event_type, values in role_totals.items()},
+        "user_totals": user_totals,
+    }
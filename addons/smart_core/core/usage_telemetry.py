@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Buffered usage telemetry.
+
+usage.track 不再在请求事务内逐键 upsert 热点计数行（advisory lock + ON CONFLICT），而是：
+- 一次事件以一行结构化记录（日期/事件/对象键/角色/用户）追加到 UNLOGGED 暂存表 sc_usage_event_stage；
+- 定时 flusher 把暂存行聚合为增量，按维度排序后批量 upsert 到日汇总表 sc_usage_rollup，
+  全局合计键仍写入 sc_usage_counter；
+- 暂存积压超过上限时丢弃事件并计数（进程内统计 + 下次成功暂存时补记 usage.telemetry.dropped 键）。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "usage_telemetry_buffer"
+SOURCE_AUTHORITIES = ("sc.usage.event.stage", "sc.usage.rollup", "sc.usage.counter")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+MAX_PENDING_PARAM_KEY = "smart_core.usage_telemetry.max_pending"
+DEFAULT_MAX_PENDING = 200000
+PENDING_PROBE_TTL_SECONDS = 5.0
+FLUSH_BATCH_SIZE = 5000
+DROPPED_COUNTER_KEY = "usage.telemetry.dropped"
+
+EVENT_PREFIXES = {
+    "scene_open": "usage.scene_open",
+    "capability_open": "usage.capability_open",
+}
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="usage.track",
+    )
+
+
+def usage_event_keys(
+    event_type: str,
+    subject_key: str,
+    *,
+    uid: int = 0,
+    role_codes: Iterable[str] = (),
+    day_key: str = "",
+) -> list[str]:
+    """展开一次事件命中的全部计数键（用户 → 角色 → 全局），未知事件返回空列表。"""
+    prefix = EVENT_PREFIXES.get(str(event_type or ""))
+    if not prefix or not subject_key:
+        return []
+    keys: list[str] = []
+    if uid:
+        keys.extend([
+            f"{prefix}.user.{uid}.total",
+            f"{prefix}.user.{uid}.{subject_key}",
+            f"{prefix}.user.{uid}.daily.{day_key}",
+        ])
+    for role_code in role_codes or []:
+        keys.extend([
+            f"{prefix}.role.{role_code}.total",
+            f"{prefix}.role.{role_code}.{subject_key}",
+            f"{prefix}.role.{role_code}.daily.{day_key}",
+        ])
+    keys.extend([
+        f"{prefix}.total",
+        f"{prefix}.{subject_key}",
+        f"{prefix}.daily.{day_key}",
+    ])
+    return keys
+
+
+def role_signature(role_codes: Iterable[str]) -> str:
+    """角色集合的稳定签名（排序后逗号拼接）；多角色用户一次事件只记一行，避免全局合计重复计数。"""
+    return ",".join(sorted({str(code or "").strip().lower() for code in role_codes or [] if str(code or "").strip()}))
+
+
+def split_role_signature(signature: str) -> list[str]:
+    return [code for code in str(signature or "").split(",") if code]
+
+
+class StageBackpressure:
+    """
+    进程内暂存积压判定与丢弃计数。
+
+    积压数按 PENDING_PROBE_TTL_SECONDS 周期探测一次（有界 COUNT），期间按本进程写入量递增估算，
+    避免每次事件都扫描暂存表。
+    """
+
+    def __init__(self, probe_ttl_seconds: float = PENDING_PROBE_TTL_SECONDS):
+        self.probe_ttl_seconds = float(probe_ttl_seconds)
+        self._lock = threading.Lock()
+        self._pending: dict[str, tuple[float, int]] = {}
+        self._unreported_drops: dict[tuple[str, int], int] = {}
+        self.staged_total = 0
+        self.dropped_total = 0
+
+    def needs_probe(self, dbname: str, *, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            probe = self._pending.get(dbname)
+            return probe is None or now - probe[0] >= self.probe_ttl_seconds
+
+    def record_probe(self, dbname: str, pending: int, *, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._pending[dbname] = (now, max(int(pending or 0), 0))
+
+    def pending_estimate(self, dbname: str) -> int:
+        with self._lock:
+            probe = self._pending.get(dbname)
+            return probe[1] if probe else 0
+
+    def admit(self, dbname: str, company_id: int, rows: int, max_pending: int) -> bool:
+        with self._lock:
+            probe_at, pending = self._pending.get(dbname, (0.0, 0))
+            if max_pending > 0 and pending + rows > max_pending:
+                bucket = (dbname, int(company_id or 0))
+                self._unreported_drops[bucket] = self._unreported_drops.get(bucket, 0) + rows
+                self.dropped_total += rows
+                return False
+            self._pending[dbname] = (probe_at, pending + rows)
+            self.staged_total += rows
+            return True
+
+    def take_unreported_drops(self, dbname: str, company_id: int) -> int:
+        with self._lock:
+            return self._unreported_drops.pop((dbname, int(company_id or 0)), 0)
+
+    def restore_unreported_drops(self, dbname: str, company_id: int, count: int) -> None:
+        if count <= 0:
+            return
+        with self._lock:
+            bucket = (dbname, int(company_id or 0))
+            self._unreported_drops[bucket] = self._unreported_drops.get(bucket, 0) + count
+
+    def stats(self, dbname: str) -> dict:
+        with self._lock:
+            probe = self._pending.get(dbname)
+            unreported = sum(count for (db, _company), count in self._unreported_drops.items() if db == dbname)
+            return {
+                "pending_estimate": probe[1] if probe else 0,
+                "staged_total": self.staged_total,
+                "dropped_total": self.dropped_total,
+                "dropped_unreported": unreported,
+            }
+
+
+_BACKPRESSURE = StageBackpressure()
+
+
+def stage_backpressure() -> StageBackpressure:
+    return _BACKPRESSURE
+
+
+def stage_rows(
+    company_id: int,
+    *,
+    event_type: str,
+    subject_key: str,
+    user_id: int = 0,
+    role_codes: Iterable[str] = (),
+    day: str = "",
+    delta: int = 1,
+    dropped: int = 0,
+) -> list[tuple]:
+    """
+    暂存行：(company_id, event_type, subject_key, user_id, role_code, day, counter_key, delta)。
+    一次事件一行；counter_key 指向仍保留在 sc.usage.counter 的全局合计键。
+    """
+    rows: list[tuple] = []
+    prefix = EVENT_PREFIXES.get(str(event_type or ""))
+    if prefix and subject_key and day:
+        rows.append(
+            (
+                int(company_id),
+                str(event_type),
+                str(subject_key),
+                int(user_id or 0),
+                role_signature(role_codes),
+                str(day),
+                f"{prefix}.total",
+                int(delta),
+            )
+        )
+    if dropped > 0:
+        rows.append((int(company_id), "", "", 0, "", None, DROPPED_COUNTER_KEY, int(dropped)))
+    return rows
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled view-arch cache shared by all view parsers.
+
+视图 arch 按内容摘要编译一次、进程内共享：
+- 键：arch 字节串的 sha1。get_view 已按 (model, view_id, view_type, 用户组, lang) 缓存组合结果，
+  并在 ir.ui.view 写入时失效；组合结果一旦变化（继承视图、write_date 后的新 arch、组裁剪差异），
+  摘要随之变化，因此本缓存无需单独失效，也不会跨组串用。
+- 值：CompiledViewArch，只读：lxml 根节点（保留注释，供 lxml 解析器）、去注释根节点
+  （供原 xml.etree 调用方，按需构建），以及与节点树同键缓存的索引：
+  按标签的后代节点表（一次遍历建成，替代解析器里反复的 `.//field[@name]`、`.//button`），
+  字段/按钮/修饰符/x2many 子视图索引。
+- 解析器经 `indexed_nodes(root, tag)` 取节点：root 来自本缓存时直接返回索引，否则现场遍历。
+- 调用方不得修改返回的节点树；需要修改时自行 deepcopy。
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from typing import Any
+
+from lxml import etree
+
+from .source_authority import build_source_authority_contract
+
+SOURCE_KIND = "view_arch_compile_cache"
+SOURCE_AUTHORITIES = ("ir.ui.view", "odoo.get_view")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+DEFAULT_MAX_ENTRIES = 512
+MODIFIER_ATTRS = ("invisible", "readonly", "required", "column_invisible", "attrs", "states")
+SUBVIEW_TAGS = frozenset({"tree", "list", "form", "kanban"})
+
+ArchField = namedtuple("ArchField", ("name", "attrs", "parent_tag", "in_subview", "subview_tags"))
+
+
+def source_authority_contract() -> dict:
+    return build_source_authority_contract(
+        kind=SOURCE_KIND,
+        authorities=SOURCE_AUTHORITIES,
+        no_business_fact_authority=NO_BUSINESS_FACT_AUTHORITY,
+        runtime_carrier="view_arch_cache",
+    )
+
+
+def _arch_bytes(arch: Any) -> bytes:
+    if isinstance(arch, bytes):
+        return arch
+    return str(arch or "").encode("utf-8")
+
+
+def _frozen_attrs(node) -> MappingProxyType:
+    return MappingProxyType(dict(node.attrib))
+
+
+def _tag_index(root) -> dict:
+    """一次遍历：标签 -> 文档顺序的后代节点（不含根节点，与 `.//tag` 一致）。"""
+    index: dict = {}
+    for node in root.iterdescendants():
+        if isinstance(node.tag, str):
+            index.setdefault(node.tag, []).append(node)
+    return {tag: tuple(nodes) for tag, nodes in index.items()}
+
+
+class CompiledViewArch:
+    """一次解析的 arch；去注释根节点与各索引在首次访问时构建，之后只读共享。"""
+
+    def __init__(self, arch: bytes, digest: str):
+        self._arch = arch
+        self._plain_root = None
+        self._tags = {}
+        self._named = {}
+        self._indexed = False
+        self.digest = digest
+        self.root = etree.fromstring(arch)
+
+    @property
+    def plain_root(self):
+        """去除注释/处理指令的根节点，行为与 xml.etree.ElementTree.fromstring 一致。"""
+        if self._plain_root is None:
+            parser = etree.XMLParser(remove_comments=True, remove_pis=True)
+            self._plain_root = etree.fromstring(self._arch, parser)
+        return self._plain_root
+
+    def nodes(self, tag: str, *, named: bool = False, plain: bool = False) -> tuple:
+        """`.//tag`（named=True 时为 `.//tag[@name]`）的缓存结果；plain 取去注释根节点上的节点。"""
+        key = (tag, named, plain)
+        found = self._named.get(key)
+        if found is None:
+            tags = self._tags.get(plain)
+            if tags is None:
+                tags = self._tags[plain] = _tag_index(self.plain_root if plain else self.root)
+            found = tags.get(tag, ())
+            if named:
+                found = tuple(node for node in found if node.get("name") is not None)
+            self._named[key] = found
+        return found
+
+    def _build_index(self) -> None:
+        fields = []
+        modifiers = {}
+        subview_fields = []
+        for node in self.nodes("field", named=True):
+            name = node.get("name")
+            if not name:
+                continue
+            in_subview = any(parent.tag == "field" for parent in node.iterancestors())
+            subview_tags = tuple(child.tag for child in node if isinstance(child.tag, str) and child.tag in SUBVIEW_TAGS)
+            parent = node.getparent()
+            fields.append(
+                ArchField(
+                    name=name,
+                    attrs=_frozen_attrs(node),
+                    parent_tag=parent.tag if parent is not None and isinstance(parent.tag, str) else "",
+                    in_subview=in_subview,
+                    subview_tags=subview_tags,
+                )
+            )
+            if subview_tags and not in_subview:
+                subview_fields.append(name)
+            if not in_subview:
+                found = {attr: node.get(attr) for attr in MODIFIER_ATTRS if node.get(attr) not in (None, "")}
+                if found:
+                    modifiers.setdefault(name, {}).update(found)
+        self._fields = tuple(fields)
+        self._field_names = tuple(dict.fromkeys(field.name for field in fields if not field.in_subview))
+        self._buttons = tuple(_frozen_attrs(node) for node in self.nodes("button"))
+        self._modifiers = MappingProxyType({name: MappingProxyType(values) for name, values in modifiers.items()})
+        self._subview_fields = tuple(dict.fromkeys(subview_fields))
+        self._indexed = True
+
+    def _index(self, attr: str):
+        if not self._indexed:
+            self._build_index()
+        return getattr(self, attr)
+
+    @property
+    def fields(self) -> tuple:
+        """全部 <field name>（含 x2many 子视图内字段），文档顺序。"""
+        return self._index("_fields")
+
+    @property
+    def field_names(self) -> tuple:
+        """顶层字段名（排除 x2many 子视图），去重保序。"""
+        return self._index("_field_names")
+
+    @property
+    def buttons(self) -> tuple:
+        return self._index("_buttons")
+
+    @property
+    def modifiers(self) -> MappingProxyType:
+        """顶层字段 -> {invisible/readonly/required/...: 原始表达式}。"""
+        return self._index("_modifiers")
+
+    @property
+    def subview_fields(self) -> tuple:
+        """携带内联 tree/form/kanban 子视图的顶层字段名。"""
+        return self._index("_subview_fields")
+
+
+class ViewArchCache:
+    """线程安全 LRU，按 arch 摘要缓存 CompiledViewArch；另记根节点 -> 编译结果，供按节点查索引。"""
+
+    def __init__(self, *, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(int(max_entries or 0), 1)
+        self._entries: "OrderedDict[str, CompiledViewArch]" = OrderedDict()
+        self._by_root: dict = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def compile(self, arch: Any) -> CompiledViewArch:
+        data = _arch_bytes(arch)
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            compiled = self._entries.get(digest)
+            if compiled is not None:
+                self._entries.move_to_end(digest)
+                self._stats["hits"] += 1
+                return compiled
+            self._stats["misses"] += 1
+        # 解析在锁外进行；并发编译同一 arch 时后写者覆盖，结果等价。
+        compiled = CompiledViewArch(data, digest)
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._forget(previous)
+            self._entries[digest] = compiled
+            self._by_root[id(compiled.root)] = compiled
+            while len(self._entries) > self.max_entries:
+                _digest, evicted = self._entries.popitem(last=False)
+                self._forget(evicted)
+                self._stats["evictions"] += 1
+        return compiled
+
+    def _forget(self, compiled: CompiledViewArch) -> None:
+        # 编译结果持有根节点，登记期间 id 不会被复用；淘汰时一并移除。
+        self._by_root.pop(id(compiled.root), None)
+        if compiled._plain_root is not None:
+            self._by_root.pop(id(compiled._plain_root), None)
+
+    def plain_root(self, compiled: CompiledViewArch):
+        root = compiled.plain_root
+        with self._lock:
+            if self._entries.get(compiled.digest) is compiled:
+                self._by_root[id(root)] = compiled
+        return root
+
+    def owner(self, root) -> tuple:
+        """root 为缓存中的根节点时返回 (编译结果, 是否去注释根)，否则 (None, False)。"""
+        with self._lock:
+            compiled = self._by_root.get(id(root))
+        if compiled is None:
+            return None, False
+        if compiled.root is root:
+            return compiled, False
+        if compiled._plain_root is root:
+            return compiled, True
+        return None, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_root.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), max_entries=self.max_entries)
+
+
+_CACHE = ViewArchCache()
+
+
+def compile_view_arch(arch: Any) -> CompiledViewArch:
+    """arch（str/bytes）-> 编译结果；XML 非法时抛出 lxml 的 XMLSyntaxError，由调用方按原逻辑兜底。"""
+    return _CACHE.compile(arch)
+
+
+def arch_root(arch: Any):
+    """替代 etree.fromstring(arch.encode('utf-8'))：共享只读 lxml 根节点。"""
+    if arch is not None and not isinstance(arch, (str, bytes)):
+        return arch
+    return _CACHE.compile(arch).root
+
+
+def arch_plain_root(arch: Any):
+    """替代 xml.etree.ElementTree.fromstring(arch)：共享只读、无注释的根节点。"""
+    return _CACHE.plain_root(_CACHE.compile(arch))
+
+
+def indexed_nodes(root, tag: str, *, named: bool = False) -> tuple:
+    """
+    替代 root.xpath('.//tag') / root.findall('.//tag')（named=True 时为 `[@name]`）。
+    root 为 arch_root/arch_plain_root 返回的根节点时直接取缓存索引；子节点或外部树现场遍历。
+    """
+    if root is None:
+        return ()
+    compiled, plain = _CACHE.owner(root)
+    if compiled is not None:
+        return compiled.nodes(tag, named=named, plain=plain)
+    return tuple(
+        node for node in root.iter(tag) if node is not root and (not named or node.get("name") is not None)
+    )
+
+
+def cache_stats() -> dict:
+    return _CACHE.stats()
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
@@ -24,6 +24,24 @@ from odoo.http import request
 
 from ..core.base_handler import BaseIntentHandler
 from ..core.api_data_execution_policy import client_requested_sudo, resolve_api_data_sudo
+from ..core.api_data_aggregate_planner import group_window_ids, summary_aggregates
+from ..core.api_data_sort_index import (
+    STRATEGY_NATIVE,
+    STRATEGY_PYTHON_INDEX,
+    STRATEGY_SQL_INDEX,
+    decode_after_token,
+    encode_after_token,
+    keyset_capable,
+    keyset_domain,
+    keyset_values,
+    order_string,
+    page_from_index,
+    query_fingerprint,
+    related_order_sql,
+    sort_index,
+    sql_sorted_page,
+    with_id_tiebreak,
+)
 try:
     from ..core.project_context import selected_record_context_id_from_context
 except ImportError:  # pragma: no cover - compatibility for lightweight boundary tests
@@ -64,6 +82,7 @@ class ApiDataHandler(BaseIntentHandler):
     GROUP_WINDOW_IDENTITY_ALGO = "sha1"
     SOURCE_KIND = "odoo_orm_proxy"
     SOURCE_AUTHORITIES = ("odoo.orm", "ir.model.access", "ir.rule", "ir.model.fields")
+    SORT_KEY_BATCH_SIZE = 1000
 
     # ----------------- 通用取参 -----------------
 
@@ -537,7 +556,7 @@ class ApiDataHandler(BaseIntentHandler):
             return None
         return len(rows or [])
 
-    def _build_numeric_aggregates(self, env_model, domain, fields_safe: List[str]) -> Dict[str, Dict[str, Any]]:
+    def _numeric_aggregate_fields(self, env_model, fields_safe: List[str]) -> List[str]:
         numeric_types = {"integer", "float", "monetary"}
         aggregate_fields = []
         for field_name in fields_safe or []:
@@ -550,6 +569,40 @@ class ApiDataHandler(BaseIntentHandler):
                 and bool(getattr(field, "column_type", None))
             ):
                 aggregate_fields.append(field_name)
+        return aggregate_fields
+
+    def _build_list_summary(
+        self,
+        env_model,
+        domain,
+        fields_safe: List[str],
+        group_by,
+        *,
+        need_total: bool,
+        need_aggregates: bool,
+        need_group_total: bool,
+    ) -> Tuple[Optional[int], Dict[str, Dict[str, Any]], Optional[int], bool]:
+        """总数/分组总数/数值合计合并为一条 SQL；无法下推时逐项走 ORM。返回 (..., planned)。"""
+        aggregate_fields = self._numeric_aggregate_fields(env_model, fields_safe) if need_aggregates else []
+        group_field = self._primary_group_by_field(group_by) if need_group_total else ""
+        if need_total or aggregate_fields or group_field:
+            planned = summary_aggregates(
+                env_model,
+                domain,
+                sum_fields=aggregate_fields,
+                group_field=group_field,
+                need_count=need_total,
+            )
+            if planned is not None:
+                aggregates = {name: {"sum": value} for name, value in (planned.get("sums") or {}).items()}
+                return planned.get("count"), aggregates, planned.get("group_total"), True
+        total = env_model.search_count(domain or []) if need_total else None
+        aggregates = self._build_numeric_aggregates(env_model, domain, fields_safe) if need_aggregates else {}
+        group_total = self._count_group_total(env_model, domain, group_by) if need_group_total else None
+        return total, aggregates, group_total, False
+
+    def _build_numeric_aggregates(self, env_model, domain, fields_safe: List[str]) -> Dict[str, Dict[str, Any]]:
+        aggregate_fields = self._numeric_aggregate_fields(env_model, fields_safe)
         if not aggregate_fields:
             return {}
         if getattr(env_model, "_auto", True) is False:
@@ -686,7 +739,7 @@ class ApiDataHandler(BaseIntentHandler):
         if "id" not in row_fields:
             row_fields.insert(0, "id")
         page_offsets = group_page_offsets if isinstance(group_page_offsets, dict) else {}
-        out = []
+        plans = []
         for item in summary:
             group_domain = item.get("domain") if isinstance(item.get("domain"), list) else []
             if not group_domain:
@@ -699,24 +752,59 @@ class ApiDataHandler(BaseIntentHandler):
             max_offset = max(0, count - page_limit)
             page_offset = max(0, min(req_offset, max_offset))
             page_offset = (page_offset // page_limit) * page_limit
+            plans.append(
+                {
+                    "item": item,
+                    "group_domain": group_domain,
+                    "count": count,
+                    "requested_page_size": requested_page_size,
+                    "page_limit": page_limit,
+                    "group_key": group_key,
+                    "req_offset": req_offset,
+                    "max_offset": max_offset,
+                    "page_offset": page_offset,
+                }
+            )
+        try:
+            # 批量窗口读取失败时回退到逐组读取，单个分组出错只丢弃该组样本；savepoint 保证事务可继续使用。
+            with env_model.env.cr.savepoint():
+                windowed_rows = self._fetch_group_windows(env_model, domain, group_by, row_fields, order, plans)
+        except Exception:
+            _logger.warning("group window query failed model=%s; falling back to per-group reads", env_model._name, exc_info=True)
+            windowed_rows = None
+        out = []
+        for index, plan in enumerate(plans):
+            item = plan["item"]
+            group_domain = plan["group_domain"]
+            count = plan["count"]
+            requested_page_size = plan["requested_page_size"]
+            page_limit = plan["page_limit"]
+            group_key = plan["group_key"]
+            req_offset = plan["req_offset"]
+            max_offset = plan["max_offset"]
+            page_offset = plan["page_offset"]
             page_total = max(1, ((count + page_limit - 1) // page_limit))
             page_current = (page_offset // page_limit) + 1
             page_range_start = page_offset + 1 if count > 0 else 0
             page_range_end = min(count, page_offset + page_limit) if count > 0 else 0
-            try:
-                sample_rows, order_error, _python_order_applied = self._search_read_with_order(
-                    env_model,
-                    group_domain,
-                    row_fields,
-                    order,
-                    page_limit,
-                    page_offset,
-                )
-                if order_error:
+            if windowed_rows is not None:
+                sample_rows = windowed_rows[index]
+            else:
+                try:
+                    with env_model.env.cr.savepoint():
+                        sample_rows, order_error, _python_order_applied = self._search_read_with_order(
+                            env_model,
+                            group_domain,
+                            row_fields,
+                            order,
+                            page_limit,
+                            page_offset,
+                        )
+                    if order_error:
+                        sample_rows = []
+                except Exception:
+                    _logger.exception("group sample query failed model=%s group=%s", env_model._name, item.get("label"))
                     sample_rows = []
-            except Exception:
-                _logger.exception("group sample query failed model=%s group=%s", env_model._name, item.get("label"))
-                sample_rows = []
             sample_count = len(sample_rows)
             out.append(
                 {
@@ -753,6 +841,27 @@ class ApiDataHandler(BaseIntentHandler):
             )
         return out
 
+    def _fetch_group_windows(self, env_model, domain, group_by, row_fields: List[str], order: str, plans: List[Dict[str, Any]]):
+        """所有分组的当前页样本一条窗口 SQL + 一次 read；无法下推时返回 None。"""
+        if not plans:
+            return []
+        group_field = self._primary_group_by_field(group_by)
+        clauses, order_error = self._parse_order_clauses(env_model, order or getattr(env_model, "_order", "") or "id")
+        if order_error:
+            return None
+        id_windows = group_window_ids(
+            env_model,
+            domain,
+            group_field=group_field,
+            order_clauses=clauses,
+            windows=[(plan["item"].get("value"), plan["page_offset"], plan["page_limit"]) for plan in plans],
+        )
+        if id_windows is None:
+            return None
+        all_ids = [record_id for ids in id_windows for record_id in ids]
+        rows_by_id = {row["id"]: row for row in env_model.browse(all_ids).read(row_fields)} if all_ids else {}
+        return [[rows_by_id[record_id] for record_id in ids if record_id in rows_by_id] for ids in id_windows]
+
     def _safe_eval_with_runtime(self, raw: str):
         if not isinstance(raw, str):
             return None
@@ -962,7 +1071,44 @@ class ApiDataHandler(BaseIntentHandler):
         )
         return values + blanks
 
-    def _search_read_with_order(
+    def _sort_strategy(self, env_model, clauses: List[Tuple[str, str]]) -> str:
+        if not clauses or not self._requires_python_order(env_model, clauses):
+            return STRATEGY_NATIVE
+        if related_order_sql(env_model, clauses) is not None:
+            return STRATEGY_SQL_INDEX
+        return STRATEGY_PYTHON_INDEX
+
+    def _build_sorted_ids(self, env_model, domain, clauses: List[Tuple[str, str]], strategy: str, order_sql: str):
+        if strategy == STRATEGY_NATIVE:
+            return env_model.search(domain or [], order=order_sql or None).ids
+        ids = env_model.search(domain or [], order="id asc").ids
+        # 计算字段：只读取排序字段，分批计算，避免整行 read。
+        sort_fields = list(dict.fromkeys(["id"] + [field for field, _direction in clauses]))
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(ids), self.SORT_KEY_BATCH_SIZE):
+            rows.extend(env_model.browse(ids[start:start + self.SORT_KEY_BATCH_SIZE]).read(sort_fields))
+        for field_name, direction in reversed(clauses):
+            rows = self._sort_rows_by_python_clause(rows, field_name, direction)
+        return [row["id"] for row in rows]
+
+    def _sorted_id_index(
+        self,
+        env_model,
+        domain,
+        clauses,
+        strategy: str,
+        order_sql: str,
+        fingerprint: str,
+        reuse: bool = False,
+    ):
+        """首屏（无 after 游标）总是重建并刷新缓存，保证刷新列表能看到最新增删改；仅续页复用缓存。"""
+        index = sort_index()
+        ids = index.get(fingerprint) if reuse else None
+        if ids is None:
+            ids = index.put(fingerprint, self._build_sorted_ids(env_model, domain, clauses, strategy, order_sql))
+        return ids
+
+    def _search_read_page(
         self,
         env_model,
         domain,
@@ -970,22 +1116,127 @@ class ApiDataHandler(BaseIntentHandler):
         order: str,
         limit: int,
         offset: int = 0,
-    ):
+        after: str = "",
+    ) -> Dict[str, Any]:
+        """
+        分页读取一页记录：
+        - native：可由 ORM 排序的字段直接 LIMIT/OFFSET；数值/日期排序的 after 游标转为 domain keyset，
+          其余排序的 after 游标只记录位置，按 OFFSET 续页；
+        - sql_index：作用域子查询 + join 排序 + LIMIT 一条语句取一页，after 游标按末行排序值 keyset 续页；
+        - python_index：计算字段排序先排出有序 id 序列并缓存，分页只 read 当前页。
+        """
+        page: Dict[str, Any] = {"rows": [], "error": None, "strategy": STRATEGY_NATIVE, "next_after": "", "cursor": ""}
         clauses, order_error = self._parse_order_clauses(env_model, order)
         if order_error:
-            return [], order_error, False
-        if not clauses or not self._requires_python_order(env_model, clauses):
-            recs = env_model.search(domain or [], order=order or None, limit=limit or None, offset=offset or 0)
-            return recs.read(fields_safe or ["id", "name"]), None, False
+            page["error"] = order_error
+            return page
+        strategy = self._sort_strategy(env_model, clauses)
+        page["strategy"] = strategy
+        order_clauses = with_id_tiebreak(clauses) if clauses else []
+        order_sql = order_string(order_clauses) if order_clauses else (order or "")
+        fingerprint = query_fingerprint(
+            model=env_model._name,
+            domain=domain,
+            order=order_sql,
+            uid=getattr(env_model.env, "uid", None),
+            context=getattr(env_model.env, "context", None),
+        )
+        cursor = None
+        if after:
+            cursor = decode_after_token(after)
+            if not cursor or cursor.get("fp") != fingerprint:
+                page["error"] = self._err(400, "after 无效")
+                return page
+        fields_out = list(fields_safe or ["id", "name"])
+
+        if strategy == STRATEGY_NATIVE and keyset_capable(env_model, clauses):
+            page["cursor"] = "keyset"
+            search_domain = list(domain or [])
+            if cursor:
+                search_domain += keyset_domain(order_clauses, cursor.get("k") or [])
+            row_fields = list(dict.fromkeys(fields_out + [field for field, _direction in order_clauses]))
+            recs = env_model.search(search_domain, order=order_sql, limit=limit or None, offset=0 if cursor else (offset or 0))
+            rows = recs.read(row_fields)
+            if rows and limit and len(rows) >= limit:
+                page["next_after"] = encode_after_token(
+                    {"fp": fingerprint, "m": "keyset", "id": rows[-1]["id"], "k": keyset_values(rows[-1], order_clauses)}
+                )
+            page["rows"] = [{key: row.get(key) for key in fields_out if key in row} for row in rows]
+            return page
+
+        if strategy == STRATEGY_NATIVE and not cursor:
+            page["cursor"] = "offset"
+            recs = env_model.search(domain or [], order=order_sql or None, limit=limit or None, offset=offset or 0)
+            page["rows"] = recs.read(fields_out)
+            if page["rows"] and limit and len(page["rows"]) >= limit:
+                page["next_after"] = encode_after_token(
+                    {"fp": fingerprint, "m": "offset", "p": int(offset or 0) + len(page["rows"]) - 1}
+                )
+            return page
+
+        if strategy == STRATEGY_NATIVE:
+            # 非 keyset 的原生排序续页：游标只记录位置，换算为 OFFSET 只取一页；期间增删会使行前后移动。
+            position = cursor.get("p")
+            if not isinstance(position, int) or position < 0:
+                page["error"] = self._err(400, "after 无效")
+                return page
+            page["cursor"] = "offset"
+            start = position + 1
+            recs = env_model.search(domain or [], order=order_sql or None, limit=limit or None, offset=start)
+            page["rows"] = recs.read(fields_out)
+            if page["rows"] and limit and len(page["rows"]) >= limit:
+                page["next_after"] = encode_after_token(
+                    {"fp": fingerprint, "m": "offset", "p": start + len(page["rows"]) - 1}
+                )
+            return page
 
-        row_fields = list(dict.fromkeys(list(fields_safe or ["id", "name"]) + [field for field, _direction in clauses]))
-        recs = env_model.search(domain or [], order="id asc")
-        rows = recs.read(row_fields)
-        for field_name, direction in reversed(clauses):
-            rows = self._sort_rows_by_python_clause(rows, field_name, direction)
-        start = max(0, int(offset or 0))
-        end = start + int(limit or 0) if int(limit or 0) > 0 else None
-        return rows[start:end], None, True
+        # 首屏下推失败时已退回 id 序列，续页沿用 index 游标。
+        if strategy == STRATEGY_SQL_INDEX and (not cursor or cursor.get("m") == "keyset"):
+            sql_page = sql_sorted_page(
+                env_model,
+                domain,
+                clauses,
+                limit=limit,
+                offset=offset,
+                after=(cursor.get("k") or []) if cursor else None,
+            )
+            if sql_page is not None:
+                page_ids, last_values = sql_page
+                page["cursor"] = "keyset"
+                page["rows"] = env_model.browse(page_ids).read(fields_out) if page_ids else []
+                if page_ids and limit and len(page_ids) >= limit:
+                    page["next_after"] = encode_after_token(
+                        {"fp": fingerprint, "m": "keyset", "id": page_ids[-1], "k": last_values}
+                    )
+                return page
+
+        page["cursor"] = "index"
+        ids = self._sorted_id_index(env_model, domain, clauses, strategy, order_sql, fingerprint, reuse=bool(cursor))
+        page_ids, start = page_from_index(
+            ids,
+            limit=limit,
+            offset=offset,
+            after_id=cursor.get("id") if cursor else None,
+            after_pos=cursor.get("p") if cursor else None,
+        )
+        page["rows"] = env_model.browse(page_ids).exists().read(fields_out) if page_ids else []
+        if page_ids and start + len(page_ids) < len(ids):
+            page["next_after"] = encode_after_token(
+                {"fp": fingerprint, "m": "index", "id": page_ids[-1], "p": start + len(page_ids) - 1}
+            )
+        return page
+
+    def _search_read_with_order(
+        self,
+        env_model,
+        domain,
+        fields_safe: List[str],
+        order: str,
+        limit: int,
+        offset: int = 0,
+    ):
+        page = self._search_read_page(env_model, domain, fields_safe, order, limit, offset)
+        return page["rows"], page["error"], page["strategy"] == STRATEGY_PYTHON_INDEX
 
     def _current_project_id(self, p: Dict[str, Any], ctx: Dict[str, Any]) -> int:
         return selected_record_context_id_from_context(p, ctx)
@@ -1639,36 +1890,30 @@ class ApiDataHandler(BaseIntentHandler):
         domain, search_term = self._apply_search_term_domain(env_model, domain, p, fields_safe)
         domain, project_scope_meta = self._apply_record_scope(env_model, domain, p, ctx)
 
+        after = self._get_str(p, "after", "").strip()
         try:
-            rows, order_error, python_order_applied = self._search_read_with_order(
-                env_model,
-                domain,
-                fields_safe,
-                order,
-                limit,
-                offset,
-            )
-            if order_error:
-                return order_error
+            page = self._search_read_page(env_model, domain, fields_safe, order, limit, offset, after)
         except AccessError as ae:
             # 兜底：仍然被 field-level 权限阻断时，退回最小安全字段集
             _logger.warning("read() AccessError on %s, fallback to minimal fields. err=%s", model, ae)
             fallback_fields = ["id", "name", "display_name"] if "display_name" in env_model._fields else ["id", "name"]
-            rows, order_error, python_order_applied = self._search_read_with_order(
-                env_model,
-                domain,
-                fallback_fields,
-                order,
-                limit,
-                offset,
-            )
-            if order_error:
-                return order_error
+            page = self._search_read_page(env_model, domain, fallback_fields, order, limit, offset, after)
+        if page["error"]:
+            return page["error"]
+        rows = page["rows"]
+        python_order_applied = page["strategy"] == STRATEGY_PYTHON_INDEX
 
         need_total = self._get_bool(p, "need_total", False)
-        total = env_model.search_count(domain or []) if need_total else None
         need_aggregates = self._get_bool(p, "need_aggregates", False)
-        aggregates = self._build_numeric_aggregates(env_model, domain, fields_safe) if need_aggregates else {}
+        total, aggregates, group_total, summary_planned = self._build_list_summary(
+            env_model,
+            domain,
+            fields_safe,
+            group_by,
+            need_total=need_total,
+            need_aggregates=need_aggregates,
+            need_group_total=need_group_total,
+        )
         group_summary_probe = self._build_group_summary_with_offset(
             env_model,
             domain,
@@ -1678,7 +1923,6 @@ class ApiDataHandler(BaseIntentHandler):
         )
         group_has_more = len(group_summary_probe) > group_limit
         group_summary = group_summary_probe[:group_limit]
-        group_total = self._count_group_total(env_model, domain, group_by) if need_group_total else None
         next_group_offset = (group_offset + len(group_summary)) if group_has_more else None
         prev_group_offset = max(0, group_offset - group_limit) if group_offset > 0 else None
         group_window_start = (group_offset + 1) if group_summary else 0
@@ -1744,6 +1988,7 @@ class ApiDataHandler(BaseIntentHandler):
         data = {
             "records": rows,
             "next_offset": offset + len(rows),
+            "next_after": page["next_after"] or None,
             "group_summary": group_summary,
             "grouped_rows": grouped_rows,
             "group_paging": {
@@ -1780,8 +2025,12 @@ class ApiDataHandler(BaseIntentHandler):
             "offset": offset,
             "order": order,
             "python_order_applied": bool(python_order_applied),
+            "sort_strategy": page["strategy"],
+            "pagination": "after" if after else "offset",
+            "cursor_mode": page["cursor"],
             "count": len(rows),
             "aggregates": bool(aggregates),
+            "summary_planned": bool(summary_planned),
             "fields": fields_safe,
             "domain_raw_applied": bool(domain_raw),
             "context_raw_applied": bool(context_raw),
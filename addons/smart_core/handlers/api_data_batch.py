@@ -23,6 +23,16 @@ except ImportError:  # pragma: no cover - compatibility for lightweight boundary
 
     def apply_business_scope_domain(env_model, domain, params=None, context=None):
         return apply_project_scope_domain(env_model, domain, selected_record_context_id_from_context(params, context))
+from ..core.api_data_bulk_write import (
+    BULK_WRITE_CHUNK_SIZE,
+    OUTCOME_DENIED,
+    OUTCOME_MISSING,
+    OUTCOME_STALE,
+    chunked,
+    partition_batch_ids,
+    unique_ids,
+    write_date_token,
+)
 from ..core.request_params import parse_bool, parse_non_negative_int, parse_positive_int
 from .reason_codes import (
     REASON_CONFLICT,
@@ -37,9 +47,11 @@ from ..utils.idempotency import (
     apply_idempotency_identity,
     build_idempotency_fingerprint,
     build_idempotency_conflict_response,
+    build_idempotency_in_flight_response,
+    claim_idempotency_key,
+    complete_idempotency_key,
     enrich_replay_contract,
     normalize_request_id,
-    resolve_idempotency_decision,
     replay_window_seconds,
 )
 
@@ -61,6 +73,7 @@ class ApiDataBatchHandler(BaseIntentHandler):
         "activate": {"active": True},
     }
     IDEMPOTENCY_WINDOW_SECONDS = 30
+    BULK_WRITE_CHUNK_SIZE = BULK_WRITE_CHUNK_SIZE
 
     def _err(self, code: int, message: str):
         return {"ok": False, "error": {"code": code, "message": message}, "code": code}
@@ -210,12 +223,21 @@ class ApiDataBatchHandler(BaseIntentHandler):
             include_replay_evidence=True,
         )
 
+    def _idempotency_in_flight_response(self, *, request_id, idempotency_key, trace_id):
+        return build_idempotency_in_flight_response(
+            intent_type=self.INTENT_TYPE,
+            request_id=request_id,
+            idempotency_key=idempotency_key,
+            trace_id=trace_id,
+            include_replay_evidence=True,
+        )
+
     def _write_batch_audit(self, *, trace_id: str, model: str, action: str, ids: List[int], vals: Dict[str, Any], idem_key: str, idem_fingerprint: str, result: Dict[str, Any]):
         Audit = self.env.get("sc.audit.log")
         if not Audit:
-            return
+            return 0
         try:
-            Audit.write_event(
+            log = Audit.write_event(
                 event_code="API_DATA_BATCH",
                 model=model,
                 res_id=0,
@@ -231,8 +253,53 @@ class ApiDataBatchHandler(BaseIntentHandler):
                 trace_id=trace_id or "",
                 company_id=self.env.user.company_id.id if self.env.user and self.env.user.company_id else None,
             )
+            return int(getattr(log, "id", 0) or 0)
         except Exception:
-            return
+            return 0
+
+    def _bulk_write(self, env_model, ids: List[int], safe_vals: Dict[str, Any], if_match_map: Dict[int, str]) -> Dict[int, tuple]:
+        """
+        集合校验 + 分块写入，返回失败行 {id: (reason_code, message)}；未出现的 id 即写入成功。
+        块写入失败时该块回滚并逐行重试，逐行失败只回滚本行。
+        """
+        found = env_model.browse(unique_ids(ids)).exists()
+        writable = found._filter_access_rules("write")
+        write_dates = {}
+        if if_match_map:
+            write_dates = {rec.id: write_date_token(rec.write_date) for rec in writable if rec.id in if_match_map}
+        valid_ids, rejected = partition_batch_ids(
+            ids,
+            found_ids=found.ids,
+            writable_ids=writable.ids,
+            write_dates=write_dates,
+            if_match_map=if_match_map,
+        )
+        outcomes = {
+            rec_id: {
+                OUTCOME_MISSING: (REASON_NOT_FOUND, "记录不存在"),
+                OUTCOME_DENIED: (REASON_PERMISSION_DENIED, "无写入权限"),
+                OUTCOME_STALE: (REASON_CONFLICT, "Record changed"),
+            }[outcome]
+            for rec_id, outcome in rejected.items()
+        }
+        for chunk_ids in chunked(valid_ids, self.BULK_WRITE_CHUNK_SIZE):
+            chunk = env_model.browse(chunk_ids)
+            try:
+                with self.env.cr.savepoint():
+                    chunk.write(safe_vals)
+                continue
+            except Exception as exc:
+                _logger.info("api.data.batch chunk fallback model=%s size=%s err=%s", env_model._name, len(chunk_ids), exc)
+            for rec in chunk:
+                try:
+                    with self.env.cr.savepoint():
+                        rec.write(safe_vals)
+                except AccessError:
+                    outcomes[rec.id] = (REASON_PERMISSION_DENIED, "无写入权限")
+                except Exception as exc:
+                    _logger.warning("api.data.batch failed model=%s id=%s err=%s", env_model._name, rec.id, exc)
+                    outcomes[rec.id] = (REASON_WRITE_FAILED, str(exc))
+        return outcomes
 
     def _build_failed_csv(self, model: str, action: str, failed_rows: List[Dict[str, Any]]):
         if not failed_rows:
@@ -386,16 +453,20 @@ class ApiDataBatchHandler(BaseIntentHandler):
             vals=safe_vals,
             idem_key=idempotency_key,
         )
-        decision = resolve_idempotency_decision(
+        decision = claim_idempotency_key(
             self.env,
             event_code="API_DATA_BATCH",
             idempotency_key=idempotency_key,
             fingerprint=idempotency_fingerprint,
             window_seconds=self._idempotency_window_seconds(),
-            replay_payload_key="result",
-            limit=20,
-            recent_extra_domain=[("model", "=", model)],
+            scope=model,
         )
+        if decision.get("in_flight"):
+            return self._idempotency_in_flight_response(
+                request_id=request_id,
+                idempotency_key=idempotency_key,
+                trace_id=trace_id,
+            )
         if decision.get("conflict"):
             return self._idempotency_conflict_response(
                 request_id=request_id,
@@ -448,56 +519,26 @@ class ApiDataBatchHandler(BaseIntentHandler):
         except AccessError:
             return self._err(403, "无写入权限")
 
+        outcomes = self._bulk_write(env_model, ids, safe_vals, if_match_map)
         results = []
         success = 0
         failed = 0
         for rec_id in ids:
+            reason_code, message = outcomes.get(rec_id) or (REASON_OK, "updated")
             item = {
                 "id": rec_id,
-                "ok": False,
-                "reason_code": "",
-                "message": "",
+                "ok": reason_code == REASON_OK,
+                "reason_code": reason_code,
+                "message": message,
                 "retryable": False,
                 "error_category": "",
                 "suggested_action": "",
                 "trace_id": trace_id,
             }
-            rec = env_model.browse(rec_id).exists()
-            if not rec:
-                item["reason_code"] = REASON_NOT_FOUND
-                item["message"] = "记录不存在"
-                item.update(batch_failure_meta(REASON_NOT_FOUND))
-                failed += 1
-                results.append(item)
-                continue
-            try:
-                rec.check_access_rule("write")
-                if rec_id in if_match_map:
-                    expected = if_match_map.get(rec_id, "")
-                    current = rec.write_date and rec.write_date.strftime("%Y-%m-%d %H:%M:%S") or ""
-                    if current and expected and current != expected:
-                        item["reason_code"] = REASON_CONFLICT
-                        item["message"] = "Record changed"
-                        item.update(batch_failure_meta(REASON_CONFLICT))
-                        failed += 1
-                        results.append(item)
-                        continue
-                rec.write(safe_vals)
-                item["ok"] = True
-                item["reason_code"] = REASON_OK
-                item["message"] = "updated"
-                item.update(batch_failure_meta(REASON_OK))
+            item.update(batch_failure_meta(reason_code))
+            if item["ok"]:
                 success += 1
-            except AccessError:
-                item["reason_code"] = REASON_PERMISSION_DENIED
-                item["message"] = "无写入权限"
-                item.update(batch_failure_meta(REASON_PERMISSION_DENIED))
-                failed += 1
-            except Exception as exc:
-                _logger.warning("api.data.batch failed model=%s id=%s err=%s", model, rec_id, exc)
-                item["reason_code"] = REASON_WRITE_FAILED
-                item["message"] = str(exc)
-                item.update(batch_failure_meta(REASON_WRITE_FAILED))
+            else:
                 failed += 1
             results.append(item)
 
@@ -534,7 +575,7 @@ class ApiDataBatchHandler(BaseIntentHandler):
             data["failed_csv_file_name"] = failed_csv.get("file_name")
             data["failed_csv_content_b64"] = failed_csv.get("content_b64")
             data["failed_csv_count"] = failed_csv.get("count")
-        self._write_batch_audit(
+        audit_id = self._write_batch_audit(
             trace_id=trace_id,
             model=model,
             action=action or "write",
@@ -544,6 +585,7 @@ class ApiDataBatchHandler(BaseIntentHandler):
             idem_fingerprint=idempotency_fingerprint,
             result=data,
         )
+        complete_idempotency_key(self.env, decision, result=data, trace_id=trace_id, audit_id=audit_id)
         meta = {
             "trace_id": trace_id,
             "write_mode": "batch",
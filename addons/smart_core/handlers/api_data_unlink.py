@@ -28,7 +28,9 @@ from ..utils.idempotency import (
     apply_idempotency_identity,
     build_idempotency_conflict_response,
     build_idempotency_fingerprint,
-    find_recent_audit_entry,
+    build_idempotency_in_flight_response,
+    claim_idempotency_key,
+    complete_idempotency_key,
     normalize_request_id,
     replay_window_seconds,
 )
@@ -137,9 +139,9 @@ class ApiDataUnlinkHandler(BaseIntentHandler):
     def _write_idempotency_audit(self, *, trace_id: str, model: str, ids: List[int], idem_key: str, idem_fingerprint: str, result: Dict[str, Any]):
         Audit = self.env.get("sc.audit.log")
         if not Audit:
-            return
+            return 0
         try:
-            Audit.write_event(
+            log = Audit.write_event(
                 event_code=self.IDEMPOTENCY_EVENT_CODE,
                 model=model,
                 res_id=0,
@@ -154,8 +156,9 @@ class ApiDataUnlinkHandler(BaseIntentHandler):
                 trace_id=trace_id or "",
                 company_id=self.env.user.company_id.id if self.env.user and self.env.user.company_id else None,
             )
+            return int(getattr(log, "id", 0) or 0)
         except Exception:
-            return
+            return 0
 
     def _idempotency_conflict_response(self, *, request_id: str, idempotency_key: str, idempotency_fingerprint: str, trace_id: str):
         result = build_idempotency_conflict_response(
@@ -172,6 +175,21 @@ class ApiDataUnlinkHandler(BaseIntentHandler):
         meta["trace_id"] = str(trace_id or "")
         return result
 
+    def _idempotency_in_flight_response(self, *, request_id: str, idempotency_key: str, idempotency_fingerprint: str, trace_id: str):
+        result = build_idempotency_in_flight_response(
+            intent_type=self.INTENT_TYPE,
+            request_id=request_id,
+            idempotency_key=idempotency_key,
+            trace_id=trace_id,
+            include_replay_evidence=False,
+        )
+        data = result.setdefault("data", {})
+        data["idempotency_fingerprint"] = str(idempotency_fingerprint or "")
+        data["replay_supported"] = False
+        meta = result.setdefault("meta", {})
+        meta["trace_id"] = str(trace_id or "")
+        return result
+
     def _with_idempotency_contract(self, data: Dict[str, Any], *, request_id: str, idempotency_key: str, idempotency_fingerprint: str, trace_id: str, deduplicated: bool):
         contract = apply_idempotency_identity(
             data,
@@ -291,53 +309,50 @@ class ApiDataUnlinkHandler(BaseIntentHandler):
             dry_run=dry_run,
             idem_key=idempotency_key,
         )
-        recent_entry = find_recent_audit_entry(
+        decision = claim_idempotency_key(
             self.env,
             event_code=self.IDEMPOTENCY_EVENT_CODE,
             idempotency_key=idempotency_key,
+            fingerprint=idempotency_fingerprint,
             window_seconds=self._idempotency_window_seconds(),
-            limit=20,
-            extra_domain=[("model", "=", model)],
+            scope=model,
         )
-        if recent_entry:
-            payload_after = recent_entry.get("payload") or {}
-            recent_fingerprint = str(payload_after.get("idempotency_fingerprint") or "")
-            if recent_fingerprint and recent_fingerprint != idempotency_fingerprint:
-                return self._idempotency_conflict_response(
-                    request_id=request_id,
-                    idempotency_key=idempotency_key,
-                    idempotency_fingerprint=idempotency_fingerprint,
-                    trace_id=trace_id,
-                )
-            if recent_fingerprint and recent_fingerprint == idempotency_fingerprint:
-                replay_result = payload_after.get("result")
-                base_data = replay_result if isinstance(replay_result, dict) else {
-                    "ids": ids,
-                    "model": model,
-                    "dry_run": dry_run,
-                    "project_scope": project_scope_meta,
-                    "record_scope": project_scope_meta,
-                }
-                if isinstance(base_data, dict):
-                    base_data.setdefault("project_scope", project_scope_meta)
-                    base_data.setdefault("record_scope", project_scope_meta)
-                data = self._with_idempotency_contract(
-                    base_data,
-                    request_id=request_id,
-                    idempotency_key=idempotency_key,
-                    idempotency_fingerprint=idempotency_fingerprint,
-                    trace_id=trace_id,
-                    deduplicated=True,
-                )
-                meta = {
-                    "trace_id": trace_id,
-                    "write_mode": "unlink",
-                    "source": "portal-shell",
-                    "source_authority": self._source_authority_contract(model),
-                    "project_scope": project_scope_meta,
-                    "record_scope": project_scope_meta,
-                }
-                return {"ok": True, "data": data, "meta": meta}
+        if decision.get("in_flight"):
+            return self._idempotency_in_flight_response(
+                request_id=request_id,
+                idempotency_key=idempotency_key,
+                idempotency_fingerprint=idempotency_fingerprint,
+                trace_id=trace_id,
+            )
+        if decision.get("conflict"):
+            return self._idempotency_conflict_response(
+                request_id=request_id,
+                idempotency_key=idempotency_key,
+                idempotency_fingerprint=idempotency_fingerprint,
+                trace_id=trace_id,
+            )
+        replay_payload = decision.get("replay_payload")
+        if replay_payload:
+            base_data = dict(replay_payload)
+            base_data.setdefault("project_scope", project_scope_meta)
+            base_data.setdefault("record_scope", project_scope_meta)
+            data = self._with_idempotency_contract(
+                base_data,
+                request_id=request_id,
+                idempotency_key=idempotency_key,
+                idempotency_fingerprint=idempotency_fingerprint,
+                trace_id=trace_id,
+                deduplicated=True,
+            )
+            meta = {
+                "trace_id": trace_id,
+                "write_mode": "unlink",
+                "source": "portal-shell",
+                "source_authority": self._source_authority_contract(model),
+                "project_scope": project_scope_meta,
+                "record_scope": project_scope_meta,
+            }
+            return {"ok": True, "data": data, "meta": meta}
 
         recs = env_model.browse(ids).exists()
         found_ids = set(recs.ids)
@@ -381,7 +396,7 @@ class ApiDataUnlinkHandler(BaseIntentHandler):
             trace_id=trace_id,
             deduplicated=False,
         )
-        self._write_idempotency_audit(
+        audit_id = self._write_idempotency_audit(
             trace_id=trace_id,
             model=model,
             ids=ids,
@@ -389,6 +404,7 @@ class ApiDataUnlinkHandler(BaseIntentHandler):
             idem_fingerprint=idempotency_fingerprint,
             result=data,
         )
+        complete_idempotency_key(self.env, decision, result=data, trace_id=trace_id, audit_id=audit_id)
         meta = {
             "trace_id": trace_id,
             "write_mode": "unlink",
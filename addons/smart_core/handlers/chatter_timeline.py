@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
+import base64
+import json
 from datetime import datetime
 from email.header import decode_header, make_header
 from email.utils import parseaddr
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from odoo.exceptions import AccessError, UserError
 
@@ -32,6 +34,30 @@ from ..utils.reason_codes import (
     failure_meta_for_reason,
 )
 
+# 同一时间戳内按 kind、id 倒序排列，保证游标翻页不重不漏。
+TIMELINE_KINDS = ("message", "attachment", "activity", "audit")
+_EPOCH = "'epoch'::timestamp"
+# 消息分支按 (model, res_id) 取 date/id 倒序键集分页所用的索引。
+MESSAGE_TIMELINE_INDEX = "mail_message_model_res_date_idx"
+
+
+def ensure_message_timeline_index(cr) -> bool:
+    """
+    smart_core 不依赖 mail：mail_message 不存在时跳过，mail 后装时在下次注册表加载补建；
+    索引已存在时只查 to_regclass，不对 mail_message 取锁。返回是否新建。
+    """
+    cr.execute(
+        "SELECT to_regclass('mail_message') IS NOT NULL, to_regclass(%s) IS NOT NULL",
+        (MESSAGE_TIMELINE_INDEX,),
+    )
+    has_table, has_index = cr.fetchone()
+    if not has_table or has_index:
+        return False
+    cr.execute(
+        "CREATE INDEX IF NOT EXISTS %s ON mail_message (model, res_id, date DESC, id DESC)" % MESSAGE_TIMELINE_INDEX
+    )
+    return True
+
 
 class ChatterTimelineHandler(BaseIntentHandler):
     INTENT_TYPE = "chatter.timeline"
@@ -65,6 +91,9 @@ class ChatterTimelineHandler(BaseIntentHandler):
         limit, limit_error = _read_limit(params.get("limit"), default=40, cap=120)
         if limit_error:
             return self._failure(REASON_USER_ERROR, "limit 无效", 400, trace_id)
+        cursor, cursor_error = decode_timeline_cursor(params.get("cursor"))
+        if cursor_error:
+            return self._failure(REASON_USER_ERROR, "cursor 无效", 400, trace_id)
         if model not in self.env:
             return self._failure(REASON_NOT_FOUND, "模型不存在", 404, trace_id)
 
@@ -95,10 +124,10 @@ class ChatterTimelineHandler(BaseIntentHandler):
             self.env[model].check_access_rights("read")
             record.check_access_rule("read")
 
-            messages = self._load_messages(model, record.id, limit)
-            attachments = self._load_attachments(model, record.id, limit)
-            activity_items = self._load_activities(model, record.id, limit)
-            audit_items = self._load_audit_items(model, record.id, limit) if include_audit else []
+            rows = self._timeline_rows(model, record, limit + 1, cursor, include_audit)
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            items = self._hydrate_rows(rows)
         except AccessError:
             return self._failure(REASON_PERMISSION_DENIED, "无权限读取协作时间线", 403, trace_id)
         except UserError as exc:
@@ -106,20 +135,20 @@ class ChatterTimelineHandler(BaseIntentHandler):
         except Exception:
             return self._failure(REASON_SYSTEM_ERROR, "读取协作时间线失败", 500, trace_id)
 
-        items = messages + attachments + activity_items + audit_items
-        items.sort(key=lambda item: item.get("at") or "", reverse=True)
-        if len(items) > limit:
-            items = items[:limit]
-
+        counts = {kind: 0 for kind in TIMELINE_KINDS}
+        for item in items:
+            counts[item["type"]] += 1
         return {
             "items": items,
             "counts": {
-                "messages": len(messages),
-                "attachments": len(attachments),
-                "activities": len(activity_items),
-                "audit": len(audit_items),
+                "messages": counts["message"],
+                "attachments": counts["attachment"],
+                "activities": counts["activity"],
+                "audit": counts["audit"],
                 "total": len(items),
             },
+            "has_more": has_more,
+            "next_cursor": encode_timeline_cursor(rows[-1]) if has_more and rows else "",
             "source_authorities": list(self.SOURCE_AUTHORITIES),
             "auxiliary_authorities": list(self.AUXILIARY_AUTHORITIES) if include_audit else [],
             "source_authority": self.source_authority_contract(),
@@ -143,13 +172,115 @@ class ChatterTimelineHandler(BaseIntentHandler):
             "meta": {"trace_id": trace_id, "source_authority": self.source_authority_contract()},
         }
 
-    def _load_messages(self, model: str, res_id: int, limit: int) -> List[Dict[str, Any]]:
-        Message = self.env["mail.message"]
-        rows = Message.search(
-            [("model", "=", model), ("res_id", "=", res_id)],
-            order="date desc, id desc",
-            limit=limit,
+    # ---- 分页查询 -----------------------------------------------------------------
+
+    def _related_attachment_ids(self, record) -> List[int]:
+        record_fields = getattr(record, "_fields", {}) or {}
+        attachment_field = next(
+            (
+                name
+                for name, field in record_fields.items()
+                if name == "attachment_ids"
+                or (field.type == "many2many" and field.comodel_name == "ir.attachment")
+            ),
+            "",
+        )
+        return list(record[attachment_field].ids) if attachment_field else []
+
+    def _timeline_rows(self, model: str, record, limit: int, cursor, include_audit: bool) -> List[Tuple[Any, str, int]]:
+        """四类来源 UNION ALL 后按 (ts, kind, id) 倒序取一页；每个分支先按游标截断并各取 limit 行。
+
+        kind 在分支内是常量，游标比较在 Python 侧先按 kind 折算成 ts / (ts, id) 条件，
+        使消息与审计分支可直接走 (model, res_id, ts DESC, id DESC) 索引的范围扫描。
+        """
+        branches: List[str] = []
+        params: List[Any] = []
+
+        def _keyset(kind: str, ts_expr: str, id_expr: str):
+            if not cursor:
+                return "", []
+            cursor_ts, cursor_kind, cursor_id = cursor
+            if kind == cursor_kind:
+                return " AND (%s, %s) < (%%s::timestamp, %%s::int)" % (ts_expr, id_expr), [cursor_ts, cursor_id]
+            # 同一时刻 kind 倒序：kind 更小的分支排在游标之后，可含同 ts 行。
+            op = "<=" if kind < cursor_kind else "<"
+            return " AND %s %s %%s::timestamp" % (ts_expr, op), [cursor_ts]
+
+        def _branch(kind: str, ts_expr: str, id_expr: str, from_where: str, where_params: List[Any]):
+            keyset, keyset_params = _keyset(kind, ts_expr, id_expr)
+            branches.append(
+                "(SELECT %s AS ts, %%s::varchar AS kind, %s AS id %s%s ORDER BY 1 DESC, 3 DESC LIMIT %%s)"
+                % (ts_expr, id_expr, from_where, keyset)
+            )
+            params.extend([kind, *where_params, *keyset_params, limit])
+
+        if "mail.message" in self.env:
+            _branch(
+                "message",
+                "m.date",
+                "m.id",
+                "FROM mail_message m WHERE m.model = %s AND m.res_id = %s AND m.date IS NOT NULL",
+                [model, record.id],
+            )
+        if "ir.attachment" in self.env:
+            related_ids = self._related_attachment_ids(record)
+            _branch(
+                "attachment",
+                "COALESCE(a.create_date, a.write_date, %s)" % _EPOCH,
+                "a.id",
+                "FROM ir_attachment a"
+                " WHERE ((a.res_model = %s AND a.res_id = %s AND a.res_field IS NULL) OR a.id = ANY(%s::int[]))",
+                [model, record.id, related_ids],
+            )
+        if "mail.activity" in self.env:
+            # mail_activity.res_model 为存储的关联字段，无需再查 ir.model。
+            _branch(
+                "activity",
+                "COALESCE(act.date_deadline::timestamp, %s)" % _EPOCH,
+                "act.id",
+                "FROM mail_activity act WHERE act.res_model = %s AND act.res_id = %s AND act.active IS NOT FALSE",
+                [model, record.id],
+            )
+        if include_audit and "sc.audit.log" in self.env:
+            _branch(
+                "audit",
+                "l.ts",
+                "l.id",
+                "FROM sc_audit_log l WHERE l.model = %s AND l.res_id = %s AND l.ts IS NOT NULL",
+                [model, record.id],
+            )
+        if not branches:
+            return []
+        self.env.cr.execute(
+            "SELECT ts, kind, id FROM (%s) timeline ORDER BY ts DESC, kind DESC, id DESC LIMIT %%s"
+            % " UNION ALL ".join(branches),
+            params + [limit],
         )
+        return [(ts, kind, int(rid)) for ts, kind, rid in self.env.cr.fetchall()]
+
+    def _hydrate_rows(self, rows) -> List[Dict[str, Any]]:
+        """按来源批量读取本页记录，保持查询顺序；无权读取的行跳过但不影响游标推进。"""
+        ids_by_kind: Dict[str, List[int]] = {kind: [] for kind in TIMELINE_KINDS}
+        for _ts, kind, rid in rows:
+            ids_by_kind[kind].append(rid)
+        built: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for kind, loader in (
+            ("message", self._message_items),
+            ("attachment", self._attachment_items),
+            ("activity", self._activity_items),
+            ("audit", self._audit_items),
+        ):
+            if ids_by_kind[kind]:
+                built.update({(kind, item["id"]): item for item in loader(ids_by_kind[kind])})
+        return [built[(kind, rid)] for _ts, kind, rid in rows if (kind, rid) in built]
+
+    # ---- 行构建 -------------------------------------------------------------------
+
+    def _message_items(self, ids: List[int]) -> List[Dict[str, Any]]:
+        # 经 search 过滤 mail.message 的访问规则（如内部备注）。
+        rows = self.env["mail.message"].search([("id", "in", ids)])
+        # 一次性预取本页作者，避免逐条 display_name 查询。
+        rows.mapped("author_id.display_name")
         items: List[Dict[str, Any]] = []
         for row in rows:
             date_value = _to_iso(row.date)
@@ -170,28 +301,17 @@ class ChatterTimelineHandler(BaseIntentHandler):
             )
         return items
 
-    def _load_attachments(self, model: str, res_id: int, limit: int) -> List[Dict[str, Any]]:
+    def _enqueue_legacy_prefetch(self, rows) -> None:
+        """首次查看附件列表时把远程旧附件放入后台预取队列，之后的下载直接读本地缓存。"""
+        if not rows or "sc.legacy.file.cache" not in self.env:
+            return
+        self.env["sc.legacy.file.cache"].sudo().enqueue_attachments(rows)
+
+    def _attachment_items(self, ids: List[int]) -> List[Dict[str, Any]]:
         Attachment = self.env["ir.attachment"]
-        domain = [("res_model", "=", model), ("res_id", "=", res_id)]
-        related_ids: List[int] = []
-        if model in self.env:
-            record = self.env[model].browse(res_id).exists()
-            record_fields = getattr(record, "_fields", {}) if record else {}
-            attachment_field = record and next(
-                (
-                    name
-                    for name, field in record_fields.items()
-                    if name == "attachment_ids"
-                    or (field.type == "many2many" and field.comodel_name == "ir.attachment")
-                ),
-                "",
-            )
-            if attachment_field:
-                related_ids = record[attachment_field].ids
-        if related_ids:
-            domain = ["|", ("id", "in", related_ids), "&", ("res_model", "=", model), ("res_id", "=", res_id)]
         AttachmentModel = Attachment.sudo() if hasattr(Attachment, "sudo") else Attachment
-        rows = AttachmentModel.search(domain, order="id desc", limit=limit)
+        rows = AttachmentModel.browse(ids).exists()
+        self._enqueue_legacy_prefetch(rows)
         items: List[Dict[str, Any]] = []
         for row in rows:
             date_value = _to_iso(row.create_date) or _to_iso(row.write_date)
@@ -214,19 +334,10 @@ class ChatterTimelineHandler(BaseIntentHandler):
             )
         return items
 
-    def _load_activities(self, model: str, res_id: int, limit: int) -> List[Dict[str, Any]]:
-        Activity = self.env.get("mail.activity")
-        IrModel = self.env.get("ir.model")
-        if Activity is None or IrModel is None:
-            return []
-        model_rec = IrModel.sudo().search([("model", "=", model)], limit=1)
-        if not model_rec:
-            return []
-        rows = Activity.search(
-            [("res_model_id", "=", model_rec.id), ("res_id", "=", res_id)],
-            order="date_deadline desc, id desc",
-            limit=limit,
-        )
+    def _activity_items(self, ids: List[int]) -> List[Dict[str, Any]]:
+        rows = self.env["mail.activity"].search([("id", "in", ids)])
+        rows.mapped("user_id.display_name")
+        rows.mapped("activity_type_id.display_name")
         items: List[Dict[str, Any]] = []
         for row in rows:
             deadline = _to_iso(row.date_deadline)
@@ -255,15 +366,9 @@ class ChatterTimelineHandler(BaseIntentHandler):
             )
         return items
 
-    def _load_audit_items(self, model: str, res_id: int, limit: int) -> List[Dict[str, Any]]:
-        Audit = self.env.get("sc.audit.log")
-        if not Audit:
-            return []
-        rows = Audit.sudo().search(
-            [("model", "=", model), ("res_id", "=", res_id)],
-            order="ts desc, id desc",
-            limit=limit,
-        )
+    def _audit_items(self, ids: List[int]) -> List[Dict[str, Any]]:
+        rows = self.env["sc.audit.log"].sudo().browse(ids).exists()
+        rows.mapped("actor_uid.display_name")
         items: List[Dict[str, Any]] = []
         for row in rows:
             date_value = _to_iso(row.ts)
@@ -284,6 +389,28 @@ class ChatterTimelineHandler(BaseIntentHandler):
         return items
 
 
+def encode_timeline_cursor(row) -> str:
+    ts, kind, rid = row
+    raw = json.dumps([_to_iso(ts) or "", kind, int(rid)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_timeline_cursor(value: Any):
+    """游标为 (ts, kind, id) 的 base64 编码；空值表示第一页。"""
+    if _is_empty_param(value):
+        return None, None
+    try:
+        raw = str(value).strip()
+        ts, kind, rid = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)).decode("utf-8"))
+        ts = datetime.fromisoformat(str(ts)).replace(tzinfo=None).isoformat(sep=" ")
+        rid = int(rid)
+    except Exception:
+        return None, "invalid_cursor"
+    if kind not in TIMELINE_KINDS or rid <= 0:
+        return None, "invalid_cursor"
+    return (ts, kind, rid), None
+
+
 def _read_limit(value: Any, default: int, cap: int):
     parsed, error = parse_positive_int(value, allow_empty=True)
     if error:
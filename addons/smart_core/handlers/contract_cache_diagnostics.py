@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from odoo.addons.smart_core.core.base_handler import BaseIntentHandler
+from odoo.addons.smart_core.core.contract_cache import contract_cache_diagnostics
+
+
+class ContractCacheDiagnosticsHandler(BaseIntentHandler):
+    """Expose the compiled contract cache stats of the serving worker."""
+
+    INTENT_TYPE = "contract.cache.diagnostics"
+    DESCRIPTION = "编译契约缓存诊断（命中/未命中/淘汰/代际）"
+    VERSION = "1.0.0"
+    REQUIRED_GROUPS = ["smart_core.group_smart_core_admin"]
+    SOURCE_KIND = "compiled_contract_cache_diagnostics"
+    SOURCE_AUTHORITIES = ("contract_cache", "pg_sequence.sc_contract_cache_generation")
+    NO_BUSINESS_FACT_AUTHORITY = True
+
+    @classmethod
+    def source_authority_contract(cls):
+        return {
+            "kind": cls.SOURCE_KIND,
+            "authorities": list(cls.SOURCE_AUTHORITIES),
+            "projection_only": True,
+            "rebuildable": True,
+            "no_business_fact_authority": cls.NO_BUSINESS_FACT_AUTHORITY,
+            "runtime_carrier": cls.INTENT_TYPE,
+        }
+
+    def handle(self, payload=None, ctx=None):
+        return contract_cache_diagnostics(self.env), {
+            "schema_version": "1.0.0",
+            "scope": "worker",
+            "source_kind": self.SOURCE_KIND,
+            "source_authorities": list(self.SOURCE_AUTHORITIES),
+            "source_authority": self.source_authority_contract(),
+        }
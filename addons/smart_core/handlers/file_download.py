@@ -18,6 +18,7 @@ from urllib.parse import quote, urljoin
 from odoo.exceptions import AccessError
 
 from ..core.base_handler import BaseIntentHandler
+from ..core.file_download_token import inline_max_bytes, issue_download_token, normalize_delivery
 try:
     from ..core.project_context import record_scope_denied_response
 except ImportError:  # pragma: no cover - compatibility for lightweight boundary tests
@@ -40,6 +41,7 @@ _logger = logging.getLogger(__name__)
 
 LEGACY_FILE_URL_PREFIX = "legacy-file://"
 LEGACY_FILE_ID_URL_PREFIX = "legacy-file-id://"
+LEGACY_FILE_CACHE_MODEL = "sc.legacy.file.cache"
 LEGACY_ATTACHMENT_LABEL_RE = re.compile(r"^附件\([1-9]\d*\)$")
 DEFAULT_ONLINE_LEGACY_BASE_URL = ""
 DEFAULT_LEGACY_FILE_HTTP_BASE_URLS = ()
@@ -234,21 +236,52 @@ class FileDownloadHandler(BaseIntentHandler):
             _logger.exception("file.download failed on %s", attachment_id)
             return self._err(500, str(e))
 
-        legacy_file = self._read_legacy_file(attachment)
-        if legacy_file.get("error"):
-            return self._err(legacy_file["code"], legacy_file["message"])
-
+        source = self._download_source(attachment)
+        if source.get("error"):
+            return self._err(source["code"], source["message"])
+        delivery = normalize_delivery(params.get("delivery"))
+        size = source.get("size")
+        inline = bool(source) and (
+            delivery == "inline" or (delivery == "auto" and size is not None and size <= inline_max_bytes(self.env))
+        )
+        legacy_file = {}
+        if inline and source.get("kind") != "attachment":
+            legacy_file = self._read_download_source(source)
+            if legacy_file.get("error"):
+                return self._err(legacy_file["code"], legacy_file["message"])
+
+        name = legacy_file.get("name") or source.get("name") or attachment.name
+        mimetype = legacy_file.get("mimetype") or source.get("mimetype") or attachment.mimetype or "application/octet-stream"
         data = {
             "id": attachment.id,
-            "name": legacy_file.get("name") or attachment.name,
-            "mimetype": legacy_file.get("mimetype") or attachment.mimetype or "application/octet-stream",
-            "datas": legacy_file.get("datas") or attachment.datas or "",
-            "type": "binary" if legacy_file.get("datas") else attachment.type or "binary",
+            "name": name,
+            "mimetype": mimetype,
+            "datas": (legacy_file.get("datas") or attachment.datas or "") if inline else "",
+            "type": "binary" if source.get("kind") not in (None, "attachment") else attachment.type or "binary",
             "url": attachment.url or "",
             "res_model": attachment.res_model,
             "res_id": attachment.res_id,
             "legacy_url": attachment.url or "",
+            "delivery": "inline" if inline or not source else "stream",
+            "size": size,
         }
+        if source:
+            issued = issue_download_token(
+                self.env,
+                attachment_id=attachment.id,
+                source=source["kind"],
+                ref=source.get("ref") or "",
+                base_url=source.get("base_url") or "",
+                name=name,
+                mimetype=mimetype,
+            )
+            data.update(
+                {
+                    "download_token": issued["token"],
+                    "download_url": issued["url"],
+                    "download_expires_at": issued["expires_at"],
+                }
+            )
         meta = {
             "trace_id": trace_id,
             "source": "portal-shell",
@@ -259,12 +292,34 @@ class FileDownloadHandler(BaseIntentHandler):
         }
         return {"ok": True, "data": data, "meta": meta}
 
-    def _read_legacy_file(self, attachment):
-        url = str(attachment.url or "").strip()
+    def _download_source(self, attachment, use_cache=True):
+        """
+        解析附件的文件来源但不读取内容：
+        - {}：普通外链附件，无可流式输出的内容；
+        - {"kind": attachment|path|cache|remote_url|remote_path, "ref", "name", "mimetype", "size"}；
+        - {"error": True, ...}：旧系统文件缺失。
+        远程来源先查本地预取缓存（sc.legacy.file.cache），未命中时照常解析并入队后台预取。
+        """
+        if attachment.type == "url" and use_cache and LEGACY_FILE_CACHE_MODEL in self.env:
+            cached = self.env[LEGACY_FILE_CACHE_MODEL].sudo().cached_source(attachment)
+            if cached:
+                return cached
+        source = self._resolve_download_source(attachment)
+        if use_cache and source.get("kind") in ("remote_url", "remote_path") and LEGACY_FILE_CACHE_MODEL in self.env:
+            self.env[LEGACY_FILE_CACHE_MODEL].sudo().enqueue_attachments(attachment)
+        return source
+
+    def _resolve_download_source(self, attachment):
         if attachment.type != "url":
-            return {}
+            return {
+                "kind": "attachment",
+                "name": attachment.name,
+                "mimetype": attachment.mimetype,
+                "size": int(getattr(attachment, "file_size", 0) or 0),
+            }
+        url = str(attachment.url or "").strip()
         if url and _is_online_legacy_file_url(url):
-            return _read_online_legacy_file_url(url, attachment.name, attachment.mimetype)
+            return {"kind": "remote_url", "ref": url, "name": attachment.name, "mimetype": attachment.mimetype, "size": None}
         if not url.startswith((LEGACY_FILE_URL_PREFIX, LEGACY_FILE_ID_URL_PREFIX)):
             return {}
         relative_path = self._legacy_relative_path(url)
@@ -278,32 +333,70 @@ class FileDownloadHandler(BaseIntentHandler):
                 online_url = str((file_info or {}).get("ATTR_PATH") or "").strip()
                 if online_url:
                     online_name = str((file_info or {}).get("ATTR_NAME") or "").strip()
-                    return _read_online_legacy_file_url(online_url, online_name or attachment.name, "")
+                    return {"kind": "remote_url", "ref": online_url, "name": online_name or attachment.name, "mimetype": "", "size": None}
             return {"error": True, "code": 404, "message": "旧系统未返回该历史附件文件"}
         path = _resolve_legacy_file_path(relative_path)
         if not path:
+            preferred_base_url = _online_legacy_base_url_for_attachment(attachment)
+            if _legacy_file_http_base_urls(preferred_base_url):
+                return {
+                    "kind": "remote_path",
+                    "ref": relative_path,
+                    "base_url": preferred_base_url,
+                    "name": attachment.name,
+                    "mimetype": attachment.mimetype,
+                    "size": None,
+                }
+            _logger.warning("legacy attachment file missing: attachment=%s url=%s path=%s", attachment.id, url, relative_path)
+            return {"error": True, "code": 404, "message": "历史附件文件不存在"}
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = None
+        return {
+            "kind": "path",
+            "ref": relative_path,
+            "path": path,
+            "name": attachment.name or path.name,
+            "mimetype": attachment.mimetype or mimetypes.guess_type(str(path))[0] or "application/octet-stream",
+            "size": size,
+        }
+
+    def _read_download_source(self, source):
+        """内联（base64）读取旧系统来源；仅用于小文件与显式 delivery=inline。"""
+        kind = source.get("kind")
+        if kind == "remote_url":
+            return _read_online_legacy_file_url(source["ref"], source.get("name") or "", source.get("mimetype") or "")
+        if kind == "remote_path":
             remote_file = _read_remote_legacy_file_path(
-                relative_path,
-                attachment.name,
-                attachment.mimetype,
-                preferred_base_url=_online_legacy_base_url_for_attachment(attachment),
+                source["ref"],
+                source.get("name") or "",
+                source.get("mimetype") or "",
+                preferred_base_url=source.get("base_url") or "",
             )
             if not remote_file.get("error"):
                 return remote_file
-            _logger.warning("legacy attachment file missing: attachment=%s url=%s path=%s", attachment.id, url, relative_path)
             return {"error": True, "code": 404, "message": "历史附件文件不存在"}
+        if kind not in ("path", "cache"):
+            return {}
+        path = source["path"]
         try:
             raw = path.read_bytes()
         except OSError:
-            _logger.exception("legacy attachment file unreadable: attachment=%s path=%s", attachment.id, path)
+            _logger.exception("legacy attachment file unreadable: path=%s", path)
             return {"error": True, "code": 500, "message": "历史附件读取失败"}
-        mimetype = attachment.mimetype or mimetypes.guess_type(str(path))[0] or "application/octet-stream"
         return {
             "datas": base64.b64encode(raw).decode("ascii"),
-            "name": attachment.name or path.name,
-            "mimetype": mimetype,
+            "name": source.get("name") or path.name,
+            "mimetype": source.get("mimetype") or "application/octet-stream",
         }
 
+    def _read_legacy_file(self, attachment):
+        source = self._download_source(attachment)
+        if source.get("error") or source.get("kind") in (None, "attachment"):
+            return source if source.get("error") else {}
+        return self._read_download_source(source)
+
     def _legacy_relative_path(self, url: str) -> str:
         if url.startswith(LEGACY_FILE_URL_PREFIX):
             return url[len(LEGACY_FILE_URL_PREFIX):]
@@ -645,15 +738,11 @@ def _read_online_legacy_file_url(url: str, fallback_name: str = "", fallback_mim
     }
 
 
-def _read_remote_legacy_file_path(
-    relative_path: str,
-    fallback_name: str = "",
-    fallback_mimetype: str = "",
-    preferred_base_url: str = "",
-) -> dict[str, Any]:
+def _remote_legacy_file_candidates(relative_path: str, preferred_base_url: str = "") -> list[tuple[str, str]]:
+    """旧系统 HTTP 基址 × 路径别名 -> [(url, 候选相对路径)]，按探测顺序排列。"""
     base_urls = _legacy_file_http_base_urls(preferred_base_url)
     if not base_urls:
-        return {"error": True}
+        return []
     clean = str(relative_path or "").strip().replace("\\", "/").lstrip("/")
     path_candidates = [clean]
     if clean.startswith("UploadFile/"):
@@ -670,26 +759,40 @@ def _read_remote_legacy_file_path(
         path_candidates.append("OldSystem/" + clean)
         path_candidates.append("UploadFile/OldSystem/" + clean)
     path_candidates = [item for item in dict.fromkeys(path_candidates) if item]
-    last_url = ""
+    urls = []
     for base_url in base_urls:
         for candidate in path_candidates:
             quoted = "/".join(quote(part) for part in candidate.split("/") if part)
-            url = urljoin(base_url.rstrip("/") + "/", quoted)
-            last_url = url
-            try:
-                request = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-                with urlopen(request, timeout=30) as response:
-                    raw = response.read()
-                    content_type = response.headers.get_content_type() if response.headers else ""
-            except (OSError, URLError):
-                continue
-            name = fallback_name or Path(candidate).name or "历史附件"
-            mimetype = fallback_mimetype or content_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
-            return {
-                "datas": base64.b64encode(raw).decode("ascii"),
-                "name": name,
-                "mimetype": mimetype,
-            }
+            urls.append((urljoin(base_url.rstrip("/") + "/", quoted), candidate))
+    return urls
+
+
+def _read_remote_legacy_file_path(
+    relative_path: str,
+    fallback_name: str = "",
+    fallback_mimetype: str = "",
+    preferred_base_url: str = "",
+) -> dict[str, Any]:
+    candidates = _remote_legacy_file_candidates(relative_path, preferred_base_url)
+    if not candidates:
+        return {"error": True}
+    last_url = ""
+    for url, candidate in candidates:
+        last_url = url
+        try:
+            request = Request(url, headers={"User-Agent": "Mozilla/5.0"})
+            with urlopen(request, timeout=30) as response:
+                raw = response.read()
+                content_type = response.headers.get_content_type() if response.headers else ""
+        except (OSError, URLError):
+            continue
+        name = fallback_name or Path(candidate).name or "历史附件"
+        mimetype = fallback_mimetype or content_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
+        return {
+            "datas": base64.b64encode(raw).decode("ascii"),
+            "name": name,
+            "mimetype": mimetype,
+        }
     _logger.warning("remote legacy file read failed: last_url=%s", last_url)
     return {"error": True, "code": 404, "message": "历史附件文件不存在"}
 
@@ -9,6 +9,7 @@ from typing import Any, Dict
 from odoo.exceptions import AccessError
 
 from ..core.base_handler import BaseIntentHandler
+from ..core.file_upload_spool import UPLOAD_ROUTE, UploadChunkError
 try:
     from ..core.project_context import record_scope_denied_response
 except ImportError:  # pragma: no cover - compatibility for lightweight boundary tests
@@ -34,7 +35,8 @@ class FileUploadHandler(BaseIntentHandler):
     """
     Intent: file.upload
     - 按 allowlist 限定可上传附件 model
-    - 传入 base64 数据
+    - 不带 action：传入 base64 数据（小文件，MAX_BYTES 以内）
+    - action=init/status/finalize/abort：分片续传协议，分片以原始字节 PUT 到 upload_url
     """
 
     INTENT_TYPE = "file.upload"
@@ -46,6 +48,8 @@ class FileUploadHandler(BaseIntentHandler):
 
     ALLOWED_MODELS = {"res.partner"}
     MAX_BYTES = 5 * 1024 * 1024
+    SESSION_MODEL = "sc.file.upload.session"
+    CHUNKED_ACTIONS = ("init", "status", "finalize", "abort")
     SOURCE_AUTHORITY = "ir.attachment"
     SOURCE_KIND = "odoo_attachment_upload_proxy"
     SOURCE_AUTHORITIES = ("ir.attachment", "odoo.orm", "ir.rule", "ir.model.access", "record_context_model")
@@ -71,8 +75,10 @@ class FileUploadHandler(BaseIntentHandler):
                 return values
         return set(self.ALLOWED_MODELS)
 
-    def _err(self, code: int, message: str):
-        return {"ok": False, "error": {"code": code, "message": message}, "code": code}
+    def _err(self, code: int, message: str, **extra):
+        error = {"code": code, "message": message}
+        error.update(extra)
+        return {"ok": False, "error": error, "code": code}
 
     def _collect_params(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         params = {}
@@ -86,26 +92,19 @@ class FileUploadHandler(BaseIntentHandler):
     def handle(self, payload=None, ctx=None):
         payload = payload or {}
         params = self._collect_params(payload)
+        action = str(params.get("action") or "").strip().lower()
+        if action:
+            if action not in self.CHUNKED_ACTIONS:
+                return self._err(400, f"不支持的 action: {action}")
+            return getattr(self, f"_handle_{action}")(params)
 
-        model = str(params.get("model") or params.get("res_model") or "").strip()
-        res_id = params.get("res_id") if "res_id" in params else params.get("record_id")
+        model, res_id, error = self._target_from_params(params)
+        if error:
+            return error
         name = params.get("name") or "upload.bin"
         mimetype = params.get("mimetype") or "application/octet-stream"
         data = params.get("data") or ""
 
-        if not model:
-            return self._err(400, "缺少参数 model")
-        if model not in self._allowed_models():
-            return self._err(403, f"模型不允许上传: {model}")
-        if model not in self.env:
-            return self._err(404, f"未知模型: {model}")
-        if _is_empty_param(res_id):
-            return self._err(400, "缺少参数 res_id")
-
-        res_id, res_id_error = parse_positive_int(res_id)
-        if res_id_error:
-            return self._err(400, "res_id 无效")
-
         if not data or not isinstance(data, str):
             return self._err(400, "缺少参数 data")
 
@@ -117,24 +116,10 @@ class FileUploadHandler(BaseIntentHandler):
         if len(raw) > self.MAX_BYTES:
             return self._err(413, "文件过大")
 
-        trace_id = ""
-        if isinstance(self.context, dict):
-            trace_id = self.context.get("trace_id") or ""
-
         try:
-            self.env[model].check_access_rights("write")
-            record = self.env[model].browse(res_id).exists()
-            if not record:
-                return self._err(404, "记录不存在")
-            in_scope, scope_meta = record_in_business_scope(
-                self.env[model],
-                int(record.id),
-                params,
-                self.context if isinstance(self.context, dict) else {},
-            )
-            if not in_scope:
-                return record_scope_denied_response(scope_meta)
-            record.check_access_rule("write")
+            record, scope_meta, denied = self._writable_record(model, res_id, params)
+            if denied:
+                return denied
             attachment = self.env["ir.attachment"].create(
                 {
                     "name": name,
@@ -144,13 +129,7 @@ class FileUploadHandler(BaseIntentHandler):
                     "res_id": res_id,
                 }
             )
-            attachment_field = getattr(record, "_fields", {}).get("attachment_ids")
-            if (
-                attachment_field
-                and attachment_field.type == "many2many"
-                and attachment_field.comodel_name == "ir.attachment"
-            ):
-                record.write({"attachment_ids": [(4, attachment.id)]})
+            self._link_attachment(record, attachment)
         except AccessError as ae:
             _logger.warning("file.upload AccessError on %s: %s", model, ae)
             return self._err(403, "无上传权限")
@@ -159,16 +138,166 @@ class FileUploadHandler(BaseIntentHandler):
             return self._err(500, str(e))
 
         data = {"id": attachment.id, "name": attachment.name, "model": model, "res_id": res_id}
-        meta = {
+        return {"ok": True, "data": data, "meta": self._meta(scope_meta)}
+
+    def _target_from_params(self, params):
+        model = str(params.get("model") or params.get("res_model") or "").strip()
+        res_id = params.get("res_id") if "res_id" in params else params.get("record_id")
+
+        if not model:
+            return model, None, self._err(400, "缺少参数 model")
+        if model not in self._allowed_models():
+            return model, None, self._err(403, f"模型不允许上传: {model}")
+        if model not in self.env:
+            return model, None, self._err(404, f"未知模型: {model}")
+        if _is_empty_param(res_id):
+            return model, None, self._err(400, "缺少参数 res_id")
+
+        res_id, res_id_error = parse_positive_int(res_id)
+        if res_id_error:
+            return model, None, self._err(400, "res_id 无效")
+        return model, res_id, None
+
+    def _writable_record(self, model, res_id, params):
+        """返回 (record, scope_meta, denied_response)；无写权限时抛 AccessError。"""
+        self.env[model].check_access_rights("write")
+        record = self.env[model].browse(res_id).exists()
+        if not record:
+            return record, {}, self._err(404, "记录不存在")
+        in_scope, scope_meta = record_in_business_scope(
+            self.env[model],
+            int(record.id),
+            params,
+            self.context if isinstance(self.context, dict) else {},
+        )
+        if not in_scope:
+            return record, scope_meta, record_scope_denied_response(scope_meta)
+        record.check_access_rule("write")
+        return record, scope_meta, None
+
+    def _link_attachment(self, record, attachment):
+        attachment_field = getattr(record, "_fields", {}).get("attachment_ids")
+        if (
+            attachment_field
+            and attachment_field.type == "many2many"
+            and attachment_field.comodel_name == "ir.attachment"
+        ):
+            record.write({"attachment_ids": [(4, attachment.id)]})
+
+    def _meta(self, scope_meta, write_mode="upload"):
+        trace_id = ""
+        if isinstance(self.context, dict):
+            trace_id = self.context.get("trace_id") or ""
+        return {
             "trace_id": trace_id,
-            "write_mode": "upload",
+            "write_mode": write_mode,
             "source": "portal-shell",
             "source_authority": self.source_authority_contract(),
             "legacy_source_authority": self.SOURCE_AUTHORITY,
             "project_scope": scope_meta,
             "record_scope": scope_meta,
         }
-        return {"ok": True, "data": data, "meta": meta}
+
+    def _chunk_err(self, exc: UploadChunkError):
+        if exc.offset is None:
+            return self._err(exc.code, exc.message)
+        return self._err(exc.code, exc.message, offset=exc.offset)
+
+    def _session_state(self, session):
+        return {
+            "upload_id": session.upload_token,
+            "state": session.state,
+            "offset": session.received_size,
+            "total_size": session.total_size,
+            "chunk_size": session.chunk_size,
+            "max_chunk_bytes": session.max_chunk_bytes(),
+            "upload_url": f"{UPLOAD_ROUTE}/{session.upload_token}?db={self.env.cr.dbname}",
+            "expires_at": str(session.expires_at or ""),
+        }
+
+    def _session_from_params(self, params):
+        upload_id = str(params.get("upload_id") or "").strip()
+        if not upload_id:
+            return None, self._err(400, "缺少参数 upload_id")
+        session = self.env[self.SESSION_MODEL].find_session(upload_id, self.env.uid)
+        if not session:
+            return None, self._err(404, "上传会话不存在")
+        return session, None
+
+    def _handle_init(self, params):
+        model, res_id, error = self._target_from_params(params)
+        if error:
+            return error
+        name = str(params.get("name") or "upload.bin")
+        mimetype = str(params.get("mimetype") or "application/octet-stream")
+        total_size, size_error = parse_positive_int(params.get("total_size") or params.get("size"))
+        if size_error:
+            return self._err(400, "total_size 无效")
+        Session = self.env[self.SESSION_MODEL]
+        if total_size > Session.max_upload_bytes():
+            return self._err(413, "文件过大")
+        try:
+            _record, scope_meta, denied = self._writable_record(model, res_id, params)
+            if denied:
+                return denied
+            session = Session.open_session(
+                res_model=model,
+                res_id=res_id,
+                name=name,
+                mimetype=mimetype,
+                total_size=total_size,
+                client_key=str(params.get("client_key") or "").strip()[:128],
+                sha256=str(params.get("sha256") or "").strip(),
+            )
+        except AccessError as ae:
+            _logger.warning("file.upload init AccessError on %s: %s", model, ae)
+            return self._err(403, "无上传权限")
+        return {"ok": True, "data": self._session_state(session), "meta": self._meta(scope_meta, "chunked_upload")}
+
+    def _handle_status(self, params):
+        session, error = self._session_from_params(params)
+        if error:
+            return error
+        session._sync_received_size()
+        return {"ok": True, "data": self._session_state(session), "meta": self._meta({}, "chunked_upload")}
+
+    def _handle_finalize(self, params):
+        session, error = self._session_from_params(params)
+        if error:
+            return error
+        model, res_id = session.res_model, session.res_id
+        try:
+            record, scope_meta, denied = self._writable_record(model, res_id, params)
+            if denied:
+                return denied
+            attachment = session.finalize()
+            self._link_attachment(record, attachment)
+        except UploadChunkError as exc:
+            return self._chunk_err(exc)
+        except AccessError as ae:
+            _logger.warning("file.upload finalize AccessError on %s: %s", model, ae)
+            return self._err(403, "无上传权限")
+        except Exception as e:
+            _logger.exception("file.upload finalize failed on %s", model)
+            return self._err(500, str(e))
+
+        data = {
+            "id": attachment.id,
+            "name": attachment.name,
+            "model": model,
+            "res_id": res_id,
+            "upload_id": session.upload_token,
+            "deduplicated": bool(session.deduplicated),
+        }
+        return {"ok": True, "data": data, "meta": self._meta(scope_meta, "chunked_upload")}
+
+    def _handle_abort(self, params):
+        session, error = self._session_from_params(params)
+        if error:
+            return error
+        if session.state == "open":
+            session.abort()
+        return {"ok": True, "data": {"upload_id": session.upload_token, "state": session.state}, "meta": self._meta({}, "chunked_upload")}
 
 
 def _is_empty_param(value: Any) -> bool:
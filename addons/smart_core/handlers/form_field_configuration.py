@@ -6,7 +6,6 @@ from __future__ import annotations
 import logging
 import re
 import time
-import xml.etree.ElementTree as ET
 
 from odoo.exceptions import ValidationError
 
@@ -1978,9 +1977,11 @@ class BusinessConfigListSearchAuditHandler(BaseIntentHandler):
             else:
                 view_def = Model.fields_view_get(view_id=resolved_view_id or None, view_type="tree", toolbar=False)
             arch = view_def.get("arch") if isinstance(view_def, dict) else ""
-            root = ET.fromstring(str(arch or ""))
+            from ..core.view_arch_cache import arch_plain_root, indexed_nodes
+
+            root = arch_plain_root(str(arch or ""))
             labels = {}
-            for node in root.iter("field"):
+            for node in indexed_nodes(root, "field"):
                 name = str(node.get("name") or "").strip()
                 label = str(node.get("string") or "").strip()
                 if name and label and name not in labels:
@@ -1,20 +1,34 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import json
+import logging
 import re
+import time
 from email.header import decode_header, make_header
 from email.utils import formataddr, parseaddr
 from html import escape
 from typing import Any, Iterable, List
 
-from odoo import fields
+from odoo import api, fields
 from odoo.exceptions import AccessError
+from odoo.http import Response
 
 from ..core.base_handler import BaseIntentHandler
-from ..core.request_params import parse_positive_int
+from ..core.global_message_notify import (
+    DEFAULT_MAX_WAITERS,
+    MAX_WAITERS_PARAM,
+    decode_revision_cursor,
+    global_message_dispatcher,
+    long_poll_supported,
+)
+from ..core.request_params import parse_non_negative_int, parse_positive_int
 from .collaboration_users import is_collaboration_visible_user
 
 GLOBAL_MESSAGE_SUBJECT = "[SC_GLOBAL_MESSAGE]"
+LONG_POLL_MAX_SECONDS = 25
+
+_logger = logging.getLogger(__name__)
 
 
 class _GlobalMessageBaseHandler(BaseIntentHandler):
@@ -97,23 +111,29 @@ class _GlobalMessageBaseHandler(BaseIntentHandler):
         rows.check_access_rule("read")
         return rows
 
-    def _unread_counts_by_conversation(self, message_ids: List[int] | None = None) -> dict[str, int]:
+    def _unread_counter(self):
+        return self.env["sc.global.message.unread"].sudo()
+
+    def _unread_counts_by_conversation(self) -> dict[str, int]:
         partner = self.env.user.partner_id
         if not partner:
             return {}
-        domain: list[Any] = [
-            ("res_partner_id", "=", partner.id),
-            ("is_read", "=", False),
-            ("mail_message_id.subject", "=", GLOBAL_MESSAGE_SUBJECT),
-        ]
-        if message_ids:
-            domain.append(("mail_message_id", "in", message_ids))
-        notifications = self.env["mail.notification"].search(domain)
-        counts: dict[str, int] = {}
-        for notification in notifications:
-            key = _conversation_key(_conversation_partner_ids(notification.mail_message_id))
-            counts[key] = counts.get(key, 0) + 1
-        return counts
+        return self._unread_counter().unread_counts(partner.id)
+
+    def _poll_delta(self, *, since_id: int, since_revision: Any, limit: int) -> dict[str, Any]:
+        """since_id 之后的新消息 + since_revision（未读计数游标）之后变化的会话未读数。"""
+        rows = self._visible_messages(limit=limit, since_id=since_id)
+        items = [self._serialize_message(row) for row in reversed(rows)]
+        counters = self._unread_counter().changes_since(self.env.user.partner_id.id, since_revision)
+        return {
+            "items": items,
+            "latest_id": max([item["id"] for item in items], default=since_id),
+            "has_more": len(rows) >= limit,
+            "unread": counters["unread"],
+            "total_unread": counters["total_unread"],
+            "revision": counters["revision"],
+            "changed": bool(items or counters["unread"]),
+        }
 
 
 class GlobalMessageInboxHandler(_GlobalMessageBaseHandler):
@@ -172,7 +192,7 @@ class GlobalMessageConversationsHandler(_GlobalMessageBaseHandler):
         try:
             self.env["mail.message"].check_access_rights("read")
             rows = self._visible_messages(limit=300)
-            unread_counts = self._unread_counts_by_conversation(rows.ids)
+            unread_counts = self._unread_counts_by_conversation()
             conversations: dict[str, dict[str, Any]] = {}
             for message in rows:
                 partner_ids = _conversation_partner_ids(message)
@@ -207,6 +227,140 @@ class GlobalMessageConversationsHandler(_GlobalMessageBaseHandler):
         return [int(uid) for uid in users.ids if uid]
 
 
+class GlobalMessagePollHandler(_GlobalMessageBaseHandler):
+    """
+    长轮询：since_id 之后的新消息与 since_revision 之后的未读数变化。
+    - 有变化或 timeout=0 时立即返回；否则返回流式响应，请求游标随即释放，
+      等待期间不占数据库连接，直到本人相关的消息/已读变化唤醒或超时；
+    - 只在事件驱动进程（odoo.evented）或长连接路由上挂起等待；多线程/prefork 进程里等待会占住
+      HTTP 工作线程，按短轮询立即返回。同时等待数达到上限（sc.global_message.long_poll.max_waiters）
+      或监听线程尚未就绪时同样按短轮询返回，客户端照常按 revision/latest_id 续轮询；
+    - since_revision 为上次返回的 revision 游标（整数或 "xmax:xid,..."），原样回传。
+    """
+
+    INTENT_TYPE = "global.message.poll"
+    DESCRIPTION = "Long-poll station-wide message and unread-count deltas for current user"
+
+    def handle(self, payload=None, ctx=None):
+        params = self.params if isinstance(self.params, dict) else {}
+        limit, limit_error = parse_positive_int(params.get("limit"), allow_empty=True)
+        if limit_error:
+            return self._err(400, "limit 无效")
+        limit = min(limit or 30, 100)
+        since_id, since_error = parse_non_negative_int(params.get("since_id"), allow_empty=True)
+        if since_error:
+            return self._err(400, "since_id 无效")
+        since_revision = params.get("since_revision")
+        _cursor, revision_error = decode_revision_cursor(since_revision)
+        if revision_error:
+            return self._err(400, "since_revision 无效")
+        timeout, timeout_error = parse_non_negative_int(params.get("timeout"), allow_empty=True)
+        if timeout_error:
+            return self._err(400, "timeout 无效")
+        timeout = min(LONG_POLL_MAX_SECONDS if timeout is None else timeout, LONG_POLL_MAX_SECONDS)
+
+        partner = self.env.user.partner_id
+        if not partner:
+            return self._err(403, "当前用户缺少联系人，无法读取消息")
+
+        try:
+            self.env["mail.message"].check_access_rights("read")
+            dispatcher = global_message_dispatcher()
+            max_waiters = self._long_poll_max_waiters()
+            if (
+                timeout
+                and long_poll_supported(self._request_path())
+                and dispatcher.available()
+                and dispatcher.has_capacity(max_waiters)
+            ):
+                return self._long_poll_response(
+                    since_id=since_id or 0,
+                    since_revision=since_revision or 0,
+                    limit=limit,
+                    timeout=timeout,
+                    max_waiters=max_waiters,
+                )
+            delta = self._poll_delta(since_id=since_id or 0, since_revision=since_revision or 0, limit=limit)
+            return dict(
+                delta,
+                timed_out=False,
+                source_authority=self.source_authority_contract(),
+            ), {"source_authority": self.source_authority_contract()}
+        except AccessError:
+            return self._err(403, "无权限读取全局消息")
+        except Exception:
+            return self._err(500, "读取全局消息失败")
+
+    def _request_path(self) -> str:
+        try:
+            return str(getattr(getattr(self.request, "httprequest", None), "path", "") or "")
+        except Exception:
+            return ""
+
+    def _long_poll_max_waiters(self) -> int:
+        value = self.env["ir.config_parameter"].sudo().get_param(MAX_WAITERS_PARAM)
+        parsed, error = parse_non_negative_int(value, allow_empty=True)
+        return DEFAULT_MAX_WAITERS if error or parsed is None else parsed
+
+    def _long_poll_response(self, *, since_id: int, since_revision: Any, limit: int, timeout: int, max_waiters: int):
+        # 请求游标在 handler 返回后即被关闭，每次查库都用独立游标重建 env。
+        registry = self.env.registry
+        dbname = self.env.cr.dbname
+        uid = self.env.uid
+        env_context = dict(self.env.context)
+        partner_id = int(self.env.user.partner_id.id)
+        handler_cls = type(self)
+        dispatcher = global_message_dispatcher()
+        deadline = time.monotonic() + timeout
+        source_authority = self.source_authority_contract()
+
+        def _delta():
+            with registry.cursor() as cr:
+                handler = handler_cls(api.Environment(cr, uid, env_context))
+                return handler._poll_delta(since_id=since_id, since_revision=since_revision, limit=limit)
+
+        def _generate():
+            timed_out = False
+            # 名额在开始输出时占用、结束时释放；未被迭代的响应不占名额。并发抢占失败时只查一次即返回。
+            acquired = dispatcher.acquire_poll(max_waiters)
+            try:
+                while True:
+                    # 先取版本号再查库：查库之后提交的变化一定会让版本号前进。
+                    version = dispatcher.version(dbname, partner_id)
+                    delta = _delta()
+                    if delta["changed"] or not acquired:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not dispatcher.wait(dbname, partner_id, version, remaining):
+                        timed_out = True
+                        break
+            except Exception:
+                _logger.exception("[%s] long poll failed: partner=%s", self.INTENT_TYPE, partner_id)
+                body = {
+                    "ok": False,
+                    "error": {"code": 500, "message": "读取全局消息失败"},
+                    "code": 500,
+                    "meta": {"source_authority": source_authority},
+                }
+            else:
+                body = {
+                    "ok": True,
+                    "data": dict(delta, timed_out=timed_out, source_authority=source_authority),
+                    "meta": {"source_authority": source_authority},
+                }
+            finally:
+                if acquired:
+                    dispatcher.release_poll()
+            yield json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+
+        return Response(
+            _generate(),
+            status=200,
+            mimetype="application/json",
+            headers=[("Cache-Control", "no-store"), ("X-Accel-Buffering", "no")],
+        )
+
+
 class GlobalMessageSendHandler(_GlobalMessageBaseHandler):
     INTENT_TYPE = "global.message.send"
     DESCRIPTION = "Send a station-wide direct message to internal users"
@@ -246,6 +400,12 @@ class GlobalMessageSendHandler(_GlobalMessageBaseHandler):
             })
             self._link_message_partners(message, partner_ids)
             self._create_notifications(message, partner_ids)
+            self._unread_counter().record_message(
+                message.id,
+                _conversation_key(partner_ids),
+                partner_ids,
+                author_partner_id=self.env.user.partner_id.id,
+            )
             return {
                 "ok": True,
                 "data": {"result": {"message_id": int(message.id), "success": True}},
@@ -321,7 +481,9 @@ class GlobalMessageReadHandler(_GlobalMessageBaseHandler):
                 )
             count = len(notifications)
             if notifications:
+                counts_by_key = self._unread_by_key(notifications, conversation_key)
                 notifications.write({"is_read": True, "read_date": fields.Datetime.now()})
+                self._unread_counter().mark_read(partner.id, counts_by_key)
             return {
                 "ok": True,
                 "data": {"result": {"updated": count}},
@@ -332,6 +494,19 @@ class GlobalMessageReadHandler(_GlobalMessageBaseHandler):
         except Exception:
             return self._err(500, "标记消息失败")
 
+    def _unread_by_key(self, notifications, conversation_key: str) -> dict[str, int]:
+        if conversation_key:
+            return {conversation_key: len(notifications)}
+        keys_by_message: dict[int, str] = {}
+        counts: dict[str, int] = {}
+        for notification in notifications:
+            message = notification.mail_message_id
+            if message.id not in keys_by_message:
+                keys_by_message[message.id] = _conversation_key(_conversation_partner_ids(message))
+            key = keys_by_message[message.id]
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
 
 def _resolve_email_from(user) -> str:
     email = str(user.email or user.partner_id.email or "").strip()
@@ -7,6 +7,7 @@ import re
 from odoo import SUPERUSER_ID, api
 
 from ..core.base_handler import BaseIntentHandler
+from ..core.contract_version_vector import build_contract_version_vector, contract_version_etag
 from ..core.request_params import parse_positive_int
 from ..core.unified_page_contract_lite_preview import with_lite_preview_if_requested
 from ..utils.extension_hooks import call_extension_hook_first
@@ -223,6 +224,36 @@ class LoadContractHandler(BaseIntentHandler):
         if operation_strategy:
             ctx_user["operation_strategy"] = operation_strategy
 
+        # ---------- 5.x) 版本向量预判：命中则不生成契约，直接 304 ----------
+        source_authority = self._source_authority_contract(model_name, view_type_final)
+        version_etag = contract_version_etag(
+            build_contract_version_vector(
+                self.env,
+                model=model_name,
+                action_id=action_id,
+                menu_id=menu_id,
+                lang=ctx_user.get("lang"),
+                contract_mode=str(p.get("contract_mode") or "user"),
+                request_key={
+                    "carrier": "load_contract",
+                    "payload": {
+                        key: value
+                        for key, value in p.items()
+                        if key not in ("if_none_match", "force_refresh", "version")
+                    },
+                    "view_type": view_type_final,
+                    "include": sorted(include_parts),
+                },
+            )
+        )
+        if version_etag and if_none_match and if_none_match == version_etag and not force_refresh:
+            return {
+                "status": "not_modified",
+                "code": 304,
+                "data": None,
+                "meta": {"etag": version_etag, "etag_source": "version_vector", "source_authority": source_authority},
+            }
+
         # ---------- 6) 生成契约（按当前用户权限，不 sudo） ----------
         if "app.contract.service" in self.env:
             svc = self.env["app.contract.service"].with_context(ctx_user)
@@ -268,7 +299,7 @@ class LoadContractHandler(BaseIntentHandler):
         if isinstance(hook_payload, dict):
             data = hook_payload
 
-        # ---------- 7) 计算聚合 ETag ----------
+        # ---------- 7) 计算聚合 ETag（版本向量不可用时按元数据哈希） ----------
         etag_source = _json({
             "view_hash":    meta.get("view_hash"),
             "model_hash":   meta.get("model_hash"),
@@ -279,10 +310,9 @@ class LoadContractHandler(BaseIntentHandler):
             "co":  self.env.company.id,
             "lang": ctx_user.get("lang"),
         })
-        etag = hashlib.sha1(etag_source.encode("utf-8")).hexdigest()
+        etag = version_etag or hashlib.sha1(etag_source.encode("utf-8")).hexdigest()
 
         # ---------- 8) If-None-Match → 304 语义 ----------
-        source_authority = self._source_authority_contract(model_name, view_type_final)
         if if_none_match and if_none_match == etag and not force_refresh:
             return {"status": "not_modified", "code": 304, "data": None, "meta": {"etag": etag, "source_authority": source_authority}}
 
@@ -7,6 +7,7 @@ from ..utils.reason_codes import (
     REASON_DRY_RUN,
     REASON_FILTER_NO_MATCH,
     REASON_IDEMPOTENCY_CONFLICT,
+    REASON_IDEMPOTENCY_IN_FLIGHT,
     REASON_METHOD_NOT_CALLABLE,
     REASON_MISSING_PARAMS,
     REASON_NO_WORK_ITEMS,
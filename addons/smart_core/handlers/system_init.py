@@ -53,6 +53,15 @@ from odoo.addons.smart_core.core.system_init_scene_runtime_surface_context impor
 from odoo.addons.smart_core.core.system_init_scene_runtime_surface_builder import SystemInitSceneRuntimeSurfaceBuilder
 from odoo.addons.smart_core.core.system_init_dictionary_data_helper import apply_dictionary_startup_data
 from odoo.addons.smart_core.core.intent_execution_result import IntentExecutionResult
+from odoo.addons.smart_core.core.contract_cache import group_set_hash
+from odoo.addons.smart_core.core.system_init_startup_snapshot import (
+    build_part_etags,
+    client_if_none_match,
+    client_part_etags,
+    negotiate_snapshot_response,
+    snapshot_key,
+    snapshot_version,
+)
 try:
     from odoo.addons.smart_core.core.project_context import build_record_context_contract
 except ImportError:  # pragma: no cover - compatibility for lightweight boundary tests
@@ -1683,6 +1692,33 @@ class SystemInitHandler(BaseIntentHandler):
             )
         stage_ts = _mark("resolve_scene_channel", stage_ts)
 
+        # -------- 0) 启动快照：版本未变时跳过 nav/意图/能力/场景全链路 --------
+        snapshot_ref = self._startup_snapshot_ref(
+            params,
+            scene_channel=scene_channel,
+            contract_mode=contract_mode,
+            build_mode=build_mode,
+        )
+        if snapshot_ref:
+            cached = self._lookup_startup_snapshot(snapshot_ref)
+            stage_ts = _mark("startup_snapshot_lookup", stage_ts)
+            if cached:
+                cached_meta = dict(cached.get("meta") or {})
+                cached_meta["startup_profile"] = {
+                    "build_mode": build_mode,
+                    "timings_ms": startup_timings_ms,
+                    "subtimings_ms": startup_subtimings_ms,
+                    "total_ms": int((time.perf_counter() - perf0) * 1000),
+                    "response_key_count": len(cached.get("data") or {}),
+                }
+                return self._startup_snapshot_result(
+                    params,
+                    data=cached.get("data") or {},
+                    meta=cached_meta,
+                    part_etags=cached.get("part_etags") or {},
+                    snapshot_meta={"hit": True, "built_at": cached.get("built_at") or ""},
+                )
+
         # 如果 finalize_contract 内部不读 ORM，可用 env；若会读，推荐 su_env
         cs = ContractService(su_env)
 
@@ -2323,9 +2359,99 @@ class SystemInitHandler(BaseIntentHandler):
         _ = diag_enabled
         _ = diagnostic_info
 
+        if snapshot_ref:
+            part_etags = build_part_etags(data)
+            self._store_startup_snapshot(snapshot_ref, data=data, meta=meta_with_etag, part_etags=part_etags)
+            return self._startup_snapshot_result(
+                params,
+                data=data,
+                meta=meta_with_etag,
+                part_etags=part_etags,
+                snapshot_meta={"hit": False},
+            )
+
         return IntentExecutionResult(
             ok=True,
             status="success",
             data=data,
             meta=meta_with_etag,
         )
+
+    # ---------------- 启动快照 ----------------
+    def _startup_snapshot_ref(self, params: dict, *, scene_channel: str, contract_mode: str, build_mode: str) -> dict:
+        """仅 user 模式的 boot/preload 走快照；debug、hud 与 force_refresh 始终现算。"""
+        if contract_mode != "user" or build_mode == SystemInitPayloadBuilder.BUILD_MODE_DEBUG:
+            return {}
+        if parse_bool(params.get("force_refresh"), False):
+            return {}
+        try:
+            version = snapshot_version(self.env, contract_mode=contract_mode)
+            if not version:
+                return {}
+            return {
+                "snapshot_key": snapshot_key(
+                    self.env,
+                    params=params,
+                    scene_channel=scene_channel,
+                    contract_mode=contract_mode,
+                    build_mode=build_mode,
+                ),
+                "version_etag": version,
+                "scene_channel": scene_channel,
+                "contract_mode": contract_mode,
+                "build_mode": build_mode,
+            }
+        except Exception:
+            _logger.debug("system.init startup snapshot version unavailable", exc_info=True)
+            return {}
+
+    def _lookup_startup_snapshot(self, snapshot_ref: dict) -> dict | None:
+        try:
+            with self.env.cr.savepoint(flush=False):
+                return self.env["sc.startup.snapshot"].sudo().lookup_snapshot(
+                    snapshot_ref["snapshot_key"],
+                    snapshot_ref["version_etag"],
+                )
+        except Exception:
+            _logger.debug("system.init startup snapshot lookup failed", exc_info=True)
+            return None
+
+    def _store_startup_snapshot(self, snapshot_ref: dict, *, data: dict, meta: dict, part_etags: dict) -> None:
+        stored_meta = {key: value for key, value in (meta or {}).items() if key != "startup_profile"}
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env["sc.startup.snapshot"].sudo().store_snapshot(
+                    snapshot_key=snapshot_ref["snapshot_key"],
+                    version_etag=snapshot_ref["version_etag"],
+                    role_surface=group_set_hash(self.env),
+                    scene_channel=snapshot_ref.get("scene_channel"),
+                    contract_mode=snapshot_ref.get("contract_mode"),
+                    build_mode=snapshot_ref.get("build_mode"),
+                    top_etag=stored_meta.get("etag"),
+                    part_etags=part_etags,
+                    data=data,
+                    meta=stored_meta,
+                )
+        except Exception:
+            _logger.warning("system.init startup snapshot store failed uid=%s", self.env.uid, exc_info=True)
+
+    def _startup_snapshot_result(
+        self,
+        params: dict,
+        *,
+        data: dict,
+        meta: dict,
+        part_etags: dict,
+        snapshot_meta: dict,
+    ) -> IntentExecutionResult:
+        out_data, out_meta, code = negotiate_snapshot_response(
+            data=data,
+            meta=meta,
+            part_etags=part_etags,
+            client_etags=client_part_etags(params),
+            if_none_match=client_if_none_match(params),
+            snapshot_meta=snapshot_meta,
+        )
+        if code == 304:
+            return IntentExecutionResult(ok=True, data=None, meta=out_meta, code=304)
+        return IntentExecutionResult(ok=True, status="success", data=out_data, meta=out_meta)
@@ -9,6 +9,7 @@ from ..core.base_handler import BaseIntentHandler
 from ..core.intent_execution_result import IntentExecutionResult
 from ..core.native_view_contract_projection import inject_primary_view_projection
 from ..core.request_params import parse_positive_int
+from ..core.contract_version_vector import build_contract_version_vector, contract_version_etag
 
 # ✅ 直接用你的统一服务与分发器
 from odoo.addons.smart_core.app_config_engine.services.contract_service import ContractService
@@ -178,6 +179,34 @@ class UiContractHandler(BaseIntentHandler):
         force_refresh = str(self._get_param(p, "force_refresh") or "").lower() in ("1","true","yes")
         t0 = time.time()
 
+        # 版本向量预判：命中则不分派、不组装，直接 304
+        version_vector = self._version_vector(
+            p,
+            ctx,
+            op,
+            contract_mode=contract_mode,
+            contract_surface=contract_surface,
+        )
+        if version_vector and if_none_match and not force_refresh:
+            etag = self._make_etag(
+                meta={},
+                ctx=ctx,
+                op=op,
+                p=p,
+                contract_mode=contract_mode,
+                contract_surface=contract_surface,
+                version_vector=version_vector,
+            )
+            if if_none_match == etag:
+                return self._not_modified(
+                    op=op,
+                    etag=etag,
+                    t0=t0,
+                    contract_mode=contract_mode,
+                    contract_surface=contract_surface,
+                    precheck=True,
+                )
+
         # 分派
         if op == "nav":
             res = self._op_nav(ctx)
@@ -213,27 +242,16 @@ class UiContractHandler(BaseIntentHandler):
             p=p,
             contract_mode=contract_mode,
             contract_surface=contract_surface,
+            version_vector=version_vector,
         )
 
         if if_none_match and if_none_match == etag and not force_refresh:
-            return IntentExecutionResult(
-                ok=True,
-                data=None,
-                meta={
-                    "intent": self.INTENT_TYPE,
-                    "op": op,
-                    "etag": etag,
-                    "version": self.VERSION,
-                    "elapsed_ms": int((time.time() - t0) * 1000),
-                    "contract_version": CONTRACT_VERSION,
-                    "api_version": API_VERSION,
-                    "schema_version": "1.0.0",
-                    "contract_mode": contract_mode,
-                    "contract_surface": contract_surface,
-                    "source_kind": self.SOURCE_KIND,
-                    "source_authorities": list(self.SOURCE_AUTHORITIES),
-                },
-                code=304,
+            return self._not_modified(
+                op=op,
+                etag=etag,
+                t0=t0,
+                contract_mode=contract_mode,
+                contract_surface=contract_surface,
             )
 
         meta_out = dict(meta)
@@ -616,7 +634,53 @@ class UiContractHandler(BaseIntentHandler):
         param = (str(param or "")).strip().strip('"')
         return hdr or param
 
-    def _make_etag(self, meta, ctx, op, p, contract_mode="user", contract_surface="user"):
+    def _not_modified(self, *, op, etag, t0, contract_mode, contract_surface, precheck=False):
+        meta = {
+            "intent": self.INTENT_TYPE,
+            "op": op,
+            "etag": etag,
+            "version": self.VERSION,
+            "elapsed_ms": int((time.time() - t0) * 1000),
+            "contract_version": CONTRACT_VERSION,
+            "api_version": API_VERSION,
+            "schema_version": "1.0.0",
+            "contract_mode": contract_mode,
+            "contract_surface": contract_surface,
+            "source_kind": self.SOURCE_KIND,
+            "source_authorities": list(self.SOURCE_AUTHORITIES),
+        }
+        if precheck:
+            meta["etag_source"] = "version_vector"
+        return IntentExecutionResult(ok=True, data=None, meta=meta, code=304)
+
+    def _version_vector(self, p, ctx, op, *, contract_mode="user", contract_surface="user"):
+        """构建前的契约版本向量；请求维度取整个 payload（剔除协商参数），失败返回 None。"""
+        request_key = {
+            key: value
+            for key, value in (p or {}).items()
+            if key not in ("if_none_match", "ifNoneMatch", "force_refresh")
+        }
+        return build_contract_version_vector(
+            self.env,
+            model=self._get_param(p, "model", "model_code", "modelCode"),
+            action_id=self._get_param(p, "action_id", "actionId"),
+            menu_id=self._get_param(p, "menu_id", "menuId", "id"),
+            lang=ctx.get("lang"),
+            contract_mode=contract_mode,
+            request_key={
+                "carrier": "ui.contract",
+                "op": op,
+                "contract_surface": contract_surface,
+                "contract_version": CONTRACT_VERSION,
+                "api_version": API_VERSION,
+                "payload": request_key,
+            },
+        )
+
+    def _make_etag(self, meta, ctx, op, p, contract_mode="user", contract_surface="user", version_vector=None):
+        if version_vector:
+            # 版本向量在构建前即可得出，构建前预判与构建后响应使用同一 ETag
+            return contract_version_etag(version_vector)
         meta = _normalize_meta(meta)
         etag_src = _json({
             "view_hash": meta.get("view_hash"),
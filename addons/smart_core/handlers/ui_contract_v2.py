@@ -21,6 +21,7 @@ from ..core.unified_page_contract_v2_client import (
     trim_unified_page_contract_v2,
 )
 from ..core.scene_provider import load_scenes_from_db_or_fallback
+from ..core.view_arch_cache import arch_root, indexed_nodes
 from ..core.request_params import parse_positive_int
 from ..utils.contract_governance import apply_contract_governance, resolve_contract_mode, resolve_contract_surface
 from ..utils.extension_hooks import call_extension_hook_first
@@ -2754,13 +2755,13 @@ class UiContractV2Handler(BaseIntentHandler):
                     arch = view.sudo().arch_db or ""
                 if not arch:
                     continue
-                root = etree.fromstring(arch.encode("utf-8"))
+                root = arch_root(arch)
             except Exception:
                 _logger.debug("ui.contract.v2 action-scoped visible list arch parse skipped", exc_info=True)
                 continue
             columns: list[str] = []
             labels: dict[str, str] = {}
-            for node in root.xpath(".//field"):
+            for node in indexed_nodes(root, "field"):
                 name = str(node.get("name") or "").strip()
                 if not name:
                     continue
@@ -3161,7 +3162,7 @@ class UiContractV2Handler(BaseIntentHandler):
         if not arch:
             return
         try:
-            root = etree.fromstring(arch.encode("utf-8"))
+            root = arch_root(arch)
         except Exception:
             _logger.debug("ui.contract.v2 native group column extraction skipped: invalid arch", exc_info=True)
             return
@@ -3175,7 +3176,7 @@ class UiContractV2Handler(BaseIntentHandler):
 
         def field_names(el: etree._Element) -> list[str]:
             names: list[str] = []
-            for field in el.xpath(".//field[@name]"):
+            for field in indexed_nodes(el, "field", named=True):
                 name = str(field.get("name") or "").strip()
                 if name and name not in names:
                     names.append(name)
@@ -5,6 +5,7 @@ import logging
 
 from odoo import fields
 from odoo.addons.smart_core.core.base_handler import BaseIntentHandler
+from odoo.addons.smart_core.core.usage_telemetry import usage_event_keys
 from odoo.addons.smart_core.security.platform_admin import user_is_platform_admin
 from odoo.addons.smart_core.utils.extension_hooks import call_extension_hook_first
 
@@ -22,20 +23,21 @@ class UsageTrackHandler(BaseIntentHandler):
     NON_IDEMPOTENT_ALLOWED = "analytics counters are append-only metrics and intentionally non-replayable"
     SOURCE_AUTHORITY = {
         "kind": "usage_analytics_counter_write_proxy",
-        "authorities": ["sc.usage.counter", "res.groups", "odoo.orm"],
+        "authorities": ["sc.usage.event.stage", "sc.usage.rollup", "sc.usage.counter", "res.groups", "odoo.orm"],
         "projection_only": False,
         "observability_only": True,
         "no_business_fact_authority": True,
-        "write_authority": "sc.usage.counter.bump",
+        "write_authority": "sc.usage.counter.stage_event",
     }
 
-    def _bump(self, usage_model, company, key):
-        if usage_model is None or not company or not key:
-            return
+    def _stage(self, usage_model, company, **event):
+        if usage_model is None or not company:
+            return {"staged": 0, "dropped": 0}
         try:
-            usage_model.sudo().bump(company, key, 1)
+            return usage_model.sudo().stage_event(company, **event)
         except Exception as exc:
-            _logger.warning("[usage.track] bump failed company=%s key=%s error=%s", company.id, key, exc)
+            _logger.warning("[usage.track] stage failed company=%s event=%s error=%s", company.id, event.get("event_type"), exc)
+            return {"staged": 0, "dropped": 1}
 
     def _day_key(self):
         return fields.Date.context_today(self.env.user).strftime("%Y-%m-%d")
@@ -66,63 +68,27 @@ class UsageTrackHandler(BaseIntentHandler):
         role_codes = self._role_codes_for_user(user)
         uid = int(user.id or 0) if user else 0
 
-        tracked = []
+        subject_key = scene_key if event_type == "scene_open" else capability_key if event_type == "capability_open" else ""
         day_key = self._day_key()
-        if event_type == "scene_open" and scene_key:
-            self._bump(Usage, company, "usage.scene_open.total")
-            self._bump(Usage, company, f"usage.scene_open.{scene_key}")
-            self._bump(Usage, company, f"usage.scene_open.daily.{day_key}")
-            if uid:
-                self._bump(Usage, company, f"usage.scene_open.user.{uid}.total")
-                self._bump(Usage, company, f"usage.scene_open.user.{uid}.{scene_key}")
-                self._bump(Usage, company, f"usage.scene_open.user.{uid}.daily.{day_key}")
-                tracked.extend([
-                    f"usage.scene_open.user.{uid}.total",
-                    f"usage.scene_open.user.{uid}.{scene_key}",
-                    f"usage.scene_open.user.{uid}.daily.{day_key}",
-                ])
-            for role_code in role_codes:
-                self._bump(Usage, company, f"usage.scene_open.role.{role_code}.total")
-                self._bump(Usage, company, f"usage.scene_open.role.{role_code}.{scene_key}")
-                self._bump(Usage, company, f"usage.scene_open.role.{role_code}.daily.{day_key}")
-                tracked.extend([
-                    f"usage.scene_open.role.{role_code}.total",
-                    f"usage.scene_open.role.{role_code}.{scene_key}",
-                    f"usage.scene_open.role.{role_code}.daily.{day_key}",
-                ])
-            tracked.extend([
-                "usage.scene_open.total",
-                f"usage.scene_open.{scene_key}",
-                f"usage.scene_open.daily.{day_key}",
-            ])
-        elif event_type == "capability_open" and capability_key:
-            self._bump(Usage, company, "usage.capability_open.total")
-            self._bump(Usage, company, f"usage.capability_open.{capability_key}")
-            self._bump(Usage, company, f"usage.capability_open.daily.{day_key}")
-            if uid:
-                self._bump(Usage, company, f"usage.capability_open.user.{uid}.total")
-                self._bump(Usage, company, f"usage.capability_open.user.{uid}.{capability_key}")
-                self._bump(Usage, company, f"usage.capability_open.user.{uid}.daily.{day_key}")
-                tracked.extend([
-                    f"usage.capability_open.user.{uid}.total",
-                    f"usage.capability_open.user.{uid}.{capability_key}",
-                    f"usage.capability_open.user.{uid}.daily.{day_key}",
-                ])
-            for role_code in role_codes:
-                self._bump(Usage, company, f"usage.capability_open.role.{role_code}.total")
-                self._bump(Usage, company, f"usage.capability_open.role.{role_code}.{capability_key}")
-                self._bump(Usage, company, f"usage.capability_open.role.{role_code}.daily.{day_key}")
-                tracked.extend([
-                    f"usage.capability_open.role.{role_code}.total",
-                    f"usage.capability_open.role.{role_code}.{capability_key}",
-                    f"usage.capability_open.role.{role_code}.daily.{day_key}",
-                ])
-            tracked.extend([
-                "usage.capability_open.total",
-                f"usage.capability_open.{capability_key}",
-                f"usage.capability_open.daily.{day_key}",
-            ])
-        else:
+        tracked = usage_event_keys(event_type, subject_key, uid=uid, role_codes=role_codes, day_key=day_key)
+        if not tracked:
             return {"ok": False, "error": {"code": 400, "message": "invalid usage params"}, "meta": {"intent": self.INTENT_TYPE, "source_authority": self.SOURCE_AUTHORITY}}
+        delivery = self._stage(
+            Usage,
+            company,
+            event_type=event_type,
+            subject_key=subject_key,
+            user_id=uid,
+            role_codes=role_codes,
+            day=day_key,
+        )
 
-        return {"ok": True, "data": {"tracked": tracked, "event_type": event_type}, "meta": {"intent": self.INTENT_TYPE, "source_authority": self.SOURCE_AUTHORITY}}
+        return {
+            "ok": True,
+            "data": {"tracked": tracked, "event_type": event_type},
+            "meta": {
+                "intent": self.INTENT_TYPE,
+                "source_authority": self.SOURCE_AUTHORITY,
+                "delivery": "staged" if delivery.get("staged") else "dropped",
+            },
+        }
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# 旧的按日字符串计数键（usage.<event>[.role.<r>|.user.<uid>].daily.<day>）回填到 sc_usage_rollup
+from odoo import SUPERUSER_ID, api
+
+SOURCE_KIND = "smart_core_usage_rollup_backfill"
+SOURCE_AUTHORITIES = ("sc.usage.counter", "sc.usage.rollup")
+NO_BUSINESS_FACT_AUTHORITY = True
+
+
+def source_authority_contract() -> dict:
+    return {
+        "kind": SOURCE_KIND,
+        "authorities": list(SOURCE_AUTHORITIES),
+        "projection_only": True,
+        "rebuildable": False,
+        "write_proxy": True,
+        "no_business_fact_authority": NO_BUSINESS_FACT_AUTHORITY,
+        "schema_migration_only": False,
+    }
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["sc.usage.rollup"].backfill_from_legacy_counters(batch_size=5000)
@@ -5,3 +5,4 @@ from . import ui_form_custom_field_wizard
 from . import ui_business_config_contract
 from . import ui_business_config_change_set
 from . import ui_menu_config_policy
+from . import contract_cache_invalidation
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from odoo import api, models
+
+from odoo.addons.smart_core.core.contract_cache import bump_contract_cache_generation
+
+
+class ContractCacheInvalidationMixin(models.AbstractModel):
+    """契约来源模型的写入钩子：create/write/unlink 后递增编译契约缓存代际。"""
+
+    _name = "sc.contract.cache.invalidation.mixin"
+    _description = "Compiled Contract Cache Invalidation Mixin"
+    SOURCE_KIND = "compiled_contract_cache_invalidation_trigger"
+    NO_BUSINESS_FACT_AUTHORITY = True
+
+    def _bump_contract_cache(self, operation):
+        bump_contract_cache_generation(self.env, reason="event:%s.%s" % (self._name, operation))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._bump_contract_cache("create")
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        self._bump_contract_cache("write")
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self._bump_contract_cache("unlink")
+        return result
+
+
+class IrUiViewContractCache(models.Model):
+    _name = "ir.ui.view"
+    _inherit = ["ir.ui.view", "sc.contract.cache.invalidation.mixin"]
+
+
+class IrActionsContractCache(models.Model):
+    _name = "ir.actions.actions"
+    _inherit = ["ir.actions.actions", "sc.contract.cache.invalidation.mixin"]
+
+
+class ResGroupsContractCache(models.Model):
+    _name = "res.groups"
+    _inherit = ["res.groups", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppViewFragmentContractCache(models.Model):
+    _name = "app.view.fragment"
+    _inherit = ["app.view.fragment", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppViewVariantContractCache(models.Model):
+    _name = "app.view.variant"
+    _inherit = ["app.view.variant", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppModelConfigContractCache(models.Model):
+    _name = "app.model.config"
+    _inherit = ["app.model.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppSearchConfigContractCache(models.Model):
+    _name = "app.search.config"
+    _inherit = ["app.search.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppActionConfigContractCache(models.Model):
+    _name = "app.action.config"
+    _inherit = ["app.action.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppPermissionConfigContractCache(models.Model):
+    _name = "app.permission.config"
+    _inherit = ["app.permission.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppReportConfigContractCache(models.Model):
+    _name = "app.report.config"
+    _inherit = ["app.report.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppWorkflowConfigContractCache(models.Model):
+    _name = "app.workflow.config"
+    _inherit = ["app.workflow.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppValidatorConfigContractCache(models.Model):
+    _name = "app.validator.config"
+    _inherit = ["app.validator.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class AppMenuConfigContractCache(models.Model):
+    _name = "app.menu.config"
+    _inherit = ["app.menu.config", "sc.contract.cache.invalidation.mixin"]
+
+
+class UiFormFieldPolicyContractCache(models.Model):
+    _name = "ui.form.field.policy"
+    _inherit = ["ui.form.field.policy", "sc.contract.cache.invalidation.mixin"]
+
+
+class UiMenuConfigPolicyContractCache(models.Model):
+    _name = "ui.menu.config.policy"
+    _inherit = ["ui.menu.config.policy", "sc.contract.cache.invalidation.mixin"]
+
+
+class UiBusinessConfigContractContractCache(models.Model):
+    _name = "ui.business.config.contract"
+    _inherit = ["ui.business.config.contract", "sc.contract.cache.invalidation.mixin"]
+
+
+class ScEntitlementContractCache(models.Model):
+    _name = "sc.entitlement"
+    _inherit = ["sc.entitlement", "sc.contract.cache.invalidation.mixin"]
@@ -8,6 +8,15 @@ from . import login_routing
 from . import res_users
 from . import app_action_gateway
 from . import ui_base_contract_asset
+from . import ui_base_contract_asset_job
 from . import ui_base_contract_asset_event_trigger
 from . import user_view_preference
 from . import tenant_payload_import_batch
+from . import startup_snapshot
+from . import usage_event_stage
+from . import usage_rollup
+from . import idempotency_key
+from . import file_upload_session
+from . import legacy_file_cache
+from . import global_message_unread
+from . import chatter_timeline_index
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from odoo import models
+
+from odoo.addons.smart_core.handlers.chatter_timeline import ensure_message_timeline_index
+
+
+class ChatterTimelineIndex(models.AbstractModel):
+    """
+    chatter.timeline 消息分支的 mail_message 索引。
+    smart_core 不依赖 mail，不能直接继承 mail.message：每次注册表加载时按表是否存在补建。
+    """
+
+    _name = "sc.chatter.timeline.index"
+    _description = "SC Chatter Timeline Index"
+
+    def _register_hook(self):
+        super()._register_hook()
+        ensure_message_timeline_index(self.env.cr)
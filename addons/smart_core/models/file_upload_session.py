@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import psycopg2
+
+from odoo import api, fields, models
+from odoo.tools import config
+
+from odoo.addons.smart_core.core.file_upload_spool import (
+    DEFAULT_CHUNK_BYTES,
+    DEFAULT_MAX_CHUNK_BYTES,
+    DEFAULT_MAX_UPLOAD_BYTES,
+    DEFAULT_SESSION_TTL_HOURS,
+    MAX_CHUNK_BYTES_PARAM,
+    MAX_UPLOAD_BYTES_PARAM,
+    SESSION_TTL_HOURS_PARAM,
+    UploadChunkError,
+    append_chunk,
+    file_digests,
+    install_into_filestore,
+    remove_spool,
+    spool_path,
+    spool_root,
+    spooled_size,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class FileUploadSession(models.Model):
+    """
+    file.upload 分片上传会话：init -> 按 offset 顺序 PUT 原始字节分片 -> finalize。
+    分片落在 spool 文件，finalize 时流式入 filestore 并按 sha1 去重；断线后按 received_size 续传。
+    """
+
+    _name = "sc.file.upload.session"
+    _description = "SC Chunked File Upload Session"
+    _order = "id desc"
+    SOURCE_KIND = "file_upload_session"
+    SOURCE_AUTHORITIES = ("ir.attachment", "sc.file.upload.session")
+
+    upload_token = fields.Char(string="Upload Token", required=True, readonly=True, index=True, copy=False)
+    user_id = fields.Many2one("res.users", string="User", required=True, readonly=True, ondelete="cascade")
+    client_key = fields.Char(string="Client Key", readonly=True)
+    res_model = fields.Char(string="Resource Model", required=True, readonly=True)
+    res_id = fields.Integer(string="Resource ID", required=True, readonly=True)
+    name = fields.Char(string="File Name", required=True, readonly=True)
+    mimetype = fields.Char(string="Mimetype", readonly=True)
+    total_size = fields.Integer(string="Total Size", required=True, readonly=True)
+    received_size = fields.Integer(string="Received Size", default=0, readonly=True)
+    chunk_size = fields.Integer(string="Chunk Size", required=True, readonly=True)
+    sha256 = fields.Char(string="Expected SHA-256", readonly=True)
+    state = fields.Selection(
+        [("open", "Open"), ("done", "Done"), ("aborted", "Aborted")],
+        string="State",
+        required=True,
+        default="open",
+        readonly=True,
+    )
+    attachment_id = fields.Many2one("ir.attachment", string="Attachment", readonly=True, ondelete="set null")
+    deduplicated = fields.Boolean(string="Deduplicated", readonly=True)
+    expires_at = fields.Datetime(string="Expires At", required=True, index=True, readonly=True)
+
+    _sql_constraints = [
+        ("sc_file_upload_session_token_uniq", "unique(upload_token)", "Upload token must be unique."),
+    ]
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "projection_only": False,
+            "rebuildable": False,
+            "write_proxy": True,
+            "no_business_fact_authority": True,
+        }
+
+    @api.model
+    def _int_param(self, key, default):
+        try:
+            value = int(self.env["ir.config_parameter"].sudo().get_param(key) or default)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
+
+    @api.model
+    def max_upload_bytes(self):
+        return self._int_param(MAX_UPLOAD_BYTES_PARAM, DEFAULT_MAX_UPLOAD_BYTES)
+
+    @api.model
+    def max_chunk_bytes(self):
+        return self._int_param(MAX_CHUNK_BYTES_PARAM, DEFAULT_MAX_CHUNK_BYTES)
+
+    def _spool_path(self) -> Path:
+        self.ensure_one()
+        return spool_path(spool_root(config["data_dir"], self.env.cr.dbname), self.upload_token)
+
+    @api.model
+    def open_session(self, *, res_model, res_id, name, mimetype, total_size, client_key="", sha256=""):
+        """新建会话；同一用户对同一记录以相同 client_key 重新 init 时返回未完成的会话以续传。"""
+        if client_key:
+            existing = self.sudo().search(
+                [
+                    ("user_id", "=", self.env.uid),
+                    ("client_key", "=", client_key),
+                    ("res_model", "=", res_model),
+                    ("res_id", "=", res_id),
+                    ("total_size", "=", total_size),
+                    ("state", "=", "open"),
+                    ("expires_at", ">", fields.Datetime.now()),
+                ],
+                limit=1,
+            )
+            if existing:
+                existing._sync_received_size()
+                return existing
+        ttl_hours = self._int_param(SESSION_TTL_HOURS_PARAM, DEFAULT_SESSION_TTL_HOURS)
+        return self.sudo().create(
+            {
+                "upload_token": uuid.uuid4().hex,
+                "user_id": self.env.uid,
+                "client_key": client_key or False,
+                "res_model": res_model,
+                "res_id": res_id,
+                "name": name,
+                "mimetype": mimetype,
+                "total_size": total_size,
+                "chunk_size": min(DEFAULT_CHUNK_BYTES, self.max_chunk_bytes()),
+                "sha256": (sha256 or "").lower() or False,
+                "expires_at": fields.Datetime.now() + timedelta(hours=ttl_hours),
+            }
+        )
+
+    @api.model
+    def find_session(self, upload_token, user_id):
+        session = self.sudo().search([("upload_token", "=", str(upload_token or ""))], limit=1)
+        if not session or session.user_id.id != int(user_id or 0):
+            return self.browse()
+        return session
+
+    def _sync_received_size(self):
+        """以 spool 实际大小为准（上次分片写盘后事务未提交时二者可能不一致）。"""
+        for session in self:
+            size = spooled_size(session._spool_path())
+            if size != session.received_size:
+                session.sudo().write({"received_size": size})
+
+    def _lock(self):
+        """行锁串行化同一会话的分片写入；并发分片直接 409，由客户端查询 offset 后重试。"""
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute("SELECT id FROM sc_file_upload_session WHERE id = %s FOR UPDATE NOWAIT", (self.id,))
+        except psycopg2.errors.LockNotAvailable:
+            raise UploadChunkError(409, "该上传会话正在写入其他分片", offset=self.received_size)
+
+    def receive_chunk(self, *, offset, data, sha256=""):
+        self.ensure_one()
+        self._lock()
+        if self.state != "open" or self.expires_at <= fields.Datetime.now():
+            raise UploadChunkError(410, "上传会话已结束或已过期")
+        received = append_chunk(
+            self._spool_path(),
+            offset=int(offset),
+            data=data,
+            total_size=self.total_size,
+            max_chunk_bytes=self.max_chunk_bytes(),
+            sha256=sha256,
+        )
+        self.sudo().write({"received_size": received})
+        return received
+
+    def finalize(self):
+        """整文件校验后入 filestore（sha1 去重）并以当前用户身份创建附件。"""
+        self.ensure_one()
+        self._lock()
+        if self.state == "done" and self.attachment_id:
+            return self.attachment_id
+        if self.state != "open":
+            raise UploadChunkError(410, "上传会话已结束或已过期")
+        path = self._spool_path()
+        if spooled_size(path) != self.total_size:
+            raise UploadChunkError(409, "文件尚未上传完整", offset=spooled_size(path))
+        sha1, sha256, size = file_digests(path)
+        if self.sha256 and sha256 != self.sha256:
+            raise UploadChunkError(422, "文件校验和不一致", offset=size)
+
+        Attachment = self.env["ir.attachment"]
+        values = {
+            "name": self.name,
+            "mimetype": self.mimetype,
+            "res_model": self.res_model,
+            "res_id": self.res_id,
+        }
+        deduplicated = False
+        if Attachment._storage() != "file":
+            values["raw"] = path.read_bytes()
+            remove_spool(path)
+            attachment = Attachment.create(values)
+        else:
+            fname = f"{sha1[:2]}/{sha1}"
+            deduplicated = install_into_filestore(path, Path(Attachment._full_path(fname)))
+            if not deduplicated:
+                # 与 _file_write 一致：事务回滚时由 filestore GC 回收孤儿文件。
+                Attachment._mark_for_gc(fname)
+            attachment = Attachment.create(values)
+            # create/write 会丢弃 store_fname/checksum/file_size，文件已在 filestore，直接回填。
+            self.env.cr.execute(
+                "UPDATE ir_attachment SET store_fname = %s, checksum = %s, file_size = %s, db_datas = NULL WHERE id = %s",
+                (fname, sha1, size, attachment.id),
+            )
+            attachment.invalidate_recordset(["store_fname", "checksum", "file_size", "db_datas", "raw", "datas"])
+        self.sudo().write(
+            {
+                "state": "done",
+                "received_size": size,
+                "attachment_id": attachment.id,
+                "deduplicated": deduplicated,
+            }
+        )
+        return attachment
+
+    def abort(self):
+        for session in self:
+            remove_spool(session._spool_path())
+        self.sudo().write({"state": "aborted"})
+
+    @api.model
+    def cron_purge_sessions(self, limit=500):
+        """删除过期会话（已完成的会话保留到过期，供 finalize 重试幂等返回），并清理未完成会话的 spool 文件。"""
+        now = fields.Datetime.now()
+        stale = self.sudo().search(
+            [("expires_at", "<=", now)],
+            limit=max(int(limit or 0), 1),
+            order="expires_at, id",
+        )
+        for session in stale:
+            if session.state == "open":
+                try:
+                    remove_spool(session._spool_path())
+                except (OSError, UploadChunkError):
+                    _logger.warning("file upload spool cleanup failed: session=%s", session.id, exc_info=True)
+        count = len(stale)
+        stale.unlink()
+        return {"purged": count}
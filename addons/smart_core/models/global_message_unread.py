@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+全局站内信未读计数：每个 (partner, 会话) 一行，替代每次轮询对 mail.notification 的全量重数。
+- 发送/标记已读意图在同一事务内增减计数，revision 记为写入事务的事务号（xid8）；
+  轮询游标 = 快照 xmax + 取快照时仍在进行的事务号：返回 [上次 xmax, 本次 xmax) 内已提交的变化，
+  以及上次仍在进行、现已提交的事务写入的变化。晚提交的小 revision 由游标里的进行中事务号补回，
+  不会被跳过（nextval 的顺序是取号顺序而非提交顺序，做不到这一点）；也不按全集群最老事务
+  （快照 xmin）截断，其它库或无关的长事务不会拖住增量；
+- partner 首次读取时从 mail.notification 一次性补齐（conversation_key 为空的哨兵行表示已补齐），
+  由抢到哨兵行的事务独占补齐；
+- 经其它入口（如 Discuss）改动的已读状态由对账 cron 修正，有变化的 partner 会被唤醒。
+"""
+from __future__ import annotations
+
+from odoo import api, fields, models
+
+from odoo.addons.smart_core.core.global_message_notify import (
+    decode_revision_cursor,
+    encode_revision_cursor,
+    notify_partners,
+)
+from odoo.addons.smart_core.handlers.global_messages import GLOBAL_MESSAGE_SUBJECT
+
+SEED_KEY = ""
+# 旧版按 sequence 取号，升级时删除。
+LEGACY_REVISION_SEQUENCE = "sc_global_message_unread_revision_seq"
+WRITER_REVISION_SQL = "pg_current_xact_id()::text::bigint"
+SNAPSHOT_SQL = (
+    "SELECT pg_snapshot_xmax(s)::text::bigint, ARRAY(SELECT x::text::bigint FROM pg_snapshot_xip(s) AS x) "
+    "FROM pg_current_snapshot() AS s"
+)
+
+# 与 handlers.global_messages._conversation_key 口径一致：作者 + 收件人 + 通知对象，升序去重。
+_RECOUNT_SQL = """
+    WITH msgs AS (
+        SELECT m.id, m.author_id
+          FROM mail_message m
+         WHERE m.subject = %(subject)s
+           AND (
+                m.author_id = %(partner_id)s
+                OR EXISTS (
+                    SELECT 1 FROM mail_message_res_partner_rel rel
+                     WHERE rel.mail_message_id = m.id AND rel.res_partner_id = %(partner_id)s
+                )
+           )
+    ), parts AS (
+        SELECT id AS message_id, author_id AS partner_id FROM msgs WHERE author_id IS NOT NULL
+        UNION
+        SELECT rel.mail_message_id, rel.res_partner_id
+          FROM mail_message_res_partner_rel rel JOIN msgs ON msgs.id = rel.mail_message_id
+        UNION
+        SELECT n.mail_message_id, n.res_partner_id
+          FROM mail_notification n JOIN msgs ON msgs.id = n.mail_message_id
+    ), keys AS (
+        SELECT message_id, 'partners:' || string_agg(partner_id::text, ',' ORDER BY partner_id) AS conversation_key
+          FROM parts
+         WHERE partner_id IS NOT NULL
+         GROUP BY message_id
+    )
+    SELECT keys.conversation_key,
+           COUNT(n.id) AS unread_count,
+           MAX(keys.message_id) AS last_message_id
+      FROM keys
+      LEFT JOIN mail_notification n
+        ON n.mail_message_id = keys.message_id
+       AND n.res_partner_id = %(partner_id)s
+       AND n.is_read IS NOT TRUE
+     GROUP BY keys.conversation_key
+"""
+
+
+class GlobalMessageUnread(models.Model):
+    _name = "sc.global.message.unread"
+    _description = "SC Global Message Unread Counter"
+    _log_access = False
+    _order = "id desc"
+    SOURCE_KIND = "global_message_unread_counter"
+    SOURCE_AUTHORITIES = ("mail.notification", "mail.message")
+
+    partner_id = fields.Many2one("res.partner", string="Partner", required=True, readonly=True, ondelete="cascade")
+    conversation_key = fields.Char(string="Conversation Key", required=True, readonly=True)
+    unread_count = fields.Integer(string="Unread", readonly=True)
+    last_message_id = fields.Integer(string="Last Message ID", readonly=True)
+    # revision 为 bigint 事务号，ORM 无对应字段类型，由 init() 维护列。
+
+    _sql_constraints = [
+        (
+            "partner_conversation_uniq",
+            "unique(partner_id, conversation_key)",
+            "Unread counter must be unique per partner and conversation.",
+        ),
+    ]
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("ALTER TABLE sc_global_message_unread ADD COLUMN IF NOT EXISTS revision bigint")
+        cr.execute(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'sc_global_message_unread' AND column_name = 'revision'"
+        )
+        if (cr.fetchone() or ("bigint",))[0] != "bigint":
+            cr.execute("ALTER TABLE sc_global_message_unread ALTER COLUMN revision TYPE bigint")
+        cr.execute("DROP SEQUENCE IF EXISTS %s" % LEGACY_REVISION_SEQUENCE)
+        cr.execute(
+            "CREATE INDEX IF NOT EXISTS sc_global_message_unread_partner_revision_idx "
+            "ON sc_global_message_unread (partner_id, revision)"
+        )
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "projection_only": True,
+            "rebuildable": True,
+            "no_business_fact_authority": True,
+        }
+
+    # ---- 读取 -------------------------------------------------------------------
+
+    @api.model
+    def _recount(self, partner_id):
+        if "mail.notification" not in self.env:
+            return []
+        self.env.cr.execute(_RECOUNT_SQL, {"subject": GLOBAL_MESSAGE_SUBJECT, "partner_id": int(partner_id)})
+        return [(key, int(unread or 0), int(last_id or 0)) for key, unread, last_id in self.env.cr.fetchall() if key]
+
+    @api.model
+    def ensure_seeded(self, partner_id):
+        partner_id = int(partner_id or 0)
+        if not partner_id:
+            return False
+        self.env.cr.execute("SELECT 1 FROM sc_global_message_unread WHERE partner_id = %s LIMIT 1", (partner_id,))
+        if self.env.cr.fetchone():
+            return False
+        # 先抢哨兵行：并发补齐者在此等待，抢输（对方已补齐）则按未补齐返回，由调用方照常累加。
+        if not self._upsert([(partner_id, SEED_KEY, 0, 0)], on_conflict="NOTHING"):
+            return False
+        rows = [(partner_id, key, unread, last_id) for key, unread, last_id in self._recount(partner_id)]
+        self._upsert(rows, on_conflict="NOTHING")
+        return True
+
+    @api.model
+    def unread_counts(self, partner_id):
+        self.ensure_seeded(partner_id)
+        self.env.cr.execute(
+            "SELECT conversation_key, unread_count FROM sc_global_message_unread "
+            "WHERE partner_id = %s AND conversation_key <> %s AND unread_count > 0",
+            (int(partner_id), SEED_KEY),
+        )
+        return {key: int(count) for key, count in self.env.cr.fetchall()}
+
+    @api.model
+    def changes_since(self, partner_id, revision=0):
+        """
+        返回游标之后变化的会话计数、当前总未读数与新游标（见 encode_revision_cursor）。
+        先取快照再查行：低于 xmax 且不在进行中的事务在取快照时都已结束，查行时必然可见；
+        进行中的事务号记入新游标，提交后在下一轮补回。
+        """
+        self.ensure_seeded(partner_id)
+        cursor, error = decode_revision_cursor(revision)
+        high, pending = cursor if not error else (0, ())
+        self.env.cr.execute(SNAPSHOT_SQL)
+        xmax, in_progress = self.env.cr.fetchone()
+        xmax = int(xmax or 0)
+        in_progress = [int(xid) for xid in in_progress or []]
+        self.env.cr.execute(
+            """
+            SELECT conversation_key, unread_count, last_message_id FROM sc_global_message_unread
+             WHERE partner_id = %(partner_id)s AND conversation_key <> %(seed)s
+               AND revision < %(xmax)s AND NOT revision = ANY(%(in_progress)s)
+               AND (revision >= %(high)s OR revision = ANY(%(pending)s))
+             ORDER BY revision
+            """,
+            {
+                "partner_id": int(partner_id),
+                "seed": SEED_KEY,
+                "xmax": xmax,
+                "in_progress": in_progress,
+                "high": high,
+                "pending": list(pending),
+            },
+        )
+        changed = [
+            {"key": key, "unread_count": int(unread), "last_message_id": int(last_id or 0)}
+            for key, unread, last_id in self.env.cr.fetchall()
+        ]
+        self.env.cr.execute(
+            "SELECT COALESCE(SUM(unread_count), 0) FROM sc_global_message_unread WHERE partner_id = %s",
+            (int(partner_id),),
+        )
+        total_unread = self.env.cr.fetchone()[0]
+        if xmax < high:
+            # 客户端持有的游标已越过本快照（来自更晚返回的并发轮询）：原样返回，游标不后退。
+            next_revision = encode_revision_cursor(high, pending)
+        else:
+            pending_set = set(pending)
+            next_revision = encode_revision_cursor(
+                xmax, [xid for xid in in_progress if xid >= high or xid in pending_set]
+            )
+        return {
+            "unread": changed,
+            "total_unread": int(total_unread or 0),
+            "revision": next_revision,
+        }
+
+    # ---- 写入 -------------------------------------------------------------------
+
+    @api.model
+    def _upsert(self, rows, *, on_conflict):
+        if not rows:
+            return []
+        partner_ids, keys, counts, last_ids = (list(column) for column in zip(*rows))
+        conflict = {
+            "NOTHING": "DO NOTHING",
+            # 计数增量：发送消息时收件人 +1，作者只刷新最新消息。
+            "ADD": """DO UPDATE SET
+                unread_count = sc_global_message_unread.unread_count + EXCLUDED.unread_count,
+                last_message_id = GREATEST(sc_global_message_unread.last_message_id, EXCLUDED.last_message_id),
+                revision = EXCLUDED.revision""",
+            # 对账：只有与重数结果不一致的行才前进 revision。
+            "REPLACE": """DO UPDATE SET
+                unread_count = EXCLUDED.unread_count,
+                last_message_id = EXCLUDED.last_message_id,
+                revision = EXCLUDED.revision
+              WHERE (sc_global_message_unread.unread_count, sc_global_message_unread.last_message_id)
+                    IS DISTINCT FROM (EXCLUDED.unread_count, EXCLUDED.last_message_id)""",
+        }[on_conflict]
+        self.env.cr.execute(
+            """
+            INSERT INTO sc_global_message_unread (partner_id, conversation_key, unread_count, last_message_id, revision)
+            SELECT p, k, c, m, %s
+              FROM unnest(%%s::int[], %%s::varchar[], %%s::int[], %%s::int[]) AS t(p, k, c, m)
+            ON CONFLICT (partner_id, conversation_key) %s
+            RETURNING partner_id
+            """
+            % (WRITER_REVISION_SQL, conflict),
+            (partner_ids, keys, counts, last_ids),
+        )
+        changed = sorted({row[0] for row in self.env.cr.fetchall()})
+        self.invalidate_model()
+        return changed
+
+    @api.model
+    def record_message(self, message_id, conversation_key, partner_ids, author_partner_id=0):
+        """新消息：收件人未读 +1，作者只刷新会话的最新消息；随后唤醒会话内所有 partner。"""
+        partner_ids = sorted({int(pid) for pid in partner_ids or [] if int(pid or 0) > 0})
+        # 本事务抢到哨兵行并补齐的 partner 已按库内现状（含这条消息）重数，不再叠加；
+        # 并发的首次读取抢先补齐时 ensure_seeded 返回 False，照常 +1（对方看不到本事务未提交的消息）。
+        seeded_now = {partner_id for partner_id in partner_ids if self.ensure_seeded(partner_id)}
+        rows = [
+            (partner_id, conversation_key, 0 if partner_id == int(author_partner_id or 0) else 1, int(message_id))
+            for partner_id in partner_ids
+            if partner_id not in seeded_now
+        ]
+        self._upsert(rows, on_conflict="ADD")
+        notify_partners(self.env, partner_ids)
+
+    @api.model
+    def mark_read(self, partner_id, counts_by_key):
+        partner_id = int(partner_id or 0)
+        keys = [key for key, count in (counts_by_key or {}).items() if key and int(count or 0) > 0]
+        if not partner_id or not keys:
+            return
+        self.env.cr.execute(
+            """
+            UPDATE sc_global_message_unread AS t
+               SET unread_count = GREATEST(t.unread_count - d.cnt, 0),
+                   revision = %s
+              FROM unnest(%%s::varchar[], %%s::int[]) AS d(k, cnt)
+             WHERE t.partner_id = %%s AND t.conversation_key = d.k
+            """
+            % WRITER_REVISION_SQL,
+            (keys, [int(counts_by_key[key]) for key in keys], partner_id),
+        )
+        self.invalidate_model()
+        notify_partners(self.env, [partner_id])
+
+    # ---- 对账 -------------------------------------------------------------------
+
+    @api.model
+    def reconcile(self, partner_ids=None):
+        if partner_ids is None:
+            self.env.cr.execute("SELECT DISTINCT partner_id FROM sc_global_message_unread")
+            partner_ids = [row[0] for row in self.env.cr.fetchall()]
+        changed = set()
+        for partner_id in sorted({int(pid) for pid in partner_ids or [] if pid}):
+            recount = self._recount(partner_id)
+            present = {key for key, _unread, _last_id in recount}
+            self.env.cr.execute(
+                "SELECT conversation_key FROM sc_global_message_unread "
+                "WHERE partner_id = %s AND conversation_key <> %s AND unread_count <> 0",
+                (partner_id, SEED_KEY),
+            )
+            stale = [key for (key,) in self.env.cr.fetchall() if key not in present]
+            rows = [(partner_id, SEED_KEY, 0, 0)] + [(partner_id, key, unread, last_id) for key, unread, last_id in recount]
+            # 会话已不存在但仍有未读：清零而不删除，轮询端据 revision 得知变化。
+            rows += [(partner_id, key, 0, 0) for key in stale]
+            if self._upsert(rows, on_conflict="REPLACE"):
+                changed.add(partner_id)
+        notify_partners(self.env, changed)
+        return {"partners": len(partner_ids or []), "changed": len(changed)}
+
+    @api.model
+    def cron_reconcile(self):
+        return self.reconcile()
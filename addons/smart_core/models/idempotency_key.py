@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+def _signed_crc32(value):
+    lock_key = zlib.crc32(str(value).encode("utf-8"))
+    if lock_key > 2147483647:
+        lock_key -= 4294967296
+    return lock_key
+
+
+class IdempotencyKey(models.Model):
+    _name = "sc.idempotency.key"
+    _description = "SC Idempotency Key"
+    _log_access = False
+    _order = "claimed_at desc, id desc"
+    SOURCE_KIND = "idempotency_key_store"
+    SOURCE_AUTHORITIES = ("idempotency_key", "request_fingerprint")
+
+    company_id = fields.Many2one("res.company", string="Company", ondelete="cascade", readonly=True)
+    actor_uid = fields.Integer(string="Actor UID", readonly=True)
+    event_code = fields.Char(string="Event Code", required=True, readonly=True)
+    idempotency_key = fields.Char(string="Idempotency Key", required=True, readonly=True)
+    scope = fields.Char(string="Scope", readonly=True)
+    fingerprint = fields.Char(string="Fingerprint", required=True, readonly=True)
+    status = fields.Selection(
+        [("pending", "Pending"), ("done", "Done")],
+        string="Status",
+        required=True,
+        default="pending",
+        readonly=True,
+    )
+    result_json = fields.Text(string="Result JSON", readonly=True)
+    trace_id = fields.Char(string="Trace ID", readonly=True)
+    audit_id = fields.Integer(string="Audit Log ID", readonly=True)
+    claimed_at = fields.Datetime(string="Claimed At", required=True, readonly=True)
+    completed_at = fields.Datetime(string="Completed At", readonly=True)
+    expires_at = fields.Datetime(string="Expires At", required=True, index=True, readonly=True)
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS sc_idempotency_key_scope_uniq
+                ON sc_idempotency_key (COALESCE(company_id, 0), COALESCE(actor_uid, 0), event_code, idempotency_key)
+            """
+        )
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "projection_only": False,
+            "rebuildable": False,
+            "no_business_fact_authority": True,
+        }
+
+    @api.model
+    def _select_entry(self, company_id, actor_uid, event_code, idempotency_key, now):
+        # 过期判定用应用时钟：now() 在事务内固定为事务开始时间，与 expires_at 的写入口径不一致。
+        self.env.cr.execute(
+            """
+            SELECT id, fingerprint, status, result_json, trace_id, audit_id, completed_at,
+                   expires_at <= %s AS expired
+              FROM sc_idempotency_key
+             WHERE COALESCE(company_id, 0) = %s
+               AND COALESCE(actor_uid, 0) = %s
+               AND event_code = %s
+               AND idempotency_key = %s
+            """,
+            (now, int(company_id or 0), int(actor_uid or 0), event_code, idempotency_key),
+        )
+        return self.env.cr.fetchone()
+
+    @api.model
+    def claim(self, *, event_code, idempotency_key, fingerprint, window_seconds, scope="", company_id=0, actor_uid=0):
+        """
+        先占位再执行：
+        - pg_try_advisory_xact_lock 失败说明同键请求仍在事务中 -> in_flight（不阻塞等待）；
+        - 窗口内已完成：指纹不同 -> conflict，相同 -> replay；
+        - 无记录 / 已过期 / 遗留 pending（持锁者已结束）-> 插入或接管为 pending，返回 claimed。
+        占位与业务写入同一事务，业务回滚时占位一并回滚。
+        """
+        cr = self.env.cr
+        cr.execute(
+            "SELECT pg_try_advisory_xact_lock(%s, %s)",
+            (
+                _signed_crc32(event_code),
+                _signed_crc32("%s:%s:%s" % (int(company_id or 0), int(actor_uid or 0), idempotency_key)),
+            ),
+        )
+        if not cr.fetchone()[0]:
+            return {"status": "in_flight"}
+        now = fields.Datetime.now()
+        expires_at = now + timedelta(seconds=max(int(window_seconds or 0), 0))
+        row = self._select_entry(company_id, actor_uid, event_code, idempotency_key, now)
+        if not row:
+            cr.execute(
+                """
+                INSERT INTO sc_idempotency_key
+                    (company_id, actor_uid, event_code, idempotency_key, scope, fingerprint, status, claimed_at, expires_at)
+                VALUES (%s, %s, %s, %s, %s, %s, 'pending', %s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING id
+                """,
+                (company_id or None, actor_uid or None, event_code, idempotency_key, scope or "", fingerprint, now, expires_at),
+            )
+            inserted = cr.fetchone()
+            if not inserted:
+                return {"status": "in_flight"}
+            return {"status": "claimed", "id": inserted[0], "replay_window_expired": False}
+        entry_id, old_fingerprint, status, result_json, trace_id, audit_id, completed_at, expired = row
+        if status == "done" and not expired:
+            if old_fingerprint != fingerprint:
+                return {"status": "conflict", "id": entry_id}
+            try:
+                result = json.loads(result_json or "null")
+            except Exception:
+                result = None
+            return {
+                "status": "replay",
+                "id": entry_id,
+                "result": result if isinstance(result, dict) else None,
+                "entry": {"audit_id": int(audit_id or 0), "trace_id": trace_id or "", "ts": completed_at},
+            }
+        cr.execute(
+            """
+            UPDATE sc_idempotency_key
+               SET fingerprint = %s, scope = %s, status = 'pending', result_json = NULL, trace_id = NULL,
+                   audit_id = NULL, claimed_at = %s, completed_at = NULL, expires_at = %s
+             WHERE id = %s
+            """,
+            (fingerprint, scope or "", now, expires_at, entry_id),
+        )
+        return {
+            "status": "claimed",
+            "id": entry_id,
+            "replay_window_expired": bool(expired and status == "done" and old_fingerprint == fingerprint),
+        }
+
+    @api.model
+    def complete(self, entry_id, *, result, trace_id="", audit_id=0):
+        if not entry_id:
+            return False
+        self.env.cr.execute(
+            """
+            UPDATE sc_idempotency_key
+               SET status = 'done', result_json = %s, trace_id = %s, audit_id = %s, completed_at = %s
+             WHERE id = %s
+            """,
+            (
+                json.dumps(result or {}, ensure_ascii=False, default=str, separators=(",", ":")),
+                trace_id or "",
+                int(audit_id or 0) or None,
+                fields.Datetime.now(),
+                int(entry_id),
+            ),
+        )
+        return bool(self.env.cr.rowcount)
+
+    @api.model
+    def cron_purge_expired_keys(self, limit=5000, grace_hours=24):
+        """过期后保留 grace_hours 用于 replay_window_expired 判定，再清理。"""
+        self.env.cr.execute(
+            """
+            DELETE FROM sc_idempotency_key
+             WHERE id IN (
+                SELECT id FROM sc_idempotency_key
+                 WHERE expires_at < (now() AT TIME ZONE 'UTC') - make_interval(hours => %s)
+                 LIMIT %s
+             )
+            """,
+            (max(int(grace_hours or 0), 0), max(int(limit or 0), 1)),
+        )
+        return {"purged": self.env.cr.rowcount}
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import config
+
+from odoo.addons.smart_core.core.legacy_file_cache import (
+    CLAIM_LEASE_SECONDS,
+    CONCURRENCY_PARAM,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_ATTEMPTS,
+    DEFAULT_MISSING_TTL_HOURS,
+    MAX_CONCURRENCY,
+    MISSING_TTL_HOURS_PARAM,
+    cache_root,
+    cached_file,
+    fetch_many,
+    retry_delay_seconds,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class LegacyFileCache(models.Model):
+    """
+    旧系统远程附件预取队列 + 本地内容寻址缓存索引：每个 url 型附件一行（唯一索引去重），状态机
+    pending -> running（已认领，带租约）-> done（已缓存）/ local（本地镜像可直读）
+    / missing（负缓存，到期后再次访问重新入队）/ pending（退避重试）/ failed（超过最大重试，再次访问重新入队）。
+    """
+
+    _name = "sc.legacy.file.cache"
+    _description = "SC Legacy File Prefetch Cache"
+    _log_access = False
+    _order = "available_at, id"
+    SOURCE_KIND = "legacy_file_cache"
+    SOURCE_AUTHORITIES = ("sc.legacy.file.index", "ir.attachment")
+
+    attachment_id = fields.Many2one("ir.attachment", string="Attachment", required=True, readonly=True, ondelete="cascade")
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Cached"),
+            ("local", "Local"),
+            ("missing", "Missing"),
+            ("failed", "Failed"),
+        ],
+        string="State",
+        required=True,
+        default="pending",
+        readonly=True,
+    )
+    source_kind = fields.Char(string="Source Kind", readonly=True)
+    source_url = fields.Char(string="Fetched URL", readonly=True)
+    sha256 = fields.Char(string="SHA-256", readonly=True)
+    file_size = fields.Integer(string="File Size", readonly=True)
+    mimetype = fields.Char(string="Mimetype", readonly=True)
+    attempts = fields.Integer(string="Attempts", required=True, default=0, readonly=True)
+    enqueued_at = fields.Datetime(string="Enqueued At", required=True, readonly=True)
+    available_at = fields.Datetime(string="Available At", required=True, readonly=True)
+    claimed_at = fields.Datetime(string="Claimed At", readonly=True)
+    fetched_at = fields.Datetime(string="Fetched At", readonly=True)
+    last_error = fields.Char(string="Last Error", readonly=True)
+
+    _sql_constraints = [
+        ("sc_legacy_file_cache_attachment_uniq", "unique(attachment_id)", "Attachment is already queued."),
+    ]
+
+    def init(self):
+        cr = self.env.cr
+        # 认领条件含租约过期的 running，旧的仅 pending 部分索引不再覆盖。
+        cr.execute("DROP INDEX IF EXISTS sc_legacy_file_cache_claim_idx")
+        cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS sc_legacy_file_cache_lease_idx
+                ON sc_legacy_file_cache (available_at, id)
+             WHERE state IN ('pending', 'running')
+            """
+        )
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "projection_only": True,
+            "rebuildable": True,
+            "no_business_fact_authority": True,
+        }
+
+    @api.model
+    def _int_param(self, key, default):
+        try:
+            value = int(self.env["ir.config_parameter"].sudo().get_param(key) or default)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
+
+    @api.model
+    def _cache_root(self):
+        return cache_root(config["data_dir"], self.env.cr.dbname)
+
+    @api.model
+    def is_prefetchable(self, attachment) -> bool:
+        from odoo.addons.smart_core.handlers.file_download import (
+            LEGACY_FILE_ID_URL_PREFIX,
+            LEGACY_FILE_URL_PREFIX,
+            _is_online_legacy_file_url,
+        )
+
+        if getattr(attachment, "type", "") != "url":
+            return False
+        url = str(attachment.url or "").strip()
+        return url.startswith((LEGACY_FILE_URL_PREFIX, LEGACY_FILE_ID_URL_PREFIX)) or _is_online_legacy_file_url(url)
+
+    @api.model
+    def enqueue_attachments(self, attachments) -> int:
+        """
+        一条 upsert 入队：新附件插入为 pending；已过期的负缓存与 failed 重新激活，其余保持不变。
+        只做字符串判断，不在请求线程里触网。
+        """
+        ids = sorted({attachment.id for attachment in attachments if self.is_prefetchable(attachment)})
+        if not ids:
+            return 0
+        now = fields.Datetime.now()
+        self.env.cr.execute(
+            """
+            INSERT INTO sc_legacy_file_cache AS cache (attachment_id, state, attempts, enqueued_at, available_at)
+            SELECT att_id, 'pending', 0, %(now)s, %(now)s
+              FROM unnest(%(ids)s::integer[]) AS att_id
+             ORDER BY att_id
+            ON CONFLICT (attachment_id) DO UPDATE SET
+                state = 'pending',
+                attempts = 0,
+                enqueued_at = EXCLUDED.enqueued_at,
+                available_at = EXCLUDED.available_at
+             WHERE cache.state = 'failed'
+                OR (cache.state = 'missing' AND cache.available_at <= %(now)s)
+            RETURNING cache.id
+            """,
+            {"now": now, "ids": ids},
+        )
+        return len(self.env.cr.fetchall())
+
+    @api.model
+    def cached_source(self, attachment):
+        """
+        下载前查缓存：
+        - 已缓存 -> {"kind": "cache", "ref": sha256, "path", ...}，直接读本地磁盘；
+        - 负缓存未过期 -> 404 错误，不再触网；
+        - 其余（未入队/排队中/本地镜像）-> None，走原有解析。
+        """
+        self.env.cr.execute(
+            """
+            SELECT id, state, sha256, file_size, mimetype, available_at
+              FROM sc_legacy_file_cache
+             WHERE attachment_id = %s
+            """,
+            (attachment.id,),
+        )
+        row = self.env.cr.fetchone()
+        if not row:
+            return None
+        cache_id, state, sha256, file_size, mimetype, available_at = row
+        if state == "missing" and available_at and available_at > fields.Datetime.now():
+            return {"error": True, "code": 404, "message": "历史附件文件不存在"}
+        if state != "done":
+            return None
+        path = cached_file(self._cache_root(), sha256)
+        if not path:
+            # 缓存文件被清理：重新入队，本次走原有解析。
+            self.browse(cache_id).sudo().write({"state": "pending", "attempts": 0, "available_at": fields.Datetime.now()})
+            return None
+        return {
+            "kind": "cache",
+            "ref": sha256,
+            "path": path,
+            "name": attachment.name or path.name,
+            "mimetype": attachment.mimetype or mimetype or "application/octet-stream",
+            "size": int(file_size or 0) or path.stat().st_size,
+        }
+
+    def _claim(self, limit, lease_seconds=CLAIM_LEASE_SECONDS):
+        """
+        认领一批到期任务（FOR UPDATE SKIP LOCKED）并置为 running；行锁只持续到调用方提交，
+        抓取期间入队方的 upsert 不会被阻塞。租约过期的 running 可被重新认领。
+        """
+        now = fields.Datetime.now()
+        self.env.cr.execute(
+            """
+            WITH picked AS (
+                SELECT id
+                  FROM sc_legacy_file_cache
+                 WHERE (state = 'pending' AND available_at <= %(now)s)
+                    OR (state = 'running' AND claimed_at <= %(lease_expired)s)
+                 ORDER BY available_at, id
+                 LIMIT %(limit)s
+                 FOR UPDATE SKIP LOCKED
+            )
+            UPDATE sc_legacy_file_cache AS cache
+               SET state = 'running', claimed_at = %(now)s
+              FROM picked
+             WHERE cache.id = picked.id
+            RETURNING cache.id
+            """,
+            {
+                "now": now,
+                "lease_expired": now - timedelta(seconds=max(int(lease_seconds or 0), 1)),
+                "limit": max(int(limit or 0), 1),
+            },
+        )
+        ids = sorted(row[0] for row in self.env.cr.fetchall())
+        self.invalidate_model(["state", "claimed_at"])
+        return self.browse(ids)
+
+    @api.model
+    def cron_prefetch(self, limit=50):
+        """
+        认领一批到期任务并立即提交（租约），再解析来源、用有界线程池并发抓取，最后写回结果。
+        触网期间不持有队列行锁，请求线程的入队不会等待抓取。
+        """
+        from odoo.addons.smart_core.handlers.file_download import FileDownloadHandler, _remote_legacy_file_candidates
+
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        entries = self.sudo()._claim(limit)
+        if not entries:
+            return {"claimed": 0}
+        if auto_commit:
+            self.env.cr.commit()
+        handler = FileDownloadHandler(self.env)
+        now = fields.Datetime.now()
+        missing_until = now + timedelta(hours=self._int_param(MISSING_TTL_HOURS_PARAM, DEFAULT_MISSING_TTL_HOURS))
+        jobs = []
+        stats = {"claimed": len(entries), "done": 0, "local": 0, "missing": 0, "retry": 0, "failed": 0}
+        for entry in entries:
+            attachment = entry.attachment_id
+            source = handler._download_source(attachment, use_cache=False) if attachment.exists() else {}
+            kind = source.get("kind")
+            if source.get("error"):
+                entry.write({"state": "missing", "available_at": missing_until, "last_error": source.get("message")})
+                stats["missing"] += 1
+            elif kind == "remote_url":
+                jobs.append({"id": entry.id, "kind": kind, "urls": [source.get("ref") or ""]})
+            elif kind == "remote_path":
+                urls = [url for url, _candidate in _remote_legacy_file_candidates(source.get("ref") or "", source.get("base_url") or "")]
+                jobs.append({"id": entry.id, "kind": kind, "urls": urls})
+            else:
+                entry.write({"state": "local", "source_kind": kind or False, "last_error": False})
+                stats["local"] += 1
+        if auto_commit:
+            # 来源解析的结果先落库，抓取阶段不再持有这些行的锁。
+            self.env.cr.commit()
+
+        concurrency = min(self._int_param(CONCURRENCY_PARAM, DEFAULT_CONCURRENCY), MAX_CONCURRENCY)
+        kinds = {job["id"]: job["kind"] for job in jobs}
+        for outcome in fetch_many(self._cache_root(), jobs, concurrency=concurrency):
+            entry = self.browse(outcome["id"])
+            if outcome["status"] == "done":
+                result = outcome["result"]
+                entry.write(
+                    {
+                        "state": "done",
+                        "source_kind": kinds.get(entry.id),
+                        "source_url": result.get("url"),
+                        "sha256": result.get("sha256"),
+                        "file_size": result.get("size"),
+                        "mimetype": result.get("mimetype") or False,
+                        "attempts": 0,
+                        "fetched_at": now,
+                        "last_error": False,
+                    }
+                )
+                stats["done"] += 1
+            elif outcome["status"] == "missing":
+                entry.write({"state": "missing", "available_at": missing_until, "last_error": (outcome.get("error") or "")[:256]})
+                stats["missing"] += 1
+            else:
+                attempts = entry.attempts + 1
+                give_up = attempts >= DEFAULT_MAX_ATTEMPTS
+                entry.write(
+                    {
+                        "state": "failed" if give_up else "pending",
+                        "attempts": attempts,
+                        "available_at": now + timedelta(seconds=retry_delay_seconds(attempts)),
+                        "last_error": (outcome.get("error") or "")[:256],
+                    }
+                )
+                stats["failed" if give_up else "retry"] += 1
+        if auto_commit:
+            self.env.cr.commit()
+        _logger.info("[legacy_file_cache] prefetch %s", stats)
+        return stats
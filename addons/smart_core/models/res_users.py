@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields
 
+from odoo.addons.smart_core.core.token_revocation_cache import (
+    bump_token_revocation_generation,
+    ensure_generation_table,
+)
+
 
 class ResUsers(models.Model):
     _inherit = "res.users"
@@ -10,13 +15,22 @@ class ResUsers(models.Model):
 
     token_version = fields.Integer(default=0)
 
+    def init(self):
+        super().init()
+        ensure_generation_table(self.env.cr)
+
     def write(self, vals):
         if self.env.context.get("sc_skip_token_epoch_bump"):
-            return super().write(vals)
+            result = super().write(vals)
+            if {"token_version", "active"}.intersection(vals):
+                bump_token_revocation_generation(self.env, reason="res.users.write")
+            return result
 
         security_fields = {"active", "company_id", "company_ids", "groups_id", "login", "password"}
         must_invalidate = bool(security_fields.intersection(vals)) and "token_version" not in vals
         result = super().write(vals)
+        if "token_version" in vals or "active" in vals:
+            bump_token_revocation_generation(self.env, reason="res.users.write")
         if must_invalidate:
             for user in self.exists():
                 user.with_context(sc_skip_token_epoch_bump=True).write(
@@ -24,6 +38,11 @@ class ResUsers(models.Model):
                 )
         return result
 
+    def unlink(self):
+        result = super().unlink()
+        bump_token_revocation_generation(self.env, reason="res.users.unlink")
+        return result
+
     def source_authority_contract(self):
         return {
             "kind": self.SOURCE_KIND,
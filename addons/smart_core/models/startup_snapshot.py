@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+from odoo.addons.smart_core.core.system_init_startup_snapshot import DEFAULT_TTL_SECONDS, TTL_PARAM_KEY
+
+
+class StartupSnapshot(models.Model):
+    _name = "sc.startup.snapshot"
+    _description = "System Init Startup Snapshot"
+    _order = "built_at desc, id desc"
+    SOURCE_KIND = "system_init_startup_snapshot_cache"
+    SOURCE_AUTHORITIES = ("system.init", "contract_version_vector", "contract_cache_generation")
+
+    snapshot_key = fields.Char(string="Snapshot Key", required=True, index=True, readonly=True)
+    user_id = fields.Many2one("res.users", string="User", required=True, index=True, ondelete="cascade", readonly=True)
+    company_id = fields.Many2one("res.company", string="Company", index=True, ondelete="cascade", readonly=True)
+    role_surface = fields.Char(string="Role Surface", index=True, readonly=True)
+    scene_channel = fields.Char(string="Scene Channel", index=True, readonly=True)
+    contract_mode = fields.Char(string="Contract Mode", readonly=True)
+    build_mode = fields.Char(string="Build Mode", readonly=True)
+    version_etag = fields.Char(string="Version", required=True, readonly=True)
+    top_etag = fields.Char(string="Top ETag", readonly=True)
+    part_etags_json = fields.Text(string="Part ETags JSON", readonly=True)
+    payload_json = fields.Text(string="Payload JSON", readonly=True)
+    meta_json = fields.Text(string="Meta JSON", readonly=True)
+    built_at = fields.Datetime(string="Built At", required=True, index=True, readonly=True)
+    expires_at = fields.Datetime(string="Expires At", index=True, readonly=True)
+
+    _sql_constraints = [
+        ("sc_startup_snapshot_key_uniq", "unique(snapshot_key)", "Startup snapshot key must be unique."),
+    ]
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "cache_only": True,
+            "rebuildable": True,
+            "no_business_fact_authority": True,
+        }
+
+    @api.model
+    def _ttl_seconds(self):
+        raw = self.env["ir.config_parameter"].sudo().get_param(TTL_PARAM_KEY) or ""
+        try:
+            value = int(raw)
+        except Exception:
+            value = DEFAULT_TTL_SECONDS
+        return max(value, 0)
+
+    @api.model
+    def lookup_snapshot(self, snapshot_key, version_etag):
+        """命中条件：键相同、版本相同、未过期。返回 dict 或 None。"""
+        if not snapshot_key or not version_etag:
+            return None
+        self.env.cr.execute(
+            """
+            SELECT top_etag, part_etags_json, payload_json, meta_json, built_at
+              FROM sc_startup_snapshot
+             WHERE snapshot_key = %s
+               AND version_etag = %s
+               AND (expires_at IS NULL OR expires_at > (now() AT TIME ZONE 'UTC'))
+            """,
+            (snapshot_key, version_etag),
+        )
+        row = self.env.cr.fetchone()
+        if not row:
+            return None
+        try:
+            return {
+                "top_etag": row[0] or "",
+                "part_etags": json.loads(row[1] or "{}"),
+                "data": json.loads(row[2] or "{}"),
+                "meta": json.loads(row[3] or "{}"),
+                "built_at": fields.Datetime.to_string(row[4]) if row[4] else "",
+            }
+        except Exception:
+            return None
+
+    @api.model
+    def store_snapshot(
+        self,
+        *,
+        snapshot_key,
+        version_etag,
+        role_surface,
+        scene_channel,
+        contract_mode,
+        build_mode,
+        top_etag,
+        part_etags,
+        data,
+        meta,
+    ):
+        """按 snapshot_key upsert；并发登录同一用户时后写者覆盖，不抛唯一约束错误。"""
+        if not snapshot_key or not version_etag:
+            return False
+        ttl = self._ttl_seconds()
+        if ttl <= 0:
+            return False
+        now = fields.Datetime.now()
+        self.env.cr.execute(
+            """
+            INSERT INTO sc_startup_snapshot (
+                snapshot_key, user_id, company_id, role_surface, scene_channel, contract_mode, build_mode,
+                version_etag, top_etag, part_etags_json, payload_json, meta_json, built_at, expires_at,
+                create_uid, create_date, write_uid, write_date
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (snapshot_key) DO UPDATE SET
+                role_surface = EXCLUDED.role_surface,
+                version_etag = EXCLUDED.version_etag,
+                top_etag = EXCLUDED.top_etag,
+                part_etags_json = EXCLUDED.part_etags_json,
+                payload_json = EXCLUDED.payload_json,
+                meta_json = EXCLUDED.meta_json,
+                built_at = EXCLUDED.built_at,
+                expires_at = EXCLUDED.expires_at,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+            """,
+            (
+                snapshot_key,
+                self.env.uid,
+                self.env.company.id or None,
+                role_surface or "",
+                scene_channel or "",
+                contract_mode or "",
+                build_mode or "",
+                version_etag,
+                top_etag or "",
+                json.dumps(part_etags or {}, ensure_ascii=False, separators=(",", ":")),
+                json.dumps(data or {}, ensure_ascii=False, default=str, separators=(",", ":")),
+                json.dumps(meta or {}, ensure_ascii=False, default=str, separators=(",", ":")),
+                now,
+                now + timedelta(seconds=ttl),
+                self.env.uid,
+                now,
+                self.env.uid,
+                now,
+            ),
+        )
+        return True
+
+    @api.model
+    def cron_purge_expired_snapshots(self, limit=5000):
+        self.env.cr.execute(
+            """
+            DELETE FROM sc_startup_snapshot
+             WHERE id IN (
+                SELECT id FROM sc_startup_snapshot
+                 WHERE expires_at IS NOT NULL AND expires_at < (now() AT TIME ZONE 'UTC')
+                 LIMIT %s
+             )
+            """,
+            (max(int(limit or 0), 1),),
+        )
+        return {"purged": self.env.cr.rowcount}
@@ -6,6 +6,13 @@ import time
 import zlib
 
 from odoo import api, fields, models
+from odoo.addons.smart_core.core.usage_telemetry import (
+    DEFAULT_MAX_PENDING,
+    FLUSH_BATCH_SIZE,
+    MAX_PENDING_PARAM_KEY,
+    stage_backpressure,
+    stage_rows,
+)
 from odoo.addons.smart_core.utils.extension_hooks import call_extension_hook_first
 
 
@@ -335,6 +342,146 @@ class ScUsageCounter(models.Model):
                     return
                 time.sleep(0.01 * attempt)
 
+    @api.model
+    def _telemetry_max_pending(self):
+        raw = self.env["ir.config_parameter"].sudo().get_param(MAX_PENDING_PARAM_KEY) or ""
+        try:
+            return int(raw)
+        except Exception:
+            return DEFAULT_MAX_PENDING
+
+    @api.model
+    def _probe_stage_pending(self, max_pending):
+        backpressure = stage_backpressure()
+        dbname = self.env.cr.dbname
+        if max_pending <= 0 or not backpressure.needs_probe(dbname):
+            return
+        self.env.cr.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM sc_usage_event_stage LIMIT %s) pending",
+            (int(max_pending) + 1,),
+        )
+        backpressure.record_probe(dbname, int((self.env.cr.fetchone() or (0,))[0] or 0))
+
+    @api.model
+    def stage_event(self, company, *, event_type, subject_key, user_id=0, role_codes=(), day="", delta=1):
+        """
+        usage.track 写入口：一次事件一行追加到暂存表，不触碰计数热点行。
+        积压超限时丢弃并计数，返回 {"staged", "dropped"}。
+        """
+        if not company or not event_type or not subject_key or not day:
+            return {"staged": 0, "dropped": 0}
+        backpressure = stage_backpressure()
+        dbname = self.env.cr.dbname
+        max_pending = self._telemetry_max_pending()
+        self._probe_stage_pending(max_pending)
+        if not backpressure.admit(dbname, company.id, 1, max_pending):
+            return {"staged": 0, "dropped": 1}
+        dropped = backpressure.take_unreported_drops(dbname, company.id)
+        rows = stage_rows(
+            company.id,
+            event_type=event_type,
+            subject_key=subject_key,
+            user_id=user_id,
+            role_codes=role_codes,
+            day=day,
+            delta=delta,
+            dropped=dropped,
+        )
+        if not rows:
+            backpressure.restore_unreported_drops(dbname, company.id, dropped)
+            return {"staged": 0, "dropped": 0}
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute(
+                    "INSERT INTO sc_usage_event_stage "
+                    "(company_id, event_type, subject_key, user_id, role_code, day, counter_key, delta) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(rows)),
+                    [value for row in rows for value in row],
+                )
+        except Exception:
+            backpressure.restore_unreported_drops(dbname, company.id, dropped)
+            raise
+        return {"staged": len(rows), "dropped": 0}
+
+    @api.model
+    def apply_staged(self, limit=FLUSH_BATCH_SIZE):
+        """
+        取出一批暂存行（SKIP LOCKED，多个 flusher 互不阻塞），在同一条语句内：
+        - 按维度聚合后按维度序 upsert 到 sc_usage_rollup；
+        - 按 counter_key 聚合后 upsert 全局合计计数。
+        返回 {"events", "rollup_rows", "keys"}。
+        """
+        now = fields.Datetime.now()
+        uid = self.env.uid or 1
+        self.env.cr.execute(
+            """
+            WITH moved AS (
+                DELETE FROM sc_usage_event_stage
+                 WHERE id IN (
+                    SELECT id FROM sc_usage_event_stage
+                     ORDER BY id
+                     LIMIT %s
+                     FOR UPDATE SKIP LOCKED
+                 )
+                RETURNING company_id, event_type, subject_key, user_id, role_code, day, counter_key, delta
+            ),
+            rolled AS (
+                INSERT INTO sc_usage_rollup
+                    (company_id, day, event_type, subject_key, role_code, user_id, legacy_slice, event_count, updated_at)
+                SELECT company_id, day, event_type, subject_key, role_code, user_id, '', SUM(delta)::integer, %s
+                  FROM moved
+                 WHERE event_type <> '' AND day IS NOT NULL
+                 GROUP BY company_id, day, event_type, subject_key, role_code, user_id
+                 ORDER BY company_id, day, event_type, subject_key, role_code, user_id
+                ON CONFLICT (company_id, day, event_type, subject_key, role_code, user_id, legacy_slice)
+                DO UPDATE SET
+                    event_count = sc_usage_rollup.event_count + EXCLUDED.event_count,
+                    updated_at = EXCLUDED.updated_at
+                RETURNING 1
+            ),
+            applied AS (
+                INSERT INTO sc_usage_counter
+                    (company_id, key, value, updated_at, create_uid, create_date, write_uid, write_date)
+                SELECT company_id, counter_key, SUM(delta)::integer, %s, %s, NOW(), %s, NOW()
+                  FROM moved
+                 GROUP BY company_id, counter_key
+                 ORDER BY company_id, counter_key
+                ON CONFLICT (company_id, key)
+                DO UPDATE SET
+                    value = sc_usage_counter.value + EXCLUDED.value,
+                    updated_at = EXCLUDED.updated_at,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = NOW()
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM moved), (SELECT COUNT(*) FROM rolled), (SELECT COUNT(*) FROM applied)
+            """,
+            (max(int(limit or 0), 1), now, now, uid, uid),
+        )
+        events, rollup_rows, keys = self.env.cr.fetchone() or (0, 0, 0)
+        return {"events": int(events or 0), "rollup_rows": int(rollup_rows or 0), "keys": int(keys or 0)}
+
+    @api.model
+    def cron_flush_usage_stage(self, limit=FLUSH_BATCH_SIZE, max_batches=20):
+        flushed = {"events": 0, "rollup_rows": 0, "keys": 0, "batches": 0}
+        for _batch in range(max(int(max_batches or 0), 1)):
+            result = self.apply_staged(limit=limit)
+            flushed["events"] += result["events"]
+            flushed["rollup_rows"] += result["rollup_rows"]
+            flushed["keys"] += result["keys"]
+            flushed["batches"] += 1
+            if result["events"] < max(int(limit or 0), 1):
+                break
+        return flushed
+
+    @api.model
+    def telemetry_stats(self):
+        max_pending = self._telemetry_max_pending()
+        self._probe_stage_pending(max_pending)
+        stats = stage_backpressure().stats(self.env.cr.dbname)
+        stats["max_pending"] = max_pending
+        return stats
+
     @api.model
     def get_usage_map(self, company):
         counters = self.search([("company_id", "=", company.id)])
@@ -1,11 +1,20 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import logging
+import threading
+
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
-from odoo.addons.smart_core.core.ui_base_contract_asset_event_queue import pop_scene_keys
+from odoo.addons.smart_core.core.ui_base_contract_asset_event_queue import (
+    complete_scene_keys,
+    get_queue_metrics,
+    pop_scene_keys,
+)
 from odoo.addons.smart_core.core.ui_base_contract_asset_producer import refresh_ui_base_contract_assets
 
+_logger = logging.getLogger(__name__)
+
 
 class UiBaseContractAsset(models.Model):
     _name = "sc.ui.base.contract.asset"
@@ -30,6 +39,7 @@ class UiBaseContractAsset(models.Model):
         selection=[
             ("runtime_intent", "Runtime Intent"),
             ("precompile", "Precompile"),
+            ("event_queue", "Event Queue"),
             ("snapshot_import", "Snapshot Import"),
             ("replay_capture", "Replay Capture"),
             ("seed", "Seed"),
@@ -109,20 +119,75 @@ class UiBaseContractAsset(models.Model):
         )
 
     @api.model
-    def cron_refresh_ui_base_contract_assets(self, limit: int = 50):
-        queue_batch = pop_scene_keys(self.env, limit=int(limit or 0) or 50)
+    def _refresh_claimed_batch(self, queue_batch, limit):
+        """消费一批已认领任务；批内异常（含事务中止）回滚到保存点，整批按失败退避。"""
         scene_keys = queue_batch.get("scene_keys") if isinstance(queue_batch.get("scene_keys"), list) else []
-        source_type = "event_queue" if scene_keys else "precompile"
-        produced = self.refresh_assets_for_scene_keys(
-            scene_keys=scene_keys,
-            limit=limit,
-            source_type=source_type,
-            code_version="",
+        error = ""
+        try:
+            with self.env.cr.savepoint():
+                produced = self.refresh_assets_for_scene_keys(
+                    scene_keys=scene_keys,
+                    limit=max(int(limit or 0), len(scene_keys), 1),
+                    source_type="event_queue",
+                    code_version="",
+                )
+        except Exception as exc:
+            _logger.warning("[ui_base_contract_asset] queued refresh failed for %s: %s", scene_keys, exc)
+            produced = {"produced_count": 0, "failed_count": len(scene_keys), "failed_scene_keys": list(scene_keys)}
+            error = str(exc)
+        produced = produced if isinstance(produced, dict) else {}
+        failed_keys = produced.get("failed_scene_keys") if isinstance(produced.get("failed_scene_keys"), list) else []
+        produced["queue"] = complete_scene_keys(
+            self.env,
+            jobs=queue_batch.get("jobs"),
+            failed_scene_keys=failed_keys,
+            error=error,
         )
-        if isinstance(produced, dict):
-            produced["queue"] = {
-                "popped_count": int(queue_batch.get("popped_count") or 0),
-                "remaining_count": int(queue_batch.get("remaining_count") or 0),
+        return produced
+
+    @api.model
+    def cron_refresh_ui_base_contract_assets(self, limit: int = 50, max_batches: int = 10):
+        """
+        按批认领（SKIP LOCKED）并生成资产，批间提交：认领对其他消费者可见，入队方不被长事务阻塞，
+        多个 worker 可并行消费。队列为空时退回全量预编译一批。
+        """
+        batch_size = int(limit or 0) or 50
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        totals = {"produced_count": 0, "failed_count": 0, "batches": 0, "popped_count": 0, "done_count": 0, "retry_count": 0}
+        for _batch in range(max(int(max_batches or 0), 1)):
+            queue_batch = pop_scene_keys(self.env, limit=batch_size)
+            if not queue_batch.get("scene_keys"):
+                break
+            if auto_commit:
+                self.env.cr.commit()
+            produced = self._refresh_claimed_batch(queue_batch, batch_size)
+            totals["batches"] += 1
+            totals["popped_count"] += int(queue_batch.get("popped_count") or 0)
+            totals["produced_count"] += int(produced.get("produced_count") or 0)
+            totals["failed_count"] += int(produced.get("failed_count") or 0)
+            totals["done_count"] += int(produced["queue"].get("done_count") or 0)
+            totals["retry_count"] += int(produced["queue"].get("retry_count") or 0)
+            if auto_commit:
+                self.env.cr.commit()
+        if totals["batches"]:
+            source_type = "event_queue"
+            result = {key: totals[key] for key in ("produced_count", "failed_count", "batches")}
+        else:
+            source_type = "precompile"
+            result = self.refresh_assets_for_scene_keys(
+                scene_keys=[],
+                limit=limit,
+                source_type=source_type,
+                code_version="",
+            )
+        if isinstance(result, dict):
+            metrics = get_queue_metrics(self.env)
+            result["queue"] = {
+                "popped_count": totals["popped_count"],
+                "done_count": totals["done_count"],
+                "retry_count": totals["retry_count"],
+                "remaining_count": int(metrics.get("remaining_count") or 0),
+                "oldest_age_seconds": int(metrics.get("oldest_age_seconds") or 0),
                 "source_type": source_type,
             }
-        return produced
+        return result
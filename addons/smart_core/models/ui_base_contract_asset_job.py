@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+import logging
+
+from odoo import api, fields, models
+
+from odoo.addons.smart_core.core.ui_base_contract_asset_event_queue import (
+    LEGACY_QUEUE_KEY,
+    LEGACY_QUEUE_META_KEY,
+    enqueue_scene_keys,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class UiBaseContractAssetJob(models.Model):
+    """
+    UI 基础契约资产刷新队列：每个场景键一行（唯一索引去重），状态机
+    pending -> running -> done / pending（重试退避）/ failed（超过最大重试）。
+    读写统一经 core/ui_base_contract_asset_event_queue（SKIP LOCKED 认领、revision 防丢事件）。
+    """
+
+    _name = "sc.ui.base.contract.asset.job"
+    _description = "Scene UI Base Contract Asset Refresh Job"
+    _log_access = False
+    _order = "available_at, id"
+    SOURCE_KIND = "ui_base_contract_asset_event_queue"
+    SOURCE_AUTHORITIES = ("ir.actions.act_window", "ir.ui.view", "res.groups")
+
+    scene_key = fields.Char(string="Scene Key", required=True, readonly=True)
+    reason = fields.Char(string="Reason", readonly=True)
+    state = fields.Selection(
+        [("pending", "Pending"), ("running", "Running"), ("done", "Done"), ("failed", "Failed")],
+        string="State",
+        required=True,
+        default="pending",
+        readonly=True,
+    )
+    revision = fields.Integer(string="Revision", required=True, default=1, readonly=True)
+    attempts = fields.Integer(string="Attempts", required=True, default=0, readonly=True)
+    enqueued_at = fields.Datetime(string="Enqueued At", required=True, readonly=True)
+    updated_at = fields.Datetime(string="Updated At", required=True, readonly=True)
+    available_at = fields.Datetime(string="Available At", required=True, readonly=True)
+    claimed_at = fields.Datetime(string="Claimed At", readonly=True)
+    finished_at = fields.Datetime(string="Finished At", readonly=True)
+    last_error = fields.Char(string="Last Error", readonly=True)
+
+    _sql_constraints = [
+        ("sc_ui_base_contract_asset_job_scene_key_uniq", "unique(scene_key)", "Scene key is already queued."),
+    ]
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS sc_ui_base_contract_asset_job_claim_idx
+                ON sc_ui_base_contract_asset_job (available_at, id)
+             WHERE state IN ('pending', 'running')
+            """
+        )
+        self._migrate_legacy_queue()
+
+    def _migrate_legacy_queue(self):
+        """旧版队列存于 ir.config_parameter 的 JSON 列表：迁入队列表后删除两行参数。"""
+        cr = self.env.cr
+        cr.execute("SELECT value FROM ir_config_parameter WHERE key = %s", (LEGACY_QUEUE_KEY,))
+        row = cr.fetchone()
+        if row:
+            try:
+                payload = json.loads(row[0] or "[]")
+            except ValueError:
+                payload = []
+            if isinstance(payload, list) and payload:
+                enqueue_scene_keys(self.env, scene_keys=payload, reason="migrate:ir.config_parameter")
+                _logger.info("[ui_base_contract_asset_job] migrated %s legacy queued scene keys", len(payload))
+        cr.execute("DELETE FROM ir_config_parameter WHERE key IN %s", ((LEGACY_QUEUE_KEY, LEGACY_QUEUE_META_KEY),))
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "projection_only": True,
+            "rebuildable": True,
+            "no_business_fact_authority": True,
+        }
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from odoo import api, fields, models
+from odoo.tools import sql
+
+
+class UsageEventStage(models.Model):
+    _name = "sc.usage.event.stage"
+    _description = "SC Usage Event Stage"
+    _auto = False
+    _log_access = False
+    _order = "id"
+    SOURCE_KIND = "usage_telemetry_stage"
+    SOURCE_AUTHORITIES = ("usage.track",)
+
+    company_id = fields.Many2one("res.company", string="Company", readonly=True)
+    event_type = fields.Char(string="Event Type", readonly=True)
+    subject_key = fields.Char(string="Scene / Capability Key", readonly=True)
+    user_id = fields.Integer(string="User ID", readonly=True)
+    role_code = fields.Char(string="Role Codes", readonly=True)
+    day = fields.Date(string="Day", readonly=True)
+    counter_key = fields.Char(string="Counter Key", readonly=True)
+    delta = fields.Integer(string="Delta", readonly=True)
+    staged_at = fields.Datetime(string="Staged At", readonly=True)
+
+    def init(self):
+        # UNLOGGED：只追加、无唯一约束、不写 WAL；崩溃丢失未 flush 的遥测是可接受的。
+        cr = self.env.cr
+        if sql.table_exists(cr, self._table):
+            if sql.column_exists(cr, self._table, "event_type"):
+                return
+            # 早期按计数键暂存的结构，暂存数据可丢弃，直接重建。
+            cr.execute("DROP TABLE sc_usage_event_stage")
+        cr.execute(
+            """
+            CREATE UNLOGGED TABLE sc_usage_event_stage (
+                id BIGSERIAL PRIMARY KEY,
+                company_id INTEGER NOT NULL,
+                event_type VARCHAR NOT NULL DEFAULT '',
+                subject_key VARCHAR NOT NULL DEFAULT '',
+                user_id INTEGER NOT NULL DEFAULT 0,
+                role_code VARCHAR NOT NULL DEFAULT '',
+                day DATE,
+                counter_key VARCHAR NOT NULL,
+                delta INTEGER NOT NULL DEFAULT 1,
+                staged_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC')
+            )
+            """
+        )
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "staging_only": True,
+            "no_business_fact_authority": True,
+        }
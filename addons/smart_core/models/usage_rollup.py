@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from odoo import api, fields, models
+from odoo.tools import sql
+
+from odoo.addons.smart_core.core.usage_rollup import LEGACY_DAILY_KEY_SQL_PATTERN, parse_legacy_daily_key
+
+
+class UsageRollup(models.Model):
+    _name = "sc.usage.rollup"
+    _description = "SC Usage Daily Rollup"
+    _log_access = False
+    _order = "day desc, id desc"
+    SOURCE_KIND = "usage_daily_rollup"
+    SOURCE_AUTHORITIES = ("usage.track", "sc.usage.event.stage")
+
+    company_id = fields.Many2one("res.company", string="Company", required=True, ondelete="cascade", readonly=True)
+    day = fields.Date(string="Day", required=True, readonly=True)
+    event_type = fields.Selection(
+        [("scene_open", "Scene Open"), ("capability_open", "Capability Open")],
+        string="Event Type",
+        required=True,
+        readonly=True,
+    )
+    subject_key = fields.Char(string="Scene / Capability Key", required=True, default="", readonly=True)
+    role_code = fields.Char(string="Role Codes", required=True, default="", readonly=True)
+    user_id = fields.Integer(string="User ID", required=True, default=0, readonly=True)
+    legacy_slice = fields.Char(string="Legacy Slice", required=True, default="", readonly=True)
+    event_count = fields.Integer(string="Count", required=True, default=0, readonly=True)
+    updated_at = fields.Datetime(string="Updated At", readonly=True)
+
+    _sql_constraints = [
+        (
+            "sc_usage_rollup_dim_uniq",
+            "unique(company_id, day, event_type, subject_key, role_code, user_id, legacy_slice)",
+            "Usage rollup dimensions must be unique.",
+        ),
+    ]
+
+    def init(self):
+        # 唯一约束以 (company_id, day) 开头，覆盖窗口查询；用户排行/过滤另建索引。
+        sql.create_index(
+            self.env.cr,
+            "sc_usage_rollup_company_user_day_idx",
+            self._table,
+            ["company_id", "user_id", "day"],
+        )
+
+    @api.model
+    def source_authority_contract(self):
+        return {
+            "kind": self.SOURCE_KIND,
+            "authorities": list(self.SOURCE_AUTHORITIES),
+            "projection_only": True,
+            "observability_only": True,
+            "no_business_fact_authority": True,
+        }
+
+    @api.model
+    def backfill_from_legacy_counters(self, batch_size=5000):
+        """
+        把 sc.usage.counter 中按日增长的旧字符串键（全局/角色/用户日切片）回填为日汇总行并删除原键。
+        可重复执行：迁移过的键同批删除，不会重复累加。其余旧键（全局合计、全时段对象计数）保持不变。
+        """
+        cr = self.env.cr
+        moved = 0
+        while True:
+            cr.execute(
+                """
+                SELECT id, company_id, key, value, updated_at
+                  FROM sc_usage_counter
+                 WHERE key ~ %s
+                 ORDER BY id
+                 LIMIT %s
+                """,
+                (LEGACY_DAILY_KEY_SQL_PATTERN, max(int(batch_size or 0), 1)),
+            )
+            rows = cr.fetchall()
+            if not rows:
+                return {"moved": moved}
+            # 同一批内大小写不同的角色码会落到同一维度，先合并，避免 ON CONFLICT 重复命中同一行。
+            merged = {}
+            counter_ids = []
+            for counter_id, company_id, key, value, updated_at in rows:
+                counter_ids.append(counter_id)
+                parsed = parse_legacy_daily_key(key)
+                if not parsed or not company_id:
+                    continue
+                dims = (
+                    company_id,
+                    parsed["day"],
+                    parsed["event_type"],
+                    parsed["role_code"],
+                    parsed["user_id"],
+                    parsed["legacy_slice"],
+                )
+                total, latest = merged.get(dims, (0, None))
+                merged[dims] = (total + int(value or 0), max(filter(None, [latest, updated_at]), default=None))
+            values = [value for dims, (total, latest) in merged.items() for value in (*dims, total, latest)]
+            if values:
+                cr.execute(
+                    """
+                    INSERT INTO sc_usage_rollup
+                        (company_id, day, event_type, subject_key, role_code, user_id, legacy_slice, event_count, updated_at)
+                    VALUES """
+                    + ", ".join(["(%s, %s, %s, '', %s, %s, %s, %s, %s)"] * (len(values) // 8))
+                    + """
+                    ON CONFLICT (company_id, day, event_type, subject_key, role_code, user_id, legacy_slice)
+                    DO UPDATE SET
+                        event_count = sc_usage_rollup.event_count + EXCLUDED.event_count,
+                        updated_at = GREATEST(sc_usage_rollup.updated_at, EXCLUDED.updated_at)
+                    """,
+                    values,
+                )
+            cr.execute("DELETE FROM sc_usage_counter WHERE id = ANY(%s)", (counter_ids,))
+            moved += len(counter_ids)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from odoo.addons.smart_core.core.aggregate_cache import aggregate_cache_scope
+from odoo.addons.smart_core.core.scene_block_batch import normalize_block_keys
 from odoo.addons.smart_core.utils.extension_hooks import call_extension_hook_first
 
 
@@ -20,6 +22,7 @@ class BaseSceneEntryOrchestrator:
     suggested_action_key = ""
     suggested_action_reason_code = ""
     block_fetch_intent = ""
+    blocks_fetch_intent = ""
     block_alias_map = {}
     entry_summary_keys = ()
     entry_blocks = ()
@@ -48,6 +51,7 @@ class BaseSceneEntryOrchestrator:
             "suggested_action_key",
             "suggested_action_reason_code",
             "block_fetch_intent",
+            "blocks_fetch_intent",
             "title_template",
             "title_record_name_fallback",
         )
@@ -163,6 +167,14 @@ class BaseSceneEntryOrchestrator:
                 for key, _, _ in self.entry_blocks
             }
         }
+        if self.blocks_fetch_intent and self.entry_blocks:
+            runtime_fetch_hints["batch"] = {
+                "intent": self.blocks_fetch_intent,
+                "params": {
+                    "project_id": resolved_project_id,
+                    "block_keys": [key for key, _, _ in self.entry_blocks],
+                },
+            }
         first_action = self.resolve_first_action(runtime_fetch_hints)
         return {
             "project_id": resolved_project_id,
@@ -189,16 +201,37 @@ class BaseSceneEntryOrchestrator:
         }
 
     def build_runtime_block(self, block_key, project_id=None, context=None):
-        normalized_key = str(block_key or "").strip().lower()
         project, _diag = self._service.resolve_project_with_diagnostics(project_id)
-        resolved_project_id = int(getattr(project, "id", 0) or 0)
+        payload = {"project_id": int(getattr(project, "id", 0) or 0)}
+        payload.update(self._runtime_block_item(block_key, project, context))
+        payload["source_authority"] = self.source_authority_contract()
+        payload["legacy_scene_copy_source_authority"] = self.legacy_scene_copy_source_authority_contract()
+        return payload
+
+    def _runtime_block_item(self, block_key, project, context=None):
+        normalized_key = str(block_key or "").strip().lower()
         block = self._service.build_block(normalized_key, project=project, context=context)
         state = str((block or {}).get("state") or "").strip().lower()
         return {
-            "project_id": resolved_project_id,
             "block_key": self.block_alias_map.get(normalized_key, normalized_key or ""),
             "block": block if isinstance(block, dict) else self._service.error_block(normalized_key or "unknown", "INVALID_BLOCK_PAYLOAD"),
             "degraded": state != "ready",
+        }
+
+    def iter_runtime_blocks(self, block_keys, project, context=None):
+        """项目已解析：在同一聚合缓存作用域内逐个构建 block，供整体返回与 NDJSON 流式输出共用。"""
+        with aggregate_cache_scope(self.env):
+            for key in normalize_block_keys(block_keys):
+                yield self._runtime_block_item(key, project, context)
+
+    def build_runtime_blocks(self, block_keys, project_id=None, context=None, project=None):
+        if project is None:
+            project, _diag = self._service.resolve_project_with_diagnostics(project_id)
+        blocks = list(self.iter_runtime_blocks(block_keys, project, context))
+        return {
+            "project_id": int(getattr(project, "id", 0) or 0),
+            "blocks": blocks,
+            "degraded": any(item["degraded"] for item in blocks),
             "source_authority": self.source_authority_contract(),
             "legacy_scene_copy_source_authority": self.legacy_scene_copy_source_authority_contract(),
         }
@@ -2,6 +2,7 @@
 import jwt
 import logging
 import os
+import threading
 import time
 import uuid
 from odoo.http import request
@@ -10,12 +11,17 @@ from odoo.exceptions import AccessDenied
 from odoo.modules.registry import Registry
 from odoo.tools import config
 
+from odoo.addons.smart_core.core.token_revocation_cache import user_token_state
+
 _logger = logging.getLogger(__name__)
 
 DEFAULT_SECRET_KEY = "odoo-smart-core"
 ALGORITHM = "HS256"
 DEFAULT_EXP_SECONDS = 8 * 60 * 60  # 8h
+SECRET_CACHE_TTL_SECONDS = 60
 _warned_missing_secret = False
+_secret_cache = {}
+_secret_cache_lock = threading.Lock()
 
 SOURCE_KIND = "jwt_auth_session_proxy"
 SOURCE_AUTHORITIES = ("res.users", "ir.config_parameter", "http.authorization", "odoo.session")
@@ -34,15 +40,32 @@ def source_authority_contract() -> dict:
     }
 
 
+def _cached_param_secret(env):
+    """sc.jwt.secret 按数据库缓存 SECRET_CACHE_TTL_SECONDS 秒；轮换密钥最迟在 TTL 后全部 worker 生效。"""
+    try:
+        dbname = str(env.cr.dbname or "")
+    except Exception:
+        dbname = ""
+    now = time.monotonic()
+    with _secret_cache_lock:
+        cached = _secret_cache.get(dbname)
+    if cached and cached[0] > now:
+        return cached[1]
+    try:
+        secret = env["ir.config_parameter"].sudo().get_param("sc.jwt.secret")
+    except Exception:
+        return None
+    with _secret_cache_lock:
+        _secret_cache[dbname] = (now + SECRET_CACHE_TTL_SECONDS, secret)
+    return secret
+
+
 def _get_secret_key():
     global _warned_missing_secret
     secret = os.getenv("SC_JWT_SECRET") or os.getenv("JWT_SECRET")
     env = getattr(request, "env", None)
     if not secret and env is not None:
-        try:
-            secret = env["ir.config_parameter"].sudo().get_param("sc.jwt.secret")
-        except Exception:
-            secret = None
+        secret = _cached_param_secret(env)
     if not secret:
         if not _warned_missing_secret:
             _logger.warning("JWT secret not configured; falling back to default secret.")
@@ -156,6 +179,33 @@ def _session_user_id(session_uid):
     return user_id
 
 
+def _ensure_token_db_matches_cursor(token_db):
+    # 校验改走请求游标后，令牌所属库必须就是请求游标所在库。
+    try:
+        cursor_db = str(getattr(request.env.cr, "dbname", "") or "").strip()
+    except Exception:
+        cursor_db = ""
+    if cursor_db and cursor_db != str(token_db or "").strip():
+        raise AccessDenied("Token 数据库与当前请求数据库不一致")
+
+
+def resolve_token_user(env, payload):
+    """
+    在给定（请求）游标上校验 token_version 并返回用户记录；撤销判定：
+    用户不存在 -> 拒绝；token_version 不一致或用户已停用 -> Token 已撤销。
+    (token_version, active) 走进程内缓存，由 res.users 写入时的代际递增失效。
+    """
+    user_id = _token_user_id(payload)
+    state = user_token_state(env, user_id)
+    if state is None:
+        raise AccessDenied("Token 中指定的用户不存在")
+    current_version, active = state
+    token_version = int((payload or {}).get("token_version") or 0)
+    if token_version != current_version or not active:
+        raise AccessDenied("Token 已撤销")
+    return env["res.users"].sudo().browse(user_id)
+
+
 def get_user_from_token():
     """
     从请求中提取 Token 并解析用户对象。兼容系统原生登录与自定义 Token 登录。
@@ -167,29 +217,15 @@ def get_user_from_token():
     if auth_header:
         token = _extract_bearer_token(auth_header)
         payload = decode_token(token)
-        user_id = _token_user_id(payload)
+        _token_user_id(payload)
         token_db = str(payload.get("db") or "").strip()
         db_name = token_db or getattr(getattr(request, "session", None), "db", None) or getattr(request, "db", None)
         if not db_name:
             raise AccessDenied("Token 缺少数据库信息")
         if token_db:
             _ensure_token_db_matches_request(token_db)
-        registry = Registry(db_name)
-        with registry.cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            user = env["res.users"].sudo().browse(user_id)
-            if not user.exists():
-                raise AccessDenied("Token 中指定的用户不存在")
-            current_version = int(getattr(user, "token_version", 0) or 0)
-        token_version = int(payload.get("token_version") or 0)
-        if token_version != current_version:
-            raise AccessDenied("Token 已撤销")
-        # Return a user record bound to the current request env/cursor.
-        # The `user` record above was created on a temporary cursor.
-        request_user = request.env["res.users"].sudo().browse(user_id)
-        if not request_user.exists():
-            raise AccessDenied("Token 中指定的用户不存在")
-        return request_user
+            _ensure_token_db_matches_cursor(token_db)
+        return resolve_token_user(request.env, payload)
 
     elif session_uid:
         user = request.env["res.users"].browse(_session_user_id(session_uid))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_core_module(name):
+    module_name = "odoo.addons.smart_core.core.%s" % name
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / ("%s.py" % name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _IdentityResolver:
+    def __init__(self, env):
+        self.env = env
+
+    def user_group_xmlids(self, user):
+        return {"base.group_user"} | {"test.group_%s" % gid for gid in user.groups_id.ids}
+
+
+class _IntentSurfaceBuilder:
+    calls = []
+
+    def collect_for_group_xmlids(self, env, user_xmlids):
+        self.calls.append(sorted(user_xmlids))
+        return ["system.init"], {"system.init": {"required_groups_xmlids": []}}
+
+
+def _load_access_matrix(capability_calls):
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    identity_module = types.ModuleType("odoo.addons.smart_core.identity.identity_resolver")
+    identity_module.IdentityResolver = _IdentityResolver
+    sys.modules["odoo.addons.smart_core.identity"] = types.ModuleType("odoo.addons.smart_core.identity")
+    sys.modules["odoo.addons.smart_core.identity.identity_resolver"] = identity_module
+
+    provider_module = types.ModuleType("odoo.addons.smart_core.core.capability_provider")
+
+    def load_capabilities_uncached(env, user):
+        capability_calls.append(user.id)
+        return [{"key": "project.list.open", "state": "READY"}]
+
+    provider_module.load_capabilities_uncached = load_capabilities_uncached
+    sys.modules["odoo.addons.smart_core.core.capability_provider"] = provider_module
+    surface_module = types.ModuleType("odoo.addons.smart_core.core.intent_surface_builder")
+    surface_module.IntentSurfaceBuilder = _IntentSurfaceBuilder
+    sys.modules["odoo.addons.smart_core.core.intent_surface_builder"] = surface_module
+
+    _load_core_module("source_authority")
+    contract_cache = _load_core_module("contract_cache")
+    return _load_core_module("access_matrix"), contract_cache
+
+
+class _Cursor:
+    def __init__(self, generation=0):
+        self.generation = generation
+        self.cache = {}
+
+    def execute(self, query, params=None):
+        return None
+
+    def fetchone(self):
+        return (self.generation,)
+
+
+def _user(uid, group_ids):
+    return types.SimpleNamespace(
+        id=uid,
+        company_id=types.SimpleNamespace(id=1),
+        groups_id=types.SimpleNamespace(ids=list(group_ids)),
+    )
+
+
+class _Env:
+    def __init__(self, user, generation=0):
+        self.cr = _Cursor(generation)
+        self.user = user
+        self.context = {"lang": "zh_CN"}
+        self.company = types.SimpleNamespace(id=1)
+
+
+class TestAccessMatrix(unittest.TestCase):
+    def setUp(self):
+        self.capability_calls = []
+        _IntentSurfaceBuilder.calls = []
+        self.module, self.contract_cache = _load_access_matrix(self.capability_calls)
+        self.contract_cache.configure_contract_cache(max_entries=16)
+
+    def test_users_with_same_group_set_share_one_compile(self):
+        alice = _user(7, (3, 1))
+        bob = _user(8, (1, 3))
+
+        first = self.module.access_matrix_for_user(_Env(alice), alice)
+        first["capabilities"].append({"key": "mutated"})
+        second = self.module.access_matrix_for_user(_Env(bob), bob)
+
+        self.assertEqual(self.capability_calls, [7])
+        self.assertEqual(len(_IntentSurfaceBuilder.calls), 1)
+        self.assertEqual(second["capabilities"], [{"key": "project.list.open", "state": "READY"}])
+        self.assertEqual(second["group_xmlids"], ["base.group_user", "test.group_1", "test.group_3"])
+
+    def test_different_group_set_or_generation_recompiles(self):
+        alice = _user(7, (1,))
+        carol = _user(9, (1, 2))
+
+        self.module.access_matrix_for_user(_Env(alice), alice)
+        self.module.access_matrix_for_user(_Env(carol), carol)
+        self.module.access_matrix_for_user(_Env(alice, generation=1), alice)
+
+        self.assertEqual(self.capability_calls, [7, 9, 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
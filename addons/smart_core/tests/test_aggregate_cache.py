@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_cache_module():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.aggregate_cache"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "aggregate_cache.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+ROWS = [
+    {"project_id": 1, "type": "pay", "amount": 10.0},
+    {"project_id": 1, "type": "pay", "amount": 5.0},
+    {"project_id": 1, "type": "receive", "amount": 7.0},
+    {"project_id": 2, "type": "pay", "amount": 3.0},
+]
+
+
+class _FakePaymentModel:
+    _name = "payment.request"
+
+    def __init__(self, uid=2):
+        self.env = SimpleNamespace(uid=uid, su=False, context={"allowed_company_ids": [1]})
+        self.calls = []
+
+    def check_access_rights(self, operation):
+        return True
+
+    def _match(self, row, domain):
+        for field, operator, value in domain:
+            if operator == "=" and row[field] != value:
+                return False
+            if operator == "in" and row[field] not in value:
+                return False
+        return True
+
+    def search_count(self, domain):
+        self.calls.append(("search_count", list(domain)))
+        return len([row for row in ROWS if self._match(row, domain)])
+
+    def read_group(self, domain, fields, groupby, lazy=True):
+        self.calls.append(("read_group", list(domain), list(groupby)))
+        matched = [row for row in ROWS if self._match(row, domain)]
+        groups = {}
+        for row in matched:
+            groups.setdefault(tuple(row[name] for name in groupby), []).append(row)
+        if not groupby:
+            groups = {(): matched}
+        out = []
+        for key, rows in groups.items():
+            item = {"__count": len(rows), "amount": sum(row["amount"] for row in rows), "__domain": list(domain)}
+            for name, value in zip(groupby, key):
+                item[name] = (value, f"P{value}") if name == "project_id" else value
+            out.append(item)
+        return out
+
+
+class TestAggregateCache(unittest.TestCase):
+    def setUp(self):
+        self.target = _load_cache_module()
+
+    def test_normalize_domain_ignores_and_order_but_keeps_or_structure(self):
+        normalize = self.target.normalize_domain
+        self.assertEqual(
+            normalize([("project_id", "=", 1), ("state", "in", ["b", "a"])]),
+            normalize([("state", "in", ("a", "b")), ("project_id", "=", 1)]),
+        )
+        self.assertNotEqual(
+            normalize(["|", ("a", "=", 1), ("b", "=", 2)]),
+            normalize(["|", ("b", "=", 2), ("a", "=", 1)]),
+        )
+
+    def test_scope_caches_per_rule_signature_and_outside_scope_hits_db(self):
+        model = _FakePaymentModel()
+        domain = [("project_id", "=", 1)]
+        self.target.cached_search_count(model, domain)
+        self.target.cached_search_count(model, domain)
+        self.assertEqual(len(model.calls), 2)
+
+        other_user = _FakePaymentModel(uid=9)
+        with self.target.aggregate_cache_scope():
+            for _ in range(3):
+                self.assertEqual(self.target.cached_search_count(model, list(reversed(domain))), 3)
+                rows = self.target.cached_read_group(model, domain, ["amount:sum"], [])
+                rows[0]["amount"] = -1
+            with self.target.aggregate_cache_scope():
+                self.assertEqual(self.target.cached_read_group(model, domain, ["amount:sum"], [])[0]["amount"], 22.0)
+            self.target.cached_search_count(other_user, domain)
+            self.assertEqual(self.target.cache_stats(), {"hits": 5, "misses": 3, "merged": 0})
+        self.assertEqual(len(model.calls), 4)
+        self.assertEqual(len(other_user.calls), 1)
+        self.assertEqual(self.target.cache_stats(), {})
+
+    def test_read_group_by_project_merges_projects_and_feeds_single_project_lookups(self):
+        model = _FakePaymentModel()
+        with self.target.aggregate_cache_scope():
+            by_project = self.target.read_group_by_project(model, [2, 1, 3, 1], [("type", "=", "pay")], ["amount:sum"])
+            self.assertEqual(len(model.calls), 1)
+            self.assertEqual(model.calls[0][1][-1], ("project_id", "in", [1, 2, 3]))
+            self.assertEqual(by_project[1], [{"__count": 2, "amount": 15.0}])
+            self.assertEqual(by_project[3], [{"__count": 0}])
+            self.assertEqual(self.target.group_value(by_project[1][0], "amount:sum"), 15.0)
+
+            single = self.target.cached_read_group(model, [("type", "=", "pay"), ("project_id", "=", 2)], ["amount:sum"], [])
+            self.assertEqual(single, [{"__count": 1, "amount": 3.0}])
+            again = self.target.read_group_by_project(model, [1, 2], [("type", "=", "pay")], ["amount:sum"])
+            self.assertEqual(again, {1: by_project[1], 2: by_project[2]})
+            self.assertEqual(len(model.calls), 1)
+
+            grouped = self.target.read_group_by_project(model, [1], [], ["amount:sum"], groupby=["type"])
+            self.assertEqual(sorted((row["type"], row["amount"]) for row in grouped[1]), [("pay", 15.0), ("receive", 7.0)])
+
+            self.target.read_group_by_project(model, [1], [("type", "=", "pay")], ["amount:sum"], cache=False)
+            self.assertEqual(len(model.calls), 3)
+            self.assertEqual(self.target.cache_stats()["merged"], 2)
+
+    def test_ttl_scope_shares_entries_across_requests_until_invalidated(self):
+        model = _FakePaymentModel()
+        domain = [("project_id", "=", 2)]
+        for _ in range(2):
+            with self.target.aggregate_cache_scope(ttl_seconds=60):
+                self.assertEqual(self.target.cached_search_count(model, domain), 1)
+        self.assertEqual(len(model.calls), 1)
+
+        self.target.invalidate("payment.request")
+        with self.target.aggregate_cache_scope(ttl_seconds=60):
+            self.target.cached_search_count(model, domain)
+        with self.target.aggregate_cache_scope():
+            self.target.cached_search_count(model, domain)
+        self.assertEqual(len(model.calls), 3)
+        self.target.invalidate()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_core_module(name):
+    module_name = "odoo.addons.smart_core.core.%s" % name
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / ("%s.py" % name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_planner():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    _load_core_module("source_authority")
+    _load_core_module("api_data_sort_index")
+    return _load_core_module("api_data_aggregate_planner")
+
+
+def _field(name, field_type, *, store=True, column_type=None):
+    return types.SimpleNamespace(
+        name=name,
+        type=field_type,
+        store=store,
+        column_type=column_type or ("x", "x"),
+        related=None,
+        comodel_name=None,
+        translate=False,
+        inherited=False,
+    )
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @contextlib.contextmanager
+    def savepoint(self, flush=True):
+        yield
+
+    def execute(self, query, params=None):
+        self.queries.append((query, list(params or [])))
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class _SubQuery:
+    code = 'SELECT "sc_task".id FROM "sc_task" WHERE ("sc_task"."company_id" IN %s)'
+    params = [(1,)]
+
+
+class _Model:
+    _name = "sc.task"
+    _table = "sc_task"
+
+    def __init__(self, rows):
+        self.env = types.SimpleNamespace(cr=_Cursor(rows))
+        self.flushed = []
+        self._fields = {
+            "id": _field("id", "integer", column_type=("int4", "int4")),
+            "amount": _field("amount", "float", column_type=("numeric", "numeric")),
+            "stage_id": _field("stage_id", "many2one", column_type=("int4", "int4")),
+            "display_total": _field("display_total", "float", store=False),
+        }
+
+    def _search(self, domain):
+        return types.SimpleNamespace(subselect=lambda: _SubQuery())
+
+    def flush_model(self, fnames=None):
+        self.flushed.append(fnames)
+
+
+class TestApiDataAggregatePlanner(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_planner()
+
+    def test_summary_runs_count_group_total_and_sums_in_one_statement(self):
+        model = _Model([(12, 3, 450.5)])
+
+        summary = self.module.summary_aggregates(
+            model, [], sum_fields=["amount"], group_field="stage_id", need_count=True
+        )
+
+        self.assertEqual(summary, {"count": 12, "group_total": 3, "sums": {"amount": 450.5}})
+        self.assertEqual(len(model.env.cr.queries), 1)
+        query, params = model.env.cr.queries[0]
+        self.assertIn('COUNT(DISTINCT t."stage_id")', query)
+        self.assertIn('SUM(t."amount")', query)
+        self.assertIn('WHERE t.id IN (SELECT "sc_task".id', query)
+        self.assertEqual(params, [(1,)])
+        self.assertIsNone(self.module.summary_aggregates(model, [], sum_fields=["display_total"]))
+
+    def test_group_windows_share_one_ranked_statement(self):
+        model = _Model([(0, 5), (0, 4), (1, 9)])
+
+        windows = self.module.group_window_ids(
+            model,
+            [],
+            group_field="stage_id",
+            order_clauses=[("amount", "desc")],
+            windows=[(2, 0, 2), (None, 4, 2)],
+        )
+
+        self.assertEqual(windows, [[5, 4], [9]])
+        query, params = model.env.cr.queries[0]
+        self.assertIn('PARTITION BY t."stage_id" ORDER BY t."amount" DESC, t.id ASC', query)
+        self.assertIn("CAST(%s AS int4)", query)
+        self.assertEqual(params[1:], [0, 2, 0, 2, 1, None, 4, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
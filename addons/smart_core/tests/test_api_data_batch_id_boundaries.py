@@ -52,9 +52,11 @@ def _load_handler():
         apply_idempotency_identity=lambda data, **kwargs: {**data, **kwargs},
         build_idempotency_fingerprint=lambda payload, normalize_id_keys=None: "fp",
         build_idempotency_conflict_response=lambda **kwargs: {"ok": False, "error": {"code": "CONFLICT"}},
+        build_idempotency_in_flight_response=lambda **kwargs: {"ok": False, "error": {"code": "IN_FLIGHT"}},
+        claim_idempotency_key=lambda *args, **kwargs: {},
+        complete_idempotency_key=lambda *args, **kwargs: False,
         enrich_replay_contract=lambda data, **kwargs: {**data, **kwargs},
         normalize_request_id=lambda value, prefix: value or f"{prefix}_1",
-        resolve_idempotency_decision=lambda *args, **kwargs: {},
         replay_window_seconds=lambda default, env_key=None: default,
     )
 
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_core_module(name):
+    module_name = "odoo.addons.smart_core.core.%s" % name
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / ("%s.py" % name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_bulk_write():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    _load_core_module("source_authority")
+    return _load_core_module("api_data_bulk_write")
+
+
+class TestApiDataBulkWrite(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_bulk_write()
+
+    def test_partition_keeps_per_row_precedence(self):
+        valid, rejected = self.module.partition_batch_ids(
+            [5, 1, 2, 3, 4, 1],
+            found_ids=[1, 2, 3, 4],
+            writable_ids=[1, 3, 4],
+            write_dates={3: "2026-10-17 10:00:00", 4: "2026-10-17 10:00:00"},
+            if_match_map={2: "stale", 3: "2026-10-17 09:00:00", 4: "2026-10-17 10:00:00"},
+        )
+
+        self.assertEqual(valid, [1, 4])
+        self.assertEqual(
+            rejected,
+            {5: self.module.OUTCOME_MISSING, 2: self.module.OUTCOME_DENIED, 3: self.module.OUTCOME_STALE},
+        )
+
+    def test_chunked_splits_valid_ids_in_order(self):
+        self.assertEqual(list(self.module.chunked([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+        self.assertEqual(list(self.module.chunked([], 2)), [])
+
+    def test_write_date_token_matches_if_match_format(self):
+        self.assertEqual(self.module.write_date_token(datetime(2026, 10, 17, 8, 5, 3, 999)), "2026-10-17 08:05:03")
+        self.assertEqual(self.module.write_date_token(False), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
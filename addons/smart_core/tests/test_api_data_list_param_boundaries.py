@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import contextlib
 import importlib.util
 import sys
 import types
@@ -589,6 +590,124 @@ class TestApiDataListParamBoundaries(unittest.TestCase):
         self.assertEqual([row["apply_date"] for row in asc], ["2023年12月31日", "2024-2-01", "2024-10-01", ""])
         self.assertEqual([row["apply_date"] for row in desc], ["2024-10-01", "2024-2-01", "2023年12月31日", ""])
 
+    def test_computed_order_pages_through_cached_index_with_after_token(self):
+        scores = {1: 30, 2: 10, 3: 20, 4: None, 5: 40}
+        reads = []
+
+        class Recs:
+            def __init__(self, ids):
+                self.ids = list(ids)
+
+            def exists(self):
+                return self
+
+            def read(self, fields):
+                reads.append((tuple(self.ids), tuple(fields)))
+                return [{name: (rid if name == "id" else scores[rid]) for name in fields} for rid in self.ids]
+
+        field = lambda store: types.SimpleNamespace(type="integer", store=store, column_type=("int4", "int4") if store else None, related=None)
+        env_model = types.SimpleNamespace(
+            _name="legacy.fact",
+            _table="legacy_fact",
+            env=types.SimpleNamespace(uid=2, context={}),
+            _fields={"id": field(True), "score": field(False)},
+            search=lambda domain, order=None, limit=None, offset=0: Recs(sorted(scores)),
+            browse=lambda ids: Recs(ids),
+        )
+
+        first = self.handler._search_read_page(env_model, [], ["id"], "score desc", 2)
+        second = self.handler._search_read_page(env_model, [], ["id"], "score desc", 2, 0, first["next_after"])
+        third = self.handler._search_read_page(env_model, [], ["id"], "score desc", 2, 0, second["next_after"])
+
+        self.assertEqual(first["strategy"], "python_index")
+        self.assertEqual([row["id"] for row in first["rows"] + second["rows"] + third["rows"]], [5, 1, 3, 2, 4])
+        self.assertEqual(third["next_after"], "")
+        self.assertEqual(sum(1 for _ids, fields in reads if fields == ("id", "score")), 1)
+        invalid = self.handler._search_read_page(env_model, [], ["id"], "score asc", 2, 0, first["next_after"])
+        self.assertEqual(invalid["error"]["error"]["message"], "after 无效")
+
+    def test_first_page_rebuilds_index_and_native_after_pages_by_offset(self):
+        scores = {1: 30, 2: 10, 3: 20}
+        searches = []
+
+        class Recs:
+            def __init__(self, ids):
+                self.ids = list(ids)
+
+            def exists(self):
+                return self
+
+            def read(self, fields):
+                return [{name: (rid if name == "id" else scores.get(rid)) for name in fields} for rid in self.ids]
+
+        def search(domain, order=None, limit=None, offset=0):
+            searches.append((order, limit, offset))
+            ids = sorted(scores)[offset or 0 :]
+            return Recs(ids[:limit] if limit else ids)
+
+        field = lambda store, ftype="integer": types.SimpleNamespace(
+            type=ftype, store=store, column_type=("int4", "int4") if store else None, related=None
+        )
+        env_model = types.SimpleNamespace(
+            _name="legacy.refresh",
+            _table="legacy_refresh",
+            env=types.SimpleNamespace(uid=2, context={}),
+            _fields={"id": field(True), "score": field(False), "name": field(True, "char")},
+            search=search,
+            browse=lambda ids: Recs(ids),
+        )
+
+        first = self.handler._search_read_page(env_model, [], ["id"], "score desc", 2)
+        scores[4] = 99
+        refreshed = self.handler._search_read_page(env_model, [], ["id"], "score desc", 2)
+        self.assertEqual([row["id"] for row in first["rows"]], [1, 3])
+        self.assertEqual([row["id"] for row in refreshed["rows"]], [4, 1])
+
+        searches.clear()
+        native = self.handler._search_read_page(env_model, [], ["id"], "name asc", 2)
+        continued = self.handler._search_read_page(env_model, [], ["id"], "name asc", 2, 0, native["next_after"])
+        self.assertEqual(continued["cursor"], "offset")
+        self.assertEqual([row["id"] for row in continued["rows"]], [3, 4])
+        self.assertEqual(searches[-1], ("name asc, id asc", 2, 2))
+
+    def test_group_samples_fall_back_per_group_when_batched_read_fails(self):
+        class _Cursor:
+            def __init__(self):
+                self.rolled_back = 0
+
+            @contextlib.contextmanager
+            def savepoint(self, flush=True):
+                try:
+                    yield
+                except Exception:
+                    self.rolled_back += 1
+                    raise
+
+        env_model = types.SimpleNamespace(_name="x.model", env=types.SimpleNamespace(cr=_Cursor()))
+        summary = [
+            {"field": "state", "value": "ok", "label": "OK", "count": 1, "domain": [("state", "=", "ok")]},
+            {"field": "state", "value": "bad", "label": "Bad", "count": 1, "domain": [("state", "=", "bad")]},
+        ]
+
+        def _windows(*args, **kwargs):
+            raise RuntimeError("window read failed")
+
+        def _per_group(model, domain, fields, order, limit, offset=0):
+            if domain == [("state", "=", "bad")]:
+                raise RuntimeError("bad group")
+            return [{"id": 1}], None, False
+
+        self.handler._fetch_group_windows = _windows
+        self.handler._search_read_with_order = _per_group
+
+        with self.assertLogs(level="WARNING") as logs:
+            groups = self.handler._build_grouped_rows(env_model, [], ["state"], ["id"], group_summary=summary)
+
+        self.assertEqual(len(logs.records), 2)
+
+        self.assertEqual(env_model.env.cr.rolled_back, 2)
+        self.assertEqual([group["sample_rows"] for group in groups], [[{"id": 1}], []])
+
     def test_read_rejects_invalid_fields(self):
         result = self.handler._op_read("x.model", {"ids": [1], "fields": 7}, {}, False)
 
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_sort_index():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.api_data_sort_index"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "api_data_sort_index.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _field(field_type, *, store=True, related=None, comodel_name=None, translate=False):
+    return types.SimpleNamespace(
+        type=field_type,
+        store=store,
+        column_type=("x", "x") if store else None,
+        related=related,
+        comodel_name=comodel_name,
+        translate=translate,
+        inherited=False,
+    )
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @contextlib.contextmanager
+    def savepoint(self, flush=True):
+        yield
+
+    def execute(self, query, params=None):
+        self.queries.append((query, list(params or [])))
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class _SubQuery:
+    code = 'SELECT "sc_legacy_fact".id FROM "sc_legacy_fact" WHERE ("sc_legacy_fact"."company_id" IN %s)'
+    params = [(1,)]
+
+
+class _Env(dict):
+    def __init__(self, models, cursor):
+        super().__init__(models)
+        self.cr = cursor
+
+
+def _legacy_model(rows):
+    partner = types.SimpleNamespace(_table="res_partner", _fields={"name": _field("char")})
+    env = _Env({"res.partner": partner}, _Cursor(rows))
+    partner.env = env
+    return types.SimpleNamespace(
+        _name="sc.legacy.fact",
+        _table="sc_legacy_fact",
+        env=env,
+        _fields={
+            "id": _field("integer"),
+            "partner_id": _field("many2one", comodel_name="res.partner"),
+            "partner_name": _field("char", store=False, related="partner_id.name"),
+        },
+        _search=lambda domain: types.SimpleNamespace(subselect=lambda: _SubQuery()),
+        flush_model=lambda fnames=None: None,
+    )
+
+
+class TestApiDataSortIndex(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_sort_index()
+
+    def test_keyset_domain_respects_direction_and_nulls(self):
+        clauses = [("amount", "desc"), ("id", "asc")]
+
+        self.assertEqual(
+            self.module.keyset_domain(clauses, [10.0, 7]),
+            ["|", ("amount", "<", 10.0), "&", ("amount", "=", 10.0), ("id", ">", 7)],
+        )
+        self.assertEqual(
+            self.module.keyset_domain([("date", "asc"), ("id", "asc")], [None, 7]),
+            ["&", ("date", "=", False), ("id", ">", 7)],
+        )
+
+    def test_after_token_round_trip_and_rejects_garbage(self):
+        token = self.module.encode_after_token({"fp": "abc", "m": "index", "id": 42, "p": 9})
+
+        self.assertEqual(self.module.decode_after_token(token)["p"], 9)
+        self.assertIsNone(self.module.decode_after_token("not-a-token"))
+
+    def test_page_from_index_follows_moved_cursor_row(self):
+        ids = [5, 3, 9, 1, 7]
+
+        self.assertEqual(self.module.page_from_index(ids, limit=2, after_id=9, after_pos=2), ([1, 7], 3))
+        self.assertEqual(self.module.page_from_index(ids, limit=2, after_id=9, after_pos=0), ([1, 7], 3))
+        self.assertEqual(self.module.page_from_index(ids, limit=2, offset=1), ([3, 9], 1))
+
+    def test_related_chain_resolves_to_sql_join(self):
+        partner = types.SimpleNamespace(_table="res_partner", _fields={"name": _field("char")})
+        env = {"res.partner": partner}
+        partner.env = env
+        model = types.SimpleNamespace(
+            _table="sc_legacy_fact",
+            env=env,
+            _fields={
+                "id": _field("integer"),
+                "partner_id": _field("many2one", comodel_name="res.partner"),
+                "partner_name": _field("char", store=False, related="partner_id.name"),
+                "computed_score": _field("float", store=False),
+            },
+        )
+
+        join_sql, order_sql = self.module.related_order_sql(model, [("partner_name", "desc")])
+
+        self.assertEqual(join_sql, 'LEFT JOIN "res_partner" j1 ON j1.id = t."partner_id"')
+        self.assertEqual(order_sql, "NULLIF(j1.\"name\", '') DESC NULLS LAST, t.id ASC")
+        self.assertIsNone(self.module.related_order_sql(model, [("computed_score", "asc")]))
+
+    def test_sql_page_compiles_scope_order_and_limit_into_one_select(self):
+        model = _legacy_model([("Beta", 9), ("Alpha", 4)])
+        env = model.env
+
+        ids, last_values = self.module.sql_sorted_page(model, [], [("partner_name", "desc")], limit=2, offset=0)
+
+        self.assertEqual((ids, last_values), ([9, 4], ["Alpha", 4]))
+        query, params = env.cr.queries[0]
+        self.assertIn('WHERE t.id IN (SELECT "sc_legacy_fact".id', query)
+        self.assertNotIn("ANY(", query)
+        self.assertTrue(query.endswith("ORDER BY NULLIF(j1.\"name\", '') DESC NULLS LAST, t.id ASC LIMIT %s OFFSET %s"))
+        self.assertEqual(params, [(1,), 2, 0])
+
+        self.module.sql_sorted_page(model, [], [("partner_name", "desc")], limit=2, after=last_values)
+        query, params = env.cr.queries[1]
+        self.assertIn("(NULLIF(j1.\"name\", '') < %s OR NULLIF(j1.\"name\", '') IS NULL)", query)
+        self.assertIn("NULLIF(j1.\"name\", '') = %s AND t.id > %s", query)
+        self.assertEqual(params, [(1,), "Alpha", "Alpha", 4, 2, 0])
+
+    def test_sql_keyset_condition_follows_null_positions(self):
+        terms = [("t.score", "desc", False), ("t.id", "asc", None)]
+
+        # DESC 默认空值在前：游标在空值行时，其后是全部非空行与同为空值的更大 id。
+        self.assertEqual(
+            self.module.sql_keyset_condition(terms, [None, 7]),
+            ("((t.score IS NOT NULL) OR (t.score IS NULL AND t.id > %s))", [7]),
+        )
+        self.assertEqual(
+            self.module.sql_keyset_condition([("t.name", "asc", True), ("t.id", "asc", None)], [None, 3]),
+            ("((t.name IS NULL AND t.id > %s))", [3]),
+        )
+
+    def test_subquery_accepts_tuple_and_sql_object(self):
+        self.assertEqual(self.module._sql_parts(("SELECT 1", (3,))), ("SELECT 1", [3]))
+        self.assertEqual(self.module._sql_parts(_SubQuery()), (_SubQuery.code, [(1,)]))
+
+    def test_index_expires_after_ttl(self):
+        index = self.module.SortKeyIndex(ttl_seconds=10, max_indexes=2)
+        index.put("q", [3, 1, 2], now=100.0)
+
+        self.assertEqual(list(index.get("q", now=105.0)), [3, 1, 2])
+        self.assertIsNone(index.get("q", now=111.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
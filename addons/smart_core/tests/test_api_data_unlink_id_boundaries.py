@@ -57,7 +57,9 @@ def _load_handler():
         apply_idempotency_identity=lambda data, **kwargs: {**data, **kwargs},
         build_idempotency_conflict_response=lambda **kwargs: {"ok": False},
         build_idempotency_fingerprint=lambda payload, normalize_id_keys=None: "fp",
-        find_recent_audit_entry=lambda *args, **kwargs: None,
+        build_idempotency_in_flight_response=lambda **kwargs: {"ok": False},
+        claim_idempotency_key=lambda *args, **kwargs: {},
+        complete_idempotency_key=lambda *args, **kwargs: False,
         normalize_request_id=lambda value, prefix: value or f"{prefix}_1",
         replay_window_seconds=lambda default, env_key=None: default,
     )
@@ -3,6 +3,7 @@ import importlib.util
 import sys
 import types
 import unittest
+import unittest.mock
 from pathlib import Path
 
 
@@ -10,14 +11,58 @@ class _AccessDenied(Exception):
     pass
 
 
+class _FakeDatabase:
+    """模拟 res_users 与代际计数表；每个事务（游标）共享同一份已提交数据。"""
+
+    def __init__(self):
+        self.users = {7: {"token_version": 3, "active": True}}
+        self.generation = None
+
+    def bump(self):
+        self.generation = (self.generation or 0) + 1
+
+
 class _FakeCursor:
-    def __init__(self, dbname):
+    def __init__(self, dbname, database=None):
         self.dbname = dbname
+        self.database = database or _FakeDatabase()
+        self.cache = {}
+        self.queries = []
+        self._row = None
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        if "to_regclass" in query:
+            self._row = (self.database.generation is not None,)
+        elif "FROM sc_token_revocation_generation" in query:
+            self._row = (self.database.generation,) if self.database.generation is not None else None
+        elif "FROM res_users" in query:
+            user = self.database.users.get(params[0])
+            self._row = (user["token_version"], user["active"]) if user else None
+        else:
+            self._row = None
+
+    def fetchone(self):
+        return self._row
+
+
+class _FakeUsers:
+    def __init__(self, env):
+        self.env = env
+
+    def sudo(self):
+        return self
+
+    def browse(self, user_id):
+        return types.SimpleNamespace(id=user_id, env=self.env)
 
 
 class _FakeEnv:
-    def __init__(self, dbname="db_a"):
-        self.cr = _FakeCursor(dbname)
+    def __init__(self, dbname="db_a", database=None):
+        self.cr = _FakeCursor(dbname, database)
+
+    def __getitem__(self, model):
+        return _FakeUsers(self)
 
 
 class _FakeRequest:
@@ -77,6 +122,21 @@ def _load_auth(fake_request):
         }
     )
 
+    for pkg_name, pkg_path in (
+        ("odoo.addons", root.parent),
+        ("odoo.addons.smart_core", root),
+        ("odoo.addons.smart_core.core", root / "core"),
+    ):
+        package = types.ModuleType(pkg_name)
+        package.__path__ = [str(pkg_path)]
+        sys.modules[pkg_name] = package
+    for core_name in ("source_authority", "token_revocation_cache"):
+        full_name = "odoo.addons.smart_core.core.%s" % core_name
+        core_spec = importlib.util.spec_from_file_location(full_name, root / "core" / ("%s.py" % core_name))
+        core_module = importlib.util.module_from_spec(core_spec)
+        sys.modules[full_name] = core_module
+        core_spec.loader.exec_module(core_module)
+
     name = "auth_token_boundary_test_module"
     sys.modules.pop(name, None)
     spec = importlib.util.spec_from_file_location(name, module_path)
@@ -126,6 +186,112 @@ class TestAuthTokenBoundaries(unittest.TestCase):
         auth = _load_auth(_FakeRequest("default_db", session_db="target_from_session"))
         self.assertEqual(auth._request_db_name(), "target_from_session")
 
+    def test_token_user_revocation_uses_request_cursor_and_cached_state(self):
+        database = _FakeDatabase()
+        auth = _load_auth(_FakeRequest("db_a"))
+        cache = sys.modules["odoo.addons.smart_core.core.token_revocation_cache"]
+
+        env = _FakeEnv("db_a", database)
+        self.assertEqual(auth.resolve_token_user(env, {"user_id": 7, "token_version": 3}).id, 7)
+        with self.assertRaises(_AccessDenied):
+            auth.resolve_token_user(env, {"user_id": 7, "token_version": 2})
+        with self.assertRaises(_AccessDenied):
+            auth.resolve_token_user(env, {"user_id": 99, "token_version": 0})
+
+        # 新事务：代际未变，直接命中缓存，不再读 res_users。
+        env = _FakeEnv("db_a", database)
+        auth.resolve_token_user(env, {"user_id": 7, "token_version": 3})
+        self.assertFalse([query for query in env.cr.queries if "res_users" in query])
+
+        # 撤销事务：写入 + 代际递增；本事务内旁路缓存，提交后其它事务按新代际重新读取。
+        writer = _FakeEnv("db_a", database)
+        database.users[7]["token_version"] = 4
+        cache.bump_token_revocation_generation(writer)
+        database.bump()
+        with self.assertRaises(_AccessDenied):
+            auth.resolve_token_user(writer, {"user_id": 7, "token_version": 3})
+        for _ in range(2):
+            env = _FakeEnv("db_a", database)
+            with self.assertRaises(_AccessDenied):
+                auth.resolve_token_user(env, {"user_id": 7, "token_version": 3})
+        self.assertEqual(auth.resolve_token_user(env, {"user_id": 7, "token_version": 4}).id, 7)
+
+        database.users[7]["active"] = False
+        database.bump()
+        with self.assertRaises(_AccessDenied):
+            auth.resolve_token_user(_FakeEnv("db_a", database), {"user_id": 7, "token_version": 4})
+
+    def test_stale_snapshot_only_caches_under_old_generation(self):
+        database = _FakeDatabase()
+        database.bump()
+        auth = _load_auth(_FakeRequest("db_a"))
+        stale = _FakeDatabase()
+        stale.generation = database.generation
+        stale.users[7] = dict(database.users[7])
+
+        database.users[7]["token_version"] = 4
+        database.bump()
+        # 快照早于撤销提交的请求读到旧代际 + 旧版本，只会记在旧代际下。
+        auth.resolve_token_user(_FakeEnv("db_a", stale), {"user_id": 7, "token_version": 3})
+        with self.assertRaises(_AccessDenied):
+            auth.resolve_token_user(_FakeEnv("db_a", database), {"user_id": 7, "token_version": 3})
+
+    def test_put_under_superseded_generation_is_dropped(self):
+        _load_auth(_FakeRequest("db_a"))
+        cache_module = sys.modules["odoo.addons.smart_core.core.token_revocation_cache"]
+        cache = cache_module.TokenRevocationCache()
+
+        # 旧快照请求先同步代际 1；读库期间另一请求把分区切到代际 2。
+        cache.sync_generation("db_a", 1)
+        cache.sync_generation("db_a", 2)
+        self.assertFalse(cache.put("db_a", 7, (3, True), 1))
+        self.assertIsNone(cache.get("db_a", 7, 2))
+
+        self.assertTrue(cache.put("db_a", 7, (4, True), 2))
+        self.assertEqual(cache.get("db_a", 7, 2), (4, True))
+        cache.clear("db_a")
+        self.assertFalse(cache.put("db_a", 7, (4, True), 2))
+
+    def test_interleaved_stale_request_never_rewinds_generation(self):
+        _load_auth(_FakeRequest("db_a"))
+        cache_module = sys.modules["odoo.addons.smart_core.core.token_revocation_cache"]
+        cache = cache_module.TokenRevocationCache()
+
+        # 旧快照请求 A 先同步代际 1 并缓存撤销前的版本。
+        cache.sync_generation("db_a", 1)
+        self.assertTrue(cache.put("db_a", 7, (3, True), 1))
+        # 撤销提交后请求 B 同步代际 2，尚未读取缓存。
+        cache.sync_generation("db_a", 2)
+        # 另一旧快照请求 C 带着代际 1 到达：不回退分区，读写均落空。
+        cache.sync_generation("db_a", 1)
+        self.assertIsNone(cache.get("db_a", 7, 1))
+        self.assertFalse(cache.put("db_a", 7, (3, True), 1))
+        self.assertEqual(cache.stats()["generations"]["db_a"], 2)
+        # B 按代际 2 读取：不会拿到 C 或 A 的旧版本。
+        self.assertIsNone(cache.get("db_a", 7, 2))
+        self.assertTrue(cache.put("db_a", 7, (4, True), 2))
+        cache.sync_generation("db_a", 1)
+        self.assertEqual(cache.get("db_a", 7, 2), (4, True))
+
+    def test_secret_param_is_cached_per_database(self):
+        reads = []
+
+        class _Params:
+            def sudo(self):
+                return self
+
+            def get_param(self, key):
+                reads.append(key)
+                return "param-secret"
+
+        fake_request = _FakeRequest("db_a")
+        fake_request.env.__class__ = type("_ParamEnv", (_FakeEnv,), {"__getitem__": lambda self, model: _Params()})
+        auth = _load_auth(fake_request)
+        with unittest.mock.patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(auth._get_secret_key(), "param-secret")
+            self.assertEqual(auth._get_secret_key(), "param-secret")
+        self.assertEqual(reads, ["sc.jwt.secret"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -36,8 +36,22 @@ class _EmptySearchModel:
         return []
 
 
+class _Cursor:
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, list(params or [])))
+
+    def fetchall(self):
+        return self.rows
+
+
 class _Env(dict):
-    pass
+    def __init__(self, *args, rows=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cr = _Cursor(rows)
 
 
 def _load_handler():
@@ -167,6 +181,72 @@ class TestChatterTimelineBoundaries(unittest.TestCase):
         self.assertEqual(data["counts"]["audit"], 0)
         self.assertEqual(data["auxiliary_authorities"], [])
         self.assertEqual(meta["auxiliary_authorities"], [])
+        query, _params = handler.env.cr.executed[0]
+        self.assertEqual(query.count("UNION ALL"), 1)
+        self.assertNotIn("sc_audit_log", query)
+
+    def test_cursor_round_trip_and_invalid_cursor(self):
+        cursor = self.module.encode_timeline_cursor(("2026-01-02 03:04:05", "audit", 9))
+        self.assertEqual(self.module.decode_timeline_cursor(cursor), (("2026-01-02 03:04:05", "audit", 9), None))
+        self.assertEqual(self.module.decode_timeline_cursor(""), (None, None))
+        for bad in ("bad", self.module.encode_timeline_cursor(("2026-01-02", "unknown", 9))):
+            self.assertEqual(self.module.decode_timeline_cursor(bad), (None, "invalid_cursor"))
+
+        handler = self.module.ChatterTimelineHandler(
+            env={"x.model": object()},
+            params={"model": "x.model", "res_id": 7, "cursor": "bad"},
+        )
+        result = handler.handle()
+        self.assertEqual(result["code"], 400)
+        self.assertEqual(result["error"]["message"], "cursor 无效")
+
+    def test_page_overfetches_one_row_and_applies_keyset_to_every_branch(self):
+        rows = [("2026-01-0%d 00:00:00" % day, "message", 10 - day) for day in (3, 2, 1)]
+        env = _Env(
+            {"x.model": _Model(), "mail.message": _EmptySearchModel(), "sc.audit.log": _EmptySearchModel()},
+            rows=rows,
+        )
+        cursor = self.module.encode_timeline_cursor(("2026-01-04 00:00:00", "message", 5))
+        handler = self.module.ChatterTimelineHandler(
+            env=env,
+            params={"model": "x.model", "res_id": 7, "limit": 2, "cursor": cursor},
+        )
+        handler._hydrate_rows = lambda page: [{"type": kind, "id": rid} for _ts, kind, rid in page]
+
+        data, _meta = handler.handle()
+
+        self.assertTrue(data["has_more"])
+        self.assertEqual([item["id"] for item in data["items"]], [7, 8])
+        self.assertEqual(data["counts"]["messages"], 2)
+        self.assertEqual(self.module.decode_timeline_cursor(data["next_cursor"])[0], rows[1])
+        query, params = env.cr.executed[0]
+        # 同 kind 分支按 (ts, id) 截断，其余分支只比较 ts；消息分支不再 COALESCE 以便走索引。
+        self.assertEqual(query.count("(m.date, m.id) < (%s::timestamp, %s::int)"), 1)
+        self.assertNotIn("COALESCE(m.date", query)
+        self.assertNotIn("%s::varchar, %s::int", query)
+        self.assertEqual(params[:6], ["message", "x.model", 7, "2026-01-04 00:00:00", 5, 3])
+        self.assertEqual(params[-1], 3)
+
+    def test_message_index_is_created_only_when_mail_message_exists(self):
+        class _IndexCursor(_Cursor):
+            def __init__(self, row):
+                super().__init__()
+                self.row = row
+
+            def fetchone(self):
+                return self.row
+
+        without_mail = _IndexCursor((False, False))
+        self.assertFalse(self.module.ensure_message_timeline_index(without_mail))
+        self.assertEqual(len(without_mail.executed), 1)
+
+        indexed = _IndexCursor((True, True))
+        self.assertFalse(self.module.ensure_message_timeline_index(indexed))
+        self.assertEqual(len(indexed.executed), 1)
+
+        missing = _IndexCursor((True, False))
+        self.assertTrue(self.module.ensure_message_timeline_index(missing))
+        self.assertIn("ON mail_message (model, res_id, date DESC, id DESC)", missing.executed[-1][0])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_contract_cache():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.contract_cache"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "contract_cache.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Cursor:
+    def __init__(self, generation=0):
+        self.generation = generation
+        self.cache = {}
+        self.postcommit = _Callbacks()
+        self.queries = 0
+
+    def execute(self, query, params=None):
+        self.queries += 1
+
+    def fetchone(self):
+        return (self.generation,)
+
+
+class _Callbacks:
+    def __init__(self):
+        self.items = []
+
+    def add(self, func):
+        self.items.append(func)
+
+
+class _Env:
+    def __init__(self, cursor, group_ids=(1, 2)):
+        self.cr = cursor
+        self.registry = object()
+        self.context = {"lang": "zh_CN"}
+        self.company = types.SimpleNamespace(id=1)
+        self.user = types.SimpleNamespace(groups_id=types.SimpleNamespace(ids=list(group_ids)))
+
+
+class TestContractCache(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_contract_cache()
+        self.module.configure_contract_cache(max_entries=2, max_entry_bytes=1024)
+
+    def test_hit_returns_isolated_copy(self):
+        env = _Env(_Cursor())
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {"layout": [{"name": "amount"}]}
+
+        first = self.module.get_or_build(env, "k", build)
+        first["layout"].append({"name": "mutated"})
+        second = self.module.get_or_build(env, "k", build)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second, {"layout": [{"name": "amount"}]})
+        self.assertEqual(self.module.contract_cache().stats()["hits"], 1)
+
+    def test_generation_read_once_per_transaction(self):
+        cursor = _Cursor()
+        env = _Env(cursor)
+
+        for key in ("a", "b", "a"):
+            self.module.get_or_build(env, key, lambda: {"k": key})
+
+        self.assertEqual(cursor.queries, 1)
+
+    def test_generation_change_drops_entries_across_workers(self):
+        env = _Env(_Cursor(generation=1))
+        self.module.get_or_build(env, "k", lambda: {"v": 1})
+
+        next_env = _Env(_Cursor(generation=2))
+        value = self.module.get_or_build(next_env, "k", lambda: {"v": 2})
+
+        self.assertEqual(value, {"v": 2})
+        self.assertEqual(self.module.contract_cache().stats()["invalidations"], 1)
+
+    def test_lru_eviction_and_oversize_skip(self):
+        env = _Env(_Cursor())
+        for key in ("a", "b", "c"):
+            self.module.get_or_build(env, key, lambda: {"k": 1})
+        self.module.get_or_build(env, "big", lambda: {"blob": "x" * 4096})
+
+        stats = self.module.contract_cache().stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["oversize_skips"], 1)
+
+    def test_bump_bypasses_cache_for_writing_transaction(self):
+        cursor = _Cursor()
+        env = _Env(cursor)
+        self.module.get_or_build(env, "k", lambda: {"v": 1})
+
+        self.module.bump_contract_cache_generation(env, reason="event:ir.ui.view.write")
+        self.module.bump_contract_cache_generation(env, reason="event:ir.ui.view.write")
+        value = self.module.get_or_build(env, "k", lambda: {"v": 2})
+
+        self.assertEqual(value, {"v": 2})
+        self.assertEqual(len(cursor.postcommit.items), 1)
+        self.assertEqual(self.module.contract_cache().stats()["entries"], 0)
+
+    def test_key_shared_by_group_set_not_by_user(self):
+        key_a = self.module.contract_cache_key(_Env(_Cursor(), group_ids=(2, 1)), kind="view", model="project.project")
+        key_b = self.module.contract_cache_key(_Env(_Cursor(), group_ids=(1, 2)), kind="view", model="project.project")
+        key_c = self.module.contract_cache_key(_Env(_Cursor(), group_ids=(1, 3)), kind="view", model="project.project")
+
+        self.assertEqual(key_a, key_b)
+        self.assertNotEqual(key_a, key_c)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_version_vector():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.contract_version_vector"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "contract_version_vector.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Cursor:
+    def __init__(self, row_factory):
+        self.row_factory = row_factory
+        self.executed = []
+        self._row = None
+
+    @contextlib.contextmanager
+    def savepoint(self, flush=True):
+        yield
+
+    def execute(self, query, params=None):
+        self.executed.append((query, list(params or [])))
+        self._row = self.row_factory(query, params)
+
+    def fetchone(self):
+        return self._row
+
+
+class _Model:
+    def __init__(self, table):
+        self._table = table
+        self._auto = True
+        self._abstract = False
+
+
+class _Env:
+    def __init__(self, cursor, models=None):
+        self.cr = cursor
+        self.uid = 7
+        self.company = types.SimpleNamespace(id=1)
+        self.context = {"lang": "zh_CN"}
+        self._models = models or {}
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def __getitem__(self, name):
+        return self._models[name]
+
+
+def _rows(values):
+    def factory(query, params):
+        count = query.count("(SELECT")
+        return tuple(values.get(idx, "v%s" % idx) for idx in range(count))
+
+    return factory
+
+
+class TestContractVersionVector(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_version_vector()
+
+    def test_vector_reads_all_sources_in_one_round_trip(self):
+        cursor = _Cursor(_rows({}))
+        env = _Env(cursor, {"app.menu.config": _Model("app_menu_config"), "app.view.config": _Model("app_view_config")})
+
+        vector = self.module.build_contract_version_vector(env, model="project.project", action_id="12")
+
+        self.assertEqual(len(cursor.executed), 1)
+        query, params = cursor.executed[0]
+        self.assertIn("FROM app_view_config WHERE model = ANY(%s)", query)
+        self.assertIn("FROM app_menu_config", query)
+        self.assertIn(["project.project"], params)
+        self.assertIn(12, params)
+        self.assertEqual(vector["action_id"], 12)
+        self.assertIn("cfg:app.view.config", vector["sources"])
+        self.assertIn("menu_config", vector["sources"])
+
+    def test_etag_changes_when_any_source_version_changes(self):
+        env_before = _Env(_Cursor(_rows({})))
+        env_after = _Env(_Cursor(_rows({2: "2026-10-17 08:00:00:41"})))
+
+        before = self.module.contract_version_etag(
+            self.module.build_contract_version_vector(env_before, model="res.partner")
+        )
+        again = self.module.contract_version_etag(
+            self.module.build_contract_version_vector(env_before, model="res.partner")
+        )
+        after = self.module.contract_version_etag(
+            self.module.build_contract_version_vector(env_after, model="res.partner")
+        )
+
+        self.assertTrue(before.startswith("cv1-"))
+        self.assertEqual(before, again)
+        self.assertNotEqual(before, after)
+
+    def test_etag_separates_request_shapes_and_users(self):
+        env = _Env(_Cursor(_rows({})))
+        base = self.module.build_contract_version_vector(env, model="res.partner", request_key={"view_type": "form"})
+        other_shape = self.module.build_contract_version_vector(env, model="res.partner", request_key={"view_type": "tree"})
+        env.uid = 8
+        other_user = self.module.build_contract_version_vector(env, model="res.partner", request_key={"view_type": "form"})
+
+        etags = {self.module.contract_version_etag(item) for item in (base, other_shape, other_user)}
+
+        self.assertEqual(len(etags), 3)
+
+    def test_query_failure_falls_back_to_full_build(self):
+        def broken(query, params):
+            raise RuntimeError("relation does not exist")
+
+        env = _Env(_Cursor(broken))
+
+        vector = self.module.build_contract_version_vector(env, model="res.partner")
+
+        self.assertIsNone(vector)
+        self.assertEqual(self.module.contract_version_etag(vector), "")
+
+    def test_registered_sources_join_the_vector(self):
+        self.module.register_contract_version_source("x.extension.policy", "target_model")
+        cursor = _Cursor(_rows({}))
+        env = _Env(cursor, {"x.extension.policy": _Model("x_extension_policy")})
+
+        vector = self.module.build_contract_version_vector(env, model="res.partner")
+
+        self.assertIn("FROM x_extension_policy WHERE target_model = ANY(%s)", cursor.executed[0][0])
+        self.assertIn("cfg:x.extension.policy", vector["sources"])
+
+    def test_modelless_etag_changes_when_a_record_rule_is_edited(self):
+        labels, _query, _params = self.module._build_query(_Env(_Cursor(_rows({}))), models=[], action_id=None)
+        perm_index = labels.index("perm")
+        self.assertIn("model", labels)
+
+        def etag(perm_version, **kwargs):
+            env = _Env(_Cursor(_rows({perm_index: perm_version})))
+            return self.module.contract_version_etag(
+                self.module.build_contract_version_vector(env, **kwargs)
+            )
+
+        for kwargs in ({"request_key": {"op": "nav"}}, {"menu_id": 5, "request_key": {"op": "menu"}}):
+            before = etag("2026-10-17 08:00:00:120", **kwargs)
+            self.assertEqual(before, etag("2026-10-17 08:00:00:120", **kwargs))
+            # ir.rule 编辑推进 max(write_date)，菜单/导航 ETag 随之变化。
+            self.assertNotEqual(before, etag("2026-10-17 09:30:00:120", **kwargs))
+
+        query = self.module._build_query(_Env(_Cursor(_rows({}))), models=[], action_id=None)[1]
+        self.assertIn("FROM ir_rule", query)
+        self.assertIn("FROM ir_model_access", query)
+
+
+if __name__ == "__main__":
+    unittest.main()
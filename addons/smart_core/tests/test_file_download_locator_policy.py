@@ -251,6 +251,97 @@ class TestFileDownloadLocatorPolicy(unittest.TestCase):
         self.assertEqual(result["code"], 404)
         self.assertEqual(result["message"], "旧系统未返回该历史附件文件")
 
+    def test_legacy_path_source_is_resolved_without_reading_file(self):
+        module = _load_handler()
+
+        class _Attachment:
+            id = 98333
+            type = "url"
+            url = "legacy-file://UploadFile/UserFile/2026/big.dwg"
+            name = "big.dwg"
+            mimetype = ""
+            res_model = ""
+            res_id = 0
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            target = Path(tmpdir) / "UploadFile" / "UserFile" / "2026" / "big.dwg"
+            target.parent.mkdir(parents=True)
+            target.write_bytes(b"x" * 2048)
+            old_value = os.environ.get("SC_LEGACY_FILE_ROOTS")
+            os.environ["SC_LEGACY_FILE_ROOTS"] = tmpdir
+            try:
+                handler = module.FileDownloadHandler(env=_Env())
+                handler._read_download_source = lambda _source: self.fail("stream sources must not be read")
+                source = handler._download_source(_Attachment())
+            finally:
+                if old_value is None:
+                    os.environ.pop("SC_LEGACY_FILE_ROOTS", None)
+                else:
+                    os.environ["SC_LEGACY_FILE_ROOTS"] = old_value
+
+        self.assertEqual(source["kind"], "path")
+        self.assertEqual(source["ref"], "UploadFile/UserFile/2026/big.dwg")
+        self.assertEqual(source["size"], 2048)
+
+    def test_prefetch_cache_short_circuits_remote_resolution(self):
+        module = _load_handler()
+
+        class _Attachment:
+            id = 98334
+            type = "url"
+            url = "legacy-file://UploadFile/UserFile/2026/remote.pdf"
+            name = "remote.pdf"
+            mimetype = "application/pdf"
+            res_model = ""
+            res_id = 0
+
+        class _Cache:
+            def __init__(self, cached):
+                self.cached = cached
+                self.enqueued = []
+
+            def sudo(self):
+                return self
+
+            def cached_source(self, attachment):
+                return self.cached
+
+            def enqueue_attachments(self, attachments):
+                self.enqueued.append(attachments.id)
+                return 1
+
+        hit = {"kind": "cache", "ref": "a" * 64, "path": Path("/tmp/a"), "name": "remote.pdf", "size": 10}
+        env = _Env()
+        env["sc.legacy.file.cache"] = _Cache(hit)
+        handler = module.FileDownloadHandler(env=env)
+        handler._resolve_download_source = lambda _attachment: self.fail("cache hit must not touch the legacy server")
+        self.assertIs(handler._download_source(_Attachment()), hit)
+
+        miss = _Cache(None)
+        env["sc.legacy.file.cache"] = miss
+        handler = module.FileDownloadHandler(env=env)
+        handler._resolve_download_source = lambda _attachment: {"kind": "remote_path", "ref": "UploadFile/x.pdf"}
+        self.assertEqual(handler._download_source(_Attachment())["kind"], "remote_path")
+        self.assertEqual(miss.enqueued, [98334])
+        self.assertEqual(handler._download_source(_Attachment(), use_cache=False)["kind"], "remote_path")
+        self.assertEqual(miss.enqueued, [98334])
+
+    def test_remote_legacy_candidates_keep_probe_order(self):
+        module = _load_handler()
+        old_base = os.environ.get("SC_LEGACY_FILE_HTTP_BASE")
+        os.environ["SC_LEGACY_FILE_HTTP_BASE"] = "https://files.example/legacy"
+        try:
+            candidates = module._remote_legacy_file_candidates("~/File_New/SignalPic/a.jpg")
+        finally:
+            if old_base is None:
+                os.environ.pop("SC_LEGACY_FILE_HTTP_BASE", None)
+            else:
+                os.environ["SC_LEGACY_FILE_HTTP_BASE"] = old_base
+
+        urls = [url for url, _candidate in candidates]
+        self.assertEqual(urls[0], "https://files.example/legacy/~/File_New/SignalPic/a.jpg")
+        self.assertIn("https://files.example/legacy/UploadFile/OldSystem/File_New/SignalPic/a.jpg", urls)
+
     def test_online_legacy_attachment_fallback_can_be_disabled(self):
         module = _load_handler()
         old_value = os.environ.get(module.LEGACY_ONLINE_ATTACHMENT_FALLBACK_ENV)
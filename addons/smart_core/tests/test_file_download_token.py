@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_token_module():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.file_download_token"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "file_download_token.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Params:
+    def __init__(self, values):
+        self.values = values
+
+    def sudo(self):
+        return self
+
+    def get_param(self, key, default=False):
+        return self.values.get(key, default)
+
+
+class _Env:
+    uid = 7
+
+    def __init__(self, dbname="sc_demo", **params):
+        self.cr = types.SimpleNamespace(dbname=dbname)
+        self.params = _Params({"database.secret": "s3cret", **params})
+
+    def __getitem__(self, model_name):
+        if model_name == "ir.config_parameter":
+            return self.params
+        raise KeyError(model_name)
+
+
+class TestFileDownloadToken(unittest.TestCase):
+    def setUp(self):
+        self.target = _load_token_module()
+
+    def _issue(self, env, **kwargs):
+        values = {"attachment_id": 42, "source": "path", "ref": "UploadFile/a.pdf", "name": "a.pdf", "now": 1000}
+        values.update(kwargs)
+        return self.target.issue_download_token(env, **values)
+
+    def test_round_trip_carries_resolved_source(self):
+        env = _Env()
+        issued = self._issue(env)
+
+        payload = self.target.verify_download_token(env, issued["token"], now=1100)
+
+        self.assertEqual(payload["att"], 42)
+        self.assertEqual(payload["uid"], 7)
+        self.assertEqual(payload["src"], "path")
+        self.assertEqual(payload["ref"], "UploadFile/a.pdf")
+        self.assertEqual(issued["expires_at"], 1000 + self.target.DEFAULT_TOKEN_TTL_SECONDS)
+        self.assertTrue(issued["url"].startswith("/api/file/download/"))
+        self.assertTrue(issued["url"].endswith("?db=sc_demo"))
+
+    def test_rejects_tampered_expired_and_foreign_db_tokens(self):
+        env = _Env()
+        token = self._issue(env)["token"]
+        body, signature = token.split(".")
+        forged = self._issue(env, attachment_id=43)["token"].split(".")[0]
+
+        with self.assertRaises(self.target.FileDownloadTokenError):
+            self.target.verify_download_token(env, f"{forged}.{signature}", now=1000)
+        with self.assertRaises(self.target.FileDownloadTokenError):
+            self.target.verify_download_token(env, token, now=1000 + self.target.DEFAULT_TOKEN_TTL_SECONDS + 1)
+        with self.assertRaises(self.target.FileDownloadTokenError):
+            self.target.verify_download_token(_Env(dbname="other"), token, now=1000)
+        with self.assertRaises(self.target.FileDownloadTokenError):
+            self.target.verify_download_token(_Env(**{"database.secret": "rotated"}), token, now=1000)
+        self.assertEqual(self.target.verify_download_token(env, f"{body}.{signature}", now=1000)["att"], 42)
+
+    def test_ttl_and_inline_limit_are_configurable(self):
+        env = _Env(**{self.target.TOKEN_TTL_PARAM: "999999", self.target.INLINE_MAX_BYTES_PARAM: "0"})
+
+        self.assertEqual(self.target.token_ttl_seconds(env), self.target.MAX_TOKEN_TTL_SECONDS)
+        self.assertEqual(self.target.inline_max_bytes(env), 0)
+        self.assertEqual(self.target.normalize_delivery("STREAM"), "stream")
+        self.assertEqual(self.target.normalize_delivery("base64"), "auto")
+        with self.assertRaises(self.target.FileDownloadTokenError):
+            self._issue(env, source="ftp")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -81,6 +81,25 @@ class TestFileUploadBoundaries(unittest.TestCase):
         self.assertEqual(result["code"], 400)
         self.assertEqual(result["error"]["message"], "res_id 无效")
 
+    def test_unknown_chunked_action_returns_bad_request(self):
+        handler = self.module.FileUploadHandler(env={}, params={"action": "resume"})
+
+        result = handler.handle()
+
+        self.assertEqual(result["code"], 400)
+
+    def test_chunked_init_rejects_size_above_upload_limit(self):
+        session_model = type("_Session", (), {"max_upload_bytes": lambda self: 1024})()
+        handler = self.module.FileUploadHandler(
+            env={"res.partner": object(), "sc.file.upload.session": session_model},
+            params={"action": "init", "model": "res.partner", "res_id": 3, "total_size": 2048},
+        )
+
+        result = handler.handle()
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["code"], 413)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import importlib.util
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+TOKEN = "0123456789abcdef0123456789abcdef"
+
+
+def _load_spool_module():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.file_upload_spool"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "file_upload_spool.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestFileUploadSpool(unittest.TestCase):
+    def setUp(self):
+        self.target = _load_spool_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.path = self.target.spool_path(self.root / "spool", TOKEN)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _append(self, offset, data, **kwargs):
+        values = {"total_size": 10, "max_chunk_bytes": 4}
+        values.update(kwargs)
+        return self.target.append_chunk(self.path, offset=offset, data=data, **values)
+
+    def test_chunks_append_in_offset_order_and_resume(self):
+        self.assertEqual(self._append(0, b"abcd"), 4)
+        with self.assertRaises(self.target.UploadChunkError) as ctx:
+            self._append(0, b"abcd")
+        self.assertEqual((ctx.exception.code, ctx.exception.offset), (409, 4))
+
+        self.assertEqual(self._append(4, b"efgh", sha256=hashlib.sha256(b"efgh").hexdigest()), 8)
+        self.assertEqual(self._append(8, b"ij"), 10)
+        self.assertEqual(self.path.read_bytes(), b"abcdefghij")
+
+    def test_rejects_oversize_overflow_empty_and_bad_checksum(self):
+        cases = (
+            (0, b"abcde", {}, 413),
+            (0, b"", {}, 400),
+            (0, b"abcd", {"total_size": 3}, 413),
+            (0, b"abcd", {"sha256": "0" * 64}, 422),
+        )
+        for offset, data, kwargs, code in cases:
+            with self.subTest(code=code, data=data):
+                with self.assertRaises(self.target.UploadChunkError) as ctx:
+                    self._append(offset, data, **kwargs)
+                self.assertEqual(ctx.exception.code, code)
+        self.assertEqual(self.target.spooled_size(self.path), 0)
+        with self.assertRaises(self.target.UploadChunkError):
+            self.target.spool_path(self.root, "../etc/passwd")
+
+    def test_install_moves_into_filestore_and_deduplicates(self):
+        self._append(0, b"abcd", total_size=4)
+        sha1, sha256, size = self.target.file_digests(self.path)
+        self.assertEqual((sha1, sha256, size), (hashlib.sha1(b"abcd").hexdigest(), hashlib.sha256(b"abcd").hexdigest(), 4))
+
+        full_path = self.root / "filestore" / sha1[:2] / sha1
+        self.assertFalse(self.target.install_into_filestore(self.path, full_path))
+        self.assertEqual(full_path.read_bytes(), b"abcd")
+        self.assertFalse(self.path.exists())
+
+        self._append(0, b"abcd", total_size=4)
+        self.assertTrue(self.target.install_into_filestore(self.path, full_path))
+        self.assertFalse(self.path.exists())
+        self.assertEqual(sorted(p.name for p in full_path.parent.iterdir()), [sha1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import threading
+import types
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_module():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.global_message_notify"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "global_message_notify.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Callbacks:
+    def __init__(self):
+        self.data = {}
+        self.callbacks = []
+
+    def add(self, func):
+        self.callbacks.append(func)
+
+
+class TestGlobalMessageNotify(unittest.TestCase):
+    def setUp(self):
+        self.target = _load_module()
+
+    def test_notify_partners_coalesces_per_transaction(self):
+        sent = []
+        self.target._send = lambda dbname, partner_ids: sent.append((dbname, sorted(partner_ids)))
+        env = SimpleNamespace(cr=SimpleNamespace(dbname="sc", postcommit=_Callbacks()))
+
+        self.target.notify_partners(env, [3, 1])
+        self.target.notify_partners(env, [3, "2", 0, None])
+        self.assertEqual(len(env.cr.postcommit.callbacks), 1)
+        self.assertEqual(sent, [])
+
+        env.cr.postcommit.callbacks[0]()
+        self.assertEqual(sent, [("sc", [1, 2, 3])])
+
+    def test_payloads_are_chunked_and_round_trip(self):
+        payloads = self.target.encode_payloads("sc", range(1, self.target.MAX_PARTNERS_PER_NOTIFY + 3))
+        self.assertEqual(len(payloads), 2)
+        dbname, partner_ids = self.target.decode_payload(payloads[1])
+        self.assertEqual((dbname, partner_ids), ("sc", {self.target.MAX_PARTNERS_PER_NOTIFY + 1, self.target.MAX_PARTNERS_PER_NOTIFY + 2}))
+        self.assertEqual(self.target.decode_payload("not json"), ("", set()))
+
+    def test_dispatcher_wakes_only_affected_partner(self):
+        dispatcher = self.target.GlobalMessageDispatcher()
+        results = {}
+
+        def _wait(partner_id):
+            version = dispatcher.version("sc", partner_id)
+            results[partner_id] = dispatcher.wait("sc", partner_id, version, 2)
+
+        waiters = [threading.Thread(target=_wait, args=(partner_id,)) for partner_id in (7, 8)]
+        for thread in waiters:
+            thread.start()
+        while dispatcher.stats()["waiters"] < 2:
+            threading.Event().wait(0.01)
+
+        self.assertEqual(dispatcher.publish("sc", [7]), 1)
+        waiters[0].join(1)
+        self.assertTrue(results[7])
+        self.assertNotIn(8, results)
+
+        dispatcher.publish("other_db", [8])
+        self.assertNotIn(8, results)
+        dispatcher.wake_all()
+        waiters[1].join(1)
+        self.assertTrue(results[8])
+
+    def test_wait_returns_immediately_when_version_already_moved(self):
+        dispatcher = self.target.GlobalMessageDispatcher()
+        version = dispatcher.version("sc", 5)
+        dispatcher.publish("sc", [5])
+        self.assertTrue(dispatcher.wait("sc", 5, version, 10))
+        self.assertFalse(dispatcher.wait("sc", 5, dispatcher.version("sc", 5), 0.01))
+        self.assertEqual(dispatcher.stats()["timeouts"], 1)
+
+    def test_long_poll_slots_are_capped_per_process(self):
+        dispatcher = self.target.GlobalMessageDispatcher()
+
+        self.assertTrue(dispatcher.acquire_poll(2))
+        self.assertTrue(dispatcher.acquire_poll(2))
+        self.assertFalse(dispatcher.has_capacity(2))
+        self.assertFalse(dispatcher.acquire_poll(2))
+
+        dispatcher.release_poll()
+        self.assertTrue(dispatcher.has_capacity(2))
+        self.assertFalse(dispatcher.acquire_poll(0))
+        stats = dispatcher.stats()
+        self.assertEqual(stats["active_polls"], 1)
+        self.assertEqual(stats["rejected"], 2)
+
+    def test_long_poll_only_on_evented_process_or_longpolling_route(self):
+        odoo = sys.modules["odoo"]
+        had_evented = hasattr(odoo, "evented")
+        previous = getattr(odoo, "evented", None)
+        try:
+            odoo.evented = False
+            self.assertFalse(self.target.long_poll_supported("/api/v1/intent"))
+            self.assertFalse(self.target.long_poll_supported(""))
+            self.assertTrue(self.target.long_poll_supported("/longpolling/api/v1/intent"))
+            odoo.evented = True
+            self.assertTrue(self.target.long_poll_supported("/api/v1/intent"))
+        finally:
+            if had_evented:
+                odoo.evented = previous
+            else:
+                del odoo.evented
+
+    def test_revision_cursor_carries_in_progress_xids(self):
+        encode = self.target.encode_revision_cursor
+        decode = self.target.decode_revision_cursor
+
+        self.assertEqual(encode(120, []), 120)
+        self.assertEqual(encode(120, [117, 101, 117]), "120:101,117")
+        self.assertEqual(decode("120:101,117"), ((120, (101, 117)), None))
+        self.assertEqual(decode(120), ((120, ()), None))
+        self.assertEqual(decode(None), ((0, ()), None))
+        self.assertEqual(decode("120:130")[1], "invalid")
+        self.assertEqual(decode("abc")[1], "invalid")
+        self.assertEqual(decode(True)[1], "invalid")
+        # 进行中事务过多时退回到最小事务号：之后的行重复下发，不会漏。
+        many = list(range(1000, 1000 + self.target.MAX_CURSOR_PENDING + 1))
+        self.assertEqual(encode(5000, many), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -29,6 +29,7 @@ def _load_idempotency():
     _install_module(
         "odoo.addons.smart_core.utils.reason_codes",
         REASON_IDEMPOTENCY_CONFLICT="IDEMPOTENCY_CONFLICT",
+        REASON_IDEMPOTENCY_IN_FLIGHT="IDEMPOTENCY_IN_FLIGHT",
         failure_meta_for_reason=lambda reason: {"reason_code": reason},
     )
 
@@ -64,6 +65,34 @@ class TestIdempotencyBoundaries(unittest.TestCase):
 
         self.assertEqual(left, right)
 
+    def test_claim_decision_maps_store_states(self):
+        decide = self.module.idempotency_decision_from_claim
+
+        claimed = decide({"status": "claimed", "id": 5, "replay_window_expired": True})
+        self.assertEqual(claimed["claim_id"], 5)
+        self.assertTrue(claimed["replay_window_expired"])
+        self.assertFalse(claimed["conflict"] or claimed["in_flight"])
+
+        replay = decide({"status": "replay", "id": 5, "result": {"ok": True}, "entry": {"audit_id": 9}})
+        self.assertEqual(replay["replay_payload"], {"ok": True})
+        self.assertEqual(replay["replay_entry"], {"audit_id": 9})
+        self.assertEqual(replay["claim_id"], 0)
+
+        self.assertTrue(decide({"status": "in_flight"})["in_flight"])
+        self.assertTrue(decide({"status": "conflict", "id": 5})["conflict"])
+        # 完成记录缺少结果时不回放也不重新执行
+        self.assertTrue(decide({"status": "replay", "id": 5, "result": None})["conflict"])
+
+    def test_in_flight_response_is_a_409_rejection(self):
+        result = self.module.build_idempotency_in_flight_response(
+            intent_type="api.data.batch", request_id="r1", idempotency_key="k1", trace_id="t1"
+        )
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["code"], 409)
+        self.assertEqual(result["error"]["reason_code"], "IDEMPOTENCY_IN_FLIGHT")
+        self.assertEqual(result["data"]["idempotency_key"], "k1")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import importlib.util
+import sys
+import tempfile
+import threading
+import types
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+PDF_BYTES = b"%PDF-1.4 legacy contract scan"
+
+
+def _load_cache_module():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.legacy_file_cache"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "legacy_file_cache.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class _LegacyFileServer(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        type(self).hits[self.path] = type(self).hits.get(self.path, 0) + 1
+        if self.path.startswith("/UploadFile/"):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(PDF_BYTES)))
+            self.end_headers()
+            self.wfile.write(PDF_BYTES)
+            return
+        self.send_response(500 if self.path.startswith("/boom") else 404)
+        self.end_headers()
+
+    def log_message(self, *_args):
+        pass
+
+
+class TestLegacyFileCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _LegacyFileServer)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.target = _load_cache_module()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        _LegacyFileServer.hits = {}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fetch_falls_through_candidates_into_content_addressed_store(self):
+        result = self.target.fetch_to_store(
+            self.root,
+            [f"{self.base_url}/a.pdf", f"{self.base_url}/UploadFile/a.pdf"],
+            timeout=5,
+        )
+
+        digest = hashlib.sha256(PDF_BYTES).hexdigest()
+        self.assertEqual(result["sha256"], digest)
+        self.assertEqual(result["size"], len(PDF_BYTES))
+        self.assertEqual(result["mimetype"], "application/pdf")
+        self.assertTrue(result["url"].endswith("/UploadFile/a.pdf"))
+        self.assertEqual(self.target.cached_file(self.root, digest).read_bytes(), PDF_BYTES)
+        self.assertEqual(list((self.root / ".tmp").iterdir()), [])
+
+    def test_all_404_is_missing_and_server_errors_are_retryable(self):
+        with self.assertRaises(self.target.LegacyFetchMissing):
+            self.target.fetch_to_store(self.root, [f"{self.base_url}/gone.pdf", f"{self.base_url}/gone2.pdf"], timeout=5)
+        with self.assertRaises(self.target.LegacyFetchError):
+            self.target.fetch_to_store(self.root, [f"{self.base_url}/gone.pdf", f"{self.base_url}/boom.pdf"], timeout=5)
+        with self.assertRaises(self.target.LegacyFetchError):
+            self.target.fetch_to_store(self.root, [f"{self.base_url}/UploadFile/a.pdf"], timeout=5, max_bytes=4)
+        self.assertEqual(list((self.root / ".tmp").iterdir()), [])
+        self.assertEqual(self.target.retry_delay_seconds(1), self.target.RETRY_BASE_SECONDS)
+        self.assertEqual(self.target.retry_delay_seconds(30), self.target.RETRY_MAX_SECONDS)
+
+    def test_fetch_many_keeps_order_and_dedupes_same_content(self):
+        jobs = [
+            {"id": 1, "urls": [f"{self.base_url}/UploadFile/a.pdf"]},
+            {"id": 2, "urls": [f"{self.base_url}/missing.pdf"]},
+            {"id": 3, "urls": [f"{self.base_url}/UploadFile/copy-of-a.pdf"]},
+            {"id": 4, "urls": [f"{self.base_url}/boom.pdf"]},
+        ]
+
+        outcomes = self.target.fetch_many(self.root, jobs, concurrency=2, timeout=5)
+
+        self.assertEqual([(item["id"], item["status"]) for item in outcomes], [(1, "done"), (2, "missing"), (3, "done"), (4, "error")])
+        self.assertEqual(outcomes[0]["result"]["sha256"], outcomes[2]["result"]["sha256"])
+        stored = [path for path in self.root.rglob("*") if path.is_file()]
+        self.assertEqual(len(stored), 1)
+        self.assertIsNone(self.target.cached_file(self.root, "not-a-digest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
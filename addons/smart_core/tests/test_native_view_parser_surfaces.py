@@ -49,9 +49,21 @@ def _install_lxml_shim():
     sys.modules["lxml.etree"] = etree
 
 
+def _install_core_package(root):
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    if not hasattr(smart_core_pkg, "__path__"):
+        smart_core_pkg.__path__ = [str(root)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    if not hasattr(core_pkg, "__path__"):
+        core_pkg.__path__ = [str(root / "core")]
+
+
 def _load_calendar_mixin():
     _install_lxml_shim()
     root = Path(__file__).resolve().parents[1]
+    _install_core_package(root)
     module_path = root / "app_config_engine" / "services" / "view_Parser" / "parsers_Calendar_Gantt Activity.py"
     spec = importlib.util.spec_from_file_location("calendar_gantt_activity_parser_probe", module_path)
     module = importlib.util.module_from_spec(spec)
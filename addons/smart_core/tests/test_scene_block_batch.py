@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+SMART_CORE_DIR = Path(__file__).resolve().parents[1]
+
+
+def _install_module(name, **attrs):
+    module = types.ModuleType(name)
+    for key, value in attrs.items():
+        setattr(module, key, value)
+    sys.modules[name] = module
+    return module
+
+
+def _load(module_name, path):
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_modules():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    for name, path in (
+        ("odoo.addons.smart_core", SMART_CORE_DIR),
+        ("odoo.addons.smart_core.core", SMART_CORE_DIR / "core"),
+        ("odoo.addons.smart_core.orchestration", SMART_CORE_DIR / "orchestration"),
+        ("odoo.addons.smart_core.utils", SMART_CORE_DIR / "utils"),
+    ):
+        package = sys.modules.setdefault(name, types.ModuleType(name))
+        package.__path__ = [str(path)]
+    if "odoo.addons.smart_core.core.source_authority" not in sys.modules:
+        _load("odoo.addons.smart_core.core.source_authority", SMART_CORE_DIR / "core" / "source_authority.py")
+    _install_module(
+        "odoo.addons.smart_core.utils.extension_hooks",
+        call_extension_hook_first=lambda env, hook_name, *args, **kwargs: None,
+    )
+    aggregate = _load("odoo.addons.smart_core.core.aggregate_cache", SMART_CORE_DIR / "core" / "aggregate_cache.py")
+    batch = _load("odoo.addons.smart_core.core.scene_block_batch", SMART_CORE_DIR / "core" / "scene_block_batch.py")
+    orchestrator = _load(
+        "odoo.addons.smart_core.orchestration.base_scene_entry_orchestrator",
+        SMART_CORE_DIR / "orchestration" / "base_scene_entry_orchestrator.py",
+    )
+    return aggregate, batch, orchestrator
+
+
+class _FakeModel:
+    def __init__(self, name="project.task", uid=2):
+        self._name = name
+        self.env = SimpleNamespace(uid=uid, su=False, context={"allowed_company_ids": [1]})
+        self.calls = []
+
+    def check_access_rights(self, operation):
+        return True
+
+    def search_count(self, domain):
+        self.calls.append(("search_count", domain))
+        return 3
+
+    def read_group(self, domain, fields, groupby, **_kwargs):
+        self.calls.append(("read_group", domain, fields, groupby))
+        return [{fields[0]: 10.0}]
+
+
+class _FakeService:
+    def __init__(self, aggregate, model):
+        self.aggregate = aggregate
+        self.model = model
+        self.resolve_calls = 0
+
+    def resolve_project_with_diagnostics(self, project_id):
+        self.resolve_calls += 1
+        return SimpleNamespace(id=project_id), {}
+
+    def build_block(self, block_key, project=None, context=None):
+        if block_key == "broken":
+            return None
+        domain = [("project_id", "=", project.id)]
+        return {
+            "block_key": block_key,
+            "state": "ready",
+            "data": {
+                "count": self.aggregate.cached_search_count(self.model, domain),
+                "amount": self.aggregate.cached_read_group(self.model, domain, ["amount"], [])[0]["amount"],
+            },
+        }
+
+    @staticmethod
+    def error_block(block_key, code):
+        return {"block_key": block_key, "state": "error", "error": {"code": code}}
+
+
+class TestSceneBlockBatch(unittest.TestCase):
+    def setUp(self):
+        self.aggregate, self.batch, self.orchestration = _load_modules()
+
+    def test_normalize_block_keys_dedupes_and_limits(self):
+        self.assertEqual(self.batch.normalize_block_keys(" Progress, risks,progress,"), ["progress", "risks"])
+        self.assertEqual(self.batch.normalize_block_keys(["Header", None, "header", "metrics"]), ["header", "metrics"])
+        self.assertEqual(self.batch.normalize_block_keys(None), [])
+        self.assertEqual(len(self.batch.normalize_block_keys([f"b{i}" for i in range(40)])), self.batch.MAX_BATCH_BLOCKS)
+
+    def test_build_runtime_blocks_resolves_project_once_and_shares_queries(self):
+        model = _FakeModel()
+        service = _FakeService(self.aggregate, model)
+        orchestrator = self.orchestration.BaseSceneEntryOrchestrator(None, service)
+        orchestrator.block_alias_map = {"risk": "risks"}
+
+        data = orchestrator.build_runtime_blocks("progress,risk,broken,progress", project_id=7)
+
+        self.assertEqual(service.resolve_calls, 1)
+        self.assertEqual(data["project_id"], 7)
+        self.assertEqual([item["block_key"] for item in data["blocks"]], ["progress", "risks", "broken"])
+        self.assertEqual([item["degraded"] for item in data["blocks"]], [False, False, True])
+        self.assertEqual(data["blocks"][2]["block"]["error"]["code"], "INVALID_BLOCK_PAYLOAD")
+        self.assertTrue(data["degraded"])
+        self.assertEqual([call[0] for call in model.calls], ["search_count", "read_group"])
+
+        single = orchestrator.build_runtime_block("risk", project_id=7)
+        self.assertEqual(
+            list(single),
+            ["project_id", "block_key", "block", "degraded", "source_authority", "legacy_scene_copy_source_authority"],
+        )
+        self.assertEqual(single["block_key"], "risks")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_core_module(name):
+    module_name = "odoo.addons.smart_core.core.%s" % name
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / ("%s.py" % name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_startup_snapshot():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+    for dependency in ("source_authority", "hash_utils", "contract_cache", "contract_version_vector"):
+        _load_core_module(dependency)
+    return _load_core_module("system_init_startup_snapshot")
+
+
+class _Env:
+    def __init__(self, uid=7):
+        self.uid = uid
+        self.context = {"lang": "zh_CN", "allowed_company_ids": [1]}
+        self.company = types.SimpleNamespace(id=1)
+
+
+class _Cursor:
+    def __init__(self):
+        self.executed = []
+        self.cache = {}
+
+    @contextlib.contextmanager
+    def savepoint(self, flush=True):
+        yield
+
+    def execute(self, query, params=None):
+        self.executed.append(query)
+        self._row = tuple("v%s" % idx for idx in range(query.count("(SELECT"))) or (3,)
+
+    def fetchone(self):
+        return self._row
+
+
+class _VectorEnv(_Env):
+    def __init__(self, tables):
+        super().__init__()
+        self.cr = _Cursor()
+        self._models = {
+            name: types.SimpleNamespace(_table=table, _auto=True, _abstract=False) for name, table in tables.items()
+        }
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def __getitem__(self, name):
+        return self._models[name]
+
+
+class TestSystemInitStartupSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_startup_snapshot()
+
+    def test_key_ignores_negotiation_params(self):
+        base = {"scene": "web", "with": "nav"}
+        key_a = self.module.snapshot_key(
+            _Env(), params=base, scene_channel="stable", contract_mode="user", build_mode="boot"
+        )
+        key_b = self.module.snapshot_key(
+            _Env(),
+            params={**base, "part_etags": {"nav": "x"}, "if_none_match": "y", "trace_id": "t"},
+            scene_channel="stable",
+            contract_mode="user",
+            build_mode="boot",
+        )
+        key_other_user = self.module.snapshot_key(
+            _Env(uid=8), params=base, scene_channel="stable", contract_mode="user", build_mode="boot"
+        )
+
+        self.assertEqual(key_a, key_b)
+        self.assertNotEqual(key_a, key_other_user)
+
+    def test_delta_sends_only_changed_parts(self):
+        data = {"nav": [1], "user": {"id": 7}, "scenes": [{"key": "home"}]}
+        part_etags = self.module.build_part_etags(data)
+        client = {"nav": part_etags["nav"], "user": "stale", "legacy_part": "gone"}
+
+        out, meta, code = self.module.negotiate_snapshot_response(
+            data=data, meta={"etag": "top"}, part_etags=part_etags, client_etags=client
+        )
+
+        self.assertIsNone(code)
+        self.assertEqual(set(out), {"user", "scenes"})
+        self.assertEqual(meta["delivery"], "delta")
+        self.assertEqual(meta["parts_unchanged"], ["nav"])
+        self.assertEqual(meta["parts_removed"], ["legacy_part"])
+
+    def test_not_modified_when_all_parts_match_or_top_etag_matches(self):
+        data = {"nav": [1], "user": {"id": 7}}
+        part_etags = self.module.build_part_etags(data)
+
+        out, meta, code = self.module.negotiate_snapshot_response(
+            data=data,
+            meta={"etag": "top"},
+            part_etags=part_etags,
+            client_etags=self.module.client_part_etags({"part_etags": dict(part_etags)}),
+        )
+        self.assertEqual(code, 304)
+        self.assertIsNone(out)
+
+        _, meta, code = self.module.negotiate_snapshot_response(
+            data=data, meta={"etag": "top"}, part_etags=part_etags, client_etags={}, if_none_match="top"
+        )
+        self.assertEqual(code, 304)
+        self.assertEqual(meta["delivery"], "not_modified")
+
+    def test_full_delivery_carries_part_etags(self):
+        data = {"nav": [1]}
+        part_etags = self.module.build_part_etags(data)
+
+        out, meta, code = self.module.negotiate_snapshot_response(
+            data=data, meta={"etag": "top"}, part_etags=part_etags, client_etags=None, snapshot_meta={"hit": True}
+        )
+
+        self.assertIsNone(code)
+        self.assertEqual(out, data)
+        self.assertEqual(meta["delivery"], "full")
+        self.assertEqual(meta["part_etags"], part_etags)
+        self.assertTrue(meta["startup_snapshot"]["hit"])
+
+    def test_snapshot_version_includes_global_acl_and_rule_terms(self):
+        env = _VectorEnv({"ir.model.access": "ir_model_access", "ir.rule": "ir_rule"})
+
+        version = self.module.snapshot_version(env, contract_mode="user")
+
+        self.assertTrue(version.startswith(self.module.SNAPSHOT_VERSION))
+        vector_query = env.cr.executed[0]
+        self.assertIn("SELECT max(write_date)::text || ':' || count(*) FROM ir_model_access)", vector_query)
+        self.assertIn("SELECT max(write_date)::text || ':' || count(*) FROM ir_rule)", vector_query)
+
+
+if __name__ == "__main__":
+    unittest.main()
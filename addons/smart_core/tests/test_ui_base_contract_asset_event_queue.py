@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 import importlib.util
-import json
 import re
 import sys
 import types
 import unittest
+from datetime import timedelta
 from pathlib import Path
 
 
@@ -34,53 +34,102 @@ target = _load_module(
 )
 
 
-class _Config:
-    def __init__(self):
-        self.values = {}
+class _Cursor:
+    """按 SQL 片段回放结果的假游标。"""
 
-    def sudo(self):
-        return self
+    def __init__(self, results=None):
+        self.results = list(results or [])
+        self.executed = []
+        self._rows = []
 
-    def get_param(self, key):
-        return self.values.get(key, "")
+    def execute(self, query, params=None):
+        self.executed.append((" ".join(query.split()), params))
+        self._rows = self.results.pop(0) if self.results else []
 
-    def set_param(self, key, value):
-        self.values[key] = value
+    def fetchall(self):
+        return list(self._rows)
 
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
 
-class _Env:
-    def __init__(self):
-        self.config = _Config()
 
-    def __getitem__(self, item):
-        if item != "ir.config_parameter":
-            raise KeyError(item)
-        return self.config
+class _Env:
+    def __init__(self, results=None):
+        self.cr = _Cursor(results)
 
 
 class TestUiBaseContractAssetEventQueue(unittest.TestCase):
-    def setUp(self):
-        self.env = _Env()
-
-    def _meta(self):
-        return json.loads(self.env.config.values[target.QUEUE_META_KEY])
-
     def assert_utc_z(self, value):
         self.assertRegex(value, r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$")
         self.assertNotRegex(value, re.escape("+00:00"))
 
-    def test_enqueue_pop_and_compact_meta_timestamps_use_utc_z_contract(self):
-        target.enqueue_scene_keys(self.env, scene_keys=["Project.List"], reason="unit")
-        self.assert_utc_z(self._meta()["updated_at"])
-
-        target.pop_scene_keys(self.env, limit=1)
-        self.assert_utc_z(self._meta()["consumed_at"])
-
-        self.env.config.values[target.QUEUE_KEY] = '["A__pkg1", "a", 42, ""]'
-        target.get_queue_metrics(self.env)
-        meta = self._meta()
-        self.assertEqual(meta["last_operation"], "compact")
-        self.assert_utc_z(meta["updated_at"])
+    def test_scene_keys_are_normalized_deduplicated_and_sorted(self):
+        self.assertEqual(target._normalize_scene_keys(["B", "a__pkg1", "A", "", 42]), ["42", "a", "b"])
+        self.assertEqual(target._normalize_scene_keys("project.list"), [])
+
+    def test_retry_backoff_doubles_up_to_cap(self):
+        self.assertEqual(target.retry_delay_seconds(1), 60)
+        self.assertEqual(target.retry_delay_seconds(3), 240)
+        self.assertEqual(target.retry_delay_seconds(50), target.RETRY_MAX_SECONDS)
+
+    def test_enqueue_is_a_single_upsert_and_counts_new_keys(self):
+        env = _Env(results=[[(True,), (False,)], [(4,)]])
+        result = target.enqueue_scene_keys(env, scene_keys=["Project.List", "finance.center", "project.list"], reason="unit")
+
+        upsert_sql, params = env.cr.executed[0]
+        self.assertIn("ON CONFLICT (scene_key) DO UPDATE", upsert_sql)
+        self.assertEqual(params["keys"], ["finance.center", "project.list"])
+        self.assertEqual(result["added_count"], 1)
+        self.assertEqual(result["queue_size"], 4)
+        self.assertEqual(target.enqueue_scene_keys(_Env(results=[[(0,)]]), scene_keys=[], reason="unit")["added_count"], 0)
+
+    def test_pop_claims_with_skip_locked(self):
+        env = _Env(results=[[("b", 2, 1), ("a", 1, 3)], [(5,)]])
+        batch = target.pop_scene_keys(env, limit=2)
+
+        self.assertIn("FOR UPDATE SKIP LOCKED", env.cr.executed[0][0])
+        self.assertEqual(batch["scene_keys"], ["a", "b"])
+        self.assertEqual(batch["jobs"][0], {"scene_key": "a", "revision": 1, "attempts": 3})
+        self.assertEqual(batch["remaining_count"], 3)
+
+    def test_complete_splits_done_retry_and_failed(self):
+        env = _Env()
+        jobs = [
+            {"scene_key": "a", "revision": 1, "attempts": 1},
+            {"scene_key": "b", "revision": 2, "attempts": 1},
+            {"scene_key": "c", "revision": 1, "attempts": 5},
+        ]
+        result = target.complete_scene_keys(env, jobs=jobs, failed_scene_keys=["B", "c"], error="boom", max_attempts=5)
+
+        self.assertEqual(result, {"done_count": 1, "retry_count": 1, "failed_count": 1})
+        done_params = env.cr.executed[0][1]
+        retry_params = env.cr.executed[1][1]
+        self.assertEqual(done_params["keys"], ["a"])
+        self.assertEqual(retry_params["keys"], ["b", "c"])
+        self.assertEqual(retry_params["states"], ["pending", "failed"])
+        self.assertEqual(retry_params["error"], "boom")
+
+    def test_metrics_report_depth_age_and_utc_z_timestamps(self):
+        now = target._utc_now()
+        oldest = now - timedelta(seconds=90)
+        env = _Env(
+            results=[
+                [(3, 1, 1, 2, oldest, now, now - timedelta(seconds=30), now - timedelta(seconds=20))],
+                [("event:ir.ui.view.write",)],
+                [(2,)],
+                [(1,)],
+            ]
+        )
+        metrics = target.get_queue_metrics(env)
+
+        self.assertEqual(metrics["queue_size"], 3)
+        self.assertEqual(metrics["running_count"], 1)
+        self.assertEqual(metrics["failed_count"], 2)
+        self.assertGreaterEqual(metrics["oldest_age_seconds"], 90)
+        self.assertEqual(metrics["last_operation"], "enqueue")
+        self.assertEqual(metrics["reason"], "event:ir.ui.view.write")
+        self.assert_utc_z(metrics["updated_at"])
+        self.assert_utc_z(metrics["consumed_at"])
 
 
 if __name__ == "__main__":
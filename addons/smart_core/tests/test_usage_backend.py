@@ -20,7 +20,44 @@ class TestUsageBackend(TransactionCase):
     def test_usage_handlers_are_platform_observability_handlers(self):
         self.assertEqual(UsageReportHandler.SOURCE_AUTHORITY.get("kind"), "usage_analytics_projection")
         self.assertTrue(UsageReportHandler.SOURCE_AUTHORITY.get("observability_only"))
-        self.assertEqual(UsageTrackHandler.SOURCE_AUTHORITY.get("write_authority"), "sc.usage.counter.bump")
+        self.assertEqual(UsageTrackHandler.SOURCE_AUTHORITY.get("write_authority"), "sc.usage.counter.stage_event")
+
+    def _stage(self, company, event_type, subject_key, day, *, times=1, user_id=0, role_codes=()):
+        Usage = self.env["sc.usage.counter"].sudo()
+        for _index in range(times):
+            Usage.stage_event(
+                company,
+                event_type=event_type,
+                subject_key=subject_key,
+                user_id=user_id,
+                role_codes=role_codes,
+                day=day,
+            )
+
+    def _flush(self):
+        flushed = self.env["sc.usage.counter"].sudo().cron_flush_usage_stage(limit=5000)
+        self.env.invalidate_all()
+        return flushed
+
+    def test_staged_usage_events_flush_into_rollup_and_totals(self):
+        Usage = self.env["sc.usage.counter"].sudo()
+        company = self.env.user.company_id
+        day = fields.Date.context_today(self.env.user).strftime("%Y-%m-%d")
+        scene_key = f"stage.{uuid4().hex[:8]}"
+        before = sum(Usage.search([("company_id", "=", company.id), ("key", "=", "usage.scene_open.total")]).mapped("value"))
+
+        self._stage(company, "scene_open", scene_key, day, times=3, user_id=self.env.uid, role_codes=["pm", "admin"])
+        self.assertFalse(self.env["sc.usage.rollup"].sudo().search([("subject_key", "=", scene_key)]))
+
+        flushed = self._flush()
+        self.assertGreaterEqual(flushed["events"], 3)
+        rollup = self.env["sc.usage.rollup"].sudo().search([("subject_key", "=", scene_key)])
+        self.assertEqual(len(rollup), 1)
+        self.assertEqual(rollup.event_count, 3)
+        self.assertEqual(rollup.role_code, "admin,pm")
+        total = Usage.search([("company_id", "=", company.id), ("key", "=", "usage.scene_open.total")])
+        self.assertEqual(total.value, before + 3)
+        self.assertFalse(Usage.search([("company_id", "=", company.id), ("key", "like", scene_key)]))
 
     def test_usage_report_supports_days_and_prefix_filter(self):
         Usage = self.env["sc.usage.counter"].sudo()
@@ -28,21 +65,22 @@ class TestUsageBackend(TransactionCase):
         today = fields.Date.context_today(self.env.user)
         day0 = today.strftime("%Y-%m-%d")
         day1 = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+        day5 = (today - timedelta(days=5)).strftime("%Y-%m-%d")
         marker = f"u{uuid4().hex[:8]}"
         scene_a = f"{marker}.alpha"
         scene_b = f"{marker}.beta"
         cap_a = f"{marker}.create.alpha"
         cap_b = f"{marker}.create.beta"
 
-        Usage.bump(company, "usage.scene_open.total", 12)
-        Usage.bump(company, "usage.capability_open.total", 9)
-        Usage.bump(company, f"usage.scene_open.{scene_a}", 7)
-        Usage.bump(company, f"usage.scene_open.{scene_b}", 5)
-        Usage.bump(company, f"usage.capability_open.{cap_a}", 6)
-        Usage.bump(company, f"usage.capability_open.{cap_b}", 3)
+        self._stage(company, "scene_open", scene_a, day0, times=7)
+        self._stage(company, "scene_open", scene_b, day1, times=5)
+        self._stage(company, "scene_open", scene_b, day5, times=9)
+        self._stage(company, "capability_open", cap_a, day0, times=6)
+        self._stage(company, "capability_open", cap_b, day0, times=3)
+        self._stage(company, "scene_open", "other.scene", day0, times=2)
+        self._flush()
         Usage.bump(company, f"usage.scene_open.daily.{day1}", 4)
-        Usage.bump(company, f"usage.scene_open.daily.{day0}", 8)
-        Usage.bump(company, f"usage.capability_open.daily.{day0}", 9)
+        self.env["sc.usage.rollup"].sudo().backfill_from_legacy_counters()
 
         report = build_usage_report_data(
             self.env,
@@ -57,11 +95,15 @@ class TestUsageBackend(TransactionCase):
         self.assertEqual(len(report["daily"]["scene_open"]), 2)
         self.assertEqual(report["filters"]["scene_key_prefix"], marker)
         self.assertEqual(report["filters"]["capability_key_prefix"], marker)
+        self.assertEqual(report["scene_top"], [{"key": scene_a, "count": 7}, {"key": scene_b, "count": 5}])
+        self.assertEqual([item["key"] for item in report["capability_top"]], [cap_a, cap_b])
+        daily = {row["day"]: row["count"] for row in report["daily"]["scene_open"]}
+        self.assertGreaterEqual(daily[day1], 9)
+        self.assertFalse(Usage.search([("company_id", "=", company.id), ("key", "=", f"usage.scene_open.daily.{day1}")]))
         self.assertTrue(_matches_prefix(f"{marker}.x", marker))
         self.assertFalse(_matches_prefix("other.x", marker))
 
     def test_usage_report_role_and_user_slice(self):
-        Usage = self.env["sc.usage.counter"].sudo()
         company = self.env.user.company_id
         today = fields.Date.context_today(self.env.user).strftime("%Y-%m-%d")
         role_code = f"pm_{uuid4().hex[:4]}"
@@ -69,14 +111,10 @@ class TestUsageBackend(TransactionCase):
         scene_key = f"slice.scene.{uuid4().hex[:4]}"
         cap_key = f"slice.cap.{uuid4().hex[:4]}"
 
-        Usage.bump(company, f"usage.scene_open.role.{role_code}.total", 4)
-        Usage.bump(company, f"usage.scene_open.role.{role_code}.{scene_key}", 3)
-        Usage.bump(company, f"usage.scene_open.role.{role_code}.daily.{today}", 3)
-        Usage.bump(company, f"usage.capability_open.role.{role_code}.total", 2)
-        Usage.bump(company, f"usage.capability_open.role.{role_code}.{cap_key}", 2)
-        Usage.bump(company, f"usage.capability_open.role.{role_code}.daily.{today}", 2)
-        Usage.bump(company, f"usage.scene_open.user.{user_id}.total", 5)
-        Usage.bump(company, f"usage.capability_open.user.{user_id}.total", 1)
+        self._stage(company, "scene_open", scene_key, today, times=3, user_id=user_id, role_codes=[role_code])
+        self._stage(company, "capability_open", cap_key, today, times=2, user_id=user_id, role_codes=[role_code])
+        self._stage(company, "scene_open", f"{scene_key}.other", today, times=4, user_id=999002)
+        self._flush()
 
         report = build_usage_report_data(
             self.env,
@@ -84,10 +122,12 @@ class TestUsageBackend(TransactionCase):
         )
         self.assertEqual(report["filters"]["role_code"], role_code)
         self.assertEqual(report["filters"]["user_id"], user_id)
-        self.assertTrue(any(item["role_code"] == role_code for item in report.get("role_top") or []))
+        role_row = next(item for item in report.get("role_top") or [] if item["role_code"] == role_code)
+        self.assertEqual((role_row["scene_open_total"], role_row["capability_open_total"]), (3, 2))
         self.assertTrue(any(item["user_id"] == user_id for item in report.get("user_top") or []))
-        self.assertTrue(any(item["key"] == scene_key for item in report.get("scene_top") or []))
+        self.assertEqual(report["scene_top"], [{"key": scene_key, "count": 3}])
         self.assertTrue(any(item["key"] == cap_key for item in report.get("capability_top") or []))
+        self.assertEqual(report["daily"]["scene_open"][-1]["count"], 3)
 
     def test_usage_csv_respects_hidden_reason_filter(self):
         report = {
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_core_module(name):
+    module_name = "odoo.addons.smart_core.core.%s" % name
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / ("%s.py" % name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_usage_rollup():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    _load_core_module("source_authority")
+    _load_core_module("usage_telemetry")
+    return _load_core_module("usage_rollup")
+
+
+class _Cursor:
+    def __init__(self, results):
+        self.results = list(results)
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, list(params or [])))
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+
+class TestUsageRollup(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_usage_rollup()
+
+    def test_legacy_daily_keys_map_to_rollup_slices(self):
+        self.assertEqual(
+            self.module.parse_legacy_daily_key("usage.scene_open.role.PM.daily.2026-10-01"),
+            {"event_type": "scene_open", "day": "2026-10-01", "role_code": "pm", "user_id": 0, "legacy_slice": "role_daily"},
+        )
+        self.assertEqual(
+            self.module.parse_legacy_daily_key("usage.capability_open.user.12.daily.2026-10-01")["user_id"],
+            12,
+        )
+        self.assertEqual(
+            self.module.parse_legacy_daily_key("usage.scene_open.daily.2026-10-01")["legacy_slice"],
+            "daily",
+        )
+        self.assertIsNone(self.module.parse_legacy_daily_key("usage.scene_open.user.12.projects.list"))
+        self.assertIsNone(self.module.parse_legacy_daily_key("usage.scene_open.total"))
+
+    def test_daily_scope_adds_matching_legacy_slice_only(self):
+        sql, params = self.module.daily_scope("pm", 0)
+
+        self.assertIn("(',' || role_code || ',') LIKE %s", sql)
+        self.assertEqual(params, ["%,pm,%", "role_daily", "pm"])
+        self.assertEqual(self.module.daily_scope("pm", 7), self.module.native_scope("pm", 7))
+
+    def test_report_splits_role_signatures_and_escapes_prefix(self):
+        updated = datetime(2026, 10, 17, 8, 0, 0)
+        cr = _Cursor(
+            [
+                [("scene_open", "2026-10-17", 5, updated)],
+                [("scene_open", "projects.list", 5)],
+                [("admin,pm", "scene_open", 3), ("pm", "scene_open", 2)],
+                [(7, 5, 0)],
+            ]
+        )
+
+        report = self.module.query_rollup_report(
+            cr, company_id=1, day_from="2026-10-11", day_to="2026-10-17", top_n=5, scene_prefix="proj_"
+        )
+
+        self.assertEqual(report["daily"]["scene_open"], {"2026-10-17": 5})
+        self.assertEqual(report["role_totals"]["scene_open"], {"admin": 3, "pm": 5})
+        self.assertEqual(report["user_totals"]["scene_open"], {7: 5})
+        self.assertEqual(report["generated_at"], updated)
+        self.assertEqual(cr.queries[1][1][3:], ["proj\\_%", "%", 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
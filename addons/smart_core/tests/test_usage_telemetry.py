@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+
+def _load_core_module(name):
+    module_name = "odoo.addons.smart_core.core.%s" % name
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / ("%s.py" % name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_usage_telemetry():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    _load_core_module("source_authority")
+    return _load_core_module("usage_telemetry")
+
+
+class TestUsageTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_usage_telemetry()
+
+    def test_event_keys_expand_user_role_and_global_counters(self):
+        keys = self.module.usage_event_keys(
+            "scene_open", "projects.list", uid=7, role_codes=["admin"], day_key="2026-10-17"
+        )
+
+        self.assertEqual(
+            keys,
+            [
+                "usage.scene_open.user.7.total",
+                "usage.scene_open.user.7.projects.list",
+                "usage.scene_open.user.7.daily.2026-10-17",
+                "usage.scene_open.role.admin.total",
+                "usage.scene_open.role.admin.projects.list",
+                "usage.scene_open.role.admin.daily.2026-10-17",
+                "usage.scene_open.total",
+                "usage.scene_open.projects.list",
+                "usage.scene_open.daily.2026-10-17",
+            ],
+        )
+        self.assertEqual(self.module.usage_event_keys("workspace.open", "x"), [])
+        self.assertEqual(self.module.usage_event_keys("capability_open", ""), [])
+
+    def test_stage_row_keeps_one_row_per_event_with_role_signature(self):
+        rows = self.module.stage_rows(
+            1, event_type="scene_open", subject_key="projects.list", user_id=7, role_codes=["PM", "admin", "pm"], day="2026-10-17"
+        )
+
+        self.assertEqual(rows, [(1, "scene_open", "projects.list", 7, "admin,pm", "2026-10-17", "usage.scene_open.total", 1)])
+        self.assertEqual(self.module.split_role_signature("admin,pm"), ["admin", "pm"])
+
+    def test_backpressure_drops_and_reports_drops_once(self):
+        backpressure = self.module.StageBackpressure(probe_ttl_seconds=5)
+        backpressure.record_probe("db", 8, now=100.0)
+
+        self.assertTrue(backpressure.admit("db", 1, 2, max_pending=10))
+        self.assertFalse(backpressure.admit("db", 1, 3, max_pending=10))
+        self.assertEqual(backpressure.stats("db")["dropped_total"], 3)
+        self.assertEqual(backpressure.take_unreported_drops("db", 1), 3)
+        self.assertEqual(backpressure.take_unreported_drops("db", 1), 0)
+        self.assertEqual(
+            self.module.stage_rows(1, event_type="capability_open", subject_key="", day="2026-10-17", dropped=3),
+            [(1, "", "", 0, "", None, "usage.telemetry.dropped", 3)],
+        )
+        self.assertFalse(backpressure.needs_probe("db", now=104.0))
+        self.assertTrue(backpressure.needs_probe("db", now=105.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
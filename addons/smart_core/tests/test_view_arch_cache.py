@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+try:
+    from lxml import etree as _lxml_etree  # noqa: F401
+except Exception:  # pragma: no cover - 精简环境无 lxml
+    _lxml_etree = None
+
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "core"
+
+ARCH = """
+<form string="项目">
+    <!-- 表头 -->
+    <header>
+        <button name="action_confirm" type="object" string="确认"/>
+    </header>
+    <field name="name" required="1"/>
+    <field name="stage_id" readonly="state == 'done'"/>
+    <field name="task_ids">
+        <tree>
+            <field name="name" invisible="1"/>
+        </tree>
+    </field>
+    <field name="name"/>
+</form>
+"""
+
+
+def _load_view_arch_cache():
+    sys.modules.setdefault("odoo", types.ModuleType("odoo"))
+    sys.modules.setdefault("odoo.addons", types.ModuleType("odoo.addons"))
+    smart_core_pkg = sys.modules.setdefault("odoo.addons.smart_core", types.ModuleType("odoo.addons.smart_core"))
+    smart_core_pkg.__path__ = [str(CORE_DIR.parent)]
+    core_pkg = sys.modules.setdefault("odoo.addons.smart_core.core", types.ModuleType("odoo.addons.smart_core.core"))
+    core_pkg.__path__ = [str(CORE_DIR)]
+    smart_core_pkg.core = core_pkg
+
+    source_name = "odoo.addons.smart_core.core.source_authority"
+    if source_name not in sys.modules:
+        source_spec = importlib.util.spec_from_file_location(source_name, CORE_DIR / "source_authority.py")
+        source_module = importlib.util.module_from_spec(source_spec)
+        sys.modules[source_name] = source_module
+        source_spec.loader.exec_module(source_module)
+
+    module_name = "odoo.addons.smart_core.core.view_arch_cache"
+    sys.modules.pop(module_name, None)
+    spec = importlib.util.spec_from_file_location(module_name, CORE_DIR / "view_arch_cache.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@unittest.skipUnless(_lxml_etree is not None, "lxml is required")
+class TestViewArchCache(unittest.TestCase):
+    def setUp(self):
+        self.target = _load_view_arch_cache()
+
+    def test_same_arch_compiles_once(self):
+        first = self.target.arch_root(ARCH)
+        second = self.target.arch_root(ARCH.encode("utf-8"))
+
+        self.assertIs(first, second)
+        stats = self.target.cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+        self.target.clear_cache()
+        self.assertIsNot(first, self.target.arch_root(ARCH))
+
+    def test_indexes_cover_top_level_fields_and_subviews(self):
+        compiled = self.target.compile_view_arch(ARCH)
+
+        self.assertEqual(compiled.field_names, ("name", "stage_id", "task_ids"))
+        self.assertEqual(compiled.subview_fields, ("task_ids",))
+        self.assertEqual(dict(compiled.modifiers["name"]), {"required": "1"})
+        self.assertEqual(compiled.modifiers["stage_id"]["readonly"], "state == 'done'")
+        self.assertEqual([button["name"] for button in compiled.buttons], ["action_confirm"])
+        nested = [field for field in compiled.fields if field.in_subview]
+        self.assertEqual([(field.name, field.parent_tag) for field in nested], [("name", "tree")])
+
+    def test_indexed_nodes_match_xpath_and_reuse_the_cached_index(self):
+        root = self.target.arch_root(ARCH)
+        plain = self.target.arch_plain_root(ARCH)
+
+        fields = self.target.indexed_nodes(root, "field", named=True)
+        self.assertEqual(list(fields), root.xpath(".//field[@name]"))
+        self.assertIs(fields, self.target.indexed_nodes(root, "field", named=True))
+        self.assertEqual(list(self.target.indexed_nodes(plain, "button")), plain.findall(".//button"))
+        self.assertIsNot(self.target.indexed_nodes(plain, "field"), self.target.indexed_nodes(root, "field"))
+
+        # 子节点不在索引里，现场遍历且结果一致。
+        tree = root.xpath(".//tree")[0]
+        self.assertEqual(list(self.target.indexed_nodes(tree, "field", named=True)), tree.xpath(".//field[@name]"))
+
+        self.target.clear_cache()
+        self.assertEqual(list(self.target.indexed_nodes(root, "field")), root.xpath(".//field"))
+
+    def test_plain_root_drops_comments(self):
+        compiled = self.target.compile_view_arch(ARCH)
+
+        self.assertTrue(any(not isinstance(node.tag, str) for node in compiled.root.iter()))
+        self.assertTrue(all(isinstance(node.tag, str) for node in compiled.plain_root.iter()))
+        self.assertIs(compiled.plain_root, self.target.arch_plain_root(ARCH))
+
+    def test_element_passes_through_and_lru_evicts(self):
+        root = self.target.arch_root(ARCH)
+        self.assertIs(self.target.arch_root(root), root)
+
+        cache = self.target.ViewArchCache(max_entries=2)
+        for index in range(3):
+            cache.compile(f"<tree><field name='f{index}'/></tree>")
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,10 +8,10 @@ from datetime import timedelta
 from uuid import uuid4
 
 from odoo import fields
-from .reason_codes import REASON_IDEMPOTENCY_CONFLICT, failure_meta_for_reason
+from .reason_codes import REASON_IDEMPOTENCY_CONFLICT, REASON_IDEMPOTENCY_IN_FLIGHT, failure_meta_for_reason
 
 SOURCE_KIND = "idempotency_audit_replay_projection"
-SOURCE_AUTHORITIES = ("sc.audit.log", "idempotency_key", "request_fingerprint")
+SOURCE_AUTHORITIES = ("sc.idempotency.key", "sc.audit.log", "idempotency_key", "request_fingerprint")
 NO_BUSINESS_FACT_AUTHORITY = True
 
 
@@ -272,6 +272,71 @@ def resolve_idempotency_decision(
     }
 
 
+def _idempotency_actor_scope(env, *, enforce_company=True, enforce_actor=True):
+    user = getattr(env, "user", None)
+    company_id = 0
+    actor_uid = 0
+    if enforce_actor and user:
+        actor_uid = max(int(getattr(user, "id", 0) or 0), 0)
+    if enforce_company and user and getattr(user, "company_id", None):
+        company_id = max(int(getattr(user.company_id, "id", 0) or 0), 0)
+    return company_id, actor_uid
+
+
+def idempotency_decision_from_claim(claim):
+    """sc.idempotency.key.claim 结果 -> 与 resolve_idempotency_decision 同形的决策，另带 in_flight / claim_id。"""
+    claim = claim if isinstance(claim, dict) else {}
+    status = str(claim.get("status") or "")
+    replay_payload = claim.get("result") if status == "replay" else None
+    if status == "replay" and not isinstance(replay_payload, dict):
+        # 完成记录缺少可回放结果时按冲突处理，避免同键重复执行。
+        status = "conflict"
+        replay_payload = None
+    return {
+        "conflict": status == "conflict",
+        "in_flight": status == "in_flight",
+        "replay_entry": claim.get("entry") if replay_payload else None,
+        "replay_payload": replay_payload,
+        "replay_window_expired": bool(status == "claimed" and claim.get("replay_window_expired")),
+        "claim_id": int(claim.get("id") or 0) if status == "claimed" else 0,
+    }
+
+
+def claim_idempotency_key(
+    env,
+    *,
+    event_code,
+    idempotency_key,
+    fingerprint,
+    window_seconds,
+    scope="",
+    enforce_company=True,
+    enforce_actor=True,
+):
+    """
+    在执行前占用幂等键（sc.idempotency.key，唯一索引 + 事务级 advisory lock）：
+    并发重复请求得到 in_flight，而不是在审计日志写入前各自执行一遍。
+    """
+    company_id, actor_uid = _idempotency_actor_scope(env, enforce_company=enforce_company, enforce_actor=enforce_actor)
+    claim = env["sc.idempotency.key"].sudo().claim(
+        event_code=event_code,
+        idempotency_key=str(idempotency_key or ""),
+        fingerprint=str(fingerprint or ""),
+        window_seconds=window_seconds,
+        scope=scope,
+        company_id=company_id,
+        actor_uid=actor_uid,
+    )
+    return idempotency_decision_from_claim(claim)
+
+
+def complete_idempotency_key(env, decision, *, result, trace_id="", audit_id=0):
+    claim_id = int((decision or {}).get("claim_id") or 0)
+    if not claim_id:
+        return False
+    return env["sc.idempotency.key"].sudo().complete(claim_id, result=result, trace_id=trace_id, audit_id=audit_id)
+
+
 def ids_summary(rows, *, sample_limit=20):
     normalized = []
     for value in rows or []:
@@ -317,15 +382,17 @@ def apply_replay_evidence(
     return payload
 
 
-def build_idempotency_conflict_response(
+def _build_idempotency_rejection(
     *,
+    reason_code,
+    message,
     intent_type,
     request_id,
     idempotency_key,
     trace_id,
     include_replay_evidence=False,
 ):
-    failure_meta = failure_meta_for_reason(REASON_IDEMPOTENCY_CONFLICT)
+    failure_meta = failure_meta_for_reason(reason_code)
     data = {
         "request_id": request_id,
         "idempotency_key": idempotency_key,
@@ -345,8 +412,8 @@ def build_idempotency_conflict_response(
         "code": 409,
         "error": {
             "code": 409,
-            "message": "idempotency key payload mismatch",
-            "reason_code": REASON_IDEMPOTENCY_CONFLICT,
+            "message": message,
+            "reason_code": reason_code,
             "retryable": bool(failure_meta.get("retryable")),
             "error_category": str(failure_meta.get("error_category") or ""),
             "suggested_action": str(failure_meta.get("suggested_action") or ""),
@@ -356,6 +423,44 @@ def build_idempotency_conflict_response(
     }
 
 
+def build_idempotency_conflict_response(
+    *,
+    intent_type,
+    request_id,
+    idempotency_key,
+    trace_id,
+    include_replay_evidence=False,
+):
+    return _build_idempotency_rejection(
+        reason_code=REASON_IDEMPOTENCY_CONFLICT,
+        message="idempotency key payload mismatch",
+        intent_type=intent_type,
+        request_id=request_id,
+        idempotency_key=idempotency_key,
+        trace_id=trace_id,
+        include_replay_evidence=include_replay_evidence,
+    )
+
+
+def build_idempotency_in_flight_response(
+    *,
+    intent_type,
+    request_id,
+    idempotency_key,
+    trace_id,
+    include_replay_evidence=False,
+):
+    return _build_idempotency_rejection(
+        reason_code=REASON_IDEMPOTENCY_IN_FLIGHT,
+        message="idempotency key request in flight",
+        intent_type=intent_type,
+        request_id=request_id,
+        idempotency_key=idempotency_key,
+        trace_id=trace_id,
+        include_replay_evidence=include_replay_evidence,
+    )
+
+
 def apply_idempotency_identity(
     data,
     *,
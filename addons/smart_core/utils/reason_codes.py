@@ -22,6 +22,7 @@ REASON_CONFLICT = "CONFLICT"
 REASON_WRITE_FAILED = "WRITE_FAILED"
 REASON_IDEMPOTENCY_CONFLICT = "IDEMPOTENCY_CONFLICT"
 REASON_REPLAY_WINDOW_EXPIRED = "REPLAY_WINDOW_EXPIRED"
+REASON_IDEMPOTENCY_IN_FLIGHT = "IDEMPOTENCY_IN_FLIGHT"
 REASON_PROJECT_SCOPE_DENIED = "PROJECT_SCOPE_DENIED"
 REASON_RECORD_VERSION_CONFLICT = "RECORD_VERSION_CONFLICT"
 REASON_MISSING_PARAMS = "MISSING_PARAMS"
@@ -136,6 +137,11 @@ def failure_meta_for_reason(reason_code: str):
             "error_category": "conflict",
             "suggested_action": "retry",
         },
+        REASON_IDEMPOTENCY_IN_FLIGHT: {
+            "retryable": True,
+            "error_category": "conflict",
+            "suggested_action": "retry",
+        },
         REASON_PERMISSION_DENIED: {
             "retryable": False,
             "error_category": "permission",
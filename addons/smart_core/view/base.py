@@ -3,6 +3,7 @@ from odoo import api, models
 from odoo.http import request
 from odoo.exceptions import UserError
 from lxml import etree
+from odoo.addons.smart_core.core.view_arch_cache import arch_root, indexed_nodes
 from odoo.tools.safe_eval import safe_eval
 import logging
 
@@ -107,7 +108,7 @@ class BaseViewParser(ABC):
             )
             # 确保 arch 是 etree.Element
             if isinstance(view_info['arch'], str):
-                view_info['arch'] = etree.fromstring(view_info['arch'])
+                view_info['arch'] = arch_root(view_info['arch'])
             return view_info
         except Exception as e:
             _logger.error(f"获取视图信息失败: {str(e)}")
@@ -122,7 +123,7 @@ class BaseViewParser(ABC):
         """
         if not isinstance(arch, etree._Element):
             raise ValueError("arch 必须是 lxml.etree.Element 类型")
-        return {node.get("name") for node in arch.xpath("//field[@name]") if node.get("name")}
+        return {node.get("name") for node in indexed_nodes(arch, "field", named=True) if node.get("name")}
 
 def parse_safe_context(expr_str):
         """
@@ -36,6 +36,8 @@ export interface ChatterTimelineResponse {
     audit?: number;
     total?: number;
   };
+  has_more?: boolean;
+  next_cursor?: string;
 }
 
 export interface CollaborationUserOption {
@@ -115,6 +117,7 @@ export async function fetchChatterTimeline(params: {
   res_id: number;
   limit?: number;
   include_audit?: boolean;
+  cursor?: string;
 }) {
   return intentRequest<ChatterTimelineResponse>({
     intent: 'chatter.timeline',
@@ -123,6 +126,7 @@ export async function fetchChatterTimeline(params: {
       res_id: params.res_id,
       limit: params.limit ?? 40,
       include_audit: params.include_audit ?? true,
+      cursor: params.cursor || undefined,
     },
   });
 }
@@ -1,5 +1,19 @@
+import { config } from '../config';
+import { useSessionStore } from '../stores/session';
 import { intentRequest } from './intents';
-import type { FileDownloadRequest, FileDownloadResponse, FileUploadRequest, FileUploadResponse } from '@sc/schema';
+import type {
+  FileDownloadRequest,
+  FileDownloadResponse,
+  FileUploadChunkResponse,
+  FileUploadRequest,
+  FileUploadResponse,
+  FileUploadSession,
+  FileUploadSessionRequest,
+} from '@sc/schema';
+
+// 超过该大小改走分片续传，避免整文件 base64 进入 JSON 信封。
+export const CHUNKED_UPLOAD_THRESHOLD = 4 * 1024 * 1024;
+const CHUNK_RETRY_LIMIT = 3;
 
 export async function uploadFile(params: FileUploadRequest) {
   return intentRequest<FileUploadResponse>({
@@ -8,6 +22,80 @@ export async function uploadFile(params: FileUploadRequest) {
   });
 }
 
+export async function uploadSession<T = FileUploadSession>(params: FileUploadSessionRequest) {
+  return intentRequest<T>({
+    intent: 'file.upload',
+    params,
+  });
+}
+
+async function putChunk(session: FileUploadSession, offset: number, chunk: Blob): Promise<number> {
+  const store = useSessionStore();
+  const headers = new Headers({ 'Content-Type': 'application/octet-stream' });
+  if (store.token) headers.set('Authorization', `Bearer ${store.token}`);
+  if (store.sessionDb) headers.set('X-Odoo-DB', store.sessionDb);
+  const separator = session.upload_url.includes('?') ? '&' : '?';
+  const response = await fetch(`${config.apiBaseUrl}${session.upload_url}${separator}offset=${offset}`, {
+    method: 'PUT',
+    headers,
+    body: chunk,
+    credentials: 'omit',
+  });
+  const body = (await response.json().catch(() => ({}))) as FileUploadChunkResponse;
+  if (response.ok && body.ok && body.data) return body.data.offset;
+  // 409 携带服务端已接收字节数，直接从该处续传。
+  if (response.status === 409 && typeof body.error?.offset === 'number') return body.error.offset;
+  throw new Error(body.error?.message || `chunk upload failed (${response.status})`);
+}
+
+export async function uploadFileInChunks(
+  file: File,
+  target: { model: string; res_id: number; name?: string },
+  onProgress?: (loaded: number, total: number) => void,
+) {
+  const name = target.name || file.name;
+  let session = await uploadSession({
+    action: 'init',
+    model: target.model,
+    res_id: target.res_id,
+    name,
+    mimetype: file.type || 'application/octet-stream',
+    total_size: file.size,
+    // 同一文件重新选择时命中未完成会话，从已接收的 offset 续传。
+    client_key: `${name}:${file.size}:${file.lastModified}`,
+  });
+  let offset = session.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    const end = Math.min(offset + session.chunk_size, file.size);
+    try {
+      offset = await putChunk(session, offset, file.slice(offset, end));
+      failures = 0;
+      onProgress?.(offset, file.size);
+    } catch (err) {
+      failures += 1;
+      if (failures >= CHUNK_RETRY_LIMIT) throw err;
+      session = await uploadSession({ action: 'status', upload_id: session.upload_id });
+      offset = session.offset;
+    }
+  }
+  return uploadSession<FileUploadResponse>({ action: 'finalize', upload_id: session.upload_id });
+}
+
+export async function uploadAttachment(file: File, target: { model: string; res_id: number; name?: string }) {
+  if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+    return uploadFileInChunks(file, target);
+  }
+  const { data, mimetype } = await fileToBase64(file);
+  return uploadFile({
+    model: target.model,
+    res_id: target.res_id,
+    name: target.name || file.name,
+    mimetype,
+    data,
+  });
+}
+
 export async function downloadFile(params: FileDownloadRequest) {
   return intentRequest<FileDownloadResponse>({
     intent: 'file.download',
@@ -50,6 +50,40 @@ export async function fetchGlobalMessages(params: {
   });
 }
 
+export interface GlobalMessageUnreadDelta {
+  key: string;
+  unread_count: number;
+  last_message_id: number;
+}
+
+export interface GlobalMessagePollResult {
+  items: GlobalMessageItem[];
+  latest_id: number;
+  has_more: boolean;
+  unread: GlobalMessageUnreadDelta[];
+  total_unread: number;
+  revision: number | string;
+  changed: boolean;
+  timed_out: boolean;
+}
+
+export async function pollGlobalMessages(params: {
+  since_id?: number;
+  since_revision?: number | string;
+  timeout?: number;
+  limit?: number;
+}) {
+  return intentRequest<GlobalMessagePollResult>({
+    intent: 'global.message.poll',
+    params: {
+      since_id: params.since_id || undefined,
+      since_revision: params.since_revision || undefined,
+      timeout: params.timeout,
+      limit: params.limit ?? 30,
+    },
+  });
+}
+
 export async function sendGlobalMessage(params: {
   recipient_user_ids: number[];
   body: string;
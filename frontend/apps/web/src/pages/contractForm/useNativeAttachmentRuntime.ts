@@ -1,5 +1,5 @@
 import { ref, type Ref } from 'vue';
-import { fileToBase64, uploadFile } from '../../api/files';
+import { uploadAttachment } from '../../api/files';
 
 export type PendingNativeAttachment = {
   key: string;
@@ -59,14 +59,7 @@ export function useNativeAttachmentRuntime(params: {
     }
     uploading.value = true;
     try {
-      const { data, mimetype } = await fileToBase64(file);
-      await uploadFile({
-        model: params.model(),
-        res_id: recordId,
-        name: file.name,
-        mimetype,
-        data,
-      });
+      await uploadAttachment(file, { model: params.model(), res_id: recordId });
       await params.reloadTimeline();
     } catch (err) {
       error.value = err instanceof Error ? err.message : params.resolveLabel('upload_failed', '附件上传失败');
@@ -87,14 +80,7 @@ export function useNativeAttachmentRuntime(params: {
     uploading.value = true;
     try {
       for (const item of pendingAttachments.value) {
-        const { data, mimetype } = await fileToBase64(item.file);
-        await uploadFile({
-          model: modelName,
-          res_id: resId,
-          name: item.name,
-          mimetype,
-          data,
-        });
+        await uploadAttachment(item.file, { model: modelName, res_id: resId, name: item.name });
       }
       pendingAttachments.value = [];
       await params.reloadTimeline(resId, modelName);
@@ -43,6 +43,8 @@ export function useNativeChatterRuntime(params: {
   const loading = ref(false);
   const error = ref('');
   const timeline = ref<ChatterTimelineEntry[]>([]);
+  const timelineCursor = ref('');
+  const timelineHasMore = ref(false);
   const activityUpdatingIds = ref<number[]>([]);
 
   const selectedMentionUsers = computed(() => {
@@ -57,6 +59,8 @@ export function useNativeChatterRuntime(params: {
   function clearForRecordLoad() {
     error.value = '';
     timeline.value = [];
+    timelineCursor.value = '';
+    timelineHasMore.value = false;
   }
 
   function closeComposer() {
@@ -82,6 +86,32 @@ export function useNativeChatterRuntime(params: {
         include_audit: false,
       });
       timeline.value = Array.isArray(response.items) ? response.items : [];
+      timelineCursor.value = response.next_cursor || '';
+      timelineHasMore.value = Boolean(response.has_more && response.next_cursor);
+    } catch (err) {
+      error.value = err instanceof Error ? err.message : '协作记录加载失败';
+    } finally {
+      loading.value = false;
+    }
+  }
+
+  async function loadMoreTimeline() {
+    const targetResId = params.recordId();
+    const targetModel = params.model();
+    if (!targetResId || !targetModel || !timelineHasMore.value || loading.value) return;
+    loading.value = true;
+    try {
+      const response = await fetchChatterTimeline({
+        model: targetModel,
+        res_id: targetResId,
+        limit: 12,
+        include_audit: false,
+        cursor: timelineCursor.value,
+      });
+      const items = Array.isArray(response.items) ? response.items : [];
+      timeline.value = [...timeline.value, ...items];
+      timelineCursor.value = response.next_cursor || '';
+      timelineHasMore.value = Boolean(response.has_more && response.next_cursor);
     } catch (err) {
       error.value = err instanceof Error ? err.message : '协作记录加载失败';
     } finally {
@@ -251,10 +281,12 @@ export function useNativeChatterRuntime(params: {
     loading,
     error,
     timeline,
+    timelineHasMore,
     activityUpdatingIds,
     clearForRecordLoad,
     closeComposer,
     loadTimeline,
+    loadMoreTimeline,
     loadUsers,
     selectMentionUser,
     removeMentionUser,
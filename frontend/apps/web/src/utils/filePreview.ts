@@ -1,4 +1,5 @@
 import { downloadFile } from '../api/files';
+import { config } from '../config';
 import type { FileDownloadRequest, FileDownloadResponse } from '@sc/schema';
 
 const INLINE_MIMETYPE_PREFIXES = ['image/', 'text/'];
@@ -20,6 +21,22 @@ function canPreviewInline(mimetype: string) {
   return INLINE_MIMETYPES.has(normalized) || INLINE_MIMETYPE_PREFIXES.some((prefix) => normalized.startsWith(prefix));
 }
 
+export function resolveStreamDownloadUrl(payload: FileDownloadResponse | null | undefined, asAttachment = false) {
+  const path = String(payload?.download_url || '').trim();
+  if (!path) return '';
+  const url = `${config.apiBaseUrl}${path}`;
+  if (!asAttachment) return url;
+  return `${url}${url.includes('?') ? '&' : '?'}download=1`;
+}
+
+export function downloadStreamUrl(payload: FileDownloadResponse, name?: string) {
+  const link = document.createElement('a');
+  link.href = resolveStreamDownloadUrl(payload, true);
+  link.download = name || payload.name || 'download';
+  link.rel = 'noopener';
+  link.click();
+}
+
 function attachmentIdFromWebContentUrl(url: string): number {
   const clean = String(url || '').trim();
   const direct = clean.match(/^\/web\/content\/(\d+)(?:[/?#]|$)/);
@@ -86,6 +103,17 @@ function previewBlob(objectUrl: string, name: string, previewWindow?: Window | n
 export function openDownloadedFile(payload: FileDownloadResponse, fallbackName?: string, previewWindow?: Window | null) {
   const name = payload.name || fallbackName || 'download';
   const mimetype = payload.mimetype || 'application/octet-stream';
+  if (!payload.datas && payload.download_url) {
+    if (!canPreviewInline(mimetype)) {
+      previewWindow?.close();
+      downloadStreamUrl(payload, name);
+    } else if (previewWindow) {
+      previewWindow.location.replace(resolveStreamDownloadUrl(payload));
+    } else {
+      window.open(resolveStreamDownloadUrl(payload), '_blank', 'noopener');
+    }
+    return;
+  }
   if (!payload.datas && payload.url && !payload.url.startsWith('legacy-file')) {
     if (previewWindow) {
       const link = previewWindow.document.createElement('a');
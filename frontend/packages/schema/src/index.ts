@@ -505,6 +505,37 @@ export interface FileUploadResponse {
   name: string;
   model: string;
   res_id: number;
+  upload_id?: string;
+  deduplicated?: boolean;
+}
+
+export interface FileUploadSessionRequest {
+  action: 'init' | 'status' | 'finalize' | 'abort';
+  upload_id?: string;
+  model?: string;
+  res_id?: number;
+  name?: string;
+  mimetype?: string;
+  total_size?: number;
+  client_key?: string;
+  sha256?: string;
+}
+
+export interface FileUploadSession {
+  upload_id: string;
+  state: 'open' | 'done' | 'aborted';
+  offset: number;
+  total_size: number;
+  chunk_size: number;
+  max_chunk_bytes: number;
+  upload_url: string;
+  expires_at?: string;
+}
+
+export interface FileUploadChunkResponse {
+  ok: boolean;
+  data?: { upload_id: string; offset: number; total_size: number; complete: boolean };
+  error?: { code: number; message: string; offset?: number };
 }
 
 export interface FileDownloadRequest {
@@ -515,6 +546,7 @@ export interface FileDownloadRequest {
   res_id?: number;
   record_id?: number;
   name?: string;
+  delivery?: 'auto' | 'inline' | 'stream';
 }
 
 export interface FileDownloadResponse {
@@ -527,6 +559,11 @@ export interface FileDownloadResponse {
   legacy_url?: string;
   res_model: string;
   res_id: number;
+  delivery?: 'inline' | 'stream';
+  size?: number | null;
+  download_token?: string;
+  download_url?: string;
+  download_expires_at?: number;
 }
 
 export interface LoadViewRequest {
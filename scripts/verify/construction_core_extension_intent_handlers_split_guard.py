@@ -12,7 +12,7 @@ INTENT_HANDLERS = ROOT / "addons/smart_construction_core/core_extension_intent_h
 CI = ROOT / "make/ci.mk"
 
 MAX_CORE_EXTENSION_LINES = 2243
-MAX_INTENT_HANDLER_LINES = 210
+MAX_INTENT_HANDLER_LINES = 226
 
 HANDLER_MODULES = {
     "odoo.addons.smart_construction_core.handlers.system_ping_construction": ["SystemPingConstructionHandler"],
@@ -42,23 +42,24 @@ HANDLER_MODULES = {
     "odoo.addons.smart_construction_core.handlers.project_entry_context_resolve": ["ProjectEntryContextResolveHandler"],
     "odoo.addons.smart_construction_core.handlers.project_entry_context_options": ["ProjectEntryContextOptionsHandler"],
     "odoo.addons.smart_construction_core.handlers.business_evidence_trace": ["BusinessEvidenceTraceHandler"],
-    "odoo.addons.smart_construction_core.handlers.project_dashboard_block_fetch": ["ProjectDashboardBlockFetchHandler"],
+    "odoo.addons.smart_construction_core.handlers.project_dashboard_block_fetch": ["ProjectDashboardBlockFetchHandler", "ProjectDashboardBlocksFetchHandler"],
     "odoo.addons.smart_construction_core.handlers.project_plan_bootstrap_enter": ["ProjectPlanBootstrapEnterHandler"],
-    "odoo.addons.smart_construction_core.handlers.project_plan_bootstrap_block_fetch": ["ProjectPlanBootstrapBlockFetchHandler"],
+    "odoo.addons.smart_construction_core.handlers.project_plan_bootstrap_block_fetch": ["ProjectPlanBootstrapBlockFetchHandler", "ProjectPlanBootstrapBlocksFetchHandler"],
     "odoo.addons.smart_construction_core.handlers.project_execution_enter": ["ProjectExecutionEnterHandler"],
-    "odoo.addons.smart_construction_core.handlers.project_execution_block_fetch": ["ProjectExecutionBlockFetchHandler"],
+    "odoo.addons.smart_construction_core.handlers.project_execution_block_fetch": ["ProjectExecutionBlockFetchHandler", "ProjectExecutionBlocksFetchHandler"],
     "odoo.addons.smart_construction_core.handlers.project_execution_advance": ["ProjectExecutionAdvanceHandler"],
     "odoo.addons.smart_construction_core.handlers.project_connection_transition": ["ProjectConnectionTransitionHandler"],
     "odoo.addons.smart_construction_core.handlers.cost_tracking_enter": ["CostTrackingEnterHandler"],
-    "odoo.addons.smart_construction_core.handlers.cost_tracking_block_fetch": ["CostTrackingBlockFetchHandler"],
+    "odoo.addons.smart_construction_core.handlers.cost_tracking_block_fetch": ["CostTrackingBlockFetchHandler", "CostTrackingBlocksFetchHandler"],
     "odoo.addons.smart_construction_core.handlers.cost_tracking_record_create": ["CostTrackingRecordCreateHandler"],
     "odoo.addons.smart_construction_core.handlers.payment_slice_enter": ["PaymentSliceEnterHandler"],
-    "odoo.addons.smart_construction_core.handlers.payment_slice_block_fetch": ["PaymentSliceBlockFetchHandler"],
+    "odoo.addons.smart_construction_core.handlers.payment_slice_block_fetch": ["PaymentSliceBlockFetchHandler", "PaymentSliceBlocksFetchHandler"],
     "odoo.addons.smart_construction_core.handlers.payment_slice_record_create": ["PaymentSliceRecordCreateHandler"],
     "odoo.addons.smart_construction_core.handlers.settlement_slice_enter": ["SettlementSliceEnterHandler"],
-    "odoo.addons.smart_construction_core.handlers.settlement_slice_block_fetch": ["SettlementSliceBlockFetchHandler"],
+    "odoo.addons.smart_construction_core.handlers.settlement_slice_block_fetch": ["SettlementSliceBlockFetchHandler", "SettlementSliceBlocksFetchHandler"],
     "odoo.addons.smart_construction_core.handlers.workspace_home_enter": ["WorkspaceHomeEnterHandler"],
     "odoo.addons.smart_construction_core.handlers.dashboard_company_enter": ["DashboardCompanyEnterHandler"],
+    "odoo.addons.smart_construction_core.handlers.projection_refresh": ["ProjectionRefreshHandler"],
 }
 
 
@@ -159,6 +160,7 @@ def main() -> int:
             "approval.policy.steps.set",
             "project.entry.context.options",
             "cost.tracking.record.create",
+            "project.dashboard.blocks.fetch",
             "workspace.home.enter",
         ]:
             if intent not in by_intent:
@@ -371,9 +371,9 @@ def _probe_backend_handlers(errors: list[str]) -> None:
     _assert('"archive": {"active": False}' in batch, "api.data.batch must map archive to active=False", errors)
     _assert('"activate": {"active": True}' in batch, "api.data.batch must map activate to active=True", errors)
     _assert("env_model.check_access_rights(\"write\")" in batch, "api.data.batch must check write ACL", errors)
-    _assert("rec.check_access_rule(\"write\")" in batch, "api.data.batch must check record write rule", errors)
+    _assert("_filter_access_rules(\"write\")" in batch, "api.data.batch must check record write rule", errors)
     _assert("apply_project_scope_domain" in batch, "api.data.batch must enforce project scope", errors)
-    _assert("resolve_idempotency_decision" in batch, "api.data.batch must keep idempotency", errors)
+    _assert("claim_idempotency_key" in batch, "api.data.batch must keep idempotency", errors)
     _assert("resolve_unlink_policy" in unlink, "api.data.unlink must enforce delete_policy", errors)
     _assert("env_model.check_access_rights(\"unlink\")" in unlink, "api.data.unlink must check unlink ACL", errors)
     _assert("recs.check_access_rule(\"unlink\")" in unlink, "api.data.unlink must check record unlink rule", errors)
@@ -39,6 +39,7 @@ REQUIRED_SCOPE_FILES = {
     "addons/smart_construction_core/handlers/payment_slice_record_create.py": ["selected_project_id_from_context"],
     "addons/smart_construction_core/handlers/settlement_slice_enter.py": ["selected_project_id_from_context"],
     "addons/smart_construction_core/handlers/settlement_slice_block_fetch.py": ["selected_project_id_from_context"],
+    "addons/smart_construction_core/handlers/scene_blocks_fetch.py": ["project_scope_denied_response", "selected_project_id_from_context"],
     "addons/smart_construction_core/services/project_execution_item_projection_service.py": ["selected_project_id_from_context"],
 }
 